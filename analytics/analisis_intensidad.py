@@ -8,6 +8,7 @@ from datetime import datetime, timedelta, date
 import json
 import numpy as np
 from entrenos.utils.utils import parse_reps_and_series
+from entrenos.services import notas_liftin_service
 from clientes.models import Cliente
 from entrenos.models import EntrenoRealizado
 from entrenos.models import EjercicioRealizado
@@ -41,10 +42,7 @@ class AnalisisIntensidadAvanzado:
         """
         fecha_inicio = datetime.now().date() - timedelta(days=periodo_dias)
 
-        entrenos = EntrenoRealizado.objects.filter(
-            cliente=self.cliente,
-            fecha__gte=fecha_inicio
-        ).prefetch_related('ejercicios_realizados')
+        entrenos = self._entrenos_desde(fecha_inicio)
 
         distribucion = {
             'recuperacion': {'tiempo': 0, 'porcentaje': 0, 'calorias': 0},
@@ -108,10 +106,7 @@ class AnalisisIntensidadAvanzado:
         Escalado calibrado para generar valores semanales realistas
         """
         fecha_inicio = datetime.now().date() - timedelta(days=periodo_dias)
-        entrenos = EntrenoRealizado.objects.filter(
-            cliente=self.cliente,
-            fecha__gte=fecha_inicio
-        ).prefetch_related('ejercicios_realizados')
+        entrenos = self._entrenos_desde(fecha_inicio)
 
         carga_semanal = {}
         semana_actual = fecha_inicio
@@ -268,10 +263,7 @@ class AnalisisIntensidadAvanzado:
         hoy = timezone.now().date()
         fecha_inicio_calculo = hoy - timedelta(days=periodo_dias)
 
-        entrenos = EntrenoRealizado.objects.filter(
-            cliente=self.cliente,
-            fecha__gte=fecha_inicio_calculo
-        ).order_by('fecha').prefetch_related('ejercicios_realizados')
+        entrenos = self._entrenos_desde(fecha_inicio_calculo).order_by('fecha')
 
         fatiga_acumulada = 0.0
         ultimo_dia_entreno = None
@@ -347,6 +339,17 @@ class AnalisisIntensidadAvanzado:
     # MÉTODOS AUXILIARES IMPLEMENTADOS
     # ============================================================================
 
+    def _entrenos_desde(self, fecha_inicio):
+        """
+        Entrenos del cliente desde `fecha_inicio` con ejercicios y filas Liftin
+        precargados: `_estimar_zona_entrenamiento` y `_calcular_carga_dia`
+        leen `series_liftin` vía `ejercicios_de` sin una consulta por entreno.
+        """
+        return EntrenoRealizado.objects.filter(
+            cliente=self.cliente,
+            fecha__gte=fecha_inicio
+        ).prefetch_related('ejercicios_realizados', 'series_liftin')
+
     def _estimar_zona_entrenamiento(self, entreno):
         """
         Estima zona de entrenamiento basada en características del entreno
@@ -354,7 +357,7 @@ class AnalisisIntensidadAvanzado:
         duracion = entreno.duracion_minutos or 60
 
         if entreno.notas_liftin:
-            ejercicios = parsear_ejercicios(entreno.notas_liftin)
+            ejercicios = notas_liftin_service.ejercicios_de(entreno)
             intensidad_promedio = self._calcular_intensidad_promedio(ejercicios)
 
             if intensidad_promedio >= 85:
@@ -586,7 +589,7 @@ class AnalisisIntensidadAvanzado:
         if not entreno.notas_liftin:
             return 50  # Carga base estimada
 
-        ejercicios = parsear_ejercicios(entreno.notas_liftin)
+        ejercicios = notas_liftin_service.ejercicios_de(entreno)
         volumen = self._calcular_volumen_entreno(ejercicios)
         intensidad = self._estimar_intensidad_entreno(ejercicios)
         duracion = entreno.duracion_minutos or 60
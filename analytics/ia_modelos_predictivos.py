@@ -6,6 +6,8 @@ from django.db.models import Count, Avg, Max, Min
 import logging
 from collections import defaultdict
 
+import numpy as np
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,19 +30,15 @@ class ModelosPredictivosIA:
             'min_datos_entrenamiento': 3,  # Reducido para funcionar con pocos datos
             'max_peso_realista': 200,
             'min_peso_realista': 0.5,
+            'horizonte_prediccion_semanas': 4,
         }
 
     def generar_predicciones(self):
-        ejercicios = self.obtener_ejercicios_disponibles()
         self.predicciones = []
 
-        for ejercicio in ejercicios:
-            try:
-                pred = self.predecir_rendimiento_ejercicio(ejercicio)
-                pred['nombre_ejercicio'] = ejercicio
-                self.predicciones.append(pred)
-            except Exception as e:
-                logger.warning(f"[predicción] Fallo en {ejercicio}: {e}")
+        for ejercicio, pred in self.predecir_rendimiento_multiples().items():
+            pred['nombre_ejercicio'] = ejercicio
+            self.predicciones.append(pred)
 
         return self.predicciones
 
@@ -216,110 +214,179 @@ class ModelosPredictivosIA:
             logger.error(f"Error obteniendo ejercicios: {e}")
             return []
 
-    def predecir_rendimiento_ejercicio(self, ejercicio):
+    def _series_por_ejercicio(self, ejercicios=None):
         """
-        Predice el rendimiento futuro de un ejercicio específico
-        Usa análisis de tendencia simple pero efectivo
+        Series de pesos y fechas de la ventana temporal, agrupadas por ejercicio.
+        Una sola consulta para todos los ejercicios (sin acceder a registro.entreno).
         """
-        try:
-            fecha_limite = datetime.now().date() - timedelta(days=self.configuracion['ventana_temporal_dias'])
+        fecha_limite = datetime.now().date() - timedelta(days=self.configuracion['ventana_temporal_dias'])
 
-            # Obtener datos históricos
-            registros = EjercicioRealizado.objects.filter(
-                entreno__cliente=self.cliente,
-                nombre_ejercicio=ejercicio,
-                entreno__fecha__gte=fecha_limite,
-                peso_kg__gt=0
-            ).order_by('entreno__fecha')
+        registros = EjercicioRealizado.objects.filter(
+            entreno__cliente=self.cliente,
+            entreno__fecha__gte=fecha_limite,
+            peso_kg__gt=0
+        )
+        if ejercicios is not None:
+            registros = registros.filter(nombre_ejercicio__in=list(ejercicios))
+
+        series = defaultdict(lambda: ([], []))
+        for nombre, peso, fecha in registros.order_by('entreno__fecha', 'id').values_list(
+                'nombre_ejercicio', 'peso_kg', 'entreno__fecha'):
+            pesos, fechas = series[nombre]
+            pesos.append(peso)
+            fechas.append(fecha)
+        return dict(series)
+
+    def _ejercicios_con_datos(self, series):
+        """Mismo criterio que obtener_ejercicios_disponibles, calculado sobre las series ya cargadas"""
+        cantidades = {
+            nombre: sum(1 for peso in pesos if peso < self.configuracion['max_peso_realista'])
+            for nombre, (pesos, _) in series.items()
+        }
+        candidatos = [nombre for nombre, cantidad in cantidades.items()
+                      if cantidad >= self.configuracion['min_datos_entrenamiento']]
+        return sorted(candidatos, key=lambda nombre: -cantidades[nombre])
 
-            if registros.count() < self.configuracion['min_datos_entrenamiento']:
-                return {
+    @staticmethod
+    def _pendientes_lineales(series):
+        """
+        Pendiente (kg/semana) de la recta de mínimos cuadrados de cada serie.
+        Todas las series se ajustan a la vez: se rellenan con ceros hasta la más
+        larga (el relleno no suma en los sumatorios) y se resuelven las
+        ecuaciones normales por filas.
+        """
+        nombres = [nombre for nombre, (pesos, _) in series.items() if pesos]
+        if not nombres:
+            return {}
+
+        largo = max(len(series[nombre][0]) for nombre in nombres)
+        x = np.zeros((len(nombres), largo))
+        y = np.zeros((len(nombres), largo))
+        n = np.zeros(len(nombres))
+        for i, nombre in enumerate(nombres):
+            pesos, fechas = series[nombre]
+            x[i, :len(pesos)] = [(fecha - fechas[0]).days / 7 for fecha in fechas]
+            y[i, :len(pesos)] = pesos
+            n[i] = len(pesos)
+
+        suma_x, suma_y = x.sum(axis=1), y.sum(axis=1)
+        denominador = n * (x * x).sum(axis=1) - suma_x ** 2
+        numerador = n * (x * y).sum(axis=1) - suma_x * suma_y
+        # Todas las fechas iguales: no hay recta, pendiente 0
+        pendientes = np.divide(numerador, denominador, out=np.zeros_like(numerador), where=denominador > 0)
+        return dict(zip(nombres, pendientes.tolist()))
+
+    def predecir_rendimiento_multiples(self, ejercicios=None):
+        """
+        Predicciones de varios ejercicios con una sola consulta.
+        Sin lista, usa los mismos ejercicios que obtener_ejercicios_disponibles.
+        Devuelve {ejercicio: predicción} con la forma de predecir_rendimiento_ejercicio.
+        """
+        try:
+            series = self._series_por_ejercicio(ejercicios)
+            if ejercicios is None:
+                ejercicios = self._ejercicios_con_datos(series)
+        except Exception as e:
+            logger.error(f"Error cargando series de ejercicios: {e}")
+            return {ejercicio: {'prediccion_valida': False, 'razon': f'Error: {str(e)}'}
+                    for ejercicio in ejercicios or []}
+
+        predicciones = {}
+        validadas = {}
+        for ejercicio in ejercicios:
+            pesos_brutos, fechas_brutas = series.get(ejercicio, ([], []))
+            if len(pesos_brutos) < self.configuracion['min_datos_entrenamiento']:
+                predicciones[ejercicio] = {
                     'prediccion_valida': False,
                     'razon': f'Se necesitan al menos {self.configuracion["min_datos_entrenamiento"]} registros',
-                    'registros_actuales': registros.count()
+                    'registros_actuales': len(pesos_brutos)
                 }
+                continue
 
-            # Convertir a listas para análisis
             pesos = []
             fechas = []
-            for registro in registros:
-                peso_validado = self._validar_peso(registro.peso_kg)
+            for peso, fecha in zip(pesos_brutos, fechas_brutas):
+                peso_validado = self._validar_peso(peso)
                 if peso_validado:
                     pesos.append(peso_validado)
-                    fechas.append(registro.entreno.fecha)
+                    fechas.append(fecha)
 
             if len(pesos) < 3:
-                return {'prediccion_valida': False, 'razon': 'Datos insuficientes después de validación'}
-
-            # Análisis de tendencia simple
-            peso_inicial = pesos[0]
-            peso_actual = pesos[-1]
-            peso_maximo = max(pesos)
-            peso_promedio = sum(pesos) / len(pesos)
-
-            # Calcular progreso
-            if peso_inicial > 0:
-                progreso_total = ((peso_actual - peso_inicial) / peso_inicial) * 100
-            else:
-                progreso_total = 0
+                predicciones[ejercicio] = {'prediccion_valida': False, 'razon': 'Datos insuficientes después de validación'}
+                continue
+            validadas[ejercicio] = (pesos, fechas)
 
-            # Calcular tendencia reciente (últimos 5 registros)
-            registros_recientes = pesos[-5:] if len(pesos) >= 5 else pesos
-            if len(registros_recientes) >= 2:
-                tendencia_reciente = registros_recientes[-1] - registros_recientes[0]
-            else:
-                tendencia_reciente = 0
-
-            # Predicción basada en tendencia y progreso
-            factor_prediccion = 1.0
+        pendientes = self._pendientes_lineales(validadas)
+        for ejercicio, (pesos, fechas) in validadas.items():
+            try:
+                predicciones[ejercicio] = self._prediccion_desde_serie(pesos, fechas, pendientes[ejercicio])
+            except Exception as e:
+                logger.error(f"Error prediciendo {ejercicio}: {e}")
+                predicciones[ejercicio] = {'prediccion_valida': False, 'razon': f'Error: {str(e)}'}
 
-            if progreso_total > 15:  # Progreso excelente
-                factor_prediccion = 1.05  # 5% de mejora
-            elif progreso_total > 5:  # Progreso bueno
-                factor_prediccion = 1.03  # 3% de mejora
-            elif progreso_total > 0:  # Progreso leve
-                factor_prediccion = 1.02  # 2% de mejora
-            elif tendencia_reciente > 0:  # Tendencia positiva reciente
-                factor_prediccion = 1.025  # 2.5% de mejora
-            else:  # Sin progreso o regresión
-                factor_prediccion = 1.01  # 1% de mejora conservadora
+        return {ejercicio: predicciones[ejercicio] for ejercicio in ejercicios}
 
-            peso_predicho = peso_actual * factor_prediccion
+    def predecir_rendimiento_ejercicio(self, ejercicio):
+        """
+        Predice el rendimiento futuro de un ejercicio específico
+        Usa análisis de tendencia simple pero efectivo
+        """
+        return self.predecir_rendimiento_multiples([ejercicio])[ejercicio]
+
+    def _prediccion_desde_serie(self, pesos, fechas, pendiente_semanal):
+        """Predicción de un ejercicio a partir de su serie ya validada"""
+        # Análisis de tendencia simple
+        peso_inicial = pesos[0]
+        peso_actual = pesos[-1]
+        peso_maximo = max(pesos)
+        peso_promedio = sum(pesos) / len(pesos)
+
+        # Calcular progreso
+        if peso_inicial > 0:
+            progreso_total = ((peso_actual - peso_inicial) / peso_inicial) * 100
+        else:
+            progreso_total = 0
 
-            # Validar predicción
-            if peso_predicho > peso_maximo * 1.15:  # No más del 15% sobre el máximo histórico
-                peso_predicho = peso_maximo * 1.05
+        # Calcular tendencia reciente (últimos 5 registros)
+        registros_recientes = pesos[-5:] if len(pesos) >= 5 else pesos
+        if len(registros_recientes) >= 2:
+            tendencia_reciente = registros_recientes[-1] - registros_recientes[0]
+        else:
+            tendencia_reciente = 0
 
-            # Calcular confianza basada en cantidad de datos y consistencia
-            confianza_base = min(95, 50 + len(pesos) * 3)
+        # Predicción: la recta de mínimos cuadrados proyectada al horizonte,
+        # acotada entre +1% (mejora conservadora) y +5% (progreso excelente)
+        horizonte = self.configuracion['horizonte_prediccion_semanas']
+        peso_tendencia = peso_actual + pendiente_semanal * horizonte
+        peso_predicho = min(max(peso_tendencia, peso_actual * 1.01), peso_actual * 1.05)
 
-            # Ajustar confianza por consistencia
-            if len(pesos) >= 5:
-                variabilidad = (max(pesos[-5:]) - min(pesos[-5:])) / peso_promedio
-                if variabilidad < 0.1:  # Muy consistente
-                    confianza_base += 10
-                elif variabilidad > 0.3:  # Muy variable
-                    confianza_base -= 15
+        # Calcular confianza basada en cantidad de datos y consistencia
+        confianza_base = min(95, 50 + len(pesos) * 3)
 
-            confianza = max(60, min(95, confianza_base))
+        # Ajustar confianza por consistencia
+        if len(pesos) >= 5:
+            variabilidad = (max(pesos[-5:]) - min(pesos[-5:])) / peso_promedio
+            if variabilidad < 0.1:  # Muy consistente
+                confianza_base += 10
+            elif variabilidad > 0.3:  # Muy variable
+                confianza_base -= 15
 
-            return {
-                'prediccion_valida': True,
-                'peso_predicho': round(peso_predicho, 1),
-                'peso_actual': peso_actual,
-                'peso_maximo': peso_maximo,
-                'progreso_total': round(progreso_total, 1),
-                'tendencia_reciente': round(tendencia_reciente, 1),
-                'confianza': round(confianza, 1),
-                'datos_historicos': pesos,
-                'fechas_historicas': [f.strftime('%Y-%m-%d') for f in fechas],
-                'total_registros': len(pesos),
-                'recomendacion': self._generar_recomendacion_prediccion(progreso_total, tendencia_reciente)
-            }
+        confianza = max(60, min(95, confianza_base))
 
-        except Exception as e:
-            logger.error(f"Error prediciendo {ejercicio}: {e}")
-            return {'prediccion_valida': False, 'razon': f'Error: {str(e)}'}
+        return {
+            'prediccion_valida': True,
+            'peso_predicho': round(peso_predicho, 1),
+            'peso_actual': peso_actual,
+            'peso_maximo': peso_maximo,
+            'progreso_total': round(progreso_total, 1),
+            'tendencia_reciente': round(tendencia_reciente, 1),
+            'pendiente_semanal': round(pendiente_semanal, 2),
+            'confianza': round(confianza, 1),
+            'datos_historicos': pesos,
+            'fechas_historicas': [f.strftime('%Y-%m-%d') for f in fechas],
+            'total_registros': len(pesos),
+            'recomendacion': self._generar_recomendacion_prediccion(progreso_total, tendencia_reciente)
+        }
 
     def _generar_recomendacion_prediccion(self, progreso_total, tendencia_reciente):
         """Genera recomendación basada en la predicción"""
@@ -337,7 +404,8 @@ class ModelosPredictivosIA:
     def obtener_resumen_predicciones(self):
         """Obtiene resumen general de todas las predicciones"""
         try:
-            ejercicios_disponibles = self.obtener_ejercicios_disponibles()
+            predicciones = self.predecir_rendimiento_multiples()
+            ejercicios_disponibles = list(predicciones)
 
             if not ejercicios_disponibles:
                 return {
@@ -353,7 +421,7 @@ class ModelosPredictivosIA:
             ejercicios_con_progreso = 0
 
             for ejercicio in ejercicios_disponibles[:8]:  # Limitar a 8 para rendimiento
-                prediccion = self.predecir_rendimiento_ejercicio(ejercicio)
+                prediccion = predicciones[ejercicio]
                 if prediccion.get('prediccion_valida'):
                     predicciones_validas += 1
                     suma_confianza += prediccion.get('confianza', 0)
@@ -385,12 +453,13 @@ class ModelosPredictivosIA:
     def generar_predicciones_multiples(self, ejercicios=None):
         """Genera predicciones para múltiples ejercicios"""
         try:
+            por_ejercicio = self.predecir_rendimiento_multiples(ejercicios)
             if ejercicios is None:
-                ejercicios = self.obtener_ejercicios_disponibles()[:5]
+                ejercicios = list(por_ejercicio)[:5]
 
             predicciones = []
             for ejercicio in ejercicios:
-                prediccion = self.predecir_rendimiento_ejercicio(ejercicio)
+                prediccion = por_ejercicio[ejercicio]
                 if prediccion.get('prediccion_valida'):
                     predicciones.append({
                         'ejercicio': ejercicio,
@@ -0,0 +1,115 @@
+# Script de benchmark — no es un test formal.
+# Compara la búsqueda lineal antigua del historial de ejercicios del
+# planificador Helms (subcadena sobre toda la lista precargada, por cada
+# ejercicio de cada semana) con el índice de ejercicios/historial.py, sobre
+# un historial sintético de tamaño creciente. No toca la BD.
+#
+# Uso:
+#   python3 manage.py benchmark_historial_helms
+#   python3 manage.py benchmark_historial_helms --sesiones 500 2000 8000 --semanas 52
+
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from analytics.planificador_helms.calculo.compatibilidad_fase import _bucket_desde_reps
+from analytics.planificador_helms.database.ejercicios import CATEGORIAS_CANONICAS, EJERCICIOS_DATABASE
+from analytics.planificador_helms.ejercicios.historial import IndiceHistorial
+from analytics.planificador_helms.utils.helpers import extraer_nombre_ejercicio
+
+
+def nombres_catalogo():
+    return sorted({
+        extraer_nombre_ejercicio(ej)
+        for categorias in EJERCICIOS_DATABASE.values()
+        for categoria in CATEGORIAS_CANONICAS
+        for ej in categorias.get(categoria, [])
+    })
+
+
+def historial_sintetico(n_sesiones, nombres, ejercicios_por_sesion=6, semilla=7):
+    """Filas con la forma de _precargar_historial_ejercicios, más reciente primero."""
+    rnd = random.Random(semilla)
+    hoy = date.today()
+    filas = []
+    for s in range(n_sesiones):
+        fecha = hoy - timedelta(days=s)
+        for nombre in rnd.sample(nombres, ejercicios_por_sesion):
+            filas.append({
+                'nombre_ejercicio': nombre,
+                'peso_kg': rnd.choice([None, 20, 40, 60, 80, 100]),
+                'rpe': rnd.choice([None, 6, 7, 8, 9]),
+                'repeticiones': rnd.choice([None, 3, 5, 8, 10, 12]),
+                'entreno__fecha': fecha,
+            })
+    return filas
+
+
+def sesiones_lineal(filas, nombre_ejercicio):
+    """Camino anterior de _obtener_historial_ejercicio: (coincidencias, sesiones del bucket de la referencia)."""
+    nombre_lower = nombre_ejercicio.lower()
+    matches = [e for e in filas if nombre_lower in (e['nombre_ejercicio'] or '').lower()]
+    if not matches or matches[0].get('repeticiones') is None:
+        return matches, []
+    bucket_ref = _bucket_desde_reps(int(matches[0]['repeticiones']))
+    return matches, [
+        {
+            'peso': float(m['peso_kg']),
+            'reps': int(m['repeticiones']),
+            'rpe': float(m['rpe']),
+            'fecha': m['entreno__fecha'],
+        }
+        for m in matches
+        if (
+            m.get('repeticiones') is not None
+            and m['peso_kg']
+            and m['rpe'] is not None
+            and _bucket_desde_reps(int(m['repeticiones'])) == bucket_ref
+        )
+    ]
+
+
+def sesiones_indice(indice, nombre_ejercicio):
+    """Mismo resultado que sesiones_lineal, a través de IndiceHistorial."""
+    matches = indice.coincidencias(nombre_ejercicio)
+    if not matches or matches[0].get('repeticiones') is None:
+        return matches, []
+    return matches, indice.sesiones(nombre_ejercicio, _bucket_desde_reps(int(matches[0]['repeticiones'])))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark del historial de ejercicios del planificador Helms: búsqueda lineal vs índice.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sesiones', type=int, nargs='+', default=[250, 1000, 4000],
+                            help='Tamaños de historial (sesiones) a medir')
+        parser.add_argument('--semanas', type=int, default=52,
+                            help='Semanas de plan simuladas (cada una consulta todo el catálogo)')
+
+    def handle(self, *args, **options):
+        nombres = nombres_catalogo()
+        consultas = nombres * options['semanas']
+        self.stdout.write(f"Catálogo: {len(nombres)} ejercicios | consultas por plan: {len(consultas)}")
+
+        for n in options['sesiones']:
+            filas = historial_sintetico(n, nombres)
+
+            t0 = time.perf_counter()
+            lineal = [sesiones_lineal(filas, c) for c in consultas[:len(nombres)]]
+            # La búsqueda lineal no memoiza: el coste del plan es proporcional a las semanas
+            t_lineal = (time.perf_counter() - t0) * options['semanas']
+
+            t0 = time.perf_counter()
+            indice = IndiceHistorial(filas)
+            resultados = [sesiones_indice(indice, c) for c in consultas]
+            t_indice = time.perf_counter() - t0
+
+            if resultados[:len(nombres)] != lineal:
+                self.stdout.write(self.style.ERROR(f"  {n} sesiones: resultados distintos"))
+                continue
+            self.stdout.write(
+                f"  {n:6d} sesiones ({len(filas):6d} filas): lineal {t_lineal * 1000:9.1f} ms | "
+                f"índice {t_indice * 1000:7.1f} ms | x{t_lineal / max(t_indice, 1e-9):.0f}"
+            )
@@ -0,0 +1,53 @@
+# Generated by Django 5.2 on 2026-10-18 14:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_historialfase'),
+        ('clientes', '0009_add_hrv_ms_to_bitacora'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanHelmsPersistido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('año', models.PositiveSmallIntegerField()),
+                ('huella', models.CharField(max_length=64)),
+                ('version_historial', models.PositiveIntegerField(default=0)),
+                ('version_generada', models.PositiveIntegerField(default=0)),
+                ('semanas', models.JSONField(default=dict, help_text='{semana_global: {dia_N: [ejercicios]}}')),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('cliente', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='planes_helms', to='clientes.cliente')),
+            ],
+            options={
+                'verbose_name': 'Plan Helms persistido',
+                'verbose_name_plural': 'Planes Helms persistidos',
+            },
+        ),
+        migrations.CreateModel(
+            name='SesionPlanHelms',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('datos', models.JSONField(null=True)),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sesiones', to='analytics.planhelmspersistido')),
+            ],
+            options={
+                'verbose_name': 'Sesión de plan Helms',
+                'verbose_name_plural': 'Sesiones de plan Helms',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='planhelmspersistido',
+            constraint=models.UniqueConstraint(fields=('cliente', 'año', 'huella'), name='plan_helms_cliente_anio_huella_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='sesionplanhelms',
+            constraint=models.UniqueConstraint(fields=('plan', 'fecha'), name='sesion_plan_helms_fecha_uniq'),
+        ),
+    ]
@@ -508,3 +508,52 @@ class HistorialFase(models.Model):
     def obtener_fases_completadas(cls, cliente):
         """Obtiene todas las fases completadas del cliente"""
         return cls.objects.filter(cliente=cliente, completada=True).order_by('-fecha_fin')
+
+
+class PlanHelmsPersistido(models.Model):
+    """
+    Semanas generadas del plan Helms de un cliente para un año, compartidas
+    por todos los workers (ver analytics/planificador_helms/persistencia.py).
+
+    `huella` resume las entradas del planificador (perfil, días, objetivo,
+    año, versión del algoritmo). `version_historial` sube cada vez que cambia
+    el historial o las lesiones del cliente; si no coincide con
+    `version_generada`, solo se regeneran las semanas desde la actual.
+    """
+    cliente = models.ForeignKey(
+        Cliente, on_delete=models.CASCADE, related_name='planes_helms',
+        db_constraint=False,  # el planificador también se usa con perfiles sin Cliente
+    )
+    año = models.PositiveSmallIntegerField()
+    huella = models.CharField(max_length=64)
+    version_historial = models.PositiveIntegerField(default=0)
+    version_generada = models.PositiveIntegerField(default=0)
+    semanas = models.JSONField(default=dict, help_text="{semana_global: {dia_N: [ejercicios]}}")
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Plan Helms persistido"
+        verbose_name_plural = "Planes Helms persistidos"
+        constraints = [
+            models.UniqueConstraint(fields=['cliente', 'año', 'huella'], name='plan_helms_cliente_anio_huella_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Plan Helms cliente={self.cliente_id} {self.año} ({len(self.semanas)} semanas)"
+
+
+class SesionPlanHelms(models.Model):
+    """Resultado de generar_entrenamiento_para_fecha para una fecha de un plan persistido."""
+    plan = models.ForeignKey(PlanHelmsPersistido, on_delete=models.CASCADE, related_name='sesiones')
+    fecha = models.DateField()
+    datos = models.JSONField(null=True)
+
+    class Meta:
+        verbose_name = "Sesión de plan Helms"
+        verbose_name_plural = "Sesiones de plan Helms"
+        constraints = [
+            models.UniqueConstraint(fields=['plan', 'fecha'], name='sesion_plan_helms_fecha_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.plan_id} {self.fecha}"
@@ -14,7 +14,7 @@ from .config import DISTRIBUCION_DIAS, TEMPOS, REP_RANGE_AJUSTE_PEQUENOS, GRUPOS
 from .distribucion.asignador import GrupoParaAsignar, asignar_semana, AsignacionImposibleError
 from .volumen.calculadora import calcular_volumen_optimo, CalculadoraVolumen
 from .models.perfil_cliente import PerfilCliente
-from .database.ejercicios import EJERCICIOS_DATABASE
+from .database.ejercicios import obtener_tipo_ejercicio
 from .periodizacion.generador import GeneradorPeriodizacion
 from .calculo.peso import CalculadorPeso
 from .calculo.compatibilidad_fase import resolver_peso_objetivo, resolver_ancla_historica, _bucket_desde_reps
@@ -22,6 +22,8 @@ from .calculo.fatiga import GestorFatiga
 from .ejercicios.selector import SelectorEjercicios
 from .ejercicios.patrones import PatronManager
 from .ejercicios.variacion import derivar_rep_rpe_toque, construir_variantes_por_toque
+from .ejercicios.historial import IndiceHistorial
+from . import persistencia
 from .utils.helpers import normalizar_nombre, extraer_nombre_ejercicio, extraer_patron_ejercicio
 from entrenos.services.descanso_service import get_descanso_sugerido
 
@@ -36,6 +38,18 @@ class PlanificadorHelms:
         self.ejercicios_evitar = set(normalizar_nombre(e) for e in (perfil_cliente.ejercicios_evitar or []))
 
     def generar_entrenamiento_para_fecha(self, fecha_objetivo: date) -> Optional[Dict[str, Any]]:
+        """
+        Sesión del plan para `fecha_objetivo`. Se lee del plan persistido (una
+        consulta por clave) y solo se genera si falta o quedó obsoleta.
+        """
+        año_planificacion = getattr(self.perfil, 'año_planificacion', None) or datetime.now().year
+        sesion = persistencia.leer_sesion(self, año_planificacion, fecha_objetivo)
+        if sesion is persistencia.FALTA:
+            sesion = self._generar_entrenamiento_para_fecha(fecha_objetivo)
+            persistencia.guardar_sesion(self, año_planificacion, fecha_objetivo, sesion)
+        return sesion
+
+    def _generar_entrenamiento_para_fecha(self, fecha_objetivo: date) -> Optional[Dict[str, Any]]:
         try:
             # Bug 1 fix: usar semana RELATIVA al plan, no semana ISO del calendario
             año_planificacion = getattr(self.perfil, 'año_planificacion', None) or datetime.now().year
@@ -113,14 +127,13 @@ class PlanificadorHelms:
         }
 
     def generar_plan_anual(self) -> Dict[str, Any]:
-        from django.core.cache import cache as _djcache
+        # Semanas ya generadas y vigentes del plan persistido; solo se generan
+        # las que faltan (todas la primera vez, desde la actual si cambió el historial).
         _año = getattr(self.perfil, 'año_planificacion', None) or datetime.now().year
-        _ck = f'plan_anual_{self.perfil.id}_{self.dias_disponibles}_{self.objetivo_principal}_{_año}'
-        _cached = _djcache.get(_ck)
-        if _cached is not None:
-            return _cached
+        plan_guardado, semanas_guardadas = persistencia.semanas_vigentes(self, _año)
+        semanas_plan = {}
+        historial_cargado = False
 
-        self._precargar_historial_ejercicios()
         periodizacion = GeneradorPeriodizacion.generar_periodizacion_anual()
         entrenos_por_fecha = {}
         plan_por_bloques = []
@@ -157,7 +170,13 @@ class PlanificadorHelms:
                                                                          bloque.get("volumen_multiplicador", 1.0))
                     bloque_semana["intensidad_rpe"] = (detalle.get("rpe", bloque.get("intensidad_rpe", (7,))[0]),)
 
-                plan_semana = self._generar_semana_especifica(bloque_semana, num_bloque_idx)
+                plan_semana = semanas_guardadas.get(semana_global)
+                if plan_semana is None:
+                    if not historial_cargado:
+                        self._precargar_historial_ejercicios()
+                        historial_cargado = True
+                    plan_semana = self._generar_semana_especifica(bloque_semana, num_bloque_idx)
+                semanas_plan[semana_global] = plan_semana
 
                 dia_keys = sorted(plan_semana.keys())
                 for i, dia_key in enumerate(dia_keys):
@@ -193,7 +212,8 @@ class PlanificadorHelms:
                 "año_planificacion": año_planificacion,
             },
         }
-        _djcache.set(_ck, _result, 3600)  # 1 hora
+        if historial_cargado:
+            persistencia.guardar_semanas(plan_guardado, semanas_plan)
         return _result
 
     def _generar_semana_especifica(self, bloque: Dict[str, Any], numero_bloque: int) -> Dict[str, List[Dict[str, Any]]]:
@@ -461,12 +481,7 @@ class PlanificadorHelms:
         return semana_planificada
 
     def _determinar_tipo_ejercicio_completo(self, grupo: str, nombre: str) -> str:
-        db_grupo = EJERCICIOS_DATABASE.get(grupo, {})
-        for tipo in ['compuesto_principal', 'compuesto_secundario', 'aislamiento']:
-            for ej in db_grupo.get(tipo, []):
-                if extraer_nombre_ejercicio(ej).lower() == nombre.lower():
-                    return tipo
-        return 'aislamiento'
+        return obtener_tipo_ejercicio(grupo, nombre)
 
     def _precargar_historial_ejercicios(self):
         """Carga el historial de ejercicios del cliente con una única consulta DB."""
@@ -483,20 +498,26 @@ class PlanificadorHelms:
             logger.warning("Error precargando historial de ejercicios: %s", e)
             self._historial_ejercicios_raw = []
 
+    def _indice_historial(self) -> IndiceHistorial:
+        """Índice de _historial_ejercicios_raw; se reconstruye si se reasigna la lista."""
+        indice = getattr(self, '_indice_historial_cache', None)
+        if indice is None or indice.filas is not self._historial_ejercicios_raw:
+            indice = self._indice_historial_cache = IndiceHistorial(self._historial_ejercicios_raw)
+        return indice
+
     def _obtener_historial_ejercicio(self, nombre_ejercicio: str) -> dict:
         """
         Devuelve el peso y RPE de la última sesión del ejercicio.
-        Usa la caché en memoria si está disponible (cargada por _precargar_historial_ejercicios).
+        Usa la caché en memoria si está disponible (cargada por _precargar_historial_ejercicios),
+        a través de su índice por nombre (ver ejercicios/historial.py).
         """
         resultado = {'peso_real': None, 'rpe_real': None, 'reps_real': None, 'peso_real_bruto': None}
         try:
             nombre_lower = nombre_ejercicio.lower()
 
             if hasattr(self, '_historial_ejercicios_raw'):
-                matches = [
-                    e for e in self._historial_ejercicios_raw
-                    if nombre_lower in (e['nombre_ejercicio'] or '').lower()
-                ]
+                indice = self._indice_historial()
+                matches = indice.coincidencias(nombre_lower)
                 if not matches:
                     return resultado
 
@@ -518,21 +539,7 @@ class PlanificadorHelms:
                     return resultado
 
                 bucket_ref = _bucket_desde_reps(int(ref['repeticiones']))
-                sesiones = [
-                    {
-                        'peso': float(m['peso_kg']),
-                        'reps': int(m['repeticiones']),
-                        'rpe': float(m['rpe']),
-                        'fecha': m['entreno__fecha'],
-                    }
-                    for m in matches
-                    if (
-                        m.get('repeticiones') is not None
-                        and m['peso_kg']
-                        and m['rpe'] is not None
-                        and _bucket_desde_reps(int(m['repeticiones'])) == bucket_ref
-                    )
-                ]
+                sesiones = indice.sesiones(nombre_lower, bucket_ref)
 
                 if not sesiones:
                     # Referencia sin datos completos y sin otras sesiones compatibles
@@ -554,3 +554,29 @@ def obtener_mapeo_inverso() -> Dict[str, str]:
     if _MAPEO_INVERSO_CACHE is None:
         _MAPEO_INVERSO_CACHE = crear_mapeo_inverso()
     return _MAPEO_INVERSO_CACHE
+
+
+# Cache (grupo, nombre normalizado) -> categoría, construida una sola vez
+_TIPO_EJERCICIO_CACHE: Optional[Dict[tuple, str]] = None
+
+
+def obtener_tipo_ejercicio(grupo_muscular: str, nombre_ejercicio: str) -> str:
+    """
+    Categoría del ejercicio dentro de su grupo ('compuesto_principal',
+    'compuesto_secundario' o 'aislamiento'). Si aparece en varias gana la
+    primera de CATEGORIAS_CANONICAS; si no está en el catálogo, 'aislamiento'.
+
+    Ejemplo:
+        >>> obtener_tipo_ejercicio('pecho', 'Press Banca con Barra')
+        'compuesto_principal'
+    """
+    global _TIPO_EJERCICIO_CACHE
+    if _TIPO_EJERCICIO_CACHE is None:
+        tipos = {}
+        for grupo, categorias in EJERCICIOS_DATABASE.items():
+            for categoria in CATEGORIAS_CANONICAS:
+                for ejercicio in categorias.get(categoria, []):
+                    nombre = ejercicio.get('nombre', '') if isinstance(ejercicio, dict) else str(ejercicio)
+                    tipos.setdefault((grupo, nombre.strip().lower()), categoria)
+        _TIPO_EJERCICIO_CACHE = tipos
+    return _TIPO_EJERCICIO_CACHE.get((grupo_muscular, nombre_ejercicio.lower()), 'aislamiento')
@@ -0,0 +1,68 @@
+"""
+Índice en memoria del historial de ejercicios del cliente.
+
+`_obtener_historial_ejercicio` buscaba por subcadena en toda la lista
+precargada (`_historial_ejercicios_raw`) para cada ejercicio de cada semana
+generada: O(ejercicios × historial) en un plan anual. El índice agrupa las
+filas por nombre normalizado una sola vez y memoiza, por nombre consultado:
+
+- las filas que coinciden (misma regla: `consulta in nombre_historial`,
+  en minúsculas), en el orden original (más reciente primero);
+- las sesiones completas (peso, reps, RPE) separadas por bucket de reps.
+
+La búsqueda por subcadena se hace sobre los nombres distintos del historial
+(decenas), no sobre las filas (miles), y solo la primera vez por nombre.
+"""
+
+from typing import Dict, List
+
+from ..calculo.compatibilidad_fase import _bucket_desde_reps
+
+
+class IndiceHistorial:
+    """Índice de `filas` (values() de EjercicioRealizado ordenado por -fecha, -id)."""
+
+    def __init__(self, filas: List[dict]):
+        self.filas = filas
+        self._posiciones_por_nombre: Dict[str, List[int]] = {}
+        for posicion, fila in enumerate(filas):
+            nombre = (fila['nombre_ejercicio'] or '').lower()
+            self._posiciones_por_nombre.setdefault(nombre, []).append(posicion)
+        self._coincidencias: Dict[str, List[dict]] = {}
+        self._sesiones: Dict[str, Dict[str, List[dict]]] = {}
+
+    def coincidencias(self, nombre_ejercicio: str) -> List[dict]:
+        """Filas cuyo nombre contiene `nombre_ejercicio`, más reciente primero."""
+        consulta = nombre_ejercicio.lower()
+        if consulta not in self._coincidencias:
+            grupos = [
+                posiciones for nombre, posiciones in self._posiciones_por_nombre.items()
+                if consulta in nombre
+            ]
+            if len(grupos) == 1:
+                posiciones = grupos[0]
+            else:
+                posiciones = sorted(p for grupo in grupos for p in grupo)
+            self._coincidencias[consulta] = [self.filas[p] for p in posiciones]
+        return self._coincidencias[consulta]
+
+    def sesiones(self, nombre_ejercicio: str, bucket: str) -> List[dict]:
+        """
+        Sesiones completas {'peso', 'reps', 'rpe', 'fecha'} del ejercicio en
+        `bucket`, más reciente primero (entrada de resolver_ancla_historica).
+        """
+        consulta = nombre_ejercicio.lower()
+        if consulta not in self._sesiones:
+            por_bucket: Dict[str, List[dict]] = {}
+            for m in self.coincidencias(consulta):
+                if m.get('repeticiones') is None or not m['peso_kg'] or m['rpe'] is None:
+                    continue
+                reps = int(m['repeticiones'])
+                por_bucket.setdefault(_bucket_desde_reps(reps), []).append({
+                    'peso': float(m['peso_kg']),
+                    'reps': reps,
+                    'rpe': float(m['rpe']),
+                    'fecha': m['entreno__fecha'],
+                })
+            self._sesiones[consulta] = por_bucket
+        return self._sesiones[consulta].get(bucket, [])
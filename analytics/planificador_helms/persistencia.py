@@ -0,0 +1,176 @@
+"""
+Plan Helms persistido en BD (PlanHelmsPersistido / SesionPlanHelms).
+
+`generar_plan_anual` cacheaba el resultado una hora en la caché LocMem de
+cada worker (sin tener en cuenta el historial) y
+`generar_entrenamiento_para_fecha` regeneraba la periodización y la semana
+completa en cada llamada. Aquí el plan se guarda por cliente, año y huella
+de las entradas del planificador, y lo reutilizan todas las vistas y workers:
+
+- `huella(planificador, año)`: perfil, días, objetivo, año y VERSION_PLAN.
+  Un cambio en cualquiera de ellos es otro plan.
+- `invalidar(cliente_id)`: sube `version_historial` de los planes del
+  cliente (señales de EjercicioRealizado, SerieRealizada y lesiones). El
+  siguiente uso conserva las semanas ya pasadas y regenera solo desde la
+  semana que contiene hoy.
+- `leer_sesion` / `guardar_sesion`: la sesión de un día es una lectura por
+  clave (plan, fecha).
+- `semanas_vigentes` / `guardar_semanas`: semanas reutilizables del plan
+  anual y escritura de las generadas.
+
+Si la BD no está disponible (perfiles de prueba, comandos sin cliente) el
+planificador genera como antes, sin persistir.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+# Subir al cambiar el algoritmo del planificador: invalida todos los planes guardados
+VERSION_PLAN = 1
+
+# Centinela para distinguir "sin sesión guardada" de una sesión None guardada
+FALTA = object()
+
+
+def inicio_plan(año: int) -> date:
+    """Primer lunes del año: inicio de la semana 1 del plan."""
+    primer_dia = date(año, 1, 1)
+    return primer_dia + timedelta(days=(0 - primer_dia.weekday() + 7) % 7)
+
+
+def semana_del_plan(año: int, fecha: date) -> int:
+    """Número de semana global del plan (1..) que contiene `fecha`."""
+    return (fecha - inicio_plan(año)).days // 7 + 1
+
+
+def huella(planificador, año: int) -> str:
+    entradas = {
+        'version': VERSION_PLAN,
+        'perfil': vars(planificador.perfil),
+        'dias': planificador.dias_disponibles,
+        'objetivo': planificador.objetivo_principal,
+        'año': año,
+    }
+    serializado = json.dumps(entradas, sort_keys=True, default=str)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+
+def invalidar(cliente_id) -> int:
+    """Marca como obsoletas (desde hoy) las semanas guardadas del cliente."""
+    from analytics.models import PlanHelmsPersistido
+
+    return PlanHelmsPersistido.objects.filter(cliente_id=cliente_id).update(
+        version_historial=F('version_historial') + 1
+    )
+
+
+def invalidar_entreno(entreno_id) -> int:
+    """invalidar() del cliente del entreno, en un solo UPDATE (sin leer el entreno)."""
+    from analytics.models import PlanHelmsPersistido
+    from entrenos.models import EntrenoRealizado
+
+    return PlanHelmsPersistido.objects.filter(
+        cliente_id__in=EntrenoRealizado.objects.filter(pk=entreno_id).values('cliente_id')
+    ).update(version_historial=F('version_historial') + 1)
+
+
+def _plan(planificador, año):
+    from analytics.models import PlanHelmsPersistido
+
+    plan, _ = PlanHelmsPersistido.objects.get_or_create(
+        cliente_id=planificador.perfil.id, año=año, huella=huella(planificador, año),
+    )
+    return _vigente(plan)
+
+
+def _vigente(plan, hoy=None):
+    """Si el historial cambió, descarta semanas y sesiones desde la semana actual."""
+    if plan.version_generada == plan.version_historial:
+        return plan
+    from analytics.models import PlanHelmsPersistido
+
+    semana = semana_del_plan(plan.año, hoy or date.today())
+    plan.semanas = {k: v for k, v in plan.semanas.items() if int(k) < semana}
+    plan.version_generada = plan.version_historial
+    with transaction.atomic():
+        plan.sesiones.filter(fecha__gte=inicio_plan(plan.año) + timedelta(weeks=semana - 1)).delete()
+        # Condicional: si otra invalidación llegó mientras tanto, se repetirá en la próxima lectura
+        PlanHelmsPersistido.objects.filter(pk=plan.pk, version_historial=plan.version_historial).update(
+            semanas=plan.semanas, version_generada=plan.version_generada,
+        )
+    return plan
+
+
+def _persistible(planificador):
+    return getattr(planificador.perfil, 'id', None) is not None
+
+
+def leer_sesion(planificador, año: int, fecha: date):
+    """Sesión guardada para `fecha` (puede ser None), o FALTA."""
+    from analytics.models import SesionPlanHelms
+
+    if not _persistible(planificador):
+        return FALTA
+    try:
+        sesion = SesionPlanHelms.objects.select_related('plan').filter(
+            plan__cliente_id=planificador.perfil.id, plan__año=año,
+            plan__huella=huella(planificador, año), fecha=fecha,
+        ).first()
+    except Exception as e:
+        logger.warning("Plan Helms persistido no disponible: %s", e)
+        return FALTA
+    if sesion is None:
+        return FALTA
+    # Con el historial cambiado solo caducan las sesiones desde la semana actual
+    obsoleta = sesion.plan.version_generada != sesion.plan.version_historial
+    if obsoleta and semana_del_plan(año, fecha) >= semana_del_plan(año, date.today()):
+        return FALTA
+    return sesion.datos
+
+
+def guardar_sesion(planificador, año: int, fecha: date, datos) -> None:
+    from analytics.models import SesionPlanHelms
+
+    if not _persistible(planificador):
+        return
+    try:
+        with transaction.atomic():
+            SesionPlanHelms.objects.update_or_create(
+                plan=_plan(planificador, año), fecha=fecha, defaults={'datos': datos},
+            )
+    except Exception as e:
+        logger.warning("No se pudo guardar la sesión Helms %s: %s", fecha, e)
+
+
+def semanas_vigentes(planificador, año: int):
+    """(plan, {semana_global: semana}) reutilizables; (None, {}) si no se persiste."""
+    if not _persistible(planificador):
+        return None, {}
+    try:
+        with transaction.atomic():
+            plan = _plan(planificador, año)
+    except Exception as e:
+        logger.warning("Plan Helms persistido no disponible: %s", e)
+        return None, {}
+    return plan, {int(k): v for k, v in plan.semanas.items()}
+
+
+def guardar_semanas(plan, semanas: dict) -> None:
+    """Guarda las semanas generadas si el plan no se invalidó entre medias."""
+    from analytics.models import PlanHelmsPersistido
+
+    if plan is None:
+        return
+    try:
+        PlanHelmsPersistido.objects.filter(pk=plan.pk, version_historial=plan.version_generada).update(
+            semanas={str(k): v for k, v in semanas.items()},
+        )
+    except Exception as e:
+        logger.warning("No se pudo guardar el plan Helms %s: %s", plan.pk, e)
@@ -4,10 +4,14 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
+from django.db.models import Avg, Count, F, Max, Sum
 from datetime import timedelta
 import logging
 
-from entrenos.models import EntrenoRealizado, EjercicioLiftinDetallado
+from entrenos.models import (
+    EntrenoRealizado, EjercicioLiftinDetallado, EjercicioRealizado, SerieNotaLiftin, SerieRealizada,
+)
+from entrenos.services import notas_liftin_service, pipeline_entreno
 from .models import (
     MetricaRendimiento, AnalisisEjercicio, TendenciaProgresion,
     PrediccionRendimiento, RecomendacionEntrenamiento
@@ -16,7 +20,7 @@ from .models import (
 logger = logging.getLogger(__name__)
 
 
-@receiver(post_save, sender=EntrenoRealizado)
+@pipeline_entreno.handler
 def actualizar_metricas_entreno(sender, instance, created, raw=False, **kwargs):
     """
     Actualiza métricas cuando se crea o modifica un entrenamiento
@@ -72,24 +76,16 @@ def calcular_metricas_dia(cliente, fecha):
             return
 
         # Calcular métricas básicas
-        volumen_total = 0
         calorias_totales = sum([e.calorias_quemadas or 0 for e in entrenamientos_dia])
         duracion_total = sum([e.duracion_minutos or 0 for e in entrenamientos_dia])
 
-        # Calcular volumen usando datos de ejercicios parseados
-        from entrenos.utils.utils import parsear_ejercicios
-
-        for entreno in entrenamientos_dia:
-            if entreno.notas_liftin:
-                ejercicios = parsear_ejercicios(entreno.notas_liftin)
-                for ej in ejercicios:
-                    try:
-                        peso = float(ej.get('peso', 0)) if ej.get('peso') != 'PC' else 0
-                        series = int(ej.get('series', 1)) if ej.get('series') else 1
-                        reps = int(ej.get('repeticiones', 1)) if ej.get('repeticiones') else 1
-                        volumen_total += peso * series * reps
-                    except (ValueError, TypeError):
-                        continue
+        # Calcular volumen sobre las series ya parseadas (SerieNotaLiftin)
+        volumen_total = SerieNotaLiftin.objects.filter(
+            cliente=cliente,
+            fecha=fecha
+        ).aggregate(
+            v=Sum(F('peso_kg') * F('series') * F('repeticiones'))
+        )['v'] or 0
 
         # Calcular intensidad promedio
         intensidad_promedio = volumen_total / duracion_total if duracion_total > 0 else 0
@@ -121,39 +117,34 @@ def calcular_metricas_dia(cliente, fecha):
         logger.error(f"Error calculando métricas para {cliente.nombre} - {fecha}: {e}")
 
 
+def _acotar_porcentaje(valor):
+    """Ajusta un porcentaje al rango de DecimalField(max_digits=5, decimal_places=2)."""
+    return round(max(-999.99, min(999.99, valor)), 2)
+
+
 def actualizar_analisis_ejercicio_especifico(cliente, nombre_ejercicio, fecha):
     """
     Actualiza el análisis de un ejercicio específico
     """
     try:
-        # Obtener todos los ejercicios de este tipo para el cliente
-        from entrenos.utils.utils import parsear_ejercicios
-
-        entrenamientos = EntrenoRealizado.objects.filter(
-            cliente=cliente
-        ).exclude(notas_liftin__isnull=True).exclude(notas_liftin='')
-
-        ejercicios_tipo = []
-        for entreno in entrenamientos:
-            ejercicios = parsear_ejercicios(entreno.notas_liftin)
-            for ej in ejercicios:
-                if ej['nombre'] == nombre_ejercicio:
-                    ej['fecha'] = entreno.fecha
-                    ejercicios_tipo.append(ej)
+        # Series de este ejercicio para el cliente (lookup indexado, sin parsear notas)
+        series = notas_liftin_service.series_de_ejercicio(cliente, nombre_ejercicio)
 
-        if len(ejercicios_tipo) < 2:
+        resumen = series.aggregate(
+            filas=Count('pk'),
+            peso_maximo=Max('peso_kg'),
+            peso_promedio=Avg('peso_kg'),
+        )
+        if resumen['filas'] < 2:
             return
 
-        # Ordenar por fecha
-        ejercicios_tipo.sort(key=lambda x: x['fecha'])
-
         # Calcular progresión
-        primero = ejercicios_tipo[0]
-        ultimo = ejercicios_tipo[-1]
+        primero = series.first()
+        ultimo = series.last()
 
         try:
-            peso_inicial = float(primero.get('peso', 0)) if primero.get('peso') != 'PC' else 0
-            peso_final = float(ultimo.get('peso', 0)) if ultimo.get('peso') != 'PC' else 0
+            peso_inicial = primero.peso_kg
+            peso_final = ultimo.peso_kg
 
             if peso_inicial > 0:
                 progresion_peso = ((peso_final - peso_inicial) / peso_inicial) * 100
@@ -161,8 +152,8 @@ def actualizar_analisis_ejercicio_especifico(cliente, nombre_ejercicio, fecha):
                 progresion_peso = 0
 
             # Calcular volumen inicial y final
-            vol_inicial = peso_inicial * int(primero.get('series', 1)) * int(primero.get('repeticiones', 1))
-            vol_final = peso_final * int(ultimo.get('series', 1)) * int(ultimo.get('repeticiones', 1))
+            vol_inicial = primero.volumen
+            vol_final = ultimo.volumen
 
             if vol_inicial > 0:
                 progresion_volumen = ((vol_final - vol_inicial) / vol_inicial) * 100
@@ -175,15 +166,15 @@ def actualizar_analisis_ejercicio_especifico(cliente, nombre_ejercicio, fecha):
                 nombre_ejercicio=nombre_ejercicio,
                 fecha=fecha,
                 defaults={
-                    'peso_inicial': peso_inicial,
-                    'peso_final': peso_final,
-                    'progresion_peso': progresion_peso,
-                    'volumen_inicial': vol_inicial,
-                    'volumen_final': vol_final,
-                    'progresion_volumen': progresion_volumen,
-                    'sesiones_totales': len(ejercicios_tipo),
-                    'peso_maximo': max(
-                        [float(e.get('peso', 0)) if e.get('peso') != 'PC' else 0 for e in ejercicios_tipo])
+                    'peso_maximo': resumen['peso_maximo'] or 0,
+                    'peso_promedio': round(resumen['peso_promedio'] or 0, 2),
+                    'volumen_ejercicio': vol_final,
+                    'series_totales': ultimo.series,
+                    'repeticiones_totales': ultimo.series * ultimo.repeticiones,
+                    'progresion_peso': _acotar_porcentaje(progresion_peso),
+                    'progresion_volumen': _acotar_porcentaje(progresion_volumen),
+                    'one_rm_estimado': round(peso_final * (1 + ultimo.repeticiones / 30), 2),
+                    'completado_exitosamente': ultimo.completado,
                 }
             )
 
@@ -412,6 +403,29 @@ def limpiar_metricas_entreno_eliminado(sender, instance, **kwargs):
         logger.error(f"Error limpiando métricas eliminadas: {e}")
 
 
+@receiver(post_save, sender=EjercicioRealizado)
+@receiver(post_delete, sender=EjercicioRealizado)
+@receiver(post_save, sender=SerieRealizada)
+@receiver(post_delete, sender=SerieRealizada)
+def invalidar_plan_helms_por_historial(sender, instance, raw=False, **kwargs):
+    """El historial cambió: el plan Helms persistido se regenera desde la semana actual."""
+    if raw:
+        return
+    from .planificador_helms import persistencia
+    persistencia.invalidar_entreno(instance.entreno_id)
+
+
+@receiver(post_delete, sender=EntrenoRealizado)
+@receiver(post_save, sender='hyrox.UserInjury')
+@receiver(post_delete, sender='hyrox.UserInjury')
+def invalidar_plan_helms_por_cliente(sender, instance, raw=False, **kwargs):
+    """Entreno borrado o lesión cambiada (filtra ejercicios del plan vía BioContext)."""
+    if raw:
+        return
+    from .planificador_helms import persistencia
+    persistencia.invalidar(instance.cliente_id)
+
+
 # Función para recalcular todas las métricas (útil para migraciones o correcciones)
 def recalcular_todas_las_metricas(cliente=None):
     """
@@ -436,21 +450,14 @@ def recalcular_todas_las_metricas(cliente=None):
             calcular_metricas_dia(cliente, fecha)
 
         # Recalcular análisis de ejercicios
-        from entrenos.utils.utils import parsear_ejercicios
-
-        entrenamientos = EntrenoRealizado.objects.filter(
-            cliente=cliente
-        ).exclude(notas_liftin__isnull=True).exclude(notas_liftin='')
-
-        ejercicios_unicos = set()
-        for entreno in entrenamientos:
-            ejercicios = parsear_ejercicios(entreno.notas_liftin)
-            for ej in ejercicios:
-                ejercicios_unicos.add(ej['nombre'])
+        series_cliente = SerieNotaLiftin.objects.filter(cliente=cliente)
+        ejercicios_unicos = set(
+            series_cliente.values_list('nombre_normalizado', flat=True).distinct()
+        )
+        # Usar la fecha más reciente para el análisis
+        fecha_reciente = series_cliente.aggregate(f=Max('fecha'))['f']
 
         for nombre_ejercicio in ejercicios_unicos:
-            # Usar la fecha más reciente para el análisis
-            fecha_reciente = entrenamientos.order_by('-fecha').first().fecha
             actualizar_analisis_ejercicio_especifico(cliente, nombre_ejercicio, fecha_reciente)
             calcular_tendencia_progresion(cliente, nombre_ejercicio)
 
@@ -0,0 +1,65 @@
+"""
+Predicción por lotes de ModelosPredictivosIA: todas las series del cliente
+en una sola consulta, mismo resultado que la predicción ejercicio a ejercicio.
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from analytics.ia_modelos_predictivos import ModelosPredictivosIA
+from clientes.models import Cliente
+from entrenos.models import EntrenoRealizado, EjercicioRealizado
+from rutinas.models import Rutina
+
+
+class PrediccionPorLotesTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='tester_prediccion_lotes', password='x')
+        self.cliente, _ = Cliente.objects.get_or_create(
+            user=user, defaults={'nombre': 'TestPrediccionLotes', 'dias_disponibles': 4},
+        )
+        rutina = Rutina.objects.create(nombre='Rutina Test Predicción Lotes')
+        inicio = date.today() - timedelta(weeks=8)
+        self.entrenos = [
+            EntrenoRealizado.objects.create(cliente=self.cliente, rutina=rutina, fecha=inicio + timedelta(weeks=i))
+            for i in range(8)
+        ]
+
+    def _serie(self, nombre, pesos):
+        for entreno, peso in zip(self.entrenos, pesos):
+            EjercicioRealizado.objects.create(
+                entreno=entreno, nombre_ejercicio=nombre, peso_kg=peso, series=3, repeticiones=8,
+            )
+
+    def test_lote_igual_a_ejercicio_a_ejercicio_en_una_consulta(self):
+        self._serie('Sentadilla', [60, 62.5, 65, 67.5, 70, 72.5, 75, 77.5])
+        self._serie('Press Banca', [50, 50, 50, 50, 50, 50])
+        self._serie('Remo', [40, 42, 41, 43, 44])
+        self._serie('Curl', [12, 12])  # Insuficiente
+        modelos = ModelosPredictivosIA(self.cliente)
+
+        with self.assertNumQueries(1):
+            lote = modelos.predecir_rendimiento_multiples()
+
+        self.assertEqual(list(lote), modelos.obtener_ejercicios_disponibles())
+        for ejercicio, prediccion in lote.items():
+            self.assertEqual(prediccion, modelos.predecir_rendimiento_ejercicio(ejercicio))
+        self.assertEqual(lote['Sentadilla']['pendiente_semanal'], 2.5)
+        self.assertEqual(lote['Press Banca']['pendiente_semanal'], 0.0)
+
+        self.assertEqual(
+            modelos.predecir_rendimiento_multiples(['Curl'])['Curl'],
+            {'prediccion_valida': False, 'razon': 'Se necesitan al menos 3 registros', 'registros_actuales': 2},
+        )
+
+    def test_predicciones_multiples_por_defecto_en_una_consulta(self):
+        for i in range(40):
+            self._serie(f'Ejercicio {i}', [30 + i, 31 + i, 32 + i])
+        modelos = ModelosPredictivosIA(self.cliente)
+
+        with self.assertNumQueries(1):
+            resultado = modelos.generar_predicciones_multiples()
+
+        self.assertEqual(resultado['total_generadas'], 5)
+        self.assertEqual({'ejercicio', 'datos'}, set(resultado['predicciones'][0]))
@@ -0,0 +1,92 @@
+# analytics/test_planificador_helms_historial_indice.py
+"""
+Índice del historial de ejercicios del planificador Helms.
+
+El índice (ejercicios/historial.py) sustituye la búsqueda lineal por
+subcadena de _obtener_historial_ejercicio y la tabla de tipos sustituye el
+recorrido de EJERCICIOS_DATABASE en _determinar_tipo_ejercicio_completo.
+Los resultados deben ser idénticos a los del camino anterior, que se
+conserva en el comando benchmark_historial_helms como referencia.
+"""
+
+from datetime import date, timedelta
+
+from django.test import SimpleTestCase
+
+from analytics.management.commands.benchmark_historial_helms import (
+    historial_sintetico,
+    nombres_catalogo,
+    sesiones_indice,
+    sesiones_lineal,
+)
+from analytics.planificador_helms.core import PlanificadorHelms
+from analytics.planificador_helms.database.ejercicios import (
+    CATEGORIAS_CANONICAS,
+    EJERCICIOS_DATABASE,
+    obtener_tipo_ejercicio,
+)
+from analytics.planificador_helms.ejercicios.historial import IndiceHistorial
+from analytics.planificador_helms.models.perfil_cliente import PerfilCliente
+from analytics.planificador_helms.utils.helpers import extraer_nombre_ejercicio
+
+
+def _fila(nombre, dias, peso=80, rpe=8, reps=8):
+    return {
+        'nombre_ejercicio': nombre,
+        'peso_kg': peso,
+        'rpe': rpe,
+        'repeticiones': reps,
+        'entreno__fecha': date.today() - timedelta(days=dias),
+    }
+
+
+class TestIndiceHistorial(SimpleTestCase):
+
+    def test_mismos_resultados_que_la_busqueda_lineal(self):
+        nombres = nombres_catalogo()
+        filas = historial_sintetico(120, nombres)
+        indice = IndiceHistorial(filas)
+        for nombre in nombres + ['press', 'Curl', 'inexistente']:
+            self.assertEqual(sesiones_indice(indice, nombre), sesiones_lineal(filas, nombre), nombre)
+
+    def test_subcadena_mezcla_nombres_en_orden_cronologico(self):
+        filas = [
+            _fila('Press Banca Inclinado', 1, reps=10),
+            _fila('Press Banca', 2, reps=5),
+            _fila(None, 3),
+            _fila('press banca', 4, reps=3, peso=100),
+            _fila('Press Banca Inclinado', 5, rpe=None),
+        ]
+        indice = IndiceHistorial(filas)
+
+        self.assertEqual(indice.coincidencias('PRESS BANCA'), [filas[0], filas[1], filas[3], filas[4]])
+        self.assertEqual([s['peso'] for s in indice.sesiones('press banca', 'fuerza_potencia')], [80.0, 100.0])
+        self.assertEqual(indice.coincidencias('inclinado'), [filas[0], filas[4]])
+
+    def test_planner_reconstruye_el_indice_si_se_reasigna_el_historial(self):
+        planner = PlanificadorHelms(PerfilCliente({'id': 9998, 'nombre': 'indice', 'dias_disponibles': 4}))
+        planner._historial_ejercicios_raw = [_fila('Remo con Barra', 2, peso=70)]
+        self.assertEqual(planner._obtener_historial_ejercicio('Remo con Barra')['peso_real_bruto'], 70.0)
+
+        planner._historial_ejercicios_raw = [_fila('Remo con Barra', 2, peso=75)]
+        self.assertEqual(planner._obtener_historial_ejercicio('Remo con Barra')['peso_real_bruto'], 75.0)
+
+
+class TestTipoEjercicio(SimpleTestCase):
+
+    def test_tabla_coincide_con_el_recorrido_del_catalogo(self):
+        def tipo_lineal(grupo, nombre):
+            db_grupo = EJERCICIOS_DATABASE.get(grupo, {})
+            for tipo in CATEGORIAS_CANONICAS:
+                for ej in db_grupo.get(tipo, []):
+                    if extraer_nombre_ejercicio(ej).lower() == nombre.lower():
+                        return tipo
+            return 'aislamiento'
+
+        for grupo, categorias in EJERCICIOS_DATABASE.items():
+            for categoria in CATEGORIAS_CANONICAS:
+                for ej in categorias.get(categoria, []):
+                    nombre = extraer_nombre_ejercicio(ej)
+                    self.assertEqual(obtener_tipo_ejercicio(grupo, nombre), tipo_lineal(grupo, nombre))
+                    self.assertEqual(obtener_tipo_ejercicio(grupo, nombre.upper()), tipo_lineal(grupo, nombre.upper()))
+        self.assertEqual(obtener_tipo_ejercicio('pecho', 'No existe'), 'aislamiento')
@@ -0,0 +1,90 @@
+# analytics/test_planificador_helms_persistencia.py
+"""
+Plan Helms persistido (planificador_helms/persistencia.py).
+
+- La sesión de un día, una vez generada, es una sola lectura por clave.
+- El plan anual reutiliza las semanas guardadas; si cambia el historial
+  solo se regeneran las semanas desde la actual; si cambia el perfil es
+  otro plan (otra huella).
+"""
+
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from analytics.models import PlanHelmsPersistido
+from analytics.planificador_helms import persistencia
+from analytics.planificador_helms.core import PlanificadorHelms
+from analytics.planificador_helms.models.perfil_cliente import PerfilCliente
+from clientes.models import Cliente
+from entrenos.models import EjercicioRealizado, EntrenoRealizado
+from rutinas.models import Rutina
+
+
+class PlanHelmsPersistidoTests(TestCase):
+
+    def setUp(self):
+        self.cliente = Cliente.objects.get(user=User.objects.create_user('plan_helms_persistido'))
+        self.hoy = date.today()
+
+    def _planner(self, **extra):
+        datos = {
+            'id': self.cliente.id, 'dias_disponibles': 4, 'experiencia_años': 3,
+            'año_planificacion': self.hoy.year,
+        }
+        datos.update(extra)
+        return PlanificadorHelms(PerfilCliente(datos))
+
+    def _semanas_generadas(self, planner):
+        original = PlanificadorHelms._generar_semana_especifica
+        with mock.patch.object(PlanificadorHelms, '_generar_semana_especifica', autospec=True,
+                               side_effect=original) as generar:
+            plan = planner.generar_plan_anual()
+        return plan, generar.call_count
+
+    def test_sesion_del_dia_es_una_lectura_por_clave(self):
+        lunes = self.hoy - timedelta(days=self.hoy.weekday())
+        primera = self._planner().generar_entrenamiento_para_fecha(lunes)
+
+        with self.assertNumQueries(1):
+            segunda = self._planner().generar_entrenamiento_para_fecha(lunes)
+
+        self.assertEqual(segunda, primera)
+        self.assertTrue(primera['ejercicios'])
+
+    def test_plan_anual_reutiliza_las_semanas_guardadas(self):
+        primero, generadas = self._semanas_generadas(self._planner())
+        segundo, regeneradas = self._semanas_generadas(self._planner())
+
+        self.assertEqual(generadas, 52)
+        self.assertEqual(regeneradas, 0)
+        self.assertEqual(segundo['entrenos_por_fecha'], primero['entrenos_por_fecha'])
+        self.assertEqual(PlanHelmsPersistido.objects.filter(cliente=self.cliente).count(), 1)
+
+    def test_historial_nuevo_regenera_solo_desde_la_semana_actual(self):
+        primero, _ = self._semanas_generadas(self._planner())
+        entreno = EntrenoRealizado.objects.create(
+            cliente=self.cliente, rutina=Rutina.objects.create(nombre='Torso'), fecha=self.hoy,
+        )
+        EjercicioRealizado.objects.create(
+            entreno=entreno, nombre_ejercicio='Press Banca con Barra', peso_kg=80, repeticiones=8, rpe=8,
+        )
+
+        segundo, regeneradas = self._semanas_generadas(self._planner())
+
+        semana_actual = persistencia.semana_del_plan(self.hoy.year, self.hoy)
+        self.assertEqual(regeneradas, max(0, min(52, 52 - semana_actual + 1)))
+        inicio_semana = persistencia.inicio_plan(self.hoy.year) + timedelta(weeks=semana_actual - 1)
+        pasadas = {f: v for f, v in primero['entrenos_por_fecha'].items() if f < inicio_semana.isoformat()}
+        self.assertEqual(
+            {f: v for f, v in segundo['entrenos_por_fecha'].items() if f in pasadas}, pasadas,
+        )
+
+    def test_otro_perfil_es_otro_plan(self):
+        self._planner().generar_plan_anual()
+        _, generadas = self._semanas_generadas(self._planner(dias_disponibles=5))
+
+        self.assertEqual(generadas, 52)
+        self.assertEqual(PlanHelmsPersistido.objects.filter(cliente=self.cliente).count(), 2)
@@ -0,0 +1,50 @@
+"""
+Predicciones de rendimiento por lotes: la pendiente de mínimos cuadrados
+alimenta el peso predicho.
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from analytics.ia_modelos_predictivos import ModelosPredictivosIA
+from clientes.models import Cliente
+from entrenos.models import EjercicioRealizado, EntrenoRealizado
+from rutinas.models import Rutina
+
+
+class PrediccionesPorLotesTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('predicciones_user')
+        self.cliente = Cliente.objects.get(user=user)
+        self.rutina = Rutina.objects.create(nombre='Predicciones')
+        self.hoy = timezone.now().date()
+
+    def _serie(self, nombre, pesos):
+        for semana, peso in enumerate(pesos):
+            entreno = EntrenoRealizado.objects.create(
+                cliente=self.cliente, rutina=self.rutina,
+                fecha=self.hoy - timedelta(weeks=len(pesos) - 1 - semana),
+            )
+            EjercicioRealizado.objects.create(
+                entreno=entreno, nombre_ejercicio=nombre, peso_kg=peso, series=3, repeticiones=8,
+            )
+
+    def test_peso_predicho_proyecta_la_pendiente_semanal(self):
+        self._serie('press banca', [80, 80.5, 81, 81.5, 82])
+        self._serie('sentadilla', [100, 110, 120, 130, 140])
+        self._serie('remo', [60, 59, 58, 57, 56])
+
+        with self.assertNumQueries(1):
+            predicciones = ModelosPredictivosIA(self.cliente).predecir_rendimiento_multiples(
+                ['press banca', 'sentadilla', 'remo']
+            )
+
+        press = predicciones['press banca']
+        self.assertAlmostEqual(press['pendiente_semanal'], 0.5)
+        # 4 semanas × 0,5 kg = +2 kg, dentro de la banda +1%..+5%
+        self.assertAlmostEqual(press['peso_predicho'], 84.0)
+        # Pendiente fuerte: se acota a +5%; pendiente negativa: +1% conservador
+        self.assertAlmostEqual(predicciones['sentadilla']['peso_predicho'], 147.0)
+        self.assertAlmostEqual(predicciones['remo']['peso_predicho'], 56.6)
@@ -22,6 +22,7 @@ import json
 from analytics.planificador import PlanificadorAvanzadoHelms
 from decimal import Decimal
 from entrenos.utils.utils import parse_reps_and_series
+from entrenos.services import mejores_marcas_service, notas_liftin_service
 from clientes.models import Cliente
 from entrenos.models import EntrenoRealizado, EjercicioLiftinDetallado
 from .models import (
@@ -84,41 +85,9 @@ class CalculadoraEjerciciosTabla:
         """
 
         # 1. MAPEO DIRECTO: Ejercicio específico -> Movimiento Principal
-        # Este mapeo es la FUENTE DE VERDAD para clasificar ejercicios
-        mapeo_ejercicios_a_principal = {
-            # 🎯 REMO (Row) - Tracción Horizontal
-            'remo con barra (pendlay)': 'Remo',
-            'remo con mancuerna a una mano': 'Remo',
-            'remo en polea baja (gironda)': 'Remo',
-
-            # 🎯 PRESS BANCA (Bench Press) - Empuje Horizontal
-            'press banca con barra': 'Press Banca',
-            'press banca con mancuernas': 'Press Banca',
-            'press inclinado con barra': 'Press Banca',
-            'press inclinado con mancuernas': 'Press Banca',
-            'press cerrado en banca': 'Press Banca',
-            'fondos en paralelas (con lastre)': 'Press Banca',
-
-            # 🎯 PRESS MILITAR (Overhead Press) - Empuje Vertical
-            'press militar con barra (de pie)': 'Press Militar',
-            'press militar con mancuernas (sentado)': 'Press Militar',
-            'push press': 'Press Militar',
-            'press arnold': 'Press Militar',
-
-            # 🎯 PESO MUERTO (Deadlift) - Bisagra de Cadera
-            'peso muerto': 'Peso Muerto',
-            'peso muerto rumano': 'Peso Muerto',
-            'peso muerto sumo': 'Peso Muerto',
-            # 'buenos días (good mornings)': 'Peso Muerto', # Eliminado por ser accesorio
-            # 'hip thrust con barra': 'Peso Muerto', # Eliminado: No es equivalente a peso muerto
-
-            # 🎯 SENTADILLA (Squat) - Flexión de Rodilla
-            'sentadilla trasera con barra': 'Sentadilla',
-            'sentadilla frontal con barra': 'Sentadilla',
-            'sentadilla búlgara': 'Sentadilla',
-            # 'prensa de piernas': 'Sentadilla', # Eliminado: Sobrestima masivamente el 1RM
-            # 'zancadas con mancuernas': 'Sentadilla', # Eliminado: Accesorio unilateral
-        }
+        # Fuente de verdad compartida con el índice de mejores marcas
+        # (entrenos.services.mejores_marcas_service).
+        mapeo_ejercicios_a_principal = mejores_marcas_service.MOVIMIENTO_PRINCIPAL
 
         # 2. Obtenemos todos los ejercicios realizados por el cliente
         todos_los_ejercicios = self.obtener_ejercicios_tabla()
@@ -671,66 +640,48 @@ class CalculadoraEjerciciosTabla:
 
     def analizar_acwr(self, periodo_dias=90, periodo_agudo=7, periodo_cronico=28):
         """
-        Calcula la Carga Aguda, Carga Crónica y el ratio ACWR.
-        Utiliza pandas para un cálculo eficiente.
-        VERSIÓN CORREGIDA: Convierte Decimal a float para ser serializable en JSON.
+        Calcula la Carga Aguda, Carga Crónica y el ratio ACWR (medias móviles)
+        sobre el hub ActividadRealizada. Adaptador de core.services.motor_carga.
         """
-        try:
-            import pandas as pd
-        except ImportError:
-            return {'dataframe': [], 'acwr_actual': 0, 'zona_riesgo': 'desconocida',
-                    'recomendacion': 'Pandas no está instalado.'}
+        from core.services import motor_carga
+        from entrenos.models import ActividadRealizada as _AR
+
         # Buscamos la fecha del último entrenamiento registrado para este cliente
         ultimo_entreno = EntrenoRealizado.objects.filter(cliente=self.cliente).order_by('-fecha').first()
         fecha_fin = ultimo_entreno.fecha if ultimo_entreno else timezone.now().date()
         fecha_inicio = fecha_fin - timedelta(days=periodo_dias)
 
-        from entrenos.models import ActividadRealizada as _AR
-        actividades = _AR.objects.filter(
+        actividades = list(_AR.objects.filter(
             cliente=self.cliente,
             fecha__gte=fecha_inicio,
             fecha__lte=fecha_fin,
             carga_ua__isnull=False,
-        ).order_by('fecha').values('fecha', 'carga_ua')
+        ).values_list('fecha', 'carga_ua'))
 
         if not actividades:
             return {'dataframe': [], 'acwr_actual': 0, 'zona_riesgo': 'muy_baja',
                     'recomendacion': 'No hay datos suficientes.'}
 
-        df = pd.DataFrame(list(actividades))
-        df['fecha'] = pd.to_datetime(df['fecha'])
-        df['carga_ua'] = df['carga_ua'].astype(float)
-
-        df = df.groupby('fecha')['carga_ua'].sum().reset_index()
-        df['carga_diaria'] = df['carga_ua']
-
-        idx = pd.date_range(start=fecha_inicio, end=fecha_fin)
-        df = df.set_index('fecha').reindex(idx, fill_value=0)
-
-        df['carga_aguda'] = df['carga_diaria'].rolling(window=periodo_agudo, min_periods=1).mean()
-        df['carga_cronica'] = df['carga_diaria'].rolling(window=periodo_cronico, min_periods=1).mean()
-        df['acwr'] = (df['carga_aguda'] / df['carga_cronica']).fillna(0).replace([np.inf, -np.inf], 0)
-
-        acwr_actual = round(df['acwr'].iloc[-1], 2) if not df.empty else 0
-
-        if 0.8 <= acwr_actual <= 1.3:
-            zona_riesgo = 'optima'
-            recomendacion = "Estás en la 'zona dulce'. La carga es ideal para progresar de forma segura."
-        elif 1.3 < acwr_actual < 1.5:
-            zona_riesgo = 'cuidado'
-            recomendacion = "Estás aumentando la carga. Procede con cuidado y vigila la recuperación."
-        elif acwr_actual >= 1.5:
-            zona_riesgo = 'riesgo_alto'
-            recomendacion = "¡Peligro! El riesgo de lesión es elevado. Considera reducir la intensidad o el volumen."
-        else:
-            zona_riesgo = 'baja_carga'
-            recomendacion = "La carga es baja. Ideal para una semana de descarga, pero riesgosa para perder adaptaciones si se mantiene."
+        cargas = motor_carga.serie_diaria(actividades, fecha_inicio, fecha_fin)
+        carga_aguda, carga_cronica, acwr = motor_carga.acwr_rolling(
+            cargas, periodo_agudo, periodo_cronico
+        )
+        acwr_actual = round(float(acwr[-1]), 2)
 
-        df_json = df.reset_index().rename(columns={'index': 'fecha'})
-        df_json['fecha'] = df_json['fecha'].dt.strftime('%Y-%m-%d')
+        zona_riesgo = motor_carga.zona_riesgo(acwr_actual)
+        recomendacion = {
+            'optima': "Estás en la 'zona dulce'. La carga es ideal para progresar de forma segura.",
+            'cuidado': "Estás aumentando la carga. Procede con cuidado y vigila la recuperación.",
+            'riesgo_alto': "¡Peligro! El riesgo de lesión es elevado. Considera reducir la intensidad o el volumen.",
+            'baja_carga': "La carga es baja. Ideal para una semana de descarga, pero riesgosa para perder adaptaciones si se mantiene.",
+        }[zona_riesgo]
 
         return {
-            'dataframe': df_json.to_dict('records'),
+            'dataframe': motor_carga.registros(
+                motor_carga.rango_fechas(fecha_inicio, fecha_fin),
+                carga_ua=cargas, carga_diaria=cargas,
+                carga_aguda=carga_aguda, carga_cronica=carga_cronica, acwr=acwr,
+            ),
             'acwr_actual': acwr_actual,
             'zona_riesgo': zona_riesgo,
             'recomendacion': recomendacion
@@ -798,9 +749,10 @@ def explicacion_plan_helms(request):
     cliente = get_object_or_404(Cliente, user=request.user)
     
     # 1. Instanciar Planificador y Perfil
-    # Necesitamos los máximos actuales para ejemplos precisos
-    calc = CalculadoraEjerciciosTabla(cliente)
-    maximos = calc.calcular_1rm_estimado_por_ejercicio()
+    # Necesitamos los máximos actuales para ejemplos precisos (índice de
+    # mejores marcas: mismo resultado que la calculadora sin recorrer el
+    # histórico completo)
+    maximos = mejores_marcas_service.maximos_por_movimiento(cliente)
     
     # Convertir a formato compatible con PerfilCliente si es necesario
     # PerfilCliente espera diccionario o objeto, aquí pasamos un dict enriquecido
@@ -2378,12 +2330,12 @@ class AnalisisProgresionAvanzado:
         entrenamientos = EntrenoRealizado.objects.filter(
             cliente=self.cliente,
             fecha__gte=datetime.now().date() - timedelta(days=30)
-        ).exclude(notas_liftin__isnull=True).exclude(notas_liftin='')
+        ).exclude(notas_liftin__isnull=True).exclude(notas_liftin='').prefetch_related('series_liftin')
 
         rms = {}
 
         for entreno in entrenamientos:
-            ejercicios = parsear_ejercicios(entreno.notas_liftin)
+            ejercicios = notas_liftin_service.ejercicios_de(entreno)
 
             for ejercicio in ejercicios:
                 nombre = ejercicio['nombre']
@@ -2493,12 +2445,12 @@ class AnalisisProgresionAvanzado:
         entrenamientos = EntrenoRealizado.objects.filter(
             cliente=self.cliente,
             fecha__gte=fecha_inicio
-        ).exclude(notas_liftin__isnull=True).exclude(notas_liftin='').order_by('fecha')
+        ).exclude(notas_liftin__isnull=True).exclude(notas_liftin='').order_by('fecha').prefetch_related('series_liftin')
 
         datos = []
 
         for entreno in entrenamientos:
-            ejercicios = parsear_ejercicios(entreno.notas_liftin)
+            ejercicios = notas_liftin_service.ejercicios_de(entreno)
 
             for ej in ejercicios:
                 if ej['nombre'] == ejercicio:
@@ -2653,12 +2605,12 @@ class AnalisisProgresionAvanzado:
         entrenamientos = EntrenoRealizado.objects.filter(
             cliente=self.cliente,
             fecha__gte=fecha_inicio
-        ).exclude(notas_liftin__isnull=True).exclude(notas_liftin='')
+        ).exclude(notas_liftin__isnull=True).exclude(notas_liftin='').prefetch_related('series_liftin')
 
         volumen_total = 0
 
         for entreno in entrenamientos:
-            ejercicios = parsear_ejercicios(entreno.notas_liftin)
+            ejercicios = notas_liftin_service.ejercicios_de(entreno)
 
             for ej in ejercicios:
                 if ej['nombre'] == ejercicio:
@@ -2699,7 +2651,7 @@ class AnalisisProgresionAvanzado:
             cliente=self.cliente,
             fecha__gte=fecha_inicio,
             fecha__lte=fecha_fin
-        )
+        ).prefetch_related('series_liftin')
 
         carga_total = 0
         duracion_total = 0
@@ -2709,7 +2661,7 @@ class AnalisisProgresionAvanzado:
             duracion_total += entreno.duracion_minutos or 0
 
             if entreno.notas_liftin:
-                ejercicios = parsear_ejercicios(entreno.notas_liftin)
+                ejercicios = notas_liftin_service.ejercicios_de(entreno)
                 for ej in ejercicios:
                     try:
                         peso = float(ej.get('peso', 0)) if ej.get('peso') != 'PC' else 0
@@ -2886,7 +2838,7 @@ class AnalisisIntensidadAvanzado:
         entrenamientos = EntrenoRealizado.objects.filter(
             cliente=self.cliente,
             fecha__gte=fecha_inicio
-        )
+        ).prefetch_related('series_liftin')
 
         distribucion = {
             'recuperacion': {'tiempo': 0, 'porcentaje': 0, 'calorias': 0},
@@ -2940,7 +2892,7 @@ class AnalisisIntensidadAvanzado:
                 cliente=self.cliente,
                 fecha__gte=semana_actual,
                 fecha__lte=fin_semana
-            )
+            ).prefetch_related('series_liftin')
 
             carga_total = 0
             sesiones = entrenamientos_semana.count()
@@ -2952,7 +2904,7 @@ class AnalisisIntensidadAvanzado:
 
                 # Calcular carga basada en volumen y duración
                 if entreno.notas_liftin:
-                    ejercicios = parsear_ejercicios(entreno.notas_liftin)
+                    ejercicios = notas_liftin_service.ejercicios_de(entreno)
                     volumen_entreno = self._calcular_volumen_entreno(ejercicios)
                     intensidad_estimada = self._estimar_intensidad_entreno(ejercicios)
 
@@ -3002,7 +2954,7 @@ class AnalisisIntensidadAvanzado:
         entrenamientos = EntrenoRealizado.objects.filter(
             cliente=self.cliente,
             fecha__gte=fecha_inicio
-        ).exclude(notas_liftin__isnull=True).exclude(notas_liftin='')
+        ).exclude(notas_liftin__isnull=True).exclude(notas_liftin='').prefetch_related('series_liftin')
 
         distribucion = {
             'recuperacion': 0,  # 40-60% 1RM
@@ -3014,7 +2966,7 @@ class AnalisisIntensidadAvanzado:
         total_series = 0
 
         for entreno in entrenamientos:
-            ejercicios = parsear_ejercicios(entreno.notas_liftin)
+            ejercicios = notas_liftin_service.ejercicios_de(entreno)
 
             for ejercicio in ejercicios:
                 try:
@@ -3122,7 +3074,7 @@ class AnalisisIntensidadAvanzado:
         duracion = entreno.duracion_minutos or 60
 
         if entreno.notas_liftin:
-            ejercicios = parsear_ejercicios(entreno.notas_liftin)
+            ejercicios = notas_liftin_service.ejercicios_de(entreno)
             intensidad_promedio = self._calcular_intensidad_promedio(ejercicios)
 
             if intensidad_promedio >= 85:
@@ -3340,7 +3292,7 @@ class AnalisisIntensidadAvanzado:
         if not entreno.notas_liftin:
             return 50  # Carga base estimada
 
-        ejercicios = parsear_ejercicios(entreno.notas_liftin)
+        ejercicios = notas_liftin_service.ejercicios_de(entreno)
         volumen = self._calcular_volumen_entreno(ejercicios)
         intensidad = self._estimar_intensidad_entreno(ejercicios)
         duracion = entreno.duracion_minutos or 60
@@ -3647,13 +3599,14 @@ def api_marcar_entreno_completado(request, cliente_id):
 
 # analytics/views.py
 
-# ... (Asegúrate de tener los imports: json, datetime, timedelta, etc.)
-import pandas as pd  # Usaremos pandas para calcular medias móviles fácilmente. ¡Es muy eficiente!
-
-
-# Si no tienes pandas, instálalo con: pip install pandas
+# Medias móviles, monotonía y strain: core.services.motor_carga (NumPy)
 
 class AnalizadorCargaYFatiga:
+    # Ventana de datos: 90 días hasta la referencia, que puede retroceder hasta
+    # 30 días si no hubo entrenos esta semana (ver analizar_acwr).
+    DIAS_VENTANA = 90
+    DIAS_RETROCESO_MAX = 30
+
     def __init__(self, cliente, periodo_dias=90):
         self.cliente = cliente
         self.fecha_fin = timezone.now().date()
@@ -3669,34 +3622,41 @@ class AnalizadorCargaYFatiga:
         Calcula la Carga de Entrenamiento (Training Load) multi-métrica.
         Combina Volumen (GYM) con Duración x RPE (Cardio/Intensidad).
         """
-        carga = 0.0
-        # 1. Carga por Volumen (Fuerza)
-        if entreno.volumen_total_kg and entreno.volumen_total_kg > 0:
-            carga += float(entreno.volumen_total_kg) / 1000.0
-        
-        # 2. Carga por Duración y RPE (Cardio/HIIT/Metabólico)
-        duracion = entreno.duracion_minutos or 0
-        rpe = 0
-        
-        # Intentar obtener RPE y duración de la sesión detallada si existe
-        if hasattr(entreno, 'sesion_detalle'):
-            rpe = entreno.sesion_detalle.rpe_medio or 0
-            if not duracion:
-                duracion = entreno.sesion_detalle.duracion_minutos or 0
-        
-        if duracion > 0:
-            # Si no hay RPE registrado, asumimos un esfuerzo base de 5.0 (moderado)
-            rpe_val = rpe if rpe > 0 else 5.0
-            # Normalización: (Minutos * RPE) / 100
-            carga += (duracion * float(rpe_val)) / 100.0
-             
-        return round(float(carga), 2)
-
-    def _generar_narrativa_dinamica(self, df, acwr_actual, zona_riesgo, monotonia=0):
+        # RelatedObjectDoesNotExist hereda de AttributeError: getattr cubre "sin detalle"
+        detalle = getattr(entreno, 'sesion_detalle', None)
+        return float(self._cargas_entrenamientos([(
+            entreno.volumen_total_kg,
+            entreno.duracion_minutos,
+            detalle.rpe_medio if detalle else None,
+            detalle.duracion_minutos if detalle else None,
+        )])[0])
+
+    @staticmethod
+    def _cargas_entrenamientos(filas):
+        """
+        Versión vectorizada de _calcular_carga_entrenamiento sobre filas
+        (volumen_total_kg, duracion_minutos, sesion_detalle__rpe_medio,
+        sesion_detalle__duracion_minutos):
+        volumen/1000 + duración × RPE / 100 (RPE 5.0 si no hay registro).
+        """
+        if not filas:
+            return np.zeros(0)
+        datos = np.array(
+            [[float(v or 0), float(d or 0), float(r or 0), float(dd or 0)] for v, d, r, dd in filas]
+        )
+        volumen, duracion, rpe, duracion_detalle = datos.T
+        duracion = np.where(duracion > 0, duracion, duracion_detalle)
+        rpe = np.where(rpe > 0, rpe, 5.0)
+        carga = np.where(volumen > 0, volumen / 1000.0, 0.0)
+        carga += np.where(duracion > 0, duracion * rpe / 100.0, 0.0)
+        return np.round(carga, 2)
+
+    def _generar_narrativa_dinamica(self, serie, acwr_actual, zona_riesgo, monotonia=0):
         """
-        Analiza el DataFrame de carga y genera un resumen textual dinámico.
+        Analiza la serie de carga (dict de arrays alineados con serie['fechas'])
+        y genera un resumen textual dinámico.
         """
-        if df.empty or df['carga_diaria'].sum() == 0:
+        if not serie or float(np.sum(serie['carga_diaria'])) == 0:
             return {
                 'titulo': "Esperando Datos",
                 'resumen': "Aún no hay suficientes datos de entrenamiento en este período para generar un análisis. ¡Es hora de empezar a entrenar!",
@@ -3705,9 +3665,10 @@ class AnalizadorCargaYFatiga:
 
         # 1. Analizar la tendencia general del Fitness (Carga Crónica)
         # Comparamos el fitness del último tercio del período con el primero
-        tercio = len(df) // 3
-        fitness_inicial = df['carga_cronica'].iloc[:tercio].mean()
-        fitness_final = df['carga_cronica'].iloc[-tercio:].mean()
+        cronica = serie['carga_cronica']
+        tercio = len(cronica) // 3
+        fitness_inicial = cronica[:tercio].mean()
+        fitness_final = cronica[-tercio:].mean()
 
         tendencia_fitness = "estable."
         if fitness_final > fitness_inicial * 1.1:  # Si ha aumentado más de un 10%
@@ -3733,16 +3694,17 @@ class AnalizadorCargaYFatiga:
             })
 
         # Punto de mayor riesgo
-        riesgo_max = df['acwr'].max()
+        acwr = serie['acwr']
+        riesgo_max = acwr.max()
         if riesgo_max >= 1.5:
-            fecha_riesgo_max = df['acwr'].idxmax().strftime('%d de %B')
+            fecha_riesgo_max = serie['fechas'][int(acwr.argmax())].strftime('%d de %B')
             puntos_clave.append({
                 'emoji': '🚨',
                 'texto': f"Se detectó un pico de riesgo el <strong>{fecha_riesgo_max}</strong> con un ratio de {riesgo_max:.2f}. Estos son los momentos donde hay que priorizar la recuperación."
             })
 
         # Períodos de descarga o baja carga
-        periodos_baja_carga = (df['acwr'] < 0.8).sum()
+        periodos_baja_carga = int((acwr < 0.8).sum())
         if periodos_baja_carga > 5:  # Si hubo más de 5 días en baja carga
             puntos_clave.append({
                 'emoji': '🔋',
@@ -3771,137 +3733,102 @@ class AnalizadorCargaYFatiga:
         """
         Calcula el ratio ACWR y genera narrativa dinámica.
         Si no hay carga en los últimos 7 días, retrocede al último entreno para dar feedback útil.
+
+        Una sola consulta values() cubre la ventana más amplia posible; la serie
+        diaria, medias móviles, monotonía y strain salen de core.services.motor_carga.
         """
-        if not self.entrenamientos.exists():
+        from core.services import motor_carga
+
+        hoy = timezone.now().date()
+        filas = list(
+            EntrenoRealizado.objects.filter(
+                cliente=self.cliente,
+                fecha__gte=hoy - timedelta(days=self.DIAS_VENTANA + self.DIAS_RETROCESO_MAX),
+                fecha__lte=hoy,
+            ).values_list(
+                'fecha', 'volumen_total_kg', 'duracion_minutos',
+                'sesion_detalle__rpe_medio', 'sesion_detalle__duracion_minutos',
+            )
+        )
+        recientes = [f for f in filas if f[0] >= self.fecha_inicio]
+        if not recientes:
             return {
-                'dataframe_json': pd.DataFrame().to_json(orient='split'),
+                'dataframe_json': [],
                 'acwr_actual': 0,
                 'zona_riesgo': 'muy_baja',
                 'recomendacion': 'No hay datos suficientes. ¡A entrenar!',
-                'narrativa': self._generar_narrativa_dinamica(pd.DataFrame(), 0, 'muy_baja')
+                'narrativa': self._generar_narrativa_dinamica(None, 0, 'muy_baja')
             }
 
         # --- Lógica de Ventana Activa ---
-        # Si el último entreno es previo a hoy, pero reciente (< 30 días), 
+        # Si el último entreno es previo a hoy, pero reciente (< 30 días),
         # centramos el análisis ahí para no mostrar un dashboard vacío de 0.00.
-        ultimo_entreno_fecha = self.entrenamientos.latest('fecha').fecha
-        hoy = timezone.now().date()
+        ultimo_entreno_fecha = max(f[0] for f in recientes)
         referencia = hoy
-        
-        # Si David no ha entrenado esta semana, pero sí en el último mes
-        if (hoy - ultimo_entreno_fecha).days > 7 and (hoy - ultimo_entreno_fecha).days < 30:
+        if 7 < (hoy - ultimo_entreno_fecha).days < self.DIAS_RETROCESO_MAX:
             referencia = ultimo_entreno_fecha
+        desde = referencia - timedelta(days=self.DIAS_VENTANA)
 
-        idx = pd.date_range(start=referencia - timedelta(days=90), end=referencia)
-        cargas_diarias = {entreno.fecha: self._calcular_carga_entrenamiento(entreno) for entreno in self.entrenamientos}
-        df = pd.DataFrame(cargas_diarias.items(), columns=['fecha', 'carga_diaria'])
-        df['fecha'] = pd.to_datetime(df['fecha'])
-        df = df.set_index('fecha').reindex(idx, fill_value=0)
-        
-        df['carga_aguda'] = df['carga_diaria'].rolling(window=periodo_agudo, min_periods=1).mean()
-        df['carga_cronica'] = df['carga_diaria'].rolling(window=periodo_cronico, min_periods=1).mean()
-        df['acwr'] = (df['carga_aguda'] / df['carga_cronica']).fillna(0)
-
-        acwr_actual = round(df['acwr'].iloc[-1], 2) if not df.empty else 0
-        # ... (lógica para determinar zona_riesgo y recomendacion se mantiene igual)
-        # ... (lógica para determinar zona_riesgo y recomendacion se mantiene igual)
-        if 0.8 <= acwr_actual <= 1.3:
-            zona_riesgo = 'optima'
-            recomendacion = "Estás en la 'zona dulce'. La carga es ideal para progresar de forma segura."
-        elif 1.3 < acwr_actual < 1.5:
-            zona_riesgo = 'cuidado'
-            recomendacion = "Estás aumentando la carga. Procede con cuidado y vigila la recuperación."
-        elif acwr_actual >= 1.5:
-            zona_riesgo = 'riesgo_alto'
-            recomendacion = "¡Peligro! El riesgo de lesión es elevado. Considera reducir la intensidad o el volumen."
-        else:  # Cubre acwr < 0.8 y el caso inicial de 0
-            zona_riesgo = 'baja_carga'
-            recomendacion = "La carga es baja, lo que puede llevar a una pérdida de adaptaciones. Ideal para una semana de descarga."
-
-        # CÁLCULO DE MONOTONÍA Y STRAIN (Añadido)
-        # Monotonía = Carga Media Diaria / Desviación Estándar
-        # Strain = Carga Total Semanal * Monotonía
-        if not df.empty and len(df) >= 7:
-            last_7_days = df.iloc[-7:]
-            mean_load = last_7_days['carga_diaria'].mean()
-            std_dev = last_7_days['carga_diaria'].std()
-
-            if std_dev > 0:
-                monotonia = round(mean_load / std_dev, 2)
-            else:
-                monotonia = 0 # Evitar división por cero si todos los días son iguales (std=0)
-
-            carga_semanal = last_7_days['carga_diaria'].sum()
-            strain_raw = carga_semanal * monotonia
-            
-            # Normalización del Strain (0-100) para mejor comprensión
-            # Usamos un valor de referencia basado en el histórico o un estimado 'alto'
-            # Si no hay histórico suficiente, usamos un valor base razonable.
-            max_strain_historico = 1.0
-            if len(df) > 30:
-                 # Calculamos el strain histórico para normalizar
-                 # Esto es aproximado pero sirve para la escala
-                 df['rolling_std'] = df['carga_diaria'].rolling(7).std()
-                 df['rolling_mean'] = df['carga_diaria'].rolling(7).mean()
-                 df['rolling_load'] = df['carga_diaria'].rolling(7).sum()
-                 df['rolling_strain'] = df['rolling_load'] * (df['rolling_mean'] / df['rolling_std'].replace(0, 1))
-                 max_strain_historico = df['rolling_strain'].max()
-            
-            if max_strain_historico == 0: max_strain_historico = 1 # Evitar div/0
-            
-            # Si el strain actual es mayor, será 100 (o más, pero lo capamos visualmente)
-            # Si es muy bajo, será cercano a 0.
-            # Convertimos a escala 0-10.
-            # Ajuste heurístico: Si strain_raw es > max_historico, es un 10.
-            
-            # Simplificación: Devolvemos el valor raw y un porcentaje relativo
-            strain = round(strain_raw, 1)
-            strain_percent = min(round((strain_raw / max_strain_historico) * 100), 100) if max_strain_historico > 1 else 0
-
-        else:
-            monotonia = 0
-            strain = 0
-            strain_percent = 0
-
-        es_monotono = monotonia > 2.0
-
-        # --- CÁLCULO DE MONOTONÍA Y STRAIN (NUEVO) ---
-        # Monotonía = Carga Promedio / Desviación Estándar
-        # Strain = Carga Total * Monotonía
-        # Ya calculado arriba.
-        
-        # Preparar datos para el gráfico (Lista de dicts, no string JSON)
-        df_reset = df.reset_index()
-        # Aseguramos que la columna de fecha tenga el nombre correcto
-        if 'index' in df_reset.columns:
-            df_reset = df_reset.rename(columns={'index': 'fecha'})
-        
-        # Convertimos fechas a string ISO para evitar problemas de serialización
-        df_reset['fecha'] = df_reset['fecha'].dt.strftime('%Y-%m-%d')
-        
-        # Convertimos a lista de diccionarios
-        chart_data = df_reset.to_dict(orient='records')
-        
-        # Limpieza manual asegurada de NaN/Infinitos
-        for record in chart_data:
-            for key, value in record.items():
-                # Verificamos si es float y si es nulo (NaN) o infinito
-                if isinstance(value, float) and pd.isna(value):
-                    record[key] = None
-                # También limpiar strings 'NaN' si hubieran quedado
-                elif value == 'NaN':
-                    record[key] = None
+        cargas_sesion = self._cargas_entrenamientos([f[1:] for f in filas])
+        cargas = motor_carga.serie_diaria(
+            zip((f[0] for f in filas), cargas_sesion), desde, referencia
+        )
+        carga_aguda, carga_cronica, acwr = motor_carga.acwr_rolling(
+            cargas, periodo_agudo, periodo_cronico
+        )
+        acwr_actual = round(float(acwr[-1]), 2)
+
+        zona_riesgo = motor_carga.zona_riesgo(acwr_actual)
+        recomendacion = {
+            'optima': "Estás en la 'zona dulce'. La carga es ideal para progresar de forma segura.",
+            'cuidado': "Estás aumentando la carga. Procede con cuidado y vigila la recuperación.",
+            'riesgo_alto': "¡Peligro! El riesgo de lesión es elevado. Considera reducir la intensidad o el volumen.",
+            'baja_carga': "La carga es baja, lo que puede llevar a una pérdida de adaptaciones. Ideal para una semana de descarga.",
+        }[zona_riesgo]
+
+        # MONOTONÍA Y STRAIN
+        # Monotonía = Carga Media Diaria / Desviación Estándar (últimos 7 días)
+        # Strain = Carga Total Semanal * Monotonía, normalizado (0-100) contra
+        # el strain móvil máximo del período.
+        monotonia, strain_raw = motor_carga.monotonia_strain(cargas, 7)
+        monotonia = round(float(monotonia), 2)
+        strain_movil = motor_carga.strain_movil(cargas, 7)
+        max_strain_historico = float(np.nanmax(strain_movil)) if np.isfinite(strain_movil).any() else 1.0
+        if max_strain_historico == 0:
+            max_strain_historico = 1  # Evitar div/0
+        strain = round(float(strain_raw), 1)
+        strain_percent = min(round((strain_raw / max_strain_historico) * 100), 100) if max_strain_historico > 1 else 0
+
+        fechas = motor_carga.rango_fechas(desde, referencia)
+        serie = {
+            'fechas': fechas,
+            'carga_diaria': cargas,
+            'carga_cronica': carga_cronica,
+            'acwr': acwr,
+        }
+        carga_semanal = motor_carga.suma_movil(cargas, 7)
+        chart_data = motor_carga.registros(
+            fechas,
+            carga_diaria=cargas,
+            carga_aguda=carga_aguda,
+            carga_cronica=carga_cronica,
+            acwr=acwr,
+            rolling_std=motor_carga.desviacion_movil(cargas, 7),
+            rolling_mean=carga_semanal / 7,
+            rolling_load=carga_semanal,
+            rolling_strain=strain_movil,
+        )
 
         return {
-            'dataframe_json': chart_data, # Ahora es una lista, no un string JSON
+            'dataframe_json': chart_data,  # Lista de dicts lista para json_script
             'acwr_actual': acwr_actual,
             'zona_riesgo': zona_riesgo,
             'recomendacion': recomendacion,
-            'narrativa': self._generar_narrativa_dinamica(df, acwr_actual, zona_riesgo, monotonia),
+            'narrativa': self._generar_narrativa_dinamica(serie, acwr_actual, zona_riesgo, monotonia),
             'monotonia': monotonia,
-            'es_monotono': es_monotono,
+            'es_monotono': monotonia > 2.0,
             'strain': strain,
-            'strain_percent': strain_percent # Nuevo campo para la barra de progreso
+            'strain_percent': strain_percent
         }
 
 
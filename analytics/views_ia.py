@@ -920,9 +920,9 @@ def predicciones_avanzadas(request, cliente_id):
         # Generar predicciones
         predicciones = sistema_predicciones.generar_predicciones()
 
-        for ejercicio in ejercicios_disponibles[:10]:
+        predicciones_top = sistema_predicciones.predecir_rendimiento_multiples(ejercicios_disponibles[:10])
+        for ejercicio, prediccion in predicciones_top.items():
             try:
-                prediccion = sistema_predicciones.predecir_rendimiento_ejercicio(ejercicio)
                 prediccion['nombre_ejercicio'] = ejercicio
                 predicciones.append(prediccion)
                 logger.info(f"Predicción generada para {ejercicio}: {prediccion.get('peso_predicho', '?')} kg")
@@ -0,0 +1,35 @@
+"""
+Hit/miss por familia de clave de la caché por cliente (core.services.cache_cliente).
+
+Sirve para ajustar los TTL con datos: una familia con ratio bajo y muchas
+lecturas está caducando antes de reutilizarse.
+
+Uso:
+    python manage.py estadisticas_cache
+    python manage.py estadisticas_cache --reiniciar   # muestra y pone a cero
+"""
+from django.core.management.base import BaseCommand
+
+from core.services import cache_cliente
+
+
+class Command(BaseCommand):
+    help = 'Muestra los contadores hit/miss por familia de la caché por cliente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reiniciar', action='store_true',
+                            help='Pone a cero los contadores después de mostrarlos')
+
+    def handle(self, *args, **options):
+        estadisticas = cache_cliente.estadisticas()
+        for familia, datos in estadisticas.items():
+            ratio = f"{datos['ratio']:.1%}" if datos['ratio'] is not None else '-'
+            self.stdout.write(f"{familia:<45} hit={datos['hit']:<8} miss={datos['miss']:<8} ratio={ratio}")
+
+        lecturas = sum(d['hit'] + d['miss'] for d in estadisticas.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'\nFamilias: {len(estadisticas)} | Lecturas: {lecturas}'
+        ))
+        if options['reiniciar']:
+            cache_cliente.reiniciar_estadisticas()
+            self.stdout.write('Contadores reiniciados.')
@@ -0,0 +1,185 @@
+"""
+ContextoCliente — los bloques del dashboard comparten lesiones, objetivo
+Hyrox, check-in y fase del plan cargados una vez por request en vez de
+repetir cada uno su propia query.
+"""
+import re
+from collections import Counter
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from clientes import views
+from clientes.models import BitacoraDiaria, Cliente
+from core.bio_context import BioContextProvider
+from core.context.actividad_context import get_actividad_context
+from core.context.contexto_cliente import ContextoCliente, contexto_de_request
+from core.daily_decision import DailyDecisionEngine
+from core.services.physical_snapshot import build_physical_snapshot
+from hyrox.models import HyroxObjective, UserInjury
+
+TABLAS_COMPARTIDAS = (
+    'hyrox_userinjury',
+    'hyrox_hyroxobjective',
+    'clientes_bitacoradiaria',
+    'clientes_fasecliente',
+)
+
+# Consultas del render completo del dashboard con la caché vacía (todos los
+# bloques se calculan), con el reloj fijado en miércoles. Es un valor fijo:
+# si cambia, la diferencia se revisa y se actualiza aquí a conciencia.
+PRESUPUESTO_DASHBOARD = 239
+
+
+def _queries_por_tabla(capturadas):
+    tablas = Counter()
+    for q in capturadas:
+        m = re.search(r'FROM "(\w+)"', q['sql'])
+        if m and m.group(1) in TABLAS_COMPARTIDAS:
+            tablas[m.group(1)] += 1
+    return tablas
+
+
+class ContextoClienteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user('contexto_dash', password='x')
+        self.cliente = Cliente.objects.get(user=self.user)
+        hoy = timezone.localdate()
+        HyroxObjective.objects.create(cliente=self.cliente, fecha_evento=hoy + timedelta(days=60))
+        UserInjury.objects.create(cliente=self.cliente, zona_afectada='Rodilla', fase='RETORNO')
+        UserInjury.objects.create(cliente=self.cliente, zona_afectada='Hombro', fase='AGUDA', activa=False)
+        BitacoraDiaria.objects.create(cliente=self.cliente, horas_sueno=7, energia_subjetiva=6)
+
+    def _consumidores(self, contexto=None):
+        hoy = timezone.localdate()
+        views._ctx_lesiones_activas(self.cliente, contexto=contexto)
+        views._ctx_hyrox(self.cliente, hoy, contexto=contexto)
+        views._ctx_bio(self.cliente, contexto=contexto)
+        get_actividad_context(self.cliente, hoy=hoy, contexto=contexto)
+        DailyDecisionEngine.get_estado_hoy(self.cliente, contexto=contexto)
+
+    def test_con_contexto_cada_hecho_se_consulta_una_vez(self):
+        contexto = ContextoCliente(self.cliente)
+        with CaptureQueriesContext(connection) as capturadas:
+            self._consumidores(contexto)
+
+        tablas = _queries_por_tabla(capturadas.captured_queries)
+        for tabla in TABLAS_COMPARTIDAS:
+            self.assertLessEqual(tablas[tabla], 1, msg=f'{tabla}: {tablas[tabla]} queries')
+
+    def test_sin_contexto_se_repiten_las_queries(self):
+        with CaptureQueriesContext(connection) as capturadas:
+            self._consumidores()
+
+        tablas = _queries_por_tabla(capturadas.captured_queries)
+        self.assertGreater(tablas['hyrox_userinjury'], 1)
+
+    def test_hechos_precargados_no_consultan(self):
+        objetivo = HyroxObjective.objects.get(cliente=self.cliente)
+        contexto = ContextoCliente(self.cliente)
+        contexto.lesiones
+        contexto.objetivos_hyrox
+        contexto.bitacoras_recientes
+
+        with self.assertNumQueries(0):
+            BioContextProvider.get_current_restrictions(self.cliente, contexto=contexto)
+            BioContextProvider.get_bio_signals(self.cliente, contexto=contexto)
+            self.assertEqual(len(contexto.lesiones_activas), 1)
+            self.assertEqual(contexto.objetivo_hyrox(), objetivo)
+            self.assertIsNotNone(contexto.bitacora_del_dia(contexto.hoy, checkin_completo=True))
+
+    def test_mismos_resultados_con_y_sin_contexto(self):
+        contexto = ContextoCliente(self.cliente)
+        self.assertEqual(
+            BioContextProvider.get_current_restrictions(self.cliente),
+            BioContextProvider.get_current_restrictions(self.cliente, contexto=contexto),
+        )
+        self.assertEqual(
+            BioContextProvider.get_readiness_score(self.cliente),
+            BioContextProvider.get_readiness_score(self.cliente, contexto=contexto),
+        )
+        self.assertEqual(
+            DailyDecisionEngine.get_estado_hoy(self.cliente)['estado'],
+            DailyDecisionEngine.get_estado_hoy(self.cliente, contexto=contexto)['estado'],
+        )
+
+    def test_contexto_memoizado_en_la_request(self):
+        request = RequestFactory().get('/')
+        primero = contexto_de_request(request, self.cliente)
+        self.assertIs(contexto_de_request(request, self.cliente), primero)
+
+    def test_snapshot_fisico_igual_con_y_sin_contexto(self):
+        hoy = timezone.localdate()
+        contexto = ContextoCliente(self.cliente)
+        self.assertEqual(
+            build_physical_snapshot(self.cliente, hoy)['fingerprint'],
+            build_physical_snapshot(self.cliente, hoy, contexto=contexto)['fingerprint'],
+        )
+
+
+class PresupuestoConsultasDashboardTests(TestCase):
+    """La vista del dashboard lee cada hecho compartido una sola vez."""
+
+    def setUp(self):
+        # Algunos bloques dependen del día de la semana (lunes y fin de semana
+        # consultan distinto): el reloj se fija en el próximo miércoles.
+        ahora = timezone.now()
+        reloj = patch(
+            'django.utils.timezone.now',
+            return_value=ahora + timedelta(days=(2 - timezone.localtime(ahora).weekday()) % 7),
+        )
+        reloj.start()
+        self.addCleanup(reloj.stop)
+
+        cache.clear()
+        self.user = get_user_model().objects.create_user('contexto_vista', password='x')
+        self.cliente = Cliente.objects.get(user=self.user)
+        self.hoy = timezone.localdate()
+        HyroxObjective.objects.create(cliente=self.cliente, fecha_evento=self.hoy + timedelta(days=60))
+        UserInjury.objects.create(cliente=self.cliente, zona_afectada='Rodilla', fase='RETORNO')
+        bitacora = BitacoraDiaria.objects.create(cliente=self.cliente, horas_sueno=7, energia_subjetiva=6)
+        # fecha es auto_now_add (reloj real): se alinea con el reloj fijado
+        BitacoraDiaria.objects.filter(pk=bitacora.pk).update(fecha=self.hoy)
+        self.client.force_login(self.user)
+
+    def _get(self):
+        cache.clear()
+        respuesta = self.client.get(reverse('clientes:mockup_demo'))
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta
+
+    def _medir(self):
+        # La primera request del día persiste versiones y trazas de decisión.
+        self._get()
+        with CaptureQueriesContext(connection) as capturadas:
+            self._get()
+        return capturadas.captured_queries
+
+    def test_hechos_compartidos_una_query_por_request(self):
+        tablas = _queries_por_tabla(self._medir())
+        for tabla in TABLAS_COMPARTIDAS:
+            self.assertLessEqual(tablas[tabla], 1, msg=f'{tabla}: {tablas[tabla]} queries')
+
+    def test_presupuesto_no_crece_con_el_historial(self):
+        self.assertEqual(len(self._medir()), PRESUPUESTO_DASHBOARD)
+
+        UserInjury.objects.create(cliente=self.cliente, zona_afectada='Tobillo', fase='RETORNO')
+        BitacoraDiaria.objects.create(
+            cliente=self.cliente, fecha=self.hoy - timedelta(days=1), horas_sueno=6, energia_subjetiva=5,
+        )
+        HyroxObjective.objects.create(
+            cliente=self.cliente, fecha_evento=self.hoy - timedelta(days=200), estado='completado',
+        )
+
+        self._get()
+        with self.assertNumQueries(PRESUPUESTO_DASHBOARD):
+            self._get()
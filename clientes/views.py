@@ -16,6 +16,8 @@ from analytics.views import AnalizadorCargaYFatiga, CalculadoraEjerciciosTabla
 from django.shortcuts import render, get_object_or_404
 from logros.models import PerfilGamificacion, PruebaLegendaria, PruebaUsuario
 from django.core.cache import cache
+from core.context.contexto_cliente import contexto_de_request
+from core.services import cache_cliente
 import json
 import logging
 import random
@@ -533,10 +535,9 @@ def checkin_matutino(request):
         pass
 
     # Bio-readiness recién calculado con este check-in: la caché de 10 min
-    # (bio_ctx_{cliente.id}) serviría el valor pre-checkin si no se invalida aquí.
-    from django.core.cache import cache as _cache
+    # (bio_ctx) serviría el valor pre-checkin si no se invalida aquí.
     from core.bio_context import BioContextProvider
-    _cache.delete(f'bio_ctx_{cliente.id}')
+    cache_cliente.invalidar_cliente(cliente.id)
     try:
         _readiness = BioContextProvider.get_readiness_score(cliente)
     except Exception:
@@ -621,34 +622,13 @@ from analytics.analisis_progresion import AnalisisProgresionAvanzado
 
 def calcular_top_1rm(cliente):
     """
-    Obtiene los mejores levantamientos (1RM estimado o Peso Máximo)
-    para el dashboard del cliente de forma optimizada.
+    Los 4 mejores levantamientos del cliente (1RM estimado) para el
+    dashboard, leídos del índice MejorMarcaEjercicio: una query ordenada
+    en vez de escanear RecordPersonal y agrupar en Python.
     """
     try:
-        # Obtenemos los últimos récords no superados de diversos tipos
-        records = (
-            RecordPersonal.objects.filter(cliente=cliente, superado=False)
-            .filter(tipo_record__in=['one_rep_max', 'peso_maximo', 'volumen_total'])
-            .order_by('ejercicio_nombre', '-valor', '-fecha_logrado')
-        )
-        
-        # Agrupamos por ejercicio para evitar duplicados en el top
-        mejores_por_ejercicio = {}
-        for r in records:
-            if r.ejercicio_nombre not in mejores_por_ejercicio:
-                mejores_por_ejercicio[r.ejercicio_nombre] = r
-            else:
-                # Prioridad: one_rep_max > peso_maximo > otros
-                existente = mejores_por_ejercicio[r.ejercicio_nombre]
-                if r.tipo_record == 'one_rep_max':
-                    mejores_por_ejercicio[r.ejercicio_nombre] = r
-                elif r.tipo_record == 'peso_maximo' and existente.tipo_record != 'one_rep_max':
-                    mejores_por_ejercicio[r.ejercicio_nombre] = r
-        
-        # Devolvemos los 4 mejores levantamientos ordenados por valor relativo (o simplemente los 4 primeros)
-        # Nota: el 'valor' puede variar mucho entre ejercicios, pero suele ser un buen indicador de 'top'
-        top_list = sorted(mejores_por_ejercicio.values(), key=lambda x: float(x.valor), reverse=True)
-        return top_list[:4]
+        from entrenos.services.mejores_marcas_service import top_levantamientos
+        return top_levantamientos(cliente, limite=4)
     except Exception as e:
         logger.error(f"Error en calcular_top_1rm: {e}")
         return []
@@ -656,8 +636,7 @@ def calcular_top_1rm(cliente):
 
 def _ctx_gamificacion(cliente):
     """Bloque de gamificación con caché de 15 minutos."""
-    _key = f'dashboard_gamif_{cliente.id}'
-    cached = cache.get(_key)
+    cached = cache_cliente.obtener('dashboard_gamif', cliente.id)
     if cached is not None:
         return cached
     perfil = PerfilGamificacion.objects.filter(cliente=cliente).select_related('nivel_actual').first()
@@ -674,7 +653,7 @@ def _ctx_gamificacion(cliente):
                 arquetipo=perfil.nivel_actual
             ).exclude(id__in=ids_completadas)[:3])
     result = (perfil, logros_completados, pruebas_activas)
-    cache.set(_key, result, 900)
+    cache_cliente.guardar('dashboard_gamif', cliente.id, result, 900)
     return result
 
 
@@ -717,8 +696,7 @@ def _ctx_estoico(request, hoy):
 
 def _ctx_analytics(cliente, hoy):
     """Analytics pesados: mesociclos, fatiga, ratios fuerza. Caché 15 min."""
-    _key = f'dashboard_analytics_{cliente.id}'
-    cached = cache.get(_key)
+    cached = cache_cliente.obtener('dashboard_analytics', cliente.id)
     if cached is None:
         analizador_progresion = AnalisisProgresionAvanzado(cliente)
         analizador_intensidad = AnalisisIntensidadAvanzado(cliente)
@@ -727,18 +705,21 @@ def _ctx_analytics(cliente, hoy):
             'fatiga_acumulada': analizador_intensidad.calcular_fatiga_acumulada(periodo_dias=14),
             'analisis_mesociclos': analizador_progresion.analisis_mesociclos(),
         }
-        cache.set(_key, cached, 900)
+        cache_cliente.guardar('dashboard_analytics', cliente.id, cached, 900)
     return cached
 
 
-def _ctx_hyrox(cliente, hoy):
+def _ctx_hyrox(cliente, hoy, contexto=None):
     """Objetivo Hyrox activo y próxima sesión."""
     try:
         from hyrox.models import HyroxObjective, HyroxSession
-        objetivo = (
-            HyroxObjective.objects.filter(cliente=cliente, estado='activo').first()
-            or HyroxObjective.objects.filter(cliente=cliente, estado='active').first()
-        )
+        if contexto is not None:
+            objetivo = contexto.objetivo_hyrox()
+        else:
+            objetivo = (
+                HyroxObjective.objects.filter(cliente=cliente, estado='activo').first()
+                or HyroxObjective.objects.filter(cliente=cliente, estado='active').first()
+            )
         proxima = None
         if objetivo:
             proxima = HyroxSession.objects.filter(
@@ -750,11 +731,11 @@ def _ctx_hyrox(cliente, hoy):
         return None, None
 
 
-def _ctx_bio(cliente):
+def _ctx_bio(cliente, contexto=None):
     """Bio readiness y restricciones activas."""
     try:
         from core.bio_context import BioContextProvider
-        readiness = BioContextProvider.get_readiness_score(cliente)
+        readiness = BioContextProvider.get_readiness_score(cliente, contexto=contexto)
         if not isinstance(readiness, dict):
             raise ValueError('Payload de bio-readiness inválido')
         score = readiness.get('score')
@@ -762,7 +743,7 @@ def _ctx_bio(cliente):
         if not isinstance(score, (int, float)) or not isinstance(volume_modifier, (int, float)):
             raise ValueError('Payload de bio-readiness incompleto')
         readiness = {**readiness, 'available': True}
-        return readiness, BioContextProvider.get_current_restrictions(cliente)
+        return readiness, BioContextProvider.get_current_restrictions(cliente, contexto=contexto)
     except Exception as e:
         logger.warning("_ctx_bio error para cliente %s: %s", cliente.id, e)
         return {
@@ -832,26 +813,37 @@ def _cache_ctx(ttl=300):
     _senal_key/_sug_key), no los 3600s de los bloques puramente informativos
     (peso, stats, radar, ACWR). Antes ninguna de estas 15 funciones tenía
     caché: cada una repetía su propia query en cada carga del dashboard.
+
+    El primer argumento es siempre el cliente: la clave va versionada con
+    cache_cliente, así que invalidar_cliente() también las descarta.
+    `contexto` (ContextoCliente de la request) se reenvía a la función si
+    ésta lo acepta, pero no forma parte de la clave.
     """
     import functools
 
     def decorator(func):
+        familia = f'ctx_{func.__name__}'
+
         @functools.wraps(func)
-        def wrapper(*args):
+        def wrapper(cliente, *args, contexto=None):
             partes = [str(getattr(a, 'id', a)) for a in args]
-            key = f'ctx_{func.__name__}_' + '_'.join(partes)
-            valor = cache.get(key, _CTX_CACHE_MISSING)
+            valor = cache_cliente.obtener(familia, cliente.id, *partes, default=_CTX_CACHE_MISSING)
             if valor is _CTX_CACHE_MISSING:
-                valor = func(*args)
-                cache.set(key, valor, ttl)
+                if contexto is not None:
+                    valor = func(cliente, *args, contexto=contexto)
+                else:
+                    valor = func(cliente, *args)
+                cache_cliente.guardar(familia, cliente.id, valor, ttl, *partes)
             return valor
         return wrapper
     return decorator
 
 
 @_cache_ctx()
-def _ctx_lesiones_activas(cliente):
+def _ctx_lesiones_activas(cliente, contexto=None):
     try:
+        if contexto is not None:
+            return contexto.lesiones_activas
         from hyrox.models import UserInjury
         return list(UserInjury.objects.filter(cliente=cliente, activa=True).exclude(fase=UserInjury.Fase.RECUPERADO))
     except Exception:
@@ -1024,6 +1016,9 @@ def _ctx_sugerencia_activa(cliente, fecha_ref):
 def _get_dashboard_context_data(request, cliente):
     usuario = request.user
     hoy = timezone.now().date()
+    # Lesiones, objetivo Hyrox, check-in y fase: una query por hecho para
+    # todos los bloques de esta request.
+    contexto = contexto_de_request(request, cliente)
     generar_retos_semanales(cliente)
     lunes = obtener_lunes_actual()
 
@@ -1052,8 +1047,7 @@ def _get_dashboard_context_data(request, cliente):
     # Aggregate sobre TODO el histórico de EjercicioRealizado — crece sin
     # límite con el uso. Invalidado en entrenos/signals.py junto al resto de
     # caches de dashboard al guardar un entreno nuevo.
-    _carga_total_key = f'dashboard_carga_total_{cliente.id}'
-    carga_total_acumulada = cache.get(_carga_total_key)
+    carga_total_acumulada = cache_cliente.obtener('dashboard_carga_total', cliente.id)
     if carga_total_acumulada is None:
         _carga_agg = EjercicioRealizado.objects.filter(
             entreno__cliente=cliente
@@ -1064,7 +1058,7 @@ def _get_dashboard_context_data(request, cliente):
             ))
         )
         carga_total_acumulada = round(_carga_agg['total'] or 0)
-        cache.set(_carga_total_key, carga_total_acumulada, 3600)
+        cache_cliente.guardar('dashboard_carga_total', cliente.id, carga_total_acumulada, 3600)
 
     emociones_lista = [
         ("😊", "feliz"), ("😐", "neutro"),
@@ -1083,11 +1077,10 @@ def _get_dashboard_context_data(request, cliente):
         _sem = _fe - timedelta(days=_fe.weekday())
         _semana_counts[_sem] = _semana_counts.get(_sem, 0) + 1
 
-    _peso_cache_key = f'dashboard_peso_{cliente.id}'
-    _peso_cached = cache.get(_peso_cache_key)
+    _peso_cached = cache_cliente.obtener('dashboard_peso', cliente.id)
     if _peso_cached is None:
         _peso_cached = analizar_tendencia_peso(cliente)
-        cache.set(_peso_cache_key, _peso_cached, 3600)
+        cache_cliente.guardar('dashboard_peso', cliente.id, _peso_cached, 3600)
     peso_actual, datos_peso, cambios_peso = _peso_cached
     sug_carga = consejo_carga(cliente)
 
@@ -1100,7 +1093,7 @@ def _get_dashboard_context_data(request, cliente):
         mesociclo_actual = analisis_mesociclos['mesociclos'][-1]
 
     from entrenos.services.autoridad_diaria_gym_service import resolver_autoridad_diaria_gym
-    _decision_entreno = resolver_autoridad_diaria_gym(cliente, hoy)
+    _decision_entreno = resolver_autoridad_diaria_gym(cliente, hoy, contexto=contexto)
     proximo_entrenamiento = _decision_entreno['entrenamiento']
 
     # ── Comprobar si el entreno de hoy (o el próximo) ya fue realizado ──────
@@ -1176,20 +1169,19 @@ def _get_dashboard_context_data(request, cliente):
     else:
         entreno_realizado_fecha = None
 
-    hyrox_objetivo, hyrox_proxima_sesion = _ctx_hyrox(cliente, hoy)
-    bio_readiness, restricciones_bio = _ctx_bio(cliente)
+    hyrox_objetivo, hyrox_proxima_sesion = _ctx_hyrox(cliente, hoy, contexto=contexto)
+    bio_readiness, restricciones_bio = _ctx_bio(cliente, contexto=contexto)
 
     _sesion_programada = _decision_entreno['sesion_programada']
 
-    _stats_cache_key = f'dashboard_stats_{cliente.id}'
-    _stats_cached = cache.get(_stats_cache_key)
+    _stats_cached = cache_cliente.obtener('dashboard_stats', cliente.id)
     if _stats_cached is None:
         estadisticas_plan = obtener_estadisticas_plan_anual(cliente)
         historial_adherencia = obtener_historial_adherencia_semanal(cliente, num_semanas=8)
         prediccion = predecir_riesgo_abandono(historial_adherencia)
         reporte_adherencia = calcular_reporte_adherencia_cliente(cliente)
         _stats_cached = (estadisticas_plan, historial_adherencia, prediccion, reporte_adherencia)
-        cache.set(_stats_cache_key, _stats_cached, 3600)
+        cache_cliente.guardar('dashboard_stats', cliente.id, _stats_cached, 3600)
     estadisticas_plan, historial_adherencia, prediccion, reporte_adherencia = _stats_cached
     consistencia_pct = _consistencia_semanal_programada(cliente, hoy)
     notificaciones = generar_notificaciones_contextuales(cliente, entrenos)
@@ -1202,8 +1194,7 @@ def _get_dashboard_context_data(request, cliente):
     # principal y provocaba 502 en conexiones móviles con timeout corto. El
     # cálculo real ahora solo ocurre en widget_acwr (HTMX, hx-trigger="revealed"
     # en mockup_demo.html), que rellena el mismo cache key para la próxima carga.
-    _acwr_cache_key = f'dashboard_acwr_unificado_{cliente.id}'
-    analis_acwr = cache.get(_acwr_cache_key)
+    analis_acwr = cache_cliente.obtener('dashboard_acwr_unificado', cliente.id)
 
     # Sesiones realizadas con anticipación (fecha planificada > hoy, pero ya hechas)
     from entrenos.models import ActividadRealizada as _AR
@@ -1260,15 +1251,14 @@ def _get_dashboard_context_data(request, cliente):
         fecha_fin_radar = timezone.now().date()
         fecha_inicio_radar = fecha_fin_radar - timedelta(days=30)
 
-        _radar_cache_key = f'dashboard_radar_{cliente.id}'
-        stats_principales = cache.get(_radar_cache_key)
+        stats_principales = cache_cliente.obtener('dashboard_radar', cliente.id)
         if stats_principales is None:
             calculadora_stats = CalculadoraEjerciciosTabla(cliente)
             stats_principales = calculadora_stats.calcular_metricas_principales(
                 fecha_inicio=fecha_inicio_radar,
                 fecha_fin=fecha_fin_radar
             )
-            cache.set(_radar_cache_key, stats_principales, 3600)  # 1h
+            cache_cliente.guardar('dashboard_radar', cliente.id, stats_principales, 3600)  # 1h
         
         # Mapeamos a lo que el template blade_runner.html espera
         metricas_radar = {
@@ -1295,19 +1285,17 @@ def _get_dashboard_context_data(request, cliente):
     acwr_data_json = _json.dumps(analis_acwr.get('dataframe', [])) if analis_acwr else '[]'
 
     # Phase 3.0 — señal corporal del diario (5 min cache — cambia máx cada cierre)
-    _senal_key = f'dashboard_senal_diario_{cliente.id}'
-    _senal_diario = cache.get(_senal_key)
+    _senal_diario = cache_cliente.obtener('dashboard_senal_diario', cliente.id)
     if _senal_diario is None:
         _senal_diario = _ctx_senal_corporal_diario(cliente)
-        cache.set(_senal_key, _senal_diario, 300)
+        cache_cliente.guardar('dashboard_senal_diario', cliente.id, _senal_diario, 300)
 
     # Phase 3.5 — sugerencia diario (5 min cache — solo cambia al aceptar/ignorar)
     _MISSING = object.__new__(object)
-    _sug_key = f'dashboard_sug_diario_{cliente.id}'
-    _sugerencia_diario_cached = cache.get(_sug_key, _MISSING)
+    _sugerencia_diario_cached = cache_cliente.obtener('dashboard_sug_diario', cliente.id, default=_MISSING)
     if _sugerencia_diario_cached is _MISSING:
         _sugerencia_diario_cached = _ctx_sugerencia_diario(cliente)
-        cache.set(_sug_key, _sugerencia_diario_cached, 300)
+        cache_cliente.guardar('dashboard_sug_diario', cliente.id, _sugerencia_diario_cached, 300)
 
     return {
         'usuario': usuario,
@@ -1389,7 +1377,7 @@ def _get_dashboard_context_data(request, cliente):
         'evaluacion_intervencion': _ctx_evaluacion_intervencion(cliente, hoy),
         'recomendacion_continuidad': _ctx_recomendacion_continuidad(cliente, hoy),
         'hoy': timezone.now().date(),
-        'lesiones_activas': _ctx_lesiones_activas(cliente),
+        'lesiones_activas': _ctx_lesiones_activas(cliente, contexto=contexto),
         # Phase 45 — JOI semanal: frase breve si hay señal y no se mostró hoy
         'joi_semanal': _ctx_joi_semanal(cliente),
         # Phase 3.0 — Señal corporal del diario (informativa, no bloquea)
@@ -1474,7 +1462,7 @@ def _panel_cliente_full(request):
     # ── Check-in matutino ─────────────────────────────────────────────
     from datetime import date as _today
     _hoy2 = _today.today()
-    bitacora_hoy = BitacoraDiaria.objects.filter(cliente=cliente, fecha=_hoy2).first()
+    bitacora_hoy = contexto_de_request(request, cliente).bitacora_del_dia(_hoy2)
     context['checkin_hoy'] = bitacora_hoy  # None if not done yet
 
     return render(request, 'clientes/panel_cliente.html', context)
@@ -1485,16 +1473,12 @@ def mockup_demo(request):
     usuario = request.user
     cliente = get_object_or_404(Cliente, user=usuario)
     context = _get_dashboard_context_data(request, cliente)
+    contexto = contexto_de_request(request, cliente)
     from diario.models import ProsocheDiario, SeguimientoVires
     from nutricion_app_django.models import TargetNutricionalDiario
     _hoy = timezone.localdate()
 
-    checkin_hoy = BitacoraDiaria.objects.filter(
-        cliente=cliente,
-        fecha=_hoy,
-        horas_sueno__isnull=False,
-        energia_subjetiva__isnull=False,
-    ).first()
+    checkin_hoy = contexto.bitacora_del_dia(_hoy, checkin_completo=True)
     context['checkin_hoy'] = checkin_hoy
     context['checkin_pendiente'] = checkin_hoy is None
 
@@ -1558,11 +1542,10 @@ def mockup_demo(request):
     # ── Resumen semanal gym ───────────────────────────────────────
     try:
         from entrenos.services.resumen_semanal_service import get_resumen_semanal_gym
-        _resumen_key = f'dashboard_resumen_gym_{cliente.id}'
-        _resumen = cache.get(_resumen_key)
+        _resumen = cache_cliente.obtener('dashboard_resumen_gym', cliente.id)
         if _resumen is None:
             _resumen = get_resumen_semanal_gym(cliente)
-            cache.set(_resumen_key, _resumen, 3600)
+            cache_cliente.guardar('dashboard_resumen_gym', cliente.id, _resumen, 3600)
         context['resumen_semanal_gym'] = _resumen
     except Exception:
         context['resumen_semanal_gym'] = []
@@ -1570,11 +1553,10 @@ def mockup_demo(request):
     # ── Revisión de progreso (peso/cintura/rendimiento) ───────────
     try:
         from entrenos.services.revision_progreso_service import get_revision_progreso
-        _revision_key = f'dashboard_revision_progreso_{cliente.id}'
-        _revision = cache.get(_revision_key)
+        _revision = cache_cliente.obtener('dashboard_revision_progreso', cliente.id)
         if _revision is None:
             _revision = get_revision_progreso(cliente)
-            cache.set(_revision_key, _revision, 3600)
+            cache_cliente.guardar('dashboard_revision_progreso', cliente.id, _revision, 3600)
         context['revision_progreso'] = _revision
     except Exception:
         context['revision_progreso'] = []
@@ -1582,32 +1564,24 @@ def mockup_demo(request):
     # ── Alertas del sistema (panel unificado) ─────────────────────
     try:
         from entrenos.services.alertas_sistema_service import get_alertas_sistema
-        _alertas_key = f'dashboard_alertas_{cliente.id}'
-        _alertas = cache.get(_alertas_key)
+        _alertas = cache_cliente.obtener('dashboard_alertas', cliente.id)
         if _alertas is None:
-            _alertas = get_alertas_sistema(cliente)
-            cache.set(_alertas_key, _alertas, 300)
+            _alertas = get_alertas_sistema(cliente, contexto=contexto)
+            cache_cliente.guardar('dashboard_alertas', cliente.id, _alertas, 300)
         context['alertas_sistema'] = _alertas
     except Exception:
         context['alertas_sistema'] = []
 
     # ── Lesión activa (para panel inline de gestión) ───────────────
     try:
-        from hyrox.models import UserInjury
-        context['lesion_activa'] = UserInjury.objects.filter(
-            cliente=cliente, activa=True
-        ).order_by('-fecha_inicio').first()
+        context['lesion_activa'] = contexto.lesion_activa
     except Exception:
         context['lesion_activa'] = None
 
     # Garantiza que hyrox_objetivo esté en el contexto aunque _ctx_hyrox haya fallado.
     if not context.get('hyrox_objetivo'):
         try:
-            from hyrox.models import HyroxObjective
-            context['hyrox_objetivo'] = (
-                HyroxObjective.objects.filter(cliente=cliente, estado='activo').first()
-                or HyroxObjective.objects.filter(cliente=cliente, estado='active').first()
-            )
+            context['hyrox_objetivo'] = contexto.objetivo_hyrox()
         except Exception:
             context.setdefault('hyrox_objetivo', None)
 
@@ -1721,7 +1695,7 @@ def mockup_demo(request):
     try:
         from core.organismo import resolver_estado_sistema_hoy
         estado_sistema = resolver_estado_sistema_hoy(
-            usuario, decision_gym=context.get('_decision_gym_raw')
+            usuario, decision_gym=context.get('_decision_gym_raw'), contexto=contexto,
         )
         context['estado_sistema'] = estado_sistema
     except Exception as e:
@@ -32,13 +32,15 @@ class BioContextProvider:
     # ──────────────────────────────────────────────────────────
 
     @staticmethod
-    def get_current_restrictions(cliente) -> Dict[str, Any]:
+    def get_current_restrictions(cliente, contexto=None) -> Dict[str, Any]:
         """
         Devuelve una vista unificada de todas las restricciones biomecánicas
         activas del usuario, provenientes de sus lesiones ``UserInjury``.
 
         Args:
             cliente: instancia de ``clientes.models.Cliente``
+            contexto: ``ContextoCliente`` opcional de la request; si se pasa,
+                las lesiones salen de él en vez de una query propia.
 
         Returns:
             dict con:
@@ -48,12 +50,15 @@ class BioContextProvider:
         """
         from hyrox.models import UserInjury
 
-        lesiones_activas = UserInjury.objects.filter(
-            cliente=cliente,
-            activa=True,
-        ).exclude(
-            fase=UserInjury.Fase.RECUPERADO,
-        )
+        if contexto is not None:
+            lesiones_activas = contexto.lesiones_activas
+        else:
+            lesiones_activas = UserInjury.objects.filter(
+                cliente=cliente,
+                activa=True,
+            ).exclude(
+                fase=UserInjury.Fase.RECUPERADO,
+            )
 
         tags: Set[str] = set()
         injuries_summary: List[Dict[str, Any]] = []
@@ -89,15 +94,15 @@ class BioContextProvider:
         """
         Igual que ``get_current_restrictions`` pero reutiliza la caché de 10 min
         que ya escribe ``core.bio_context_processor.bio_context`` (key
-        ``bio_ctx_{cliente.id}``, contiene ``bio_banner``). Si hay hit, evita
+        familia ``bio_ctx`` de ``cache_cliente``, contiene ``bio_banner``). Si hay hit, evita
         repetir la query a ``UserInjury`` que el context processor ya hizo (o
         hará) para la misma request/ventana. Si no hay hit, cae al cálculo
         directo — la vista que llame a este método no necesita escribir en
         caché, el context processor la rellenará al renderizar el template.
         """
-        from django.core.cache import cache
+        from core.services import cache_cliente
 
-        cached = cache.get(f'bio_ctx_{cliente.id}')
+        cached = cache_cliente.obtener('bio_ctx', cliente.id)
         if cached and 'bio_banner' in cached:
             return cached['bio_banner']
 
@@ -108,7 +113,7 @@ class BioContextProvider:
     # ──────────────────────────────────────────────────────────
 
     @staticmethod
-    def get_bio_signals(cliente) -> Dict[str, Any]:
+    def get_bio_signals(cliente, contexto=None) -> Dict[str, Any]:
         """
         Devuelve los datos más recientes del checkin matutino (BitacoraDiaria)
         dentro de una ventana de 3 días. Si no hay registro en ese periodo,
@@ -129,12 +134,15 @@ class BioContextProvider:
         from django.utils import timezone
 
         hoy = timezone.now().date()
-        entrada = (
-            BitacoraDiaria.objects
-            .filter(cliente=cliente, fecha__gte=hoy - timezone.timedelta(days=3), fecha__lte=hoy)
-            .order_by('-fecha')
-            .first()
-        )
+        if contexto is not None:
+            entrada = contexto.bitacora_mas_reciente(hoy - timezone.timedelta(days=3), hoy)
+        else:
+            entrada = (
+                BitacoraDiaria.objects
+                .filter(cliente=cliente, fecha__gte=hoy - timezone.timedelta(days=3), fecha__lte=hoy)
+                .order_by('-fecha')
+                .first()
+            )
         if not entrada:
             return {
                 'energia': None, 'horas_sueno': None, 'calidad_sueno': None,
@@ -157,7 +165,7 @@ class BioContextProvider:
     # ──────────────────────────────────────────────────────────
 
     @staticmethod
-    def get_readiness_score(cliente) -> Dict[str, Any]:
+    def get_readiness_score(cliente, contexto=None) -> Dict[str, Any]:
         """
         Calcula un score unificado de «preparación para entrenar» fusionando:
 
@@ -172,6 +180,8 @@ class BioContextProvider:
 
         Args:
             cliente: instancia de ``clientes.models.Cliente``
+            contexto: ``ContextoCliente`` opcional (lesiones y check-in
+                compartidos con el resto de la request)
 
         Returns:
             dict con:
@@ -188,12 +198,15 @@ class BioContextProvider:
         )
 
         # ── Recoger lesiones activas ────────────────────────────
-        lesiones_activas = UserInjury.objects.filter(
-            cliente=cliente,
-            activa=True,
-        ).exclude(
-            fase=UserInjury.Fase.RECUPERADO,
-        )
+        if contexto is not None:
+            lesiones_activas = contexto.lesiones_activas
+        else:
+            lesiones_activas = list(UserInjury.objects.filter(
+                cliente=cliente,
+                activa=True,
+            ).exclude(
+                fase=UserInjury.Fase.RECUPERADO,
+            ))
 
         # ── Últimas 3 entradas de DailyRecoveryEntry ────────────
         recent_entries = list(
@@ -206,7 +219,7 @@ class BioContextProvider:
         )
 
         has_pain_data = len(recent_entries) > 0
-        has_injuries = lesiones_activas.exists()
+        has_injuries = bool(lesiones_activas)
 
         # ── Hyrox Pain Score (0-10, menor = mejor) ──────────────
         if has_pain_data:
@@ -227,7 +240,7 @@ class BioContextProvider:
             'hrv_ms': None, 'freshness_days': None,
         }
         try:
-            bio = BioContextProvider.get_bio_signals(cliente)
+            bio = BioContextProvider.get_bio_signals(cliente, contexto=contexto)
         except Exception:
             bio = _bio_empty
 
@@ -343,14 +356,17 @@ class BioContextProvider:
         volume_modifier_base = volume_modifier  # Pre-transition cap (same when no transition)
 
         # Buscar lesiones recientemente recuperadas (últimos 7 días)
-        lesiones_recientes = UserInjury.objects.filter(
-            cliente=cliente,
-            fase=UserInjury.Fase.RECUPERADO,
-            fecha_resolucion__gte=hoy - timezone.timedelta(days=7)
-        ).order_by('-fecha_resolucion')
+        if contexto is not None:
+            lesiones_recientes = contexto.lesiones_recuperadas_desde(hoy - timezone.timedelta(days=7))
+        else:
+            lesiones_recientes = list(UserInjury.objects.filter(
+                cliente=cliente,
+                fase=UserInjury.Fase.RECUPERADO,
+                fecha_resolucion__gte=hoy - timezone.timedelta(days=7)
+            ).order_by('-fecha_resolucion')[:1])
 
-        if lesiones_recientes.exists():
-            lesion_transicion = lesiones_recientes.first()
+        if lesiones_recientes:
+            lesion_transicion = lesiones_recientes[0]
             dias_desde_resolucion = (hoy - lesion_transicion.fecha_resolucion).days
 
             # Verificar salida anticipada (>= 3 sesiones y dolor = 0)
@@ -377,11 +393,16 @@ class BioContextProvider:
                 volume_modifier = min(volume_modifier, 0.85)
         else:
             # Lesión activa en fase RETORNO: mostrar banner sin countdown de días
-            lesion_retorno = UserInjury.objects.filter(
-                cliente=cliente,
-                fase=UserInjury.Fase.RETORNO,
-                activa=True
-            ).first()
+            if contexto is not None:
+                lesion_retorno = next(iter(contexto.lesiones_en_fase(
+                    UserInjury.Fase.RETORNO, solo_activas=True,
+                )), None)
+            else:
+                lesion_retorno = UserInjury.objects.filter(
+                    cliente=cliente,
+                    fase=UserInjury.Fase.RETORNO,
+                    activa=True
+                ).first()
             if lesion_retorno:
                 is_in_transition = True
                 transition_days_left = None  # Sin countdown: fase activa sin fecha de resolución
@@ -405,7 +426,7 @@ class BioContextProvider:
                 'has_pain_data': has_pain_data,
                 'pain_entries_count': len(recent_entries),
                 'has_active_injuries': has_injuries,
-                'injury_count': lesiones_activas.count() if has_injuries else 0,
+                'injury_count': len(lesiones_activas),
                 'helms_inputs': {
                     'nivel_estres': nivel_estres,
                     'calidad_sueño': calidad_sueño,
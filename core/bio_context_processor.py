@@ -3,9 +3,15 @@
 Django context processor que inyecta datos biomédicos en TODAS las plantillas.
 Esto permite que el banner de Recovery Mode y el widget de Readiness
 aparezcan globalmente sin modificar cada vista individual.
+
+Los valores son perezosos: las páginas que no incluyen el banner no hacen
+ninguna consulta (ni siquiera la del cliente).
 """
 import logging
-from django.core.cache import cache
+
+from django.utils.functional import SimpleLazyObject
+
+from core.services import cache_cliente
 
 logger = logging.getLogger(__name__)
 
@@ -13,24 +19,42 @@ logger = logging.getLogger(__name__)
 def bio_context(request):
     """
     Inyecta ``bio_banner`` y ``bio_readiness`` en el contexto de cada template.
-    Los resultados se cachean 10 minutos por usuario para evitar queries en cada request.
+    Se calculan la primera vez que la plantilla lee cualquiera de los dos.
+    """
+    if not hasattr(request, 'user') or not request.user.is_authenticated:
+        return {'bio_banner': {}, 'bio_readiness': {}}
+
+    datos = SimpleLazyObject(lambda: _bio_datos(request))
+    return {
+        'bio_banner': SimpleLazyObject(lambda: datos['bio_banner']),
+        'bio_readiness': SimpleLazyObject(lambda: datos['bio_readiness']),
+    }
+
+
+def _bio_datos(request):
+    """
+    Banner y readiness del cliente. Los resultados se cachean 10 minutos por
+    usuario para evitar queries en cada request.
     """
     bio_banner = {}
     bio_readiness = {}
 
     try:
-        if not hasattr(request, 'user') or not request.user.is_authenticated:
-            return {'bio_banner': bio_banner, 'bio_readiness': bio_readiness}
-
-        cliente = getattr(request.user, 'cliente_perfil', None)
+        # Si la vista ya montó el ContextoCliente del usuario (dashboard), se
+        # reutilizan su cliente y sus lesiones/check-in en vez de reconsultarlos.
+        contexto = getattr(request, '_contexto_cliente', None)
+        if contexto is not None and contexto.cliente.user_id == request.user.id:
+            cliente = contexto.cliente
+        else:
+            contexto = None
+            cliente = getattr(request.user, 'cliente_perfil', None)
         if cliente is None:
             return {'bio_banner': bio_banner, 'bio_readiness': bio_readiness}
 
         # Recovery test feedback bypasa la caché
         recovery_test_passed = request.session.pop('recovery_test_passed', False)
 
-        cache_key = f'bio_ctx_{cliente.id}'
-        cached = cache.get(cache_key)
+        cached = cache_cliente.obtener('bio_ctx', cliente.id)
         if cached is not None and not recovery_test_passed:
             if recovery_test_passed:
                 cached['bio_banner']['recovery_test_passed'] = True
@@ -39,15 +63,15 @@ def bio_context(request):
 
         from core.bio_context import BioContextProvider
 
-        bio_banner = BioContextProvider.get_current_restrictions(cliente)
-        bio_readiness = BioContextProvider.get_readiness_score(cliente)
+        bio_banner = BioContextProvider.get_current_restrictions(cliente, contexto=contexto)
+        bio_readiness = BioContextProvider.get_readiness_score(cliente, contexto=contexto)
 
         if recovery_test_passed:
             bio_banner['recovery_test_passed'] = True
             bio_banner['has_restrictions'] = True
 
         result = {'bio_banner': bio_banner, 'bio_readiness': bio_readiness}
-        cache.set(cache_key, result, 600)  # 10 minutos
+        cache_cliente.guardar('bio_ctx', cliente.id, result, 600)  # 10 minutos
         return result
 
     except Exception as e:
@@ -20,10 +20,12 @@ from entrenos.models import ActividadRealizada
 _TIPOS_ACTIVIDAD = ['gym', 'hyrox', 'carrera']
 
 
-def get_actividad_context(cliente, hoy: date | None = None) -> dict:
+def get_actividad_context(cliente, hoy: date | None = None, contexto=None) -> dict:
     """
     Devuelve un dict con la actividad reciente del cliente.
 
+    `contexto` (ContextoCliente opcional) aporta la fase del plan ya cargada.
+
     Campos garantizados (nunca KeyError):
         sesiones_gym_semana   int
         sesiones_hyrox_semana int
@@ -106,13 +108,16 @@ def get_actividad_context(cliente, hoy: date | None = None) -> dict:
     # ── 4. Fase del plan activa (FaseCliente) ─────────────────────
     try:
         from django.db.models import Q
-        fase_actual = (
-            FaseCliente.objects
-            .filter(cliente=cliente)
-            .filter(Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=hoy))
-            .order_by('-fecha_inicio')
-            .first()
-        )
+        if contexto is not None:
+            fase_actual = contexto.fase_actual(hoy)
+        else:
+            fase_actual = (
+                FaseCliente.objects
+                .filter(cliente=cliente)
+                .filter(Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=hoy))
+                .order_by('-fecha_inicio')
+                .first()
+            )
         if fase_actual:
             dias_en_fase = (hoy - fase_actual.fecha_inicio).days
             fp = {
@@ -0,0 +1,188 @@
+"""
+core/context/contexto_cliente.py — hechos compartidos del cliente por request.
+
+El dashboard (clientes/views.py) monta ~15 bloques `_ctx_*` y además llama
+a BioContextProvider, DailyDecisionEngine y resolver_estado_sistema_hoy;
+cada uno volvía a consultar por su cuenta las mismas filas: lesiones
+(`UserInjury`), objetivo Hyrox activo, check-in reciente (`BitacoraDiaria`),
+fase del plan (`FaseCliente`) y el entreno de hoy.
+
+`ContextoCliente` carga cada hecho una sola vez (perezoso, una query por
+hecho) y los consumidores lo reciben como argumento opcional `contexto`:
+sin él siguen consultando como antes. Los filtros en Python reproducen las
+mismas condiciones que tenían las queries originales.
+
+No se cachea entre requests: vive lo que vive la request
+(`contexto_de_request`).
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from functools import cached_property
+
+from django.db.models import Q
+from django.utils import timezone
+
+# Fases de UserInjury (hyrox.models.UserInjury.Fase) sin importar el modelo
+# al cargar el módulo.
+AGUDA = 'AGUDA'
+SUB_AGUDA = 'SUB_AGUDA'
+RETORNO = 'RETORNO'
+RECUPERADO = 'RECUPERADO'
+
+# Margen de días de check-in cargados: cubre la ventana de 3 días de
+# get_bio_signals con fecha UTC y local.
+_DIAS_BITACORA = 4
+_DIAS_TRANSICION = 7
+
+
+class ContextoCliente:
+    """Hechos del cliente compartidos por los bloques de una misma request."""
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+        self.hoy = timezone.localdate()
+        self._fases = {}
+
+    # ── Lesiones ──────────────────────────────────────────────────
+
+    @cached_property
+    def lesiones(self):
+        """
+        Lesiones relevantes para cualquier consumidor, en una query: activas,
+        en fase aguda/sub-aguda (aunque estén inactivas) y recuperadas en la
+        ventana de transición. Orden del modelo (-activa, -fecha_inicio).
+        """
+        from hyrox.models import UserInjury
+
+        desde = timezone.now().date() - timedelta(days=_DIAS_TRANSICION + 1)
+        return list(
+            UserInjury.objects.filter(cliente=self.cliente).filter(
+                Q(activa=True)
+                | Q(fase__in=(AGUDA, SUB_AGUDA))
+                | Q(fase=RECUPERADO, fecha_resolucion__gte=desde)
+            )
+        )
+
+    @property
+    def lesiones_activas(self):
+        """activa=True excluyendo fase RECUPERADO."""
+        return [l for l in self.lesiones if l.activa and l.fase != RECUPERADO]
+
+    @property
+    def lesion_activa(self):
+        """Lesión activa más reciente (cualquier fase)."""
+        return next((l for l in self.lesiones if l.activa), None)
+
+    def lesiones_en_fase(self, *fases, solo_activas=False):
+        return [
+            l for l in self.lesiones
+            if l.fase in fases and (l.activa or not solo_activas)
+        ]
+
+    def lesiones_recuperadas_desde(self, fecha):
+        """RECUPERADO con fecha_resolucion >= fecha, más reciente primero."""
+        recuperadas = [
+            l for l in self.lesiones
+            if l.fase == RECUPERADO and l.fecha_resolucion and l.fecha_resolucion >= fecha
+        ]
+        return sorted(recuperadas, key=lambda l: l.fecha_resolucion, reverse=True)
+
+    # ── Hyrox ─────────────────────────────────────────────────────
+
+    @cached_property
+    def objetivos_hyrox(self):
+        """
+        Todos los objetivos del cliente por id. Cada uno lleva el cliente ya
+        asignado y una referencia al contexto (`_contexto_cliente`) para que
+        sus métodos reutilicen lesiones y objetivo activo sin volver a la BD.
+        """
+        from hyrox.models import HyroxObjective
+
+        objetivos = list(HyroxObjective.objects.filter(cliente=self.cliente).order_by('id'))
+        for objetivo in objetivos:
+            objetivo.cliente = self.cliente
+            objetivo._contexto_cliente = self
+        return objetivos
+
+    def objetivo_hyrox(self, *estados):
+        """Primer objetivo del primer estado que tenga alguno (por defecto activo → active)."""
+        for estado in estados or ('activo', 'active'):
+            for objetivo in self.objetivos_hyrox:
+                if objetivo.estado == estado:
+                    return objetivo
+        return None
+
+    @property
+    def ultimo_objetivo_hyrox(self):
+        """Objetivo más reciente (mayor id) en cualquier estado."""
+        return self.objetivos_hyrox[-1] if self.objetivos_hyrox else None
+
+    # ── Check-in (BitacoraDiaria) ─────────────────────────────────
+
+    @cached_property
+    def bitacoras_recientes(self):
+        from clientes.models import BitacoraDiaria
+
+        return list(
+            BitacoraDiaria.objects
+            .filter(
+                cliente=self.cliente,
+                fecha__gte=self.hoy - timedelta(days=_DIAS_BITACORA),
+                fecha__lte=self.hoy + timedelta(days=1),
+            )
+            .order_by('-fecha', 'id')
+        )
+
+    def bitacora_mas_reciente(self, desde, hasta):
+        return next(
+            (b for b in self.bitacoras_recientes if desde <= b.fecha <= hasta), None,
+        )
+
+    def bitacora_del_dia(self, fecha, checkin_completo=False):
+        """Primera bitácora del día; con checkin_completo exige sueño y energía."""
+        for b in self.bitacoras_recientes:
+            if b.fecha != fecha:
+                continue
+            if checkin_completo and (b.horas_sueno is None or b.energia_subjetiva is None):
+                continue
+            return b
+        return None
+
+    # ── Plan y sesión de hoy ──────────────────────────────────────
+
+    def fase_actual(self, hoy: date):
+        """FaseCliente abierta o vigente en `hoy` (la de inicio más reciente)."""
+        if hoy not in self._fases:
+            from clientes.models import FaseCliente
+
+            self._fases[hoy] = (
+                FaseCliente.objects
+                .filter(cliente=self.cliente)
+                .filter(Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=hoy))
+                .order_by('-fecha_inicio')
+                .first()
+            )
+        return self._fases[hoy]
+
+    @cached_property
+    def entreno_hoy(self):
+        """Último EntrenoRealizado con fecha de hoy (con su sesion_detalle)."""
+        from entrenos.models import EntrenoRealizado
+
+        return (
+            EntrenoRealizado.objects
+            .filter(cliente=self.cliente, fecha=self.hoy)
+            .select_related('sesion_detalle')
+            .order_by('-id')
+            .first()
+        )
+
+
+def contexto_de_request(request, cliente):
+    """ContextoCliente memoizado en la request (uno por request y cliente)."""
+    contexto = getattr(request, '_contexto_cliente', None)
+    if contexto is None or contexto.cliente.pk != cliente.pk:
+        contexto = ContextoCliente(cliente)
+        request._contexto_cliente = contexto
+    return contexto
@@ -158,13 +158,15 @@ class DailyDecisionEngine:
             return 0
 
     @classmethod
-    def get_estado_hoy(cls, cliente, es_descanso_plan: bool = None) -> Dict[str, Any]:
+    def get_estado_hoy(cls, cliente, es_descanso_plan: bool = None, contexto=None) -> Dict[str, Any]:
         """
         Devuelve el estado unificado del día.
 
-        Parámetro opcional:
+        Parámetros opcionales:
             es_descanso_plan – True si el plan gym marca hoy como descanso.
                                None = no se conoce (no fuerza el estado).
+            contexto         – ContextoCliente de la request: lesiones,
+                               objetivo Hyrox, check-in y fase ya cargados.
 
         Returns dict con:
             estado           – empujar / sostener / recuperar / volver
@@ -180,14 +182,14 @@ class DailyDecisionEngine:
             datos_raw        – números técnicos (para JOI context)
         """
         # ── 0. Actividad context (Phase 59X.B) ───────────────────
-        act_ctx = get_actividad_context(cliente)
+        act_ctx = get_actividad_context(cliente, contexto=contexto)
         es_descarga_plan = bool(
             act_ctx.get('fase_plan') and act_ctx['fase_plan'].get('es_descarga')
         )
 
         # ── 1. Bio signals ────────────────────────────────────────
-        bio = BioContextProvider.get_bio_signals(cliente)
-        readiness_data = BioContextProvider.get_readiness_score(cliente)
+        bio = BioContextProvider.get_bio_signals(cliente, contexto=contexto)
+        readiness_data = BioContextProvider.get_readiness_score(cliente, contexto=contexto)
         readiness_pct = readiness_data['score'] * 100
 
         # ── 2. ACWR unificado (gym + hyrox + carrera) ─────────────
@@ -205,9 +207,12 @@ class DailyDecisionEngine:
         try:
             from hyrox.models import HyroxObjective
             from hyrox.training_engine import HyroxLoadManager
-            objetivo = HyroxObjective.objects.filter(
-                cliente=cliente, estado='activo'
-            ).first()
+            if contexto is not None:
+                objetivo = contexto.objetivo_hyrox('activo')
+            else:
+                objetivo = HyroxObjective.objects.filter(
+                    cliente=cliente, estado='activo'
+                ).first()
             if objetivo:
                 carga = HyroxLoadManager.calcular_ctl_atl_tsb(objetivo)
                 tsb = carga.get('tsb')
@@ -245,11 +250,14 @@ class DailyDecisionEngine:
         lesion_zona  = None
         try:
             from hyrox.models import UserInjury
-            lesion = (
-                UserInjury.objects
-                .filter(cliente=cliente, fase__in=('AGUDA', 'SUB_AGUDA'))
-                .first()
-            )
+            if contexto is not None:
+                lesion = next(iter(contexto.lesiones_en_fase('AGUDA', 'SUB_AGUDA')), None)
+            else:
+                lesion = (
+                    UserInjury.objects
+                    .filter(cliente=cliente, fase__in=('AGUDA', 'SUB_AGUDA'))
+                    .first()
+                )
             if lesion:
                 lesion_aguda = True
                 lesion_zona  = getattr(lesion, 'zona_afectada', None)
@@ -31,7 +31,7 @@ from django.utils import timezone
 logger = logging.getLogger(__name__)
 
 
-def resolver_estado_sistema_hoy(usuario, decision_gym=None):
+def resolver_estado_sistema_hoy(usuario, decision_gym=None, contexto=None):
     """
     Determina el estado global del sistema para el usuario HOY.
 
@@ -44,6 +44,9 @@ def resolver_estado_sistema_hoy(usuario, decision_gym=None):
             pasarla aquí evita una segunda query idéntica dentro de
             _check_en_margen y garantiza que ambos leen el mismo dato.
             Si se omite, se calcula internamente como antes.
+        contexto: ContextoCliente opcional (core.context.contexto_cliente) de
+            la request: lesiones y entreno de hoy ya cargados por el
+            dashboard. Si se omite, cada check consulta como antes.
 
     RETORNA:
     {
@@ -63,18 +66,20 @@ def resolver_estado_sistema_hoy(usuario, decision_gym=None):
     4. Si no: SILENCIO (reposo)
     """
     try:
+        extra = {'contexto': contexto} if contexto is not None else {}
+
         # 1. PROTEGIENDO — señales fuertes
-        protegiendo = _check_protegiendo(usuario, decision_gym=decision_gym)
+        protegiendo = _check_protegiendo(usuario, decision_gym=decision_gym, **extra)
         if protegiendo:
             return protegiendo
 
         # 2. EN_MARGEN — acción viable ahora
-        en_margen = _check_en_margen(usuario, decision_gym=decision_gym)
+        en_margen = _check_en_margen(usuario, decision_gym=decision_gym, **extra)
         if en_margen:
             return en_margen
 
         # 3. OBSERVANDO — hay movimiento sin conclusión
-        observando = _check_observando(usuario)
+        observando = _check_observando(usuario, **extra)
         if observando:
             return observando
 
@@ -91,7 +96,7 @@ def resolver_estado_sistema_hoy(usuario, decision_gym=None):
 # 1. PROTEGIENDO — Señales fuertes (cualquiera activa)
 # ────────────────────────────────────────────────────────────────────
 
-def _check_protegiendo(usuario, decision_gym=None):
+def _check_protegiendo(usuario, decision_gym=None, contexto=None):
     """
     Retorna dict PROTEGIENDO si hay alguna señal fuerte, None si no.
 
@@ -149,11 +154,14 @@ def _check_protegiendo(usuario, decision_gym=None):
 
     # Check 2: RPE extremo reciente
     try:
-        from entrenos.models import EntrenoRealizado
-        sesion = EntrenoRealizado.objects.filter(
-            cliente__user=usuario,
-            fecha=timezone.localdate()
-        ).order_by('-id').first()
+        if contexto is not None:
+            sesion = contexto.entreno_hoy
+        else:
+            from entrenos.models import EntrenoRealizado
+            sesion = EntrenoRealizado.objects.filter(
+                cliente__user=usuario,
+                fecha=timezone.localdate()
+            ).order_by('-id').first()
         if (
             decision_gym is None
             and sesion and sesion.sesion_detalle
@@ -175,12 +183,15 @@ def _check_protegiendo(usuario, decision_gym=None):
 
     # Check 3: Lesión AGUDA / SUB_AGUDA
     try:
-        from hyrox.models import UserInjury
-        lesion = UserInjury.objects.filter(
-            cliente__user=usuario,
-            activa=True,
-            fase__in=['AGUDA', 'SUB_AGUDA']
-        ).first()
+        if contexto is not None:
+            lesion = next(iter(contexto.lesiones_en_fase('AGUDA', 'SUB_AGUDA', solo_activas=True)), None)
+        else:
+            from hyrox.models import UserInjury
+            lesion = UserInjury.objects.filter(
+                cliente__user=usuario,
+                activa=True,
+                fase__in=['AGUDA', 'SUB_AGUDA']
+            ).first()
         if lesion and decision_gym is None:
             motivo = 'lesion_activa'
             modulo_principal = 'hyrox'
@@ -218,7 +229,7 @@ def _check_protegiendo(usuario, decision_gym=None):
     # Check 5: JOI Habitación está PROTEGIENDO (validación)
     try:
         from joi.services import determinar_estado_habitacion_joi
-        estado, _ = determinar_estado_habitacion_joi(usuario)
+        estado, _ = determinar_estado_habitacion_joi(usuario, contexto=contexto)
         if estado == 'PROTEGIENDO':
             motivo = 'joi_protegiendo'
             modulo_principal = 'joi'
@@ -239,7 +250,7 @@ def _check_protegiendo(usuario, decision_gym=None):
 # 2. EN_MARGEN — Acción viable AHORA
 # ────────────────────────────────────────────────────────────────────
 
-def _check_en_margen(usuario, decision_gym=None):
+def _check_en_margen(usuario, decision_gym=None, contexto=None):
     """
     Retorna dict EN_MARGEN si hay acción viable ahora, None si no.
 
@@ -259,7 +270,7 @@ def _check_en_margen(usuario, decision_gym=None):
     """
     try:
         # Guard: usuario debe tener cliente_perfil
-        cliente = getattr(usuario, 'cliente_perfil', None)
+        cliente = contexto.cliente if contexto is not None else getattr(usuario, 'cliente_perfil', None)
         if not cliente:
             return None
 
@@ -302,12 +313,16 @@ def _check_en_margen(usuario, decision_gym=None):
 
         # Check 4: ¿Lesión AGUDA/SUB_AGUDA?
         try:
-            from hyrox.models import UserInjury
-            if decision_gym is None and UserInjury.objects.filter(
-                cliente__user=usuario,
-                activa=True,
-                fase__in=['AGUDA', 'SUB_AGUDA']
-            ).exists():
+            if contexto is not None:
+                hay_lesion = bool(contexto.lesiones_en_fase('AGUDA', 'SUB_AGUDA', solo_activas=True))
+            else:
+                from hyrox.models import UserInjury
+                hay_lesion = UserInjury.objects.filter(
+                    cliente__user=usuario,
+                    activa=True,
+                    fase__in=['AGUDA', 'SUB_AGUDA']
+                ).exists()
+            if decision_gym is None and hay_lesion:
                 return None
         except Exception:
             pass
@@ -319,10 +334,13 @@ def _check_en_margen(usuario, decision_gym=None):
         # sesion_detalle es el related_name inverso de SesionEntrenamiento
         # (OneToOne), no un JSONField: se lee por atributo, no por .get().
         from entrenos.models import EntrenoRealizado
-        sesion = EntrenoRealizado.objects.filter(
-            cliente__user=usuario,
-            fecha=timezone.localdate()
-        ).order_by('-id').first()
+        if contexto is not None:
+            sesion = contexto.entreno_hoy
+        else:
+            sesion = EntrenoRealizado.objects.filter(
+                cliente__user=usuario,
+                fecha=timezone.localdate()
+            ).order_by('-id').first()
         sesion_detalle = getattr(sesion, 'sesion_detalle', None) if sesion else None
         if sesion_detalle and (sesion_detalle.rpe_medio or 0) >= 9:
             return None
@@ -407,7 +425,7 @@ def _check_en_margen(usuario, decision_gym=None):
 # 3. OBSERVANDO — Hay movimiento, no conclusión
 # ────────────────────────────────────────────────────────────────────
 
-def _check_observando(usuario):
+def _check_observando(usuario, contexto=None):
     """
     Retorna dict OBSERVANDO si hay movimiento sin conclusión, None si no.
 
@@ -418,7 +436,7 @@ def _check_observando(usuario):
     try:
         # Check 1: ¿JOI Habitación está OBSERVANDO?
         from joi.services import determinar_estado_habitacion_joi
-        estado, motivo = determinar_estado_habitacion_joi(usuario)
+        estado, motivo = determinar_estado_habitacion_joi(usuario, contexto=contexto)
         if estado == 'OBSERVANDO':
             return _estado_dict(
                 'OBSERVANDO',
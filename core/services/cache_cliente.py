@@ -0,0 +1,166 @@
+"""Caché de bloques derivados por cliente con invalidación por versión.
+
+Los bloques del dashboard (`dashboard_*`, `ctx_*` de `clientes.views`) y
+el contexto biomédico (`bio_ctx`) se cacheaban con claves fijas y se
+invalidaban borrando clave a clave en cada sitio que guardaba algo — cada
+uno con su propia lista, siempre incompleta. Aquí cada bloque se guarda
+junto a la versión del cliente vigente al leerlo (`(version, valor)`) y
+solo vale mientras esa versión siga siendo la actual:
+`invalidar_cliente()` borra la versión y la siguiente lectura crea otra,
+dejando huérfanos a la vez todos los bloques derivados.
+
+`obtener()` lee versión y bloque en un solo `get_many`, y `guardar()`
+reutiliza la versión que vio la lectura fallida justo anterior del mismo
+hilo (si no, la vuelve a leer): un bloque
+calculado mientras otro proceso invalidaba queda marcado con la versión
+vieja y no se sirve.
+
+Con `CACHE_BACKEND=redis` (settings) la versión y los bloques viven en el
+Redis compartido, así que una invalidación en un worker la ven todos. Con
+LocMemCache sigue funcionando, pero por proceso.
+
+Si `settings.CACHE_CLIENTE_CONTADORES` está activo (por defecto no), cada
+lectura suma un hit o un miss a la familia (`estadisticas()`, comando
+`estadisticas_cache`) para ajustar los TTL con datos.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+_CLAVE_VERSION = 'cache_cliente_version_{}'
+_CLAVE_CONTADOR = 'cache_stats_{}_{}'
+# Registro de familias sin leer-modificar-escribir un conjunto compartido:
+# add() marca la familia una sola vez e incr() le da un hueco en el índice.
+_CLAVE_REGISTRADA = 'cache_stats_registrada_{}'
+_CLAVE_NUM_FAMILIAS = 'cache_stats_num_familias'
+_CLAVE_FAMILIA = 'cache_stats_familia_{}'
+
+# Centinela para distinguir "no cacheado" de un valor None cacheado
+FALTA = object()
+
+# (clave, versión) de la última lectura fallida del hilo, para su guardar()
+_ultimo_fallo = threading.local()
+
+
+def _nueva_version():
+    # Hora en ns (no un contador desde 1): si el backend expulsa la clave de
+    # versión, la nueva no puede coincidir con una anterior y resucitar
+    # bloques obsoletos.
+    return time.time_ns()
+
+
+def _crear_version(clave_version):
+    nueva = _nueva_version()
+    if cache.add(clave_version, nueva, None):
+        return nueva
+    return cache.get(clave_version) or 0
+
+
+def version(cliente_id):
+    """Versión actual de las claves del cliente (la crea si no existe)."""
+    clave_version = _CLAVE_VERSION.format(cliente_id)
+    actual = cache.get(clave_version)
+    return _crear_version(clave_version) if actual is None else actual
+
+
+def _clave(familia, cliente_id, partes):
+    return f'{familia}_{cliente_id}' + ''.join(f'_{p}' for p in partes)
+
+
+def invalidar_cliente(cliente_id):
+    """Invalida de una vez todos los bloques cacheados del cliente."""
+    # Borrar (no escribir): la próxima lectura crea una nueva con add(),
+    # y un guardado sin lectores posteriores no escribe nada en la caché.
+    cache.delete(_CLAVE_VERSION.format(cliente_id))
+
+
+def _registrar_familia(familia):
+    if not cache.add(_CLAVE_REGISTRADA.format(familia), True, None):
+        return
+    cache.add(_CLAVE_NUM_FAMILIAS, 0, None)
+    cache.set(_CLAVE_FAMILIA.format(cache.incr(_CLAVE_NUM_FAMILIAS)), familia, None)
+
+
+def _contar(familia, resultado):
+    if not getattr(settings, 'CACHE_CLIENTE_CONTADORES', False):
+        return
+    contador = _CLAVE_CONTADOR.format(familia, resultado)
+    try:
+        cache.incr(contador)
+    except ValueError:
+        # Primer acceso de la familia en esta caché: registrarla
+        _registrar_familia(familia)
+        cache.add(contador, 0, None)
+        try:
+            cache.incr(contador)
+        except ValueError:
+            pass
+
+
+def obtener(familia, cliente_id, *partes, default=None):
+    """Valor cacheado del bloque o `default` si no está (cuenta hit/miss)."""
+    clave_version = _CLAVE_VERSION.format(cliente_id)
+    clave = _clave(familia, cliente_id, partes)
+    valores = cache.get_many([clave_version, clave])
+    actual = valores.get(clave_version)
+    guardado = valores.get(clave)
+    if actual is not None and guardado is not None and guardado[0] == actual:
+        _ultimo_fallo.clave = None
+        _contar(familia, 'hit')
+        return guardado[1]
+
+    if actual is None:
+        actual = _crear_version(clave_version)
+    _ultimo_fallo.clave, _ultimo_fallo.version = clave, actual
+    _contar(familia, 'miss')
+    return default
+
+
+def guardar(familia, cliente_id, valor, timeout, *partes):
+    """Guarda el bloque bajo la versión vista al leerlo (o la actual)."""
+    clave = _clave(familia, cliente_id, partes)
+    if getattr(_ultimo_fallo, 'clave', None) == clave:
+        _ultimo_fallo.clave = None
+        vista = _ultimo_fallo.version
+    else:
+        vista = version(cliente_id)
+    cache.set(clave, (vista, valor), timeout)
+
+
+def _familias():
+    total = cache.get(_CLAVE_NUM_FAMILIAS) or 0
+    indice = [_CLAVE_FAMILIA.format(n) for n in range(1, total + 1)]
+    return indice, list(cache.get_many(indice).values())
+
+
+def estadisticas():
+    """{familia: {'hit', 'miss', 'ratio'}} de todas las familias registradas."""
+    familias = sorted(_familias()[1])
+    claves = [
+        _CLAVE_CONTADOR.format(f, r) for f in familias for r in ('hit', 'miss')
+    ]
+    valores = cache.get_many(claves)
+    resultado = {}
+    for familia in familias:
+        hits = valores.get(_CLAVE_CONTADOR.format(familia, 'hit'), 0)
+        misses = valores.get(_CLAVE_CONTADOR.format(familia, 'miss'), 0)
+        total = hits + misses
+        resultado[familia] = {
+            'hit': hits,
+            'miss': misses,
+            'ratio': round(hits / total, 3) if total else None,
+        }
+    return resultado
+
+
+def reiniciar_estadisticas():
+    """Pone a cero los contadores de todas las familias registradas."""
+    indice, familias = _familias()
+    cache.delete_many(
+        [_CLAVE_CONTADOR.format(f, r) for f in familias for r in ('hit', 'miss')]
+        + [_CLAVE_REGISTRADA.format(f) for f in familias]
+        + indice + [_CLAVE_NUM_FAMILIAS]
+    )
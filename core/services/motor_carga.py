@@ -0,0 +1,218 @@
+"""Motor de carga de entrenamiento compartido (NumPy).
+
+Única implementación de la matemática de carga que antes vivía repetida en
+`analytics.views` (dos ACWR con pandas), `EstadisticasService` y
+`HyroxLoadManager`:
+
+- serie diaria densa de carga a partir de filas (fecha, carga) o
+  (cliente_id, fecha, carga) de una sola consulta `values_list()`;
+- medias móviles agudas/crónicas, EWMA CTL/ATL, monotonía y strain.
+
+Todas las funciones trabajan sobre el último eje, así que aceptan una serie
+(1D) o una matriz clientes × días (2D) sin cambios. No consulta la base de
+datos ni persiste nada.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+try:
+    from scipy.signal import lfilter
+except ImportError:  # scipy es opcional: fallback escalar
+    lfilter = None
+
+
+K_CTL = 1 / 42.0
+K_ATL = 1 / 7.0
+
+UMBRAL_OPTIMA = (0.8, 1.3)
+UMBRAL_RIESGO_ALTO = 1.5
+
+
+def rango_fechas(desde, hasta):
+    """Lista de fechas consecutivas [desde, hasta]."""
+    return [desde + timedelta(days=i) for i in range((hasta - desde).days + 1)]
+
+
+def serie_diaria(filas, desde, hasta):
+    """
+    Suma las cargas de `filas` (fecha, carga) en un array denso por día.
+    Las filas fuera de [desde, hasta] se ignoran.
+    """
+    n = (hasta - desde).days + 1
+    serie = np.zeros(max(n, 0), dtype=float)
+    if n <= 0:
+        return serie
+    offsets, cargas = [], []
+    for fecha, carga in filas:
+        if carga is None:
+            continue
+        i = (fecha - desde).days
+        if 0 <= i < n:
+            offsets.append(i)
+            cargas.append(float(carga))
+    if offsets:
+        np.add.at(serie, np.asarray(offsets), np.asarray(cargas))
+    return serie
+
+
+def series_por_cliente(filas, cliente_ids, desde, hasta):
+    """
+    Igual que `serie_diaria` para varios clientes a la vez: `filas` son
+    (cliente_id, fecha, carga) y el resultado es una matriz
+    len(cliente_ids) × días en el orden de `cliente_ids`.
+    """
+    posicion = {cid: i for i, cid in enumerate(cliente_ids)}
+    n = (hasta - desde).days + 1
+    matriz = np.zeros((len(posicion), max(n, 0)), dtype=float)
+    filas_idx, cols_idx, cargas = [], [], []
+    for cliente_id, fecha, carga in filas:
+        fila = posicion.get(cliente_id)
+        if fila is None or carga is None:
+            continue
+        j = (fecha - desde).days
+        if 0 <= j < n:
+            filas_idx.append(fila)
+            cols_idx.append(j)
+            cargas.append(float(carga))
+    if cargas:
+        np.add.at(matriz, (np.asarray(filas_idx), np.asarray(cols_idx)), np.asarray(cargas))
+    return matriz
+
+
+def media_movil(cargas, ventana):
+    """
+    Media móvil de `ventana` días con min_periods=1 (equivale a
+    `pandas.Series.rolling(ventana, min_periods=1).mean()`).
+    """
+    cargas = np.asarray(cargas, dtype=float)
+    acumulado = np.cumsum(cargas, axis=-1)
+    desplazado = np.zeros_like(acumulado)
+    if cargas.shape[-1] > ventana:
+        desplazado[..., ventana:] = acumulado[..., :-ventana]
+    cuenta = np.minimum(np.arange(1, cargas.shape[-1] + 1), ventana)
+    return (acumulado - desplazado) / cuenta
+
+
+def _ventanas(cargas, ventana):
+    """Vista (…, n - ventana + 1, ventana) de ventanas completas."""
+    return np.lib.stride_tricks.sliding_window_view(cargas, ventana, axis=-1)
+
+
+def desviacion_movil(cargas, ventana):
+    """
+    Desviación típica muestral (ddof=1) en ventanas completas; NaN en los
+    primeros `ventana - 1` días, como `rolling(ventana).std()`.
+    """
+    cargas = np.asarray(cargas, dtype=float)
+    salida = np.full(cargas.shape, np.nan)
+    if cargas.shape[-1] >= ventana:
+        salida[..., ventana - 1:] = _ventanas(cargas, ventana).std(axis=-1, ddof=1)
+    return salida
+
+
+def suma_movil(cargas, ventana):
+    """Suma en ventanas completas; NaN en los primeros `ventana - 1` días."""
+    cargas = np.asarray(cargas, dtype=float)
+    salida = np.full(cargas.shape, np.nan)
+    if cargas.shape[-1] >= ventana:
+        salida[..., ventana - 1:] = _ventanas(cargas, ventana).sum(axis=-1)
+    return salida
+
+
+def ewma(cargas, k, inicial=0.0):
+    """
+    EWMA de Banister: x_t = x_{t-1} + (carga_t - x_{t-1}) · k, arrancando en
+    `inicial`. Devuelve el valor tras cada día.
+    """
+    cargas = np.asarray(cargas, dtype=float)
+    if cargas.shape[-1] == 0:
+        return cargas.copy()
+    if lfilter is not None:
+        inicial = np.broadcast_to(np.asarray(inicial, dtype=float), cargas.shape[:-1])
+        zi = (inicial * (1 - k))[..., np.newaxis]
+        salida, _ = lfilter([k], [1.0, -(1 - k)], cargas, axis=-1, zi=zi)
+        return salida
+    salida = np.empty_like(cargas)
+    valor = np.array(inicial, dtype=float)
+    for t in range(cargas.shape[-1]):
+        valor = valor + (cargas[..., t] - valor) * k
+        salida[..., t] = valor
+    return salida
+
+
+def ctl_atl_tsb(cargas, ctl_inicial=0.0, atl_inicial=0.0):
+    """Series CTL (42 d), ATL (7 d) y TSB = CTL − ATL."""
+    ctl = ewma(cargas, K_CTL, ctl_inicial)
+    atl = ewma(cargas, K_ATL, atl_inicial)
+    return ctl, atl, ctl - atl
+
+
+def ratio(agudo, cronico):
+    """Agudo / crónico con 0 donde el crónico es 0 (sin inf ni NaN)."""
+    agudo = np.asarray(agudo, dtype=float)
+    cronico = np.asarray(cronico, dtype=float)
+    salida = np.zeros(np.broadcast(agudo, cronico).shape)
+    np.divide(agudo, cronico, out=salida, where=cronico > 0)
+    return salida
+
+
+def acwr_rolling(cargas, agudo=7, cronico=28):
+    """Medias móviles aguda/crónica y su ratio por día."""
+    carga_aguda = media_movil(cargas, agudo)
+    carga_cronica = media_movil(cargas, cronico)
+    return carga_aguda, carga_cronica, ratio(carga_aguda, carga_cronica)
+
+
+def monotonia_strain(cargas, ventana=7):
+    """
+    Monotonía de Foster (media / desviación de los últimos `ventana` días)
+    y strain (carga de la ventana × monotonía). Monotonía 0 si la
+    desviación es 0 o no hay días suficientes.
+    """
+    cargas = np.asarray(cargas, dtype=float)
+    if cargas.shape[-1] < ventana:
+        return 0.0, 0.0
+    ultimos = cargas[..., -ventana:]
+    media = ultimos.mean(axis=-1)
+    desviacion = ultimos.std(axis=-1, ddof=1)
+    monotonia = ratio(media, desviacion)
+    return monotonia, ultimos.sum(axis=-1) * monotonia
+
+
+def strain_movil(cargas, ventana=7):
+    """Strain diario en ventanas completas (desviación 0 se trata como 1)."""
+    desviacion = desviacion_movil(cargas, ventana)
+    desviacion = np.where(desviacion == 0, 1.0, desviacion)
+    suma = suma_movil(cargas, ventana)
+    return suma * ((suma / ventana) / desviacion)
+
+
+def zona_riesgo(acwr):
+    """Zona de riesgo canónica para un ACWR (misma escala en toda la app)."""
+    if UMBRAL_OPTIMA[0] <= acwr <= UMBRAL_OPTIMA[1]:
+        return 'optima'
+    if UMBRAL_OPTIMA[1] < acwr < UMBRAL_RIESGO_ALTO:
+        return 'cuidado'
+    if acwr >= UMBRAL_RIESGO_ALTO:
+        return 'riesgo_alto'
+    return 'baja_carga'
+
+
+def registros(fechas, **columnas):
+    """
+    Convierte columnas alineadas con `fechas` en la lista de dicts que
+    consumen las plantillas y gráficos ({'fecha': 'YYYY-MM-DD', ...}).
+    NaN/inf pasan a None para que la salida sea serializable en JSON.
+    """
+    nombres = list(columnas)
+    valores = [np.asarray(columnas[n], dtype=float) for n in nombres]
+    salida = []
+    for i, fecha in enumerate(fechas):
+        fila = {'fecha': fecha.isoformat()}
+        for nombre, serie in zip(nombres, valores):
+            v = float(serie[i])
+            fila[nombre] = v if np.isfinite(v) else None
+        salida.append(fila)
+    return salida
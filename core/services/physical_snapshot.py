@@ -37,12 +37,20 @@ def _missing_signal(source):
     }
 
 
-def _checkin_signal(cliente, as_of_date):
-    record = (
-        BitacoraDiaria.objects.filter(cliente=cliente, fecha__lte=as_of_date)
-        .order_by("-fecha", "-pk")
-        .first()
-    )
+def _checkin_signal(cliente, as_of_date, contexto=None):
+    record = None
+    if contexto is not None and as_of_date == contexto.hoy:
+        # Una bitácora por (cliente, fecha): la más reciente de la ventana
+        # cargada es la misma que devolvería la query.
+        record = contexto.bitacora_mas_reciente(
+            as_of_date - timedelta(days=CHECKIN_FRESH_DAYS + 1), as_of_date,
+        )
+    if record is None:
+        record = (
+            BitacoraDiaria.objects.filter(cliente=cliente, fecha__lte=as_of_date)
+            .order_by("-fecha", "-pk")
+            .first()
+        )
     if record is None:
         return _missing_signal("clientes.BitacoraDiaria")
 
@@ -66,19 +74,29 @@ def _checkin_signal(cliente, as_of_date):
     }
 
 
-def _readiness_signal(cliente, as_of_date):
+def _readiness_signal(cliente, as_of_date, contexto=None):
     # Un objetivo cancelado/completado o un evento ya pasado no es aplicable a
     # la lectura física del día. El orden hace determinista el caso legado de
     # varios objetivos activos.
-    objective = (
-        HyroxObjective.objects.filter(
-            cliente=cliente,
-            estado="activo",
-            fecha_evento__gte=as_of_date,
+    if contexto is not None:
+        objective = min(
+            (
+                o for o in contexto.objetivos_hyrox
+                if o.estado == "activo" and o.fecha_evento >= as_of_date
+            ),
+            key=lambda o: (o.fecha_evento, o.pk),
+            default=None,
+        )
+    else:
+        objective = (
+            HyroxObjective.objects.filter(
+                cliente=cliente,
+                estado="activo",
+                fecha_evento__gte=as_of_date,
+            )
+            .order_by("fecha_evento", "pk")
+            .first()
         )
-        .order_by("fecha_evento", "pk")
-        .first()
-    )
     if objective is None:
         result = _missing_signal("hyrox.HyroxReadinessLog")
         result["objective_id"] = None
@@ -113,18 +131,32 @@ def _readiness_signal(cliente, as_of_date):
     }
 
 
-def _active_injuries_signal(cliente, as_of_date):
-    injuries = (
-        UserInjury.objects.filter(
-            cliente=cliente,
-            activa=True,
-            fecha_inicio__lte=as_of_date,
+def _active_injuries_signal(cliente, as_of_date, contexto=None):
+    if contexto is not None:
+        # contexto.lesiones incluye todas las activas: mismo filtro en Python.
+        injuries = sorted(
+            (
+                injury for injury in contexto.lesiones
+                if injury.activa
+                and injury.fecha_inicio <= as_of_date
+                and injury.fase != UserInjury.Fase.RECUPERADO
+                and (injury.fecha_resolucion is None or injury.fecha_resolucion > as_of_date)
+            ),
+            key=lambda injury: (injury.fecha_inicio, injury.pk),
+            reverse=True,
+        )
+    else:
+        injuries = (
+            UserInjury.objects.filter(
+                cliente=cliente,
+                activa=True,
+                fecha_inicio__lte=as_of_date,
+            )
+            .exclude(fase=UserInjury.Fase.RECUPERADO)
+            .filter(Q(fecha_resolucion__isnull=True) | Q(fecha_resolucion__gt=as_of_date))
+            # Equivale al `.first()` legacy de UserInjury (Meta: fecha más reciente).
+            .order_by("-fecha_inicio", "-pk")
         )
-        .exclude(fase=UserInjury.Fase.RECUPERADO)
-        .filter(Q(fecha_resolucion__isnull=True) | Q(fecha_resolucion__gt=as_of_date))
-        # Equivale al `.first()` legacy de UserInjury (Meta: fecha más reciente).
-        .order_by("-fecha_inicio", "-pk")
-    )
     items = [
         {
             "id": injury.pk,
@@ -319,17 +351,22 @@ def _fingerprint(payload):
     return hashlib.sha256(canonical).hexdigest()
 
 
-def build_physical_snapshot(cliente, as_of_date):
-    """Construye un snapshot V1 determinista de hechos físicos conocidos."""
+def build_physical_snapshot(cliente, as_of_date, contexto=None):
+    """
+    Construye un snapshot V1 determinista de hechos físicos conocidos.
+
+    Con `contexto` (ContextoCliente de la request) check-in, objetivo y
+    lesiones salen de los hechos ya cargados; el resultado es el mismo.
+    """
     payload = {
         "schema_version": SCHEMA_VERSION,
         "cliente_id": cliente.pk,
         "as_of_date": as_of_date.isoformat(),
         "capabilities": sorted(set(CAPABILITIES)),
         "signals": {
-            "checkin": _checkin_signal(cliente, as_of_date),
-            "hyrox_readiness": _readiness_signal(cliente, as_of_date),
-            "active_injuries": _active_injuries_signal(cliente, as_of_date),
+            "checkin": _checkin_signal(cliente, as_of_date, contexto),
+            "hyrox_readiness": _readiness_signal(cliente, as_of_date, contexto),
+            "active_injuries": _active_injuries_signal(cliente, as_of_date, contexto),
             "active_rehab": _active_rehab_signal(cliente, as_of_date),
             "recent_activity": _recent_activity_signal(cliente, as_of_date),
         },
@@ -0,0 +1,97 @@
+"""
+Caché por cliente versionada: una invalidación descarta todos los bloques
+derivados del cliente, y cada familia lleva sus contadores hit/miss.
+"""
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from clientes.models import Cliente
+from clientes.views import _cache_ctx
+from core.services import cache_cliente
+
+
+@override_settings(CACHE_CLIENTE_CONTADORES=True)
+class CacheClienteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.cliente = Cliente.objects.get(user=User.objects.create_user('cache_cliente_user'))
+        self.otro = Cliente.objects.get(user=User.objects.create_user('cache_cliente_otro'))
+
+    def test_invalidar_cliente_descarta_todas_sus_familias_y_no_las_de_otros(self):
+        cache_cliente.guardar('dashboard_gamif', self.cliente.id, 'gamif', 60)
+        cache_cliente.guardar('bio_ctx', self.cliente.id, {'bio_banner': {}}, 60)
+        cache_cliente.guardar('dashboard_gamif', self.otro.id, 'gamif otro', 60)
+
+        cache_cliente.invalidar_cliente(self.cliente.id)
+
+        self.assertIsNone(cache_cliente.obtener('dashboard_gamif', self.cliente.id))
+        self.assertIsNone(cache_cliente.obtener('bio_ctx', self.cliente.id))
+        self.assertEqual(cache_cliente.obtener('dashboard_gamif', self.otro.id), 'gamif otro')
+
+    def test_version_expulsada_no_resucita_bloques_antiguos(self):
+        cache_cliente.guardar('dashboard_stats', self.cliente.id, 'viejo', 60)
+        cache_cliente.invalidar_cliente(self.cliente.id)
+        cache.delete(f'cache_cliente_version_{self.cliente.id}')
+
+        self.assertIsNone(cache_cliente.obtener('dashboard_stats', self.cliente.id))
+
+    @override_settings(CACHE_CLIENTE_CONTADORES=False)
+    def test_lectura_y_escritura_sin_viaje_extra_por_la_version(self):
+        cache_cliente.obtener('bio_ctx', self.cliente.id)
+        cache_cliente.guardar('dashboard_stats', self.cliente.id, 'stats', 60)
+
+        with mock.patch.object(cache_cliente, 'cache', mock.Mock(wraps=caches['default'])) as espia:
+            self.assertEqual(cache_cliente.obtener('dashboard_stats', self.cliente.id), 'stats')
+            self.assertIsNone(cache_cliente.obtener('dashboard_peso', self.cliente.id))
+            cache_cliente.guardar('dashboard_peso', self.cliente.id, 'peso', 60)
+
+        self.assertEqual([c[0] for c in espia.method_calls], ['get_many', 'get_many', 'set'])
+
+    def test_bloque_calculado_durante_una_invalidacion_no_se_sirve(self):
+        self.assertIsNone(cache_cliente.obtener('dashboard_stats', self.cliente.id))
+        cache_cliente.invalidar_cliente(self.cliente.id)
+        cache_cliente.guardar('dashboard_stats', self.cliente.id, 'calculado antes', 60)
+
+        self.assertIsNone(cache_cliente.obtener('dashboard_stats', self.cliente.id))
+
+    def test_cache_ctx_se_invalida_con_el_cliente(self):
+        llamadas = []
+
+        @_cache_ctx()
+        def _fn(cliente, fecha_ref):
+            llamadas.append(1)
+            return None
+
+        _fn(self.cliente, date(2026, 7, 18))
+        _fn(self.cliente, date(2026, 7, 18))
+        cache_cliente.invalidar_cliente(self.cliente.id)
+        _fn(self.cliente, date(2026, 7, 18))
+        self.assertEqual(len(llamadas), 2)
+
+    def test_contadores_hit_miss_por_familia(self):
+        cache_cliente.obtener('dashboard_peso', self.cliente.id)
+        cache_cliente.guardar('dashboard_peso', self.cliente.id, (80, [], []), 60)
+        cache_cliente.obtener('dashboard_peso', self.cliente.id)
+        cache_cliente.obtener('dashboard_peso', self.cliente.id)
+        cache_cliente.obtener('bio_ctx', self.cliente.id)
+
+        estadisticas = cache_cliente.estadisticas()
+        self.assertEqual(estadisticas['dashboard_peso'], {'hit': 2, 'miss': 1, 'ratio': 0.667})
+        self.assertEqual(estadisticas['bio_ctx'], {'hit': 0, 'miss': 1, 'ratio': 0.0})
+
+        out = StringIO()
+        call_command('estadisticas_cache', '--reiniciar', stdout=out)
+        self.assertIn('Familias: 2 | Lecturas: 4', out.getvalue())
+        self.assertEqual(cache_cliente.estadisticas(), {})
+
+    @override_settings(CACHE_CLIENTE_CONTADORES=False)
+    def test_sin_contadores_no_escribe_estadisticas(self):
+        cache_cliente.obtener('dashboard_peso', self.cliente.id)
+        self.assertEqual(cache_cliente.estadisticas(), {})
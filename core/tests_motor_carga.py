@@ -0,0 +1,159 @@
+"""
+Motor de carga compartido: equivalencia con las implementaciones escalares
+que sustituye y coste en consultas de los adaptadores.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from clientes.models import Cliente
+from core.services import motor_carga
+from entrenos.models import ActividadRealizada, EntrenoRealizado
+from rutinas.models import Rutina
+
+
+def _ewma_escalar(cargas, k):
+    valor, salida = 0.0, []
+    for c in cargas:
+        valor = valor + (c - valor) * k
+        salida.append(valor)
+    return salida
+
+
+def _media_movil_escalar(cargas, ventana):
+    return [
+        sum(cargas[max(0, i - ventana + 1):i + 1]) / min(i + 1, ventana)
+        for i in range(len(cargas))
+    ]
+
+
+class MotorCargaSeriesTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.cargas = np.where(rng.random(200) < 0.5, rng.uniform(20, 90, 200), 0.0)
+
+    def test_ewma_coincide_con_recursion_de_banister(self):
+        ctl, atl, tsb = motor_carga.ctl_atl_tsb(self.cargas)
+        np.testing.assert_allclose(ctl, _ewma_escalar(self.cargas, 1 / 42.0), rtol=1e-9)
+        np.testing.assert_allclose(atl, _ewma_escalar(self.cargas, 1 / 7.0), rtol=1e-9)
+        np.testing.assert_allclose(tsb, ctl - atl)
+
+    def test_ewma_con_estado_inicial_continua_la_serie(self):
+        completa = motor_carga.ewma(self.cargas, 1 / 7.0)
+        mitad = motor_carga.ewma(self.cargas[100:], 1 / 7.0, inicial=completa[99])
+        np.testing.assert_allclose(mitad, completa[100:], rtol=1e-9)
+
+    def test_media_movil_min_periods_uno(self):
+        for ventana in (7, 28):
+            np.testing.assert_allclose(
+                motor_carga.media_movil(self.cargas, ventana),
+                _media_movil_escalar(list(self.cargas), ventana),
+                rtol=1e-9, atol=1e-9,
+            )
+
+    def test_matriz_de_clientes_equivale_a_series_individuales(self):
+        desde = date(2026, 1, 1)
+        filas = [
+            (1, desde + timedelta(days=3), 100),
+            (2, desde + timedelta(days=3), 40),
+            (1, desde + timedelta(days=3), 50),
+            (2, desde + timedelta(days=9), 70),
+            (3, desde + timedelta(days=40), 10),  # fuera de rango
+        ]
+        hasta = desde + timedelta(days=20)
+        matriz = motor_carga.series_por_cliente(filas, [1, 2], desde, hasta)
+        self.assertEqual(matriz.shape, (2, 21))
+        self.assertEqual(matriz[0, 3], 150)
+        np.testing.assert_array_equal(
+            matriz[1],
+            motor_carga.serie_diaria([(f, c) for cid, f, c in filas if cid == 2], desde, hasta),
+        )
+        ctl_matriz, _, _ = motor_carga.ctl_atl_tsb(matriz)
+        ctl_uno, _, _ = motor_carga.ctl_atl_tsb(matriz[1])
+        np.testing.assert_allclose(ctl_matriz[1], ctl_uno)
+
+    def test_monotonia_y_ratio_sin_divisiones_por_cero(self):
+        monotonia, strain = motor_carga.monotonia_strain(np.full(10, 30.0))
+        self.assertEqual(monotonia, 0)
+        self.assertEqual(strain, 0)
+        np.testing.assert_array_equal(motor_carga.ratio([1.0, 2.0], [0.0, 4.0]), [0.0, 0.5])
+
+
+class AdaptadoresMotorCargaTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('motor_carga_user')
+        self.cliente = Cliente.objects.get(user=user)
+        self.hoy = timezone.now().date()
+
+    def test_fatiga_usa_una_sola_consulta(self):
+        from analytics.views import AnalizadorCargaYFatiga
+
+        rutina = Rutina.objects.create(nombre='Motor carga')
+        for d in range(0, 60, 3):
+            EntrenoRealizado.objects.create(
+                cliente=self.cliente,
+                rutina=rutina,
+                fecha=self.hoy - timedelta(days=d),
+                volumen_total_kg=4000 + d * 10,
+                duracion_minutos=60,
+            )
+        analizador = AnalizadorCargaYFatiga(self.cliente)
+        with self.assertNumQueries(1):
+            resultado = analizador.analizar_acwr()
+
+        self.assertEqual(len(resultado['dataframe_json']), 91)
+        self.assertGreater(resultado['acwr_actual'], 0)
+        self.assertIn(resultado['zona_riesgo'], {'optima', 'cuidado', 'riesgo_alto', 'baja_carga'})
+        self.assertIsNone(resultado['dataframe_json'][0]['rolling_strain'])
+
+        fila = resultado['dataframe_json'][6]
+        semana = [r['carga_diaria'] for r in resultado['dataframe_json'][:7]]
+        self.assertAlmostEqual(fila['rolling_load'], sum(semana), places=4)
+        self.assertAlmostEqual(fila['rolling_mean'], sum(semana) / 7, places=4)
+        self.assertAlmostEqual(fila['rolling_std'], float(np.std(semana, ddof=1)), places=4)
+        self.assertIsNone(resultado['dataframe_json'][5]['rolling_std'])
+
+    def test_acwr_unificado_coincide_con_hyrox_load_manager(self):
+        from entrenos.services.services import EstadisticasService
+        from hyrox.models import HyroxObjective
+        from hyrox.training_engine import HyroxLoadManager
+
+        for d in range(0, 80, 2):
+            ActividadRealizada.objects.create(
+                cliente=self.cliente, fecha=self.hoy - timedelta(days=d),
+                tipo='gym', carga_ua=300 + (d % 7) * 20,
+            )
+        objetivo = HyroxObjective.objects.create(
+            cliente=self.cliente, fecha_evento=self.hoy + timedelta(days=60),
+        )
+
+        unificado = EstadisticasService._analizar_acwr_unificado_calc(self.cliente)
+        self.assertAlmostEqual(unificado['acwr_actual'], HyroxLoadManager.get_acwr(objetivo), delta=0.01)
+        self.assertEqual(len(unificado['dataframe']), 57)
+
+    def test_acwr_unificado_lee_el_libro_diario_con_consultas_acotadas(self):
+        from entrenos.models import CargaDiariaCliente
+        from entrenos.services.services import EstadisticasService
+
+        for d in range(0, 400, 2):
+            ActividadRealizada.objects.create(
+                cliente=self.cliente, fecha=self.hoy - timedelta(days=d + 3),
+                tipo='gym' if d % 4 else 'hyrox', carga_ua=250 + (d % 9) * 15,
+            )
+        self.assertTrue(CargaDiariaCliente.objects.filter(cliente=self.cliente).exists())
+
+        # primera fecha del libro + ventana CTL/ATL + desglose de 7 días
+        with self.assertNumQueries(3):
+            libro = EstadisticasService._analizar_acwr_unificado_calc(self.cliente)
+        historial = EstadisticasService._acwr_unificado_desde_historial(
+            self.cliente, 90, self.hoy
+        )
+
+        self.assertEqual(len(libro['dataframe']), 57)
+        self.assertEqual(libro['dataframe'], historial['dataframe'])
+        for clave in ('acwr_actual', 'carga_aguda', 'carga_cronica', 'desglose_tipos',
+                      'dias_descanso', 'zona_riesgo'):
+            self.assertEqual(libro[clave], historial[clave], clave)
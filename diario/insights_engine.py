@@ -91,7 +91,7 @@ def _nota_semana_actual(valor_m11):
     return None
 
 
-def lectura_principal_cultivo(gesto, fecha_referencia):
+def lectura_principal_cultivo(gesto, fecha_referencia, observaciones=None):
     """
     Fase 5C: la única lectura visible por hábito tipo='cultivo'. Elige
     la métrica según cadencia, nunca mezcla más de una en el mismo
@@ -100,14 +100,17 @@ def lectura_principal_cultivo(gesto, fecha_referencia):
     distinta de 'diaria' habla de racha; nunca se interpreta una
     comparación de dos ventanas como mejora/empeoramiento; nunca se
     infiere causa.
+
+    observaciones: az.ObservacionesUsuario compartido entre los gestos de
+    una misma página (opcional, mismo resultado).
     """
     ventana_desde = fecha_referencia - timedelta(days=13)
 
     if gesto.tipo_cadencia == Gesto.CADENCIA_LIBRE:
-        densidad = az.densidad_sobre_dias_observados_activos(gesto, ventana_desde, fecha_referencia)
+        densidad = az.densidad_sobre_dias_observados_activos(gesto, ventana_desde, fecha_referencia, observaciones)
         if densidad['confianza'] == 'insuficiente' or densidad['valor'] is None:
             return _lectura_insuficiente()
-        apariciones = az.apariciones(gesto, ventana_desde, fecha_referencia)
+        apariciones = az.apariciones(gesto, ventana_desde, fecha_referencia, observaciones)
         porcentaje = round(densidad['valor'] * 100)
         texto = (
             f'Apareció {apariciones["valor"]} veces en los últimos 14 días observados '
@@ -119,11 +122,11 @@ def lectura_principal_cultivo(gesto, fecha_referencia):
         )
 
     if gesto.tipo_cadencia in (Gesto.CADENCIA_DIARIA, Gesto.CADENCIA_DIAS_CONCRETOS):
-        resultado = az.adherencia(gesto, fecha_referencia)
+        resultado = az.adherencia(gesto, fecha_referencia, observaciones)
         if resultado['confianza'] == 'insuficiente' or resultado['valor'] is None:
             return _lectura_insuficiente()
-        m8 = az.oportunidades_previstas(gesto, fecha_referencia)
-        m9 = az.oportunidades_cumplidas(gesto, fecha_referencia)
+        m8 = az.oportunidades_previstas(gesto, fecha_referencia, observaciones)
+        m9 = az.oportunidades_cumplidas(gesto, fecha_referencia, observaciones)
         porcentaje = round(resultado['valor'] * 100)
         texto = (
             f'Adherencia del {porcentaje}% en el periodo evaluado '
@@ -138,7 +141,7 @@ def lectura_principal_cultivo(gesto, fecha_referencia):
         )
 
     if gesto.tipo_cadencia == Gesto.CADENCIA_SEMANAL:
-        resultado = az.evaluacion_semanal(gesto, fecha_referencia)
+        resultado = az.evaluacion_semanal(gesto, fecha_referencia, observaciones)
         ventana = az.ventana_cumplimiento(gesto, fecha_referencia)
         periodo_desde, periodo_hasta = ventana if ventana else (None, fecha_referencia)
 
@@ -156,12 +159,12 @@ def lectura_principal_cultivo(gesto, fecha_referencia):
     return _lectura_insuficiente()
 
 
-def _insight_progreso_cultivo(gesto, hoy):
+def _insight_progreso_cultivo(gesto, hoy, observaciones=None):
     """Adapta lectura_principal_cultivo() al formato de tarjeta del feed
     de insights_engine — sin tarjeta si no hay lectura útil (silencio,
     no relleno genérico; el "datos insuficientes" explícito es para el
     hueco permanente del dashboard, no para este feed transitorio)."""
-    lectura = lectura_principal_cultivo(gesto, hoy)
+    lectura = lectura_principal_cultivo(gesto, hoy, observaciones)
     if lectura['estado'] != 'ok':
         return None
 
@@ -255,8 +258,10 @@ def generar_insights_semanales(user):
     # Ya no se calcula nada por cuenta propia. Sin insight si la métrica
     # relevante para la cadencia del gesto tiene confianza insuficiente
     # — mejor ausente que una cifra sin respaldo suficiente.
+    gestos_cultivo = list(gestos_cultivo)
+    observaciones = az.ObservacionesUsuario.para_lecturas(user, gestos_cultivo, hoy) if gestos_cultivo else None
     for gesto in gestos_cultivo:
-        insight = _insight_progreso_cultivo(gesto, hoy)
+        insight = _insight_progreso_cultivo(gesto, hoy, observaciones)
         if insight:
             insights.append(insight)
 
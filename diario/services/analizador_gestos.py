@@ -13,7 +13,7 @@ from functools import wraps
 
 from django.utils import timezone
 
-from ..models import Gesto, ProsocheDiario, RegistroGesto
+from ..models import Gesto, PausaGesto, ProsocheDiario, RegistroGesto
 
 
 class EstadoDia:
@@ -98,18 +98,6 @@ def _confianza(dias_base, dias_ventana):
 # 1. Clasificador temporal canónico
 # ─────────────────────────────────────────────────────────────────────────
 
-def _intervalos_pausa(gesto):
-    """[(fecha_inicio, fecha_fin_o_None), ...] — fecha_fin=None = abierta."""
-    return list(gesto.pausas.values_list('fecha_inicio', 'fecha_fin'))
-
-
-def _en_pausa(fecha, intervalos_pausa):
-    for inicio, fin in intervalos_pausa:
-        if inicio <= fecha and (fin is None or fecha < fin):
-            return True
-    return False
-
-
 def _como_fecha(valor):
     """Gesto.fecha_inicio = DateField(default=timezone.now): un Gesto
     recién creado sin recargar desde BD conserva un datetime crudo en
@@ -121,24 +109,23 @@ def _como_fecha(valor):
     return valor
 
 
-def _fuera_de_vida(fecha, gesto):
-    fecha_inicio = _como_fecha(gesto.fecha_inicio)
-    if fecha < fecha_inicio:
-        return True
-    fecha_cierre = _como_fecha(gesto.fecha_cierre) if gesto.fecha_cierre is not None else None
-    if gesto.estado == 'cerrado' and fecha_cierre is not None and fecha >= fecha_cierre:
-        return True
-    return False
-
-
-def _dias_observados_derivados(usuario, fecha_desde, fecha_hasta):
+class ObservacionesUsuario:
     """
-    Días 'observados' de un usuario en un rango — §5.1 del contrato,
-    enmienda de recuperación histórica (2026-07-18).
-
-    Prioriza cierre_confirmado_en (fiable desde su despliegue, Fase 1).
-    Para fechas anteriores (donde ese campo es siempre null por
-    migración conservadora), usa evidencia de que hubo una acción
+    Días observados, RegistroGesto cumplidos y pausas de *todos* los gestos
+    de un usuario en [fecha_desde, fecha_hasta], cargados una sola vez
+    (3 consultas) y guardados como bitsets: el bit i de cada máscara es el
+    día fecha_desde + i.
+
+    Una página que calcula varias métricas de varios gestos construye una
+    instancia y la pasa como observaciones=... a cada métrica; los ledgers
+    salen idénticos a los de construir_ledger_diario() sin ella. Es una foto:
+    lo registrado después de construirla no se ve. Un rango fuera de la
+    ventana, o un gesto de otro usuario, vuelve a cargar desde BD.
+
+    Días 'observados' — §5.1 del contrato, enmienda de recuperación
+    histórica (2026-07-18). Prioriza cierre_confirmado_en (fiable desde su
+    despliegue, Fase 1). Para fechas anteriores (donde ese campo es siempre
+    null por migración conservadora), usa evidencia de que hubo una acción
     explícita del usuario ese día — nunca la mera existencia de
     ProsocheDiario, que puede crearse solo con abrir la página:
 
@@ -155,82 +142,145 @@ def _dias_observados_derivados(usuario, fecha_desde, fecha_hasta):
     aplicada con evidencia indirecta en vez de esperar a que existiera
     el campo.
     """
-    confirmados = set(
-        ProsocheDiario.objects.filter(
-            prosoche_mes__usuario=usuario,
-            fecha__range=(fecha_desde, fecha_hasta),
-            cierre_confirmado_en__isnull=False,
-        ).values_list('fecha', flat=True)
-    )
-    con_registro = set(
-        RegistroGesto.objects.filter(
-            gesto__usuario=usuario, fecha__range=(fecha_desde, fecha_hasta), estado='cumplido',
-        ).values_list('fecha', flat=True)
-    )
-    con_reflexion = set(
-        ProsocheDiario.objects.filter(
-            prosoche_mes__usuario=usuario, fecha__range=(fecha_desde, fecha_hasta),
-        ).exclude(reflexiones_dia='').values_list('fecha', flat=True)
-    )
-    con_respuesta_joi = set(
-        ProsocheDiario.objects.filter(
-            prosoche_mes__usuario=usuario, fecha__range=(fecha_desde, fecha_hasta),
-            respuesta_joi_cierre_generada_en__isnull=False,
-        ).values_list('fecha', flat=True)
-    )
-    return confirmados | con_registro | con_reflexion | con_respuesta_joi
 
+    def __init__(self, usuario, fecha_desde, fecha_hasta):
+        self.usuario_id = getattr(usuario, 'pk', usuario)
+        self.fecha_desde = fecha_desde
+        self.fecha_hasta = fecha_hasta
+        self.dias = max((fecha_hasta - fecha_desde).days + 1, 0)
+
+        observados = 0
+        diarios = ProsocheDiario.objects.filter(
+            prosoche_mes__usuario=self.usuario_id, fecha__range=(fecha_desde, fecha_hasta),
+        ).values_list('fecha', 'cierre_confirmado_en', 'reflexiones_dia', 'respuesta_joi_cierre_generada_en')
+        for fecha, confirmado_en, reflexiones, respuesta_joi_en in diarios:
+            if confirmado_en is not None or reflexiones != '' or respuesta_joi_en is not None:
+                observados |= 1 << self._indice(fecha)
+
+        self._cumplidos = {}
+        registros = RegistroGesto.objects.filter(
+            gesto__usuario=self.usuario_id, fecha__range=(fecha_desde, fecha_hasta), estado='cumplido',
+        ).values_list('gesto_id', 'fecha')
+        for gesto_id, fecha in registros:
+            bit = 1 << self._indice(fecha)
+            self._cumplidos[gesto_id] = self._cumplidos.get(gesto_id, 0) | bit
+            observados |= bit
+        self._observados = observados
+
+        self._pausas = {}
+        pausas = PausaGesto.objects.filter(gesto__usuario=self.usuario_id).values_list(
+            'gesto_id', 'fecha_inicio', 'fecha_fin',
+        )
+        for gesto_id, inicio, fin in pausas:
+            self._pausas[gesto_id] = self._pausas.get(gesto_id, 0) | self._tramo(inicio, fin)
+
+        self._todos = (1 << self.dias) - 1
+
+    @classmethod
+    def para_lecturas(cls, usuario, gestos, fecha_referencia, dias_atras=28):
+        """Ventana que cubre las métricas habituales de esos gestos en
+        fecha_referencia: los dias_atras días previos (M1/M2/M7) y las
+        ventanas de cumplimiento, extendidas a semanas lun-dom completas (M11)."""
+        desde = fecha_referencia - timedelta(days=dias_atras - 1)
+        for gesto in gestos:
+            ventana = ventana_cumplimiento(gesto, fecha_referencia)
+            if ventana is not None:
+                desde = min(desde, ventana[0] - timedelta(days=ventana[0].weekday()))
+        hasta = fecha_referencia + timedelta(days=6 - fecha_referencia.weekday())
+        return cls(usuario, desde, hasta)
+
+    def cubre(self, gesto, fecha_desde, fecha_hasta):
+        return (gesto.usuario_id == self.usuario_id
+                and self.fecha_desde <= fecha_desde and fecha_hasta <= self.fecha_hasta)
+
+    def _indice(self, fecha):
+        return (fecha - self.fecha_desde).days
+
+    def _tramo(self, inicio, fin):
+        """Máscara del intervalo semiabierto [inicio, fin) recortado a la
+        ventana; fin=None llega hasta el final."""
+        a = max(self._indice(inicio), 0)
+        b = self.dias if fin is None else min(self._indice(fin), self.dias)
+        if b <= a:
+            return 0
+        return ((1 << (b - a)) - 1) << a
+
+    def _fuera_de_vida(self, gesto):
+        mascara = self._tramo(self.fecha_desde, _como_fecha(gesto.fecha_inicio))
+        if gesto.estado == 'cerrado' and gesto.fecha_cierre is not None:
+            mascara |= self._tramo(_como_fecha(gesto.fecha_cierre), None)
+        return mascara
+
+    def _previstos(self, gesto):
+        """Días con veredicto diario según la cadencia; None para semanal/libre."""
+        if gesto.tipo_cadencia == Gesto.CADENCIA_DIARIA:
+            return self._todos
+        if gesto.tipo_cadencia != Gesto.CADENCIA_DIAS_CONCRETOS:
+            return None
+        dias_previstos_semana = set(gesto.dias_semana_objetivo or [])
+        mascara = 0
+        for weekday, nombre_dia in enumerate(Gesto.DIAS_SEMANA_VALIDOS):
+            if nombre_dia in dias_previstos_semana:
+                for i in range((weekday - self.fecha_desde.weekday()) % 7, self.dias, 7):
+                    mascara |= 1 << i
+        return mascara
+
+    def cumplidos(self, gesto):
+        return self._cumplidos.get(gesto.pk, 0)
+
+    def ultimo_cumplido(self, gesto, fecha_referencia):
+        """Última fecha cumplida <= fecha_referencia dentro de la ventana, o None."""
+        mascara = self.cumplidos(gesto) & ((1 << (self._indice(fecha_referencia) + 1)) - 1)
+        if not mascara:
+            return None
+        return self.fecha_desde + timedelta(days=mascara.bit_length() - 1)
+
+    def ledger(self, gesto, fecha_desde, fecha_hasta):
+        fuera_de_vida = self._fuera_de_vida(gesto)
+        pausado = self._pausas.get(gesto.pk, 0) & ~fuera_de_vida
+        no_observado = ~self._observados & ~fuera_de_vida & ~pausado
+        cumplidos = self.cumplidos(gesto)
+        previstos = self._previstos(gesto)
+
+        ledger = []
+        fecha = fecha_desde
+        for i in range(self._indice(fecha_desde), self._indice(fecha_hasta) + 1):
+            cumplido = bool(cumplidos >> i & 1)
+
+            if fuera_de_vida >> i & 1:
+                estado = EstadoDia.FUERA_DE_VIDA
+            elif pausado >> i & 1:
+                estado = EstadoDia.PAUSADO
+            elif no_observado >> i & 1:
+                estado = EstadoDia.NO_OBSERVADO
+            elif previstos is None:
+                # semanal y libre: sin veredicto diario, solo descriptivo.
+                estado = EstadoDia.OBSERVADO_MARCADO if cumplido else EstadoDia.OBSERVADO_NO_MARCADO
+            elif previstos >> i & 1:
+                estado = EstadoDia.PREVISTO_CUMPLIDO if cumplido else EstadoDia.PREVISTO_NO_CUMPLIDO
+            else:
+                estado = EstadoDia.OBSERVADO_NO_PREVISTO
 
-def construir_ledger_diario(gesto, fecha_desde, fecha_hasta):
+            ledger.append({'fecha': fecha, 'estado': estado, 'cumplido': cumplido})
+            fecha += timedelta(days=1)
+
+        return ledger
+
+
+def construir_ledger_diario(gesto, fecha_desde, fecha_hasta, observaciones=None):
     """
     Devuelve una lista de dicts {'fecha', 'estado', 'cumplido'} para cada
     día en [fecha_desde, fecha_hasta] (ambos inclusive), clasificado según
     la taxonomía canónica del §5.1. No calcula ninguna métrica.
 
     Precedencia: fuera_de_vida > pausado > no_observado > observado
-    (refinado por cadencia). Ver _dias_observados_derivados() para cómo
-    se deriva "observado" — incluye recuperación histórica conservadora,
-    no solo cierre_confirmado_en.
+    (refinado por cadencia). Ver ObservacionesUsuario para cómo se deriva
+    "observado" — incluye recuperación histórica conservadora, no solo
+    cierre_confirmado_en. Con observaciones que cubren el rango no consulta BD.
     """
-    intervalos_pausa = _intervalos_pausa(gesto)
-
-    dias_observados = _dias_observados_derivados(gesto.usuario, fecha_desde, fecha_hasta)
-    dias_cumplidos = set(
-        RegistroGesto.objects.filter(
-            gesto=gesto, fecha__range=(fecha_desde, fecha_hasta), estado='cumplido',
-        ).values_list('fecha', flat=True)
-    )
-
-    dias_previstos_semana = set(gesto.dias_semana_objetivo or [])
-
-    ledger = []
-    fecha = fecha_desde
-    while fecha <= fecha_hasta:
-        cumplido = fecha in dias_cumplidos
-
-        if _fuera_de_vida(fecha, gesto):
-            estado = EstadoDia.FUERA_DE_VIDA
-        elif _en_pausa(fecha, intervalos_pausa):
-            estado = EstadoDia.PAUSADO
-        elif fecha not in dias_observados:
-            estado = EstadoDia.NO_OBSERVADO
-        else:
-            if gesto.tipo_cadencia == Gesto.CADENCIA_DIARIA:
-                estado = EstadoDia.PREVISTO_CUMPLIDO if cumplido else EstadoDia.PREVISTO_NO_CUMPLIDO
-            elif gesto.tipo_cadencia == Gesto.CADENCIA_DIAS_CONCRETOS:
-                nombre_dia = Gesto.DIAS_SEMANA_VALIDOS[fecha.weekday()]
-                if nombre_dia in dias_previstos_semana:
-                    estado = EstadoDia.PREVISTO_CUMPLIDO if cumplido else EstadoDia.PREVISTO_NO_CUMPLIDO
-                else:
-                    estado = EstadoDia.OBSERVADO_NO_PREVISTO
-            else:
-                # semanal y libre: sin veredicto diario, solo descriptivo.
-                estado = EstadoDia.OBSERVADO_MARCADO if cumplido else EstadoDia.OBSERVADO_NO_MARCADO
-
-        ledger.append({'fecha': fecha, 'estado': estado, 'cumplido': cumplido})
-        fecha += timedelta(days=1)
-
-    return ledger
+    if observaciones is None or not observaciones.cubre(gesto, fecha_desde, fecha_hasta):
+        observaciones = ObservacionesUsuario(gesto.usuario_id, fecha_desde, fecha_hasta)
+    return observaciones.ledger(gesto, fecha_desde, fecha_hasta)
 
 
 def _es_activo(estado):
@@ -254,9 +304,9 @@ def _dias_excluidos_de(ledger):
 # ─────────────────────────────────────────────────────────────────────────
 
 @requiere_cultivo
-def apariciones(gesto, fecha_desde, fecha_hasta):
+def apariciones(gesto, fecha_desde, fecha_hasta, observaciones=None):
     """M1 — nº de RegistroGesto cumplido en días observados y activos."""
-    ledger = construir_ledger_diario(gesto, fecha_desde, fecha_hasta)
+    ledger = construir_ledger_diario(gesto, fecha_desde, fecha_hasta, observaciones)
     obs_activos = [d for d in ledger if _es_observado(d['estado']) and _es_activo(d['estado'])]
     apariciones_fechas = [d['fecha'] for d in obs_activos if d['cumplido']]
     return _resultado(
@@ -269,11 +319,11 @@ def apariciones(gesto, fecha_desde, fecha_hasta):
 
 
 @requiere_cultivo
-def densidad_sobre_dias_observados_activos(gesto, fecha_desde, fecha_hasta):
+def densidad_sobre_dias_observados_activos(gesto, fecha_desde, fecha_hasta, observaciones=None):
     """M2 — apariciones / días observados y activos. Denominador excluye
     pausado Y no_observado (y fuera_de_vida). Prohibido cualquier juicio
     cualitativo — solo el conteo crudo."""
-    ledger = construir_ledger_diario(gesto, fecha_desde, fecha_hasta)
+    ledger = construir_ledger_diario(gesto, fecha_desde, fecha_hasta, observaciones)
     obs_activos = [d for d in ledger if _es_observado(d['estado']) and _es_activo(d['estado'])]
     dias_excluidos = _dias_excluidos_de(ledger)
 
@@ -294,12 +344,12 @@ def densidad_sobre_dias_observados_activos(gesto, fecha_desde, fecha_hasta):
     )
 
 
-def _apariciones_con_intervalos_activos(gesto, fecha_desde, fecha_hasta):
+def _apariciones_con_intervalos_activos(gesto, fecha_desde, fecha_hasta, observaciones=None):
     """Devuelve (fechas_apariciones_ordenadas, intervalos_activos, intervalos_naturales).
     intervalo_activo(a, b) = nº de días estrictamente entre a y b cuyo
     estado no es pausado ni fuera_de_vida (no_observado sí cuenta como
     transcurrido) — §5.1 del contrato."""
-    ledger = construir_ledger_diario(gesto, fecha_desde, fecha_hasta)
+    ledger = construir_ledger_diario(gesto, fecha_desde, fecha_hasta, observaciones)
     ledger_por_fecha = {d['fecha']: d['estado'] for d in ledger}
     obs_activos = [d for d in ledger if _es_observado(d['estado']) and _es_activo(d['estado'])]
     apariciones_fechas = sorted(d['fecha'] for d in obs_activos if d['cumplido'])
@@ -321,10 +371,11 @@ def _apariciones_con_intervalos_activos(gesto, fecha_desde, fecha_hasta):
 
 
 @requiere_cultivo
-def intervalo_mediano_activo(gesto, fecha_desde, fecha_hasta):
+def intervalo_mediano_activo(gesto, fecha_desde, fecha_hasta, observaciones=None):
     """M3 — mediana de intervalos activos entre apariciones. El intervalo
     natural se adjunta solo como dato auxiliar, nunca como valor principal."""
-    apariciones_fechas, activos, naturales = _apariciones_con_intervalos_activos(gesto, fecha_desde, fecha_hasta)
+    apariciones_fechas, activos, naturales = _apariciones_con_intervalos_activos(
+        gesto, fecha_desde, fecha_hasta, observaciones)
     if len(apariciones_fechas) < 3:
         return _no_calculable(MotivoNoCalculable.MUESTRA_INSUFICIENTE, fechas_usadas=apariciones_fechas)
 
@@ -338,9 +389,10 @@ def intervalo_mediano_activo(gesto, fecha_desde, fecha_hasta):
 
 
 @requiere_cultivo
-def intervalo_maximo_activo(gesto, fecha_desde, fecha_hasta):
+def intervalo_maximo_activo(gesto, fecha_desde, fecha_hasta, observaciones=None):
     """M4 — mayor hueco activo entre dos apariciones consecutivas."""
-    apariciones_fechas, activos, naturales = _apariciones_con_intervalos_activos(gesto, fecha_desde, fecha_hasta)
+    apariciones_fechas, activos, naturales = _apariciones_con_intervalos_activos(
+        gesto, fecha_desde, fecha_hasta, observaciones)
     if not activos:
         return _no_calculable(MotivoNoCalculable.MUESTRA_INSUFICIENTE, fechas_usadas=apariciones_fechas)
 
@@ -354,11 +406,11 @@ def intervalo_maximo_activo(gesto, fecha_desde, fecha_hasta):
 
 
 @requiere_cultivo
-def regularidad(gesto, fecha_desde, fecha_hasta):
+def regularidad(gesto, fecha_desde, fecha_hasta, observaciones=None):
     """M5 — estable / variable / concentrado, según coeficiente de
     variación de los intervalos activos. Umbrales propuestos (0.3/0.7),
     sin validar contra datos reales (§4 del contrato)."""
-    apariciones_fechas, activos, _ = _apariciones_con_intervalos_activos(gesto, fecha_desde, fecha_hasta)
+    apariciones_fechas, activos, _ = _apariciones_con_intervalos_activos(gesto, fecha_desde, fecha_hasta, observaciones)
     if len(activos) < _UMBRAL_MUESTRA_MINIMA_INTERVALOS:
         return _no_calculable(MotivoNoCalculable.MUESTRA_INSUFICIENTE, fechas_usadas=apariciones_fechas)
 
@@ -377,20 +429,24 @@ def regularidad(gesto, fecha_desde, fecha_hasta):
 
 
 @requiere_cultivo
-def dias_activos_desde_ultima_aparicion(gesto, fecha_referencia=None):
+def dias_activos_desde_ultima_aparicion(gesto, fecha_referencia=None, observaciones=None):
     """M6 — días activos (no pausado/fuera_de_vida) entre la última
     aparición y fecha_referencia, ambos exclusive/inclusive según el caso."""
     fecha_referencia = fecha_referencia or timezone.localdate()
-    ultima = (
-        RegistroGesto.objects.filter(gesto=gesto, estado='cumplido', fecha__lte=fecha_referencia)
-        .order_by('-fecha').values_list('fecha', flat=True).first()
-    )
+    ultima = None
+    if observaciones is not None and observaciones.cubre(gesto, fecha_referencia, fecha_referencia):
+        ultima = observaciones.ultimo_cumplido(gesto, fecha_referencia)
+    if ultima is None:
+        ultima = (
+            RegistroGesto.objects.filter(gesto=gesto, estado='cumplido', fecha__lte=fecha_referencia)
+            .order_by('-fecha').values_list('fecha', flat=True).first()
+        )
     if ultima is None:
         return _no_calculable(MotivoNoCalculable.SIN_APARICIONES)
     if ultima == fecha_referencia:
         return _resultado(valor=0, confianza='alta', registros_usados=[ultima])
 
-    ledger = construir_ledger_diario(gesto, ultima + timedelta(days=1), fecha_referencia)
+    ledger = construir_ledger_diario(gesto, ultima + timedelta(days=1), fecha_referencia, observaciones)
     dias_activos = sum(1 for d in ledger if _es_activo(d['estado']))
     return _resultado(
         valor=dias_activos, confianza='alta', registros_usados=[ultima],
@@ -399,7 +455,7 @@ def dias_activos_desde_ultima_aparicion(gesto, fecha_referencia=None):
 
 
 @requiere_cultivo
-def comparacion_entre_periodos(gesto, fecha_referencia=None, dias_ventana=14):
+def comparacion_entre_periodos(gesto, fecha_referencia=None, dias_ventana=14, observaciones=None):
     """M7 — conteo + densidad de dos ventanas consecutivas. Si la
     cobertura de ambas ventanas difiere en más de 20 puntos, la
     confianza de la comparación baja a 'baja' como máximo."""
@@ -409,8 +465,8 @@ def comparacion_entre_periodos(gesto, fecha_referencia=None, dias_ventana=14):
     comparacion_hasta = reciente_desde - timedelta(days=1)
     comparacion_desde = max(gesto.fecha_inicio, comparacion_hasta - timedelta(days=dias_ventana - 1))
 
-    reciente = apariciones(gesto, reciente_desde, reciente_hasta)
-    reciente_densidad = densidad_sobre_dias_observados_activos(gesto, reciente_desde, reciente_hasta)
+    reciente = apariciones(gesto, reciente_desde, reciente_hasta, observaciones)
+    reciente_densidad = densidad_sobre_dias_observados_activos(gesto, reciente_desde, reciente_hasta, observaciones)
 
     if comparacion_hasta < comparacion_desde:
         return _resultado(
@@ -419,8 +475,9 @@ def comparacion_entre_periodos(gesto, fecha_referencia=None, dias_ventana=14):
             confianza='insuficiente', motivo_no_calculable=MotivoNoCalculable.MUESTRA_INSUFICIENTE,
         )
 
-    anterior = apariciones(gesto, comparacion_desde, comparacion_hasta)
-    anterior_densidad = densidad_sobre_dias_observados_activos(gesto, comparacion_desde, comparacion_hasta)
+    anterior = apariciones(gesto, comparacion_desde, comparacion_hasta, observaciones)
+    anterior_densidad = densidad_sobre_dias_observados_activos(
+        gesto, comparacion_desde, comparacion_hasta, observaciones)
 
     confianza = min(
         [reciente['confianza'], anterior['confianza']],
@@ -456,7 +513,7 @@ def ventana_cumplimiento(gesto, fecha_hasta):
 
 
 @requiere_cultivo
-def oportunidades_previstas(gesto, fecha_referencia=None):
+def oportunidades_previstas(gesto, fecha_referencia=None, observaciones=None):
     """M8 — solo diaria/dias_concretos."""
     if gesto.tipo_cadencia not in (Gesto.CADENCIA_DIARIA, Gesto.CADENCIA_DIAS_CONCRETOS):
         return _no_calculable(MotivoNoCalculable.CADENCIA_NO_APLICABLE)
@@ -464,7 +521,7 @@ def oportunidades_previstas(gesto, fecha_referencia=None):
     if ventana is None:
         return _no_calculable(MotivoNoCalculable.CADENCIA_NO_CONFIGURADA)
 
-    ledger = construir_ledger_diario(gesto, *ventana)
+    ledger = construir_ledger_diario(gesto, *ventana, observaciones=observaciones)
     previstos = [d for d in ledger if d['estado'] in (EstadoDia.PREVISTO_CUMPLIDO, EstadoDia.PREVISTO_NO_CUMPLIDO)]
     return _resultado(
         valor=len(previstos), confianza=_confianza(len(previstos), len(ledger)),
@@ -473,7 +530,7 @@ def oportunidades_previstas(gesto, fecha_referencia=None):
 
 
 @requiere_cultivo
-def oportunidades_cumplidas(gesto, fecha_referencia=None):
+def oportunidades_cumplidas(gesto, fecha_referencia=None, observaciones=None):
     """M9 — subconjunto de M8 con RegistroGesto cumplido."""
     if gesto.tipo_cadencia not in (Gesto.CADENCIA_DIARIA, Gesto.CADENCIA_DIAS_CONCRETOS):
         return _no_calculable(MotivoNoCalculable.CADENCIA_NO_APLICABLE)
@@ -481,7 +538,7 @@ def oportunidades_cumplidas(gesto, fecha_referencia=None):
     if ventana is None:
         return _no_calculable(MotivoNoCalculable.CADENCIA_NO_CONFIGURADA)
 
-    ledger = construir_ledger_diario(gesto, *ventana)
+    ledger = construir_ledger_diario(gesto, *ventana, observaciones=observaciones)
     cumplidos = [d['fecha'] for d in ledger if d['estado'] == EstadoDia.PREVISTO_CUMPLIDO]
     previstos = [d for d in ledger if d['estado'] in (EstadoDia.PREVISTO_CUMPLIDO, EstadoDia.PREVISTO_NO_CUMPLIDO)]
     return _resultado(
@@ -492,9 +549,9 @@ def oportunidades_cumplidas(gesto, fecha_referencia=None):
 
 
 @requiere_cultivo
-def adherencia(gesto, fecha_referencia=None):
+def adherencia(gesto, fecha_referencia=None, observaciones=None):
     """M10 — M9 / M8, válido solo con M8 >= 4 oportunidades."""
-    m8 = oportunidades_previstas(gesto, fecha_referencia)
+    m8 = oportunidades_previstas(gesto, fecha_referencia, observaciones)
     if m8['valor'] is None:
         return m8
     if m8['valor'] < _UMBRAL_OPORTUNIDADES_MINIMAS:
@@ -502,7 +559,7 @@ def adherencia(gesto, fecha_referencia=None):
             valor=None, confianza='insuficiente', motivo_no_calculable=MotivoNoCalculable.MUESTRA_INSUFICIENTE,
             fechas_usadas=m8['explicacion']['fechas_usadas'],
         )
-    m9 = oportunidades_cumplidas(gesto, fecha_referencia)
+    m9 = oportunidades_cumplidas(gesto, fecha_referencia, observaciones)
     return _resultado(
         valor=round(m9['valor'] / m8['valor'], 4),
         confianza=_confianza(m8['valor'], len(m8['explicacion']['fechas_usadas'])),
@@ -523,8 +580,8 @@ def _semanas_calendario(fecha_desde, fecha_hasta):
     return semanas
 
 
-def _clasificar_semana(gesto, lunes, domingo, fecha_referencia):
-    ledger = construir_ledger_diario(gesto, lunes, domingo)
+def _clasificar_semana(gesto, lunes, domingo, fecha_referencia, observaciones=None):
+    ledger = construir_ledger_diario(gesto, lunes, domingo, observaciones)
     objetivo = gesto.frecuencia_semanal_objetivo
 
     if lunes <= fecha_referencia <= domingo and fecha_referencia < domingo:
@@ -555,7 +612,7 @@ def _clasificar_semana(gesto, lunes, domingo, fecha_referencia):
 
 
 @requiere_cultivo
-def evaluacion_semanal(gesto, fecha_referencia=None):
+def evaluacion_semanal(gesto, fecha_referencia=None, observaciones=None):
     """M11 — solo tipo_cadencia == 'semanal'. Clasificación de 4 estados
     por semana; la tasa principal usa exclusivamente semana_completa."""
     if gesto.tipo_cadencia != Gesto.CADENCIA_SEMANAL:
@@ -566,7 +623,7 @@ def evaluacion_semanal(gesto, fecha_referencia=None):
         return _no_calculable(MotivoNoCalculable.CADENCIA_NO_CONFIGURADA)
 
     semanas = [
-        _clasificar_semana(gesto, lunes, domingo, fecha_referencia)
+        _clasificar_semana(gesto, lunes, domingo, fecha_referencia, observaciones)
         for lunes, domingo in _semanas_calendario(*ventana)
     ]
 
@@ -595,14 +652,14 @@ def evaluacion_semanal(gesto, fecha_referencia=None):
 
 
 @requiere_cultivo
-def incumplimientos_observados(gesto, fecha_referencia=None):
+def incumplimientos_observados(gesto, fecha_referencia=None, observaciones=None):
     """M12 — diaria/dias_concretos: días previsto_no_cumplido. semanal:
     semanas completas no cumplidas. libre: no calculable."""
     if gesto.tipo_cadencia == Gesto.CADENCIA_LIBRE:
         return _no_calculable(MotivoNoCalculable.CADENCIA_LIBRE)
 
     if gesto.tipo_cadencia == Gesto.CADENCIA_SEMANAL:
-        m11 = evaluacion_semanal(gesto, fecha_referencia)
+        m11 = evaluacion_semanal(gesto, fecha_referencia, observaciones)
         if m11['valor'] is None:
             return m11
         incumplidas = m11['valor']['semanas_completas'] - m11['valor']['semanas_cumplidas']
@@ -611,7 +668,7 @@ def incumplimientos_observados(gesto, fecha_referencia=None):
     ventana = ventana_cumplimiento(gesto, fecha_referencia or timezone.localdate())
     if ventana is None:
         return _no_calculable(MotivoNoCalculable.CADENCIA_NO_CONFIGURADA)
-    ledger = construir_ledger_diario(gesto, *ventana)
+    ledger = construir_ledger_diario(gesto, *ventana, observaciones=observaciones)
     incumplidos = [d['fecha'] for d in ledger if d['estado'] == EstadoDia.PREVISTO_NO_CUMPLIDO]
     previstos = [d for d in ledger if d['estado'] in (EstadoDia.PREVISTO_CUMPLIDO, EstadoDia.PREVISTO_NO_CUMPLIDO)]
     return _resultado(
@@ -621,7 +678,7 @@ def incumplimientos_observados(gesto, fecha_referencia=None):
 
 
 @requiere_cultivo
-def recuperacion(gesto, fecha_referencia=None):
+def recuperacion(gesto, fecha_referencia=None, observaciones=None):
     """M13 — definición distinta por cadencia (§5.3). Nunca usa la
     palabra 'recaída' (reservada a TriggerHabito/suelto) ni infiere causa:
     solo cuenta oportunidades/semanas transcurridas."""
@@ -634,16 +691,16 @@ def recuperacion(gesto, fecha_referencia=None):
         return _no_calculable(MotivoNoCalculable.CADENCIA_NO_CONFIGURADA)
 
     if gesto.tipo_cadencia == Gesto.CADENCIA_SEMANAL:
-        m11 = evaluacion_semanal(gesto, fecha_referencia)
+        m11 = evaluacion_semanal(gesto, fecha_referencia, observaciones)
         if m11['valor'] is None:
             return m11
-        secuencia = [s for s in _todas_las_semanas_ordenadas(gesto, ventana, fecha_referencia)
+        secuencia = [s for s in _todas_las_semanas_ordenadas(gesto, ventana, fecha_referencia, observaciones)
                      if s['clasificacion'] in ('semana_completa', 'semana_parcial_alcanzable')]
         recuperaciones, pendiente = _contar_recuperaciones(secuencia, key_incumplida=lambda s: s['cumplida'] is False,
                                                              key_cumplida=lambda s: s['cumplida'] is True)
         unidad = 'semanas'
     else:
-        ledger = construir_ledger_diario(gesto, *ventana)
+        ledger = construir_ledger_diario(gesto, *ventana, observaciones=observaciones)
         secuencia = [d for d in ledger if d['estado'] in (EstadoDia.PREVISTO_CUMPLIDO, EstadoDia.PREVISTO_NO_CUMPLIDO)]
         recuperaciones, pendiente = _contar_recuperaciones(
             secuencia,
@@ -667,8 +724,8 @@ def recuperacion(gesto, fecha_referencia=None):
     return _resultado(valor=valor, confianza='media' if len(recuperaciones) < 3 else 'alta')
 
 
-def _todas_las_semanas_ordenadas(gesto, ventana, fecha_referencia):
-    return [_clasificar_semana(gesto, lunes, domingo, fecha_referencia)
+def _todas_las_semanas_ordenadas(gesto, ventana, fecha_referencia, observaciones=None):
+    return [_clasificar_semana(gesto, lunes, domingo, fecha_referencia, observaciones)
             for lunes, domingo in _semanas_calendario(*ventana)]
 
 
@@ -0,0 +1,102 @@
+"""
+ObservacionesUsuario (diario/services/analizador_gestos.py): una sola carga
+de días observados, registros y pausas para todos los gestos de un usuario.
+
+Cada métrica calculada con observaciones=... debe dar exactamente lo mismo
+que sin ellas, y el conjunto completo de métricas de varios gestos no debe
+hacer más consultas que la propia carga.
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Gesto, PausaGesto, ProsocheDiario, ProsocheMes, RegistroGesto
+from .insights_engine import lectura_principal_cultivo
+from .services import analizador_gestos as az
+
+DESDE = date(2026, 5, 4)
+REFERENCIA = date(2026, 7, 15)
+
+
+class ObservacionesCompartidasTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ledger-compartido', password='x')
+        mes = ProsocheMes.objects.create(usuario=self.user, mes='Mayo', año=2026)
+        fecha = DESDE
+        while fecha <= REFERENCIA:
+            # Observado por reflexión dos de cada tres días; el resto solo si hay registro.
+            if fecha.toordinal() % 3:
+                ProsocheDiario.objects.create(prosoche_mes=mes, fecha=fecha, reflexiones_dia='Nota.')
+            fecha += timedelta(days=1)
+
+        self.gestos = [
+            Gesto.objects.create(usuario=self.user, nombre='Meditar', tipo='cultivo',
+                                 tipo_cadencia=Gesto.CADENCIA_DIARIA, fecha_inicio=DESDE),
+            Gesto.objects.create(usuario=self.user, nombre='Gimnasio', tipo='cultivo',
+                                 tipo_cadencia=Gesto.CADENCIA_SEMANAL, frecuencia_semanal_objetivo=3,
+                                 fecha_inicio=DESDE + timedelta(days=3)),
+            Gesto.objects.create(usuario=self.user, nombre='Llamar', tipo='cultivo',
+                                 tipo_cadencia=Gesto.CADENCIA_DIAS_CONCRETOS,
+                                 dias_semana_objetivo=['martes', 'domingo'], fecha_inicio=DESDE),
+            Gesto.objects.create(usuario=self.user, nombre='Leer', tipo='cultivo',
+                                 tipo_cadencia=Gesto.CADENCIA_LIBRE, fecha_inicio=DESDE),
+        ]
+        PausaGesto.objects.create(gesto=self.gestos[0], fecha_inicio=date(2026, 6, 1), fecha_fin=date(2026, 6, 8))
+        PausaGesto.objects.create(gesto=self.gestos[1], fecha_inicio=date(2026, 7, 10))
+        for i, gesto in enumerate(self.gestos):
+            fecha = DESDE
+            while fecha <= REFERENCIA:
+                if (fecha.toordinal() + i) % (i + 2):
+                    RegistroGesto.objects.create(gesto=gesto, fecha=fecha, estado='cumplido')
+                fecha += timedelta(days=1)
+
+    def _metricas(self, gesto, observaciones=None):
+        desde = REFERENCIA - timedelta(days=13)
+        return [
+            az.construir_ledger_diario(gesto, desde, REFERENCIA, observaciones),
+            az.apariciones(gesto, desde, REFERENCIA, observaciones),
+            az.densidad_sobre_dias_observados_activos(gesto, desde, REFERENCIA, observaciones),
+            az.intervalo_mediano_activo(gesto, desde, REFERENCIA, observaciones),
+            az.intervalo_maximo_activo(gesto, desde, REFERENCIA, observaciones),
+            az.regularidad(gesto, desde, REFERENCIA, observaciones),
+            az.dias_activos_desde_ultima_aparicion(gesto, REFERENCIA, observaciones),
+            az.comparacion_entre_periodos(gesto, REFERENCIA, observaciones=observaciones),
+            az.oportunidades_previstas(gesto, REFERENCIA, observaciones),
+            az.oportunidades_cumplidas(gesto, REFERENCIA, observaciones),
+            az.adherencia(gesto, REFERENCIA, observaciones),
+            az.evaluacion_semanal(gesto, REFERENCIA, observaciones),
+            az.incumplimientos_observados(gesto, REFERENCIA, observaciones),
+            az.recuperacion(gesto, REFERENCIA, observaciones),
+            lectura_principal_cultivo(gesto, REFERENCIA, observaciones),
+        ]
+
+    def test_mismas_metricas_con_una_sola_carga(self):
+        esperado = [self._metricas(gesto) for gesto in self.gestos]
+
+        with self.assertNumQueries(3):
+            observaciones = az.ObservacionesUsuario.para_lecturas(self.user, self.gestos, REFERENCIA)
+            compartido = [self._metricas(gesto, observaciones) for gesto in self.gestos]
+
+        self.assertEqual(compartido, esperado)
+        # El dataset ejercita cifras reales, no solo 'insuficiente'
+        self.assertIsNotNone(esperado[0][10]['valor'])
+        self.assertIsNotNone(esperado[1][11]['valor']['tasa_principal'])
+        self.assertIsNotNone(esperado[2][13]['valor'])
+        self.assertIsNotNone(esperado[3][5]['valor'])
+
+    def test_rango_fuera_de_la_ventana_vuelve_a_cargar(self):
+        observaciones = az.ObservacionesUsuario(self.user, date(2026, 7, 1), REFERENCIA)
+        gesto = self.gestos[0]
+
+        self.assertEqual(
+            az.construir_ledger_diario(gesto, DESDE, REFERENCIA, observaciones),
+            az.construir_ledger_diario(gesto, DESDE, REFERENCIA),
+        )
+        self.assertEqual(az.construir_ledger_diario(gesto, REFERENCIA, DESDE, observaciones), [])
+
+    def test_dashboard_de_habitos(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('diario:habitos_dashboard')).status_code, 200)
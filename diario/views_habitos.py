@@ -12,6 +12,7 @@ import json
 from .models import Gesto, ProsocheHabito
 from .forms import CadenciaGestoForm, GestoForm, TriggerHabitoForm
 from .insights_engine import lectura_principal_cultivo
+from .services.analizador_gestos import ObservacionesUsuario
 from .services import HabitosService, InsigniasService
 
 # ========================================
@@ -69,6 +70,11 @@ def habitos_dashboard(request):
     habitos_positivos = []
     habitos_negativos = []
 
+    # Una sola carga de días observados/registros/pausas para las lecturas
+    # de todos los gestos cultivo de la página.
+    cultivo_activos = [g for g in gestos_por_tipo['cultivo'] if g.estado == 'activo']
+    observaciones = ObservacionesUsuario.para_lecturas(request.user, cultivo_activos, hoy) if cultivo_activos else None
+
     for gesto in gestos_por_tipo['cultivo'] + gestos_por_tipo['suelto']:
         if gesto.estado != 'activo':
             continue
@@ -83,7 +89,7 @@ def habitos_dashboard(request):
 
         # Fase 5C: lectura principal del analizador — una sola por
         # hábito, solo para cultivo. suelto sigue con TriggerHabito.
-        lectura_cultivo = lectura_principal_cultivo(gesto, hoy) if gesto.tipo == 'cultivo' else None
+        lectura_cultivo = lectura_principal_cultivo(gesto, hoy, observaciones) if gesto.tipo == 'cultivo' else None
 
         item = {
             'habito': gesto,
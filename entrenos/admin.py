@@ -17,6 +17,10 @@ from .models import (
     DesafioSemanal,
     ProgresoDesafio,
     ActividadRealizada,
+    CargaDiariaCliente,
+    EventoEntrenoGuardado,
+    SerieNotaLiftin,
+    MejorMarcaEjercicio,
 )
 
 
@@ -677,6 +681,39 @@ class ActividadRealizadaAdmin(admin.ModelAdmin):
     raw_id_fields = ['entreno_gym', 'sesion_hyrox']
 
 
+@admin.register(CargaDiariaCliente)
+class CargaDiariaClienteAdmin(admin.ModelAdmin):
+    list_display = ['cliente', 'fecha', 'carga', 'ctl', 'atl', 'tsb']
+    list_filter = ['cliente']
+    date_hierarchy = 'fecha'
+    readonly_fields = ['cliente', 'fecha', 'carga', 'ctl', 'atl', 'tsb', 'actualizado_en']
+
+
+@admin.register(EventoEntrenoGuardado)
+class EventoEntrenoGuardadoAdmin(admin.ModelAdmin):
+    list_display = ['entreno', 'cliente', 'creado', 'guardados', 'registrado_en', 'procesado_en']
+    list_filter = ['creado', 'procesado_en']
+    raw_id_fields = ['cliente', 'entreno']
+    readonly_fields = ['registrado_en']
+
+
+@admin.register(SerieNotaLiftin)
+class SerieNotaLiftinAdmin(admin.ModelAdmin):
+    list_display = ['fecha', 'cliente', 'ejercicio', 'peso_texto', 'repeticiones_texto', 'completado', 'version']
+    list_filter = ['version', 'completado']
+    search_fields = ['nombre_normalizado', 'cliente__nombre']
+    raw_id_fields = ['entreno', 'cliente']
+
+
+@admin.register(MejorMarcaEjercicio)
+class MejorMarcaEjercicioAdmin(admin.ModelAdmin):
+    list_display = ['cliente', 'nombre', 'movimiento_principal', 'rm_estimado', 'mejor_peso_kg',
+                    'mejor_repeticiones', 'fecha_mejor', 'ultima_fecha']
+    list_filter = ['movimiento_principal']
+    search_fields = ['ejercicio', 'cliente__nombre']
+    raw_id_fields = ['cliente', 'entreno_mejor']
+
+
 # Personalización del admin site
 admin.site.site_header = "Gym Project - Administración"
 admin.site.site_title = "Gym Project Admin"
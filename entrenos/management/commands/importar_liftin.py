@@ -0,0 +1,60 @@
+"""
+Importa en bloque un fichero de entrenos Liftin (JSONL o el array JSON de
+la exportación) sin disparar las señales por fila; al final recalcula una
+vez por cliente afectado. Ver entrenos/services/importacion_liftin_service.py.
+
+Uso:
+    python manage.py importar_liftin historico.jsonl --cliente 3
+    python manage.py importar_liftin export.json --dry-run
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from entrenos.services import importacion_liftin_service
+
+
+class Command(BaseCommand):
+    help = 'Importa en bloque entrenos de Liftin desde un fichero (backfill histórico)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fichero', help='Ruta al fichero JSONL o JSON')
+        parser.add_argument('--cliente', type=int, default=None,
+                            help='ID de cliente para todos los registros (ignora el del fichero)')
+        parser.add_argument('--lote', type=int, default=500,
+                            help='Entrenos por transacción (default: 500)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo valida el fichero, no escribe en la BD')
+
+    def handle(self, *args, **options):
+        try:
+            resumen = importacion_liftin_service.importar(
+                options['fichero'],
+                cliente_id=options['cliente'],
+                lote=options['lote'],
+                dry_run=options['dry_run'],
+            )
+        except OSError as e:
+            raise CommandError(f'No se pudo leer {options["fichero"]}: {e}')
+
+        if resumen.errores:
+            for posicion, mensaje in resumen.errores:
+                self.stderr.write(f'  registro {posicion}: {mensaje}')
+            raise CommandError(
+                f'{len(resumen.errores)} registros inválidos de {resumen.registros}; no se importó nada'
+            )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f'\n[DRY-RUN] Registros válidos: {resumen.registros} | Clientes: {resumen.clientes}'
+            ))
+            return
+
+        self.stdout.write(
+            f'  Entrenos: {resumen.entrenos} | Ejercicios: {resumen.ejercicios} | '
+            f'Series de notas: {resumen.series_notas} | Detallados: {resumen.detallados} | '
+            f'Hub: {resumen.actividades}'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'\nImportados: {resumen.entrenos} | Duplicados omitidos: {resumen.duplicados} | '
+            f'Clientes: {resumen.clientes} | {resumen.filas} filas en {resumen.segundos:.1f} s '
+            f'({resumen.filas_por_segundo} filas/s)'
+        ))
@@ -101,6 +101,8 @@ class Command(BaseCommand):
         if not dry_run and pendientes:
             fields = ['carga_ua', 'rpe_medio'] if with_hr else ['carga_ua']
             ActividadRealizada.objects.bulk_update(pendientes, fields, batch_size=500)
+            from entrenos.services.carga_diaria_service import actualizar_para_actividades
+            actualizar_para_actividades(pendientes)
 
         prefijo = '[DRY-RUN] ' if dry_run else ''
         self.stdout.write(self.style.SUCCESS(
@@ -0,0 +1,33 @@
+"""
+Reconstruye el índice MejorMarcaEjercicio (1RM estimado y mejor serie por
+cliente y ejercicio) desde EjercicioRealizado y SerieRealizada.
+
+Las señales lo mantienen al día; este comando sirve para el backfill
+inicial o tras cambiar el mapeo de movimientos principales.
+
+Uso:
+    python manage.py recalcular_mejores_marcas
+    python manage.py recalcular_mejores_marcas --cliente 3
+"""
+from django.core.management.base import BaseCommand
+
+from entrenos.services import mejores_marcas_service
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de mejores marcas (1RM) por cliente y ejercicio'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cliente', type=int, default=None,
+                            help='ID de cliente; si se omite procesa todos')
+        parser.add_argument('--lote', type=int, default=1000,
+                            help='Filas por INSERT (default: 1000)')
+
+    def handle(self, *args, **options):
+        filas = mejores_marcas_service.recalcular(
+            cliente_id=options['cliente'], lote=options['lote'],
+        )
+        alcance = f"cliente {options['cliente']}" if options['cliente'] else 'todos los clientes'
+        self.stdout.write(self.style.SUCCESS(
+            f'\nÍndice de marcas ({alcance}) | Filas escritas: {filas}'
+        ))
@@ -0,0 +1,58 @@
+"""
+Reconstruye (backfill) el libro diario CargaDiariaCliente desde el hub
+ActividadRealizada y verifica que coincide con el cálculo EWMA completo.
+
+Uso:
+    python manage.py reconstruir_carga_diaria
+    python manage.py reconstruir_carga_diaria --cliente 3
+    python manage.py reconstruir_carga_diaria --verificar   # solo lectura
+"""
+from django.core.management.base import BaseCommand
+
+from entrenos.models import ActividadRealizada
+from entrenos.services import carga_diaria_service
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el libro diario de carga (CTL/ATL/TSB) y lo verifica contra el cálculo completo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cliente', type=int, default=None,
+                            help='ID de cliente; si se omite procesa todos')
+        parser.add_argument('--verificar', action='store_true',
+                            help='No reescribe nada: solo compara libro vs cálculo completo')
+
+    def handle(self, *args, **options):
+        cliente_id = options['cliente']
+        solo_verificar = options['verificar']
+
+        clientes = (
+            ActividadRealizada.objects
+            .filter(carga_ua__isnull=False)
+            .values_list('cliente_id', flat=True)
+            .distinct()
+            .order_by('cliente_id')
+        )
+        if cliente_id is not None:
+            clientes = clientes.filter(cliente_id=cliente_id)
+
+        filas = 0
+        inconsistentes = 0
+        for cid in clientes:
+            if not solo_verificar:
+                filas += carga_diaria_service.actualizar_desde(cid)
+            resultado = carga_diaria_service.verificar(cid)
+            if not resultado['consistente']:
+                inconsistentes += 1
+                self.stdout.write(self.style.WARNING(
+                    f"  cliente={cid} libro={resultado['libro']} "
+                    f"referencia={resultado['referencia']}"
+                ))
+
+        prefijo = '[VERIFICAR] ' if solo_verificar else ''
+        resumen = (
+            f'\n{prefijo}Clientes: {len(clientes)} | Filas escritas: {filas} '
+            f'| Inconsistentes: {inconsistentes}'
+        )
+        estilo = self.style.SUCCESS if inconsistentes == 0 else self.style.ERROR
+        self.stdout.write(estilo(resumen))
@@ -7,6 +7,7 @@ from django.db import transaction
 from django.db.models import Exists, OuterRef
 
 from entrenos.models import ActividadRealizada
+from entrenos.services.carga_diaria_service import actualizar_para_actividades
 from hyrox.models import StravaActivityRaw
 
 
@@ -147,6 +148,9 @@ class Command(BaseCommand):
                     ["carga_ua"],
                     batch_size=500,
                 )
+                actualizar_para_actividades(
+                    [actividad for actividad, _propuesta, _raw in candidatos]
+                )
 
         self._json_line(
             tipo_registro="resumen_apply",
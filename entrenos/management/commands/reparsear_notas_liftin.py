@@ -0,0 +1,49 @@
+"""
+Backfill / reparseo de notas Liftin a SerieNotaLiftin.
+
+Procesa los entrenos con notas que aún no tienen filas o cuyas filas son de
+una versión anterior del parser (VERSION_PARSER).
+
+Uso:
+    python manage.py reparsear_notas_liftin
+    python manage.py reparsear_notas_liftin --cliente 3
+    python manage.py reparsear_notas_liftin --forzar      # todos, aunque estén al día
+    python manage.py reparsear_notas_liftin --dry-run     # solo cuenta pendientes
+"""
+from django.core.management.base import BaseCommand
+
+from entrenos.services import notas_liftin_service
+
+
+class Command(BaseCommand):
+    help = 'Parsea notas_liftin pendientes u obsoletas a filas SerieNotaLiftin'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cliente', type=int, default=None,
+                            help='ID de cliente; si se omite procesa todos')
+        parser.add_argument('--forzar', action='store_true',
+                            help='Reparsea todos los entrenos con notas, no solo los obsoletos')
+        parser.add_argument('--lote', type=int, default=500,
+                            help='Entrenos por transacción (default: 500)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='No escribe nada: solo informa cuántos entrenos están pendientes')
+
+    def handle(self, *args, **options):
+        version = notas_liftin_service.VERSION_PARSER
+        if options['dry_run']:
+            pendientes = notas_liftin_service.pendientes(
+                options['cliente'], options['forzar'],
+            ).values('pk').distinct().count()
+            self.stdout.write(self.style.WARNING(
+                f'\n[DRY-RUN] Parser v{version} | Entrenos pendientes: {pendientes}'
+            ))
+            return
+
+        entrenos, filas = notas_liftin_service.reparsear(
+            cliente_id=options['cliente'],
+            forzar=options['forzar'],
+            lote=options['lote'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'\nParser v{version} | Entrenos: {entrenos} | Filas escritas: {filas}'
+        ))
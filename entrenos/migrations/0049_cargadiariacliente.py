@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 12:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0009_add_hrv_ms_to_bitacora'),
+        ('entrenos', '0048_evaluacionbloquegym'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CargaDiariaCliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('carga', models.FloatField(default=0.0)),
+                ('ctl', models.FloatField(default=0.0)),
+                ('atl', models.FloatField(default=0.0)),
+                ('tsb', models.FloatField(default=0.0)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='carga_diaria', to='clientes.cliente')),
+            ],
+            options={
+                'verbose_name': 'Carga Diaria',
+                'verbose_name_plural': 'Cargas Diarias',
+                'ordering': ['cliente', 'fecha'],
+                'constraints': [models.UniqueConstraint(fields=('cliente', 'fecha'), name='carga_diaria_cliente_fecha_uniq')],
+            },
+        ),
+    ]
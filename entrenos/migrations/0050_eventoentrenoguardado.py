@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 12:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0009_add_hrv_ms_to_bitacora'),
+        ('entrenos', '0049_cargadiariacliente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoEntrenoGuardado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('creado', models.BooleanField(default=False)),
+                ('campos', models.JSONField(blank=True, null=True)),
+                ('marcas', models.JSONField(blank=True, default=list)),
+                ('guardados', models.PositiveIntegerField(default=1)),
+                ('registrado_en', models.DateTimeField(auto_now_add=True)),
+                ('procesado_en', models.DateTimeField(blank=True, null=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos_entreno', to='clientes.cliente')),
+                ('entreno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos_pipeline', to='entrenos.entrenorealizado')),
+            ],
+            options={
+                'verbose_name': 'Evento de Entreno Guardado',
+                'verbose_name_plural': 'Eventos de Entreno Guardado',
+                'ordering': ['registrado_en'],
+                'indexes': [models.Index(fields=['cliente', 'procesado_en'], name='evento_entreno_pendiente_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 13:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0009_add_hrv_ms_to_bitacora'),
+        ('entrenos', '0050_eventoentrenoguardado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SerieNotaLiftin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('orden', models.PositiveSmallIntegerField(default=0)),
+                ('ejercicio', models.CharField(help_text='Nombre tal como aparece en la nota', max_length=200)),
+                ('nombre_normalizado', models.CharField(max_length=200)),
+                ('peso_texto', models.CharField(blank=True, default='', max_length=50)),
+                ('peso_kg', models.FloatField(default=0.0, help_text='0 para peso corporal (PC)')),
+                ('repeticiones_texto', models.CharField(blank=True, default='', max_length=100)),
+                ('series', models.PositiveSmallIntegerField(default=1)),
+                ('repeticiones', models.PositiveSmallIntegerField(default=0, help_text='Promedio por serie')),
+                ('completado', models.BooleanField(default=False)),
+                ('version', models.PositiveSmallIntegerField(default=1)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series_liftin', to='clientes.cliente')),
+                ('entreno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series_liftin', to='entrenos.entrenorealizado')),
+            ],
+            options={
+                'verbose_name': 'Serie de Nota Liftin',
+                'verbose_name_plural': 'Series de Notas Liftin',
+                'ordering': ['entreno', 'orden'],
+                'indexes': [models.Index(fields=['cliente', 'nombre_normalizado', 'fecha'], name='serie_liftin_ejercicio_idx'), models.Index(fields=['cliente', 'fecha'], name='serie_liftin_fecha_idx'), models.Index(fields=['version'], name='serie_liftin_version_idx')],
+            },
+        ),
+    ]
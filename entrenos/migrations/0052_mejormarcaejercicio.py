@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 13:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0009_add_hrv_ms_to_bitacora'),
+        ('entrenos', '0051_serienotaliftin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MejorMarcaEjercicio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ejercicio', models.CharField(help_text='Nombre normalizado (strip + minúsculas)', max_length=100)),
+                ('nombre', models.CharField(help_text='Nombre tal como se registró', max_length=100)),
+                ('movimiento_principal', models.CharField(blank=True, default='', help_text="Sentadilla, Press Banca... ('' si el ejercicio no es un básico)", max_length=50)),
+                ('rm_estimado', models.FloatField(default=0.0)),
+                ('mejor_peso_kg', models.FloatField(default=0.0)),
+                ('mejor_repeticiones', models.PositiveSmallIntegerField(default=0)),
+                ('fecha_mejor', models.DateField(blank=True, null=True)),
+                ('ultima_fecha', models.DateField(blank=True, null=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mejores_marcas', to='clientes.cliente')),
+                ('entreno_mejor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='entrenos.entrenorealizado')),
+            ],
+            options={
+                'verbose_name': 'Mejor Marca por Ejercicio',
+                'verbose_name_plural': 'Mejores Marcas por Ejercicio',
+                'ordering': ['cliente', '-rm_estimado'],
+                'indexes': [models.Index(fields=['cliente', '-rm_estimado'], name='mejor_marca_rm_idx'), models.Index(fields=['cliente', 'movimiento_principal'], name='mejor_marca_movimiento_idx')],
+                'constraints': [models.UniqueConstraint(fields=('cliente', 'ejercicio'), name='mejor_marca_cliente_ejercicio_uniq')],
+            },
+        ),
+    ]
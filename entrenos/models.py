@@ -181,7 +181,7 @@ class EjercicioLiftinDetallado(models.Model):
             if self.repeticiones_max:
                 reps_promedio = (self.repeticiones_min + self.repeticiones_max) / 2
 
-            return self.peso_kg * self.series_realizadas * reps_promedio
+            return float(self.peso_kg) * self.series_realizadas * reps_promedio
         return 0
 
     class Meta:
@@ -190,6 +190,113 @@ class EjercicioLiftinDetallado(models.Model):
         verbose_name_plural = "Ejercicios Detallados de Liftin"
 
 
+class SerieNotaLiftin(models.Model):
+    """
+    Una línea de `EntrenoRealizado.notas_liftin` ya parseada
+    ("✓ Press Banca: 80, 3x8-10" → ejercicio, series, reps, peso).
+
+    Se escribe una sola vez al guardar el entreno
+    (`entrenos.services.notas_liftin_service`) y los lectores de analytics
+    consultan estas filas en lugar de volver a parsear el texto. `version`
+    identifica el parser que las generó: al cambiarlo,
+    `reparsear_notas_liftin` regenera solo las filas obsoletas.
+    """
+
+    entreno = models.ForeignKey(
+        'EntrenoRealizado',
+        on_delete=models.CASCADE,
+        related_name='series_liftin',
+    )
+    # Denormalizados para búsquedas por ejercicio sin join
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name='series_liftin',
+    )
+    fecha = models.DateField()
+
+    orden = models.PositiveSmallIntegerField(default=0)
+    ejercicio = models.CharField(max_length=200, help_text="Nombre tal como aparece en la nota")
+    nombre_normalizado = models.CharField(max_length=200)
+    peso_texto = models.CharField(max_length=50, blank=True, default='')
+    peso_kg = models.FloatField(default=0.0, help_text="0 para peso corporal (PC)")
+    repeticiones_texto = models.CharField(max_length=100, blank=True, default='')
+    series = models.PositiveSmallIntegerField(default=1)
+    repeticiones = models.PositiveSmallIntegerField(default=0, help_text="Promedio por serie")
+    completado = models.BooleanField(default=False)
+    version = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        ordering = ['entreno', 'orden']
+        verbose_name = "Serie de Nota Liftin"
+        verbose_name_plural = "Series de Notas Liftin"
+        indexes = [
+            models.Index(fields=['cliente', 'nombre_normalizado', 'fecha'], name='serie_liftin_ejercicio_idx'),
+            models.Index(fields=['cliente', 'fecha'], name='serie_liftin_fecha_idx'),
+            models.Index(fields=['version'], name='serie_liftin_version_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} {self.nombre_normalizado}: {self.peso_texto}, {self.repeticiones_texto}"
+
+    @property
+    def volumen(self):
+        return self.peso_kg * self.series * self.repeticiones
+
+
+class MejorMarcaEjercicio(models.Model):
+    """
+    Índice materializado por cliente y ejercicio: 1RM estimado (Epley), la
+    serie que lo produjo y la última fecha en que se hizo el ejercicio.
+
+    Se mantiene de forma incremental al escribir `EjercicioRealizado` y
+    `SerieRealizada` (`entrenos.services.mejores_marcas_service`); la página
+    de explicación Helms, el top de levantamientos del dashboard y el sync
+    de RM de Hyrox lo leen en lugar de recorrer todo el histórico.
+    `recalcular_mejores_marcas` lo reconstruye desde cero.
+    """
+
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name='mejores_marcas',
+    )
+    ejercicio = models.CharField(max_length=100, help_text="Nombre normalizado (strip + minúsculas)")
+    nombre = models.CharField(max_length=100, help_text="Nombre tal como se registró")
+    movimiento_principal = models.CharField(
+        max_length=50, blank=True, default='',
+        help_text="Sentadilla, Press Banca... ('' si el ejercicio no es un básico)",
+    )
+
+    rm_estimado = models.FloatField(default=0.0)
+    mejor_peso_kg = models.FloatField(default=0.0)
+    mejor_repeticiones = models.PositiveSmallIntegerField(default=0)
+    fecha_mejor = models.DateField(null=True, blank=True)
+    entreno_mejor = models.ForeignKey(
+        'EntrenoRealizado',
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='+',
+    )
+    ultima_fecha = models.DateField(null=True, blank=True)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['cliente', '-rm_estimado']
+        verbose_name = "Mejor Marca por Ejercicio"
+        verbose_name_plural = "Mejores Marcas por Ejercicio"
+        constraints = [
+            models.UniqueConstraint(fields=['cliente', 'ejercicio'], name='mejor_marca_cliente_ejercicio_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['cliente', '-rm_estimado'], name='mejor_marca_rm_idx'),
+            models.Index(fields=['cliente', 'movimiento_principal'], name='mejor_marca_movimiento_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cliente_id} {self.ejercicio}: {self.rm_estimado:.1f} kg"
+
+
 class EjercicioBaseObsoleto(models.Model):
     nombre = models.CharField(max_length=100, unique=True)
     grupo_muscular = models.CharField(
@@ -1190,6 +1297,85 @@ class ActividadRealizada(models.Model):
         super().save(*args, **kwargs)
 
 
+class CargaDiariaCliente(models.Model):
+    """
+    Libro diario de carga por cliente: una fila por día desde la primera
+    ActividadRealizada con carga hasta la última. Guarda la carga del día
+    (sRPE / 10, misma escala que TRIMP) y el estado EWMA CTL/ATL/TSB tras
+    aplicarla, de modo que leer la forma del atleta es O(1) filas.
+
+    Lo mantiene `entrenos.services.carga_diaria_service` de forma incremental
+    desde las señales de ActividadRealizada; `reconstruir_carga_diaria` lo
+    rehace desde cero y verifica contra el cálculo completo.
+    """
+
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name='carga_diaria',
+    )
+    fecha = models.DateField()
+    carga = models.FloatField(default=0.0)
+    ctl = models.FloatField(default=0.0)
+    atl = models.FloatField(default=0.0)
+    tsb = models.FloatField(default=0.0)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Carga Diaria"
+        verbose_name_plural = "Cargas Diarias"
+        ordering = ['cliente', 'fecha']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cliente', 'fecha'], name='carga_diaria_cliente_fecha_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.cliente_id} {self.fecha}: CTL {self.ctl:.1f} / ATL {self.atl:.1f}"
+
+
+class EventoEntrenoGuardado(models.Model):
+    """
+    "Entreno guardado" pendiente de procesar por el pipeline diferido
+    (`entrenos.services.pipeline_entreno`). Una fila pendiente por entreno:
+    los guardados repetidos antes de que el worker la procese se fusionan
+    en ella (creado OR, campos unidos) en lugar de encolar trabajo nuevo.
+    """
+
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name='eventos_entreno',
+    )
+    entreno = models.ForeignKey(
+        EntrenoRealizado,
+        on_delete=models.CASCADE,
+        related_name='eventos_pipeline',
+    )
+    creado = models.BooleanField(default=False)
+    # update_fields de los save() fusionados; None = algún save completo
+    campos = models.JSONField(null=True, blank=True)
+    # Marcas _defer_* que el guardado puso en la instancia (p.ej. cierre
+    # de aprendizaje gestionado por la vista)
+    marcas = models.JSONField(default=list, blank=True)
+    guardados = models.PositiveIntegerField(default=1)
+    registrado_en = models.DateTimeField(auto_now_add=True)
+    procesado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Evento de Entreno Guardado"
+        verbose_name_plural = "Eventos de Entreno Guardado"
+        ordering = ['registrado_en']
+        indexes = [
+            models.Index(fields=['cliente', 'procesado_en'], name='evento_entreno_pendiente_idx'),
+        ]
+
+    def __str__(self):
+        estado = 'procesado' if self.procesado_en else 'pendiente'
+        return f"Entreno {self.entreno_id} ({self.guardados} guardados, {estado})"
+
+
 class GymDecisionLog(models.Model):
     MOTIVO_CODIGO_CHOICES = [
         ('', 'Sin clasificar'),
@@ -9,7 +9,8 @@ from datetime import date, timedelta
 _NIVEL_ORDEN = {'critico': 0, 'alerta': 1, 'info': 2, 'positivo': 3}
 
 
-def get_alertas_sistema(cliente):
+def get_alertas_sistema(cliente, contexto=None):
+    """`contexto` (ContextoCliente): lesión y objetivo Hyrox ya cargados en la request."""
     alertas = []
     hoy = date.today()
     hace_21 = hoy - timedelta(days=21)
@@ -18,7 +19,10 @@ def get_alertas_sistema(cliente):
     # ── 1. LESIÓN ACTIVA ─────────────────────────────────────────────────────
     try:
         from hyrox.models import UserInjury
-        lesion = UserInjury.objects.filter(cliente=cliente, activa=True).first()
+        if contexto is not None:
+            lesion = contexto.lesion_activa
+        else:
+            lesion = UserInjury.objects.filter(cliente=cliente, activa=True).first()
         if lesion:
             from django.urls import reverse
             alertas.append({
@@ -113,7 +117,10 @@ def get_alertas_sistema(cliente):
     try:
         from hyrox.models import HyroxObjective, HyroxActivity
         from hyrox.training_engine import StagnationEngine
-        obj = HyroxObjective.objects.filter(cliente=cliente, estado='activo').first()
+        if contexto is not None:
+            obj = contexto.objetivo_hyrox('activo')
+        else:
+            obj = HyroxObjective.objects.filter(cliente=cliente, estado='activo').first()
         if obj:
             _NOMBRE_CANON = {
                 'skierg': 'SkiErg', 'sled push': 'Sled Push', 'sled pull': 'Sled Pull',
@@ -156,7 +163,10 @@ def get_alertas_sistema(cliente):
     try:
         from hyrox.models import HyroxObjective
         from hyrox.training_engine import RPECalibrator
-        obj = HyroxObjective.objects.filter(cliente=cliente, estado='activo').first()
+        if contexto is not None:
+            obj = contexto.objetivo_hyrox('activo')
+        else:
+            obj = HyroxObjective.objects.filter(cliente=cliente, estado='activo').first()
         if obj:
             bias_info = RPECalibrator.get_bias(obj)
             if bias_info['nivel'] == 'severo':
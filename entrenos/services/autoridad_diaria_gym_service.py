@@ -80,11 +80,12 @@ def _snapshot_fisico_no_disponible(cliente, fecha) -> dict:
     }
 
 
-def _construir_snapshot_fisico(cliente, fecha):
+def _construir_snapshot_fisico(cliente, fecha, contexto=None):
+    extra = {'contexto': contexto} if contexto is not None else {}
     try:
         from core.services.physical_snapshot import build_physical_snapshot
 
-        snapshot = build_physical_snapshot(cliente, fecha)
+        snapshot = build_physical_snapshot(cliente, fecha, **extra)
     except Exception:
         snapshot = _snapshot_fisico_no_disponible(cliente, fecha)
     return deepcopy(snapshot), snapshot.get('fingerprint') or _fingerprint_snapshot_fisico(snapshot)
@@ -288,15 +289,22 @@ def resolver_autoridad_diaria_gym(
     physical_snapshot=None,
     force_refresh=False,
     allow_rehab_contract_upgrade=False,
+    contexto=None,
 ) -> dict:
-    """Devuelve la única decisión Gym preparada para presentar y ejecutar."""
+    """
+    Devuelve la única decisión Gym preparada para presentar y ejecutar.
+
+    `contexto` (ContextoCliente de la request) evita recargar lesiones,
+    objetivo y check-in en el snapshot y en la sesión recomendada.
+    """
     from entrenos.services.sesion_recomendada import obtener_sesion_recomendada_hoy
 
     fecha = fecha or timezone.localdate()
+    extra = {'contexto': contexto} if contexto is not None else {}
     if physical_snapshot is None:
         # Se recaptura en cada resolución para que un check-in/readiness recién
         # guardado pueda cambiar la decisión y, por tanto, su cache key ejecutiva.
-        physical_snapshot, huella_fisica = _construir_snapshot_fisico(cliente, fecha)
+        physical_snapshot, huella_fisica = _construir_snapshot_fisico(cliente, fecha, **extra)
     else:
         physical_snapshot = deepcopy(physical_snapshot)
         huella_fisica = physical_snapshot.get('fingerprint') or _fingerprint_snapshot_fisico(
@@ -306,6 +314,7 @@ def resolver_autoridad_diaria_gym(
         cliente,
         fecha,
         physical_snapshot=physical_snapshot,
+        **({'contexto_cliente': contexto} if contexto is not None else {}),
     )
     huella = _fingerprint(decision_base, fecha)
     cache_key = f'autoridad_diaria_gym_v{SCHEMA_VERSION}_{cliente.pk}_{fecha.isoformat()}_{huella}'
@@ -0,0 +1,258 @@
+"""
+Libro diario de carga (CTL/ATL/TSB) mantenido de forma incremental.
+
+`HyroxLoadManager.calcular_ctl_atl_tsb` recorría todo el historial de
+ActividadRealizada y repetía el EWMA 42/7 días en cada llamada. Este servicio
+persiste el estado EWMA día a día en `CargaDiariaCliente`:
+
+- Escritura: un cambio en la actividad del día D solo reescribe las filas
+  >= D, partiendo del estado guardado en D-1.
+- Lectura: una fila (la última <= fecha pedida) más el decaimiento de los
+  días sin carga posteriores, que no requiere base de datos.
+
+`calcular_desde_cero` conserva el cálculo completo original como referencia
+para la verificación de consistencia del comando `reconstruir_carga_diaria`.
+"""
+import logging
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from core.services import motor_carga
+from core.services.motor_carga import K_ATL, K_CTL
+from entrenos.models import ActividadRealizada, CargaDiariaCliente
+
+logger = logging.getLogger(__name__)
+
+# sRPE /10 → escala comparable a TRIMP (mantiene thresholds TSB intactos)
+ESCALA_CARGA_UA = 10
+
+
+def _paso_ewma(ctl, atl, carga):
+    ctl = ctl + (carga - ctl) * K_CTL
+    atl = atl + (carga - atl) * K_ATL
+    return ctl, atl
+
+
+def _cargas_por_dia(filas):
+    carga_por_dia = {}
+    for fecha, carga_ua in filas:
+        carga_por_dia[fecha] = carga_por_dia.get(fecha, 0) + float(carga_ua) / ESCALA_CARGA_UA
+    return carga_por_dia
+
+
+def _redondear(ctl, atl):
+    return {'ctl': round(ctl, 1), 'atl': round(atl, 1), 'tsb': round(ctl - atl, 1)}
+
+
+def actualizar_desde(cliente_id, fecha=None):
+    """
+    Reescribe el libro del cliente a partir de `fecha` (incluida).
+
+    Si no hay fila anterior a `fecha` (o `fecha` es None) se reconstruye todo
+    el libro desde la primera actividad con carga. Devuelve el número de
+    filas escritas.
+    """
+    with transaction.atomic():
+        previa = None
+        if fecha is not None:
+            previa = (
+                CargaDiariaCliente.objects
+                .filter(cliente_id=cliente_id, fecha__lt=fecha)
+                .order_by('-fecha')
+                .first()
+            )
+
+        actividades = ActividadRealizada.objects.filter(
+            cliente_id=cliente_id, carga_ua__isnull=False,
+        )
+        obsoletas = CargaDiariaCliente.objects.filter(cliente_id=cliente_id)
+        if previa is not None:
+            actividades = actividades.filter(fecha__gt=previa.fecha)
+            obsoletas = obsoletas.filter(fecha__gt=previa.fecha)
+
+        filas = list(actividades.order_by('fecha').values_list('fecha', 'carga_ua'))
+        obsoletas.delete()
+        if not filas:
+            if previa is not None:
+                # Se borró la última actividad: el libro termina en la anterior
+                ultima = (
+                    ActividadRealizada.objects
+                    .filter(cliente_id=cliente_id, carga_ua__isnull=False)
+                    .order_by('-fecha')
+                    .values_list('fecha', flat=True)
+                    .first()
+                )
+                sobrantes = CargaDiariaCliente.objects.filter(cliente_id=cliente_id)
+                if ultima is not None:
+                    sobrantes = sobrantes.filter(fecha__gt=ultima)
+                sobrantes.delete()
+            return 0
+
+        carga_por_dia = _cargas_por_dia(filas)
+        if previa is not None:
+            ctl, atl = previa.ctl, previa.atl
+            cursor = previa.fecha + timedelta(days=1)
+        else:
+            ctl = atl = 0.0
+            cursor = filas[0][0]
+        hasta = filas[-1][0]
+
+        nuevas = []
+        while cursor <= hasta:
+            carga = carga_por_dia.get(cursor, 0)
+            ctl, atl = _paso_ewma(ctl, atl, carga)
+            nuevas.append(CargaDiariaCliente(
+                cliente_id=cliente_id, fecha=cursor,
+                carga=carga, ctl=ctl, atl=atl, tsb=ctl - atl,
+            ))
+            cursor += timedelta(days=1)
+
+        CargaDiariaCliente.objects.bulk_create(nuevas, batch_size=500)
+        return len(nuevas)
+
+
+def actualizar_seguro(cliente_id, fecha=None):
+    """Variante para señales y vistas: nunca propaga errores al guardado."""
+    try:
+        return actualizar_desde(cliente_id, fecha)
+    except Exception as e:
+        logger.warning('carga_diaria: no se pudo actualizar cliente=%s desde %s: %s',
+                       cliente_id, fecha, e)
+        return 0
+
+
+def actualizar_para_actividades(actividades):
+    """
+    Tras escrituras que no disparan señales (bulk_update / update), reescribe
+    el libro de cada cliente afectado desde su fecha más antigua tocada.
+    """
+    desde_por_cliente = {}
+    for actividad in actividades:
+        previa = desde_por_cliente.get(actividad.cliente_id)
+        if previa is None or actividad.fecha < previa:
+            desde_por_cliente[actividad.cliente_id] = actividad.fecha
+    for cliente_id, desde in desde_por_cliente.items():
+        actualizar_desde(cliente_id, desde)
+    return len(desde_por_cliente)
+
+
+def estado_en(cliente_id, hasta_fecha=None):
+    """
+    CTL/ATL/TSB del cliente a `hasta_fecha` leyendo una sola fila del libro.
+
+    Devuelve None si el libro no tiene filas <= hasta_fecha (sin carga en el
+    hub o libro aún sin construir); el llamador decide el fallback.
+    """
+    if hasta_fecha is None:
+        hasta_fecha = timezone.now().date()
+
+    fila = (
+        CargaDiariaCliente.objects
+        .filter(cliente_id=cliente_id, fecha__lte=hasta_fecha)
+        .order_by('-fecha')
+        .values_list('fecha', 'ctl', 'atl')
+        .first()
+    )
+    if fila is None:
+        return None
+
+    fecha, ctl, atl = fila
+    # Días posteriores sin carga: mismo paso EWMA con carga 0
+    for _ in range((hasta_fecha - fecha).days):
+        ctl, atl = _paso_ewma(ctl, atl, 0)
+    return _redondear(ctl, atl)
+
+
+def serie_en(cliente_id, desde, hasta):
+    """
+    CTL y ATL del cliente para cada día de [desde, hasta] con una consulta:
+    las últimas filas del libro <= hasta, el decaimiento sin carga tras la
+    última fila y 0 antes de la primera actividad. Devuelve (ctl, atl) como
+    arrays en la escala del libro (sRPE / ESCALA_CARGA_UA).
+    """
+    dias = (hasta - desde).days + 1
+    ctl = np.zeros(max(dias, 0))
+    atl = np.zeros(max(dias, 0))
+    if dias <= 0:
+        return ctl, atl
+
+    filas = list(
+        CargaDiariaCliente.objects
+        .filter(cliente_id=cliente_id, fecha__lte=hasta)
+        .order_by('-fecha')
+        .values_list('fecha', 'ctl', 'atl')[:dias]
+    )
+    if not filas:
+        return ctl, atl
+
+    fecha_ultima, ctl_ultimo, atl_ultimo = filas[0]
+    for fecha, ctl_dia, atl_dia in filas:
+        i = (fecha - desde).days
+        if i >= 0:
+            ctl[i], atl[i] = ctl_dia, atl_dia
+
+    # Días posteriores sin carga: el paso EWMA con carga 0 es (1 - k) por día
+    inicio = max((fecha_ultima - desde).days + 1, 0)
+    if inicio < dias:
+        transcurridos = np.arange(inicio, dias) - (fecha_ultima - desde).days
+        ctl[inicio:] = ctl_ultimo * (1 - K_CTL) ** transcurridos
+        atl[inicio:] = atl_ultimo * (1 - K_ATL) ** transcurridos
+    return ctl, atl
+
+
+def primera_fecha(cliente_id):
+    """Fecha de la primera fila del libro (= primera actividad con carga)."""
+    return (
+        CargaDiariaCliente.objects
+        .filter(cliente_id=cliente_id)
+        .order_by('fecha')
+        .values_list('fecha', flat=True)
+        .first()
+    )
+
+
+def calcular_desde_cero(cliente_id, hasta_fecha=None):
+    """EWMA completo sobre el historial del hub (cálculo de referencia)."""
+    if hasta_fecha is None:
+        hasta_fecha = timezone.now().date()
+
+    filas = list(
+        ActividadRealizada.objects.filter(
+            cliente_id=cliente_id,
+            carga_ua__isnull=False,
+            fecha__lte=hasta_fecha,
+        ).order_by('fecha').values_list('fecha', 'carga_ua')
+    )
+    if not filas:
+        return None
+
+    cargas = motor_carga.serie_diaria(
+        ((fecha, float(carga_ua) / ESCALA_CARGA_UA) for fecha, carga_ua in filas),
+        filas[0][0], hasta_fecha,
+    )
+    ctl, atl, _tsb = motor_carga.ctl_atl_tsb(cargas)
+    return _redondear(float(ctl[-1]), float(atl[-1]))
+
+
+def verificar(cliente_id, hasta_fecha=None, tolerancia=0.1):
+    """
+    Compara el libro con el cálculo completo. Devuelve un dict con ambos
+    estados y `consistente` (diferencia <= tolerancia en CTL, ATL y TSB).
+    """
+    libro = estado_en(cliente_id, hasta_fecha)
+    referencia = calcular_desde_cero(cliente_id, hasta_fecha)
+    if libro is None or referencia is None:
+        consistente = libro is None and referencia is None
+    else:
+        consistente = all(
+            abs(libro[k] - referencia[k]) <= tolerancia for k in ('ctl', 'atl', 'tsb')
+        )
+    return {
+        'cliente_id': cliente_id,
+        'libro': libro,
+        'referencia': referencia,
+        'consistente': consistente,
+    }
@@ -0,0 +1,203 @@
+"""
+Exportación de entrenos Liftin en streaming.
+
+Las exportaciones montaban la respuesta entera en memoria (`json.dumps` de
+una lista con todo el histórico, o un `csv.writer` sobre un HttpResponse) y
+cada fila leía `entreno.cliente` y `entreno.rutina` con dos queries más.
+Aquí cada formato es un generador de trozos de texto que la vista entrega
+con `StreamingHttpResponse`:
+
+- El queryset lleva `select_related('cliente', 'rutina')` y se recorre con
+  `iterator(chunk_size=...)`; con ejercicios, el prefetch se hace por bloque.
+- Formatos: 'csv', 'json' (array, mismas claves que antes), 'jsonl' (un
+  entreno por línea, importable con `importar_liftin`) y 'columnar' (JSONL
+  por bloques: una cabecera con las columnas y luego una línea por bloque
+  con una lista de valores por columna).
+
+La memoria usada depende del tamaño de bloque, no del histórico.
+"""
+import csv
+import json
+
+from django.db.models import Prefetch
+
+from entrenos.models import EjercicioLiftinDetallado, EntrenoRealizado
+
+TAMANO_BLOQUE = 500
+
+FORMATOS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'json': ('application/json', 'json'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'columnar': ('application/x-ndjson', 'columnar.jsonl'),
+}
+
+COLUMNAS = (
+    'id', 'fecha', 'cliente_id', 'cliente', 'rutina', 'fuente_datos',
+    'hora_inicio', 'hora_fin', 'duracion_minutos', 'numero_ejercicios',
+    'volumen_total_kg', 'calorias_quemadas', 'frecuencia_cardiaca_promedio',
+    'frecuencia_cardiaca_maxima', 'liftin_workout_id', 'notas_liftin',
+)
+
+CABECERA_CSV = [
+    'Fecha', 'Cliente', 'Rutina', 'Fuente', 'Hora Inicio', 'Hora Fin',
+    'Duración (min)', 'Ejercicios', 'Volumen (kg)', 'Calorías',
+    'FC Promedio', 'FC Máxima', 'Notas',
+]
+
+
+def entrenos_a_exportar(fuentes=('liftin',), cliente_id=None, desde=None, hasta=None):
+    """Entrenos a exportar, del más reciente al más antiguo."""
+    entrenos = EntrenoRealizado.objects.all()
+    if fuentes:
+        entrenos = entrenos.filter(fuente_datos__in=fuentes)
+    if cliente_id:
+        entrenos = entrenos.filter(cliente_id=cliente_id)
+    if desde:
+        entrenos = entrenos.filter(fecha__gte=desde)
+    if hasta:
+        entrenos = entrenos.filter(fecha__lte=hasta)
+    return entrenos.order_by('-fecha', '-id')
+
+
+def _recorrer(entrenos, con_ejercicios, bloque):
+    entrenos = entrenos.select_related('cliente', 'rutina')
+    if con_ejercicios:
+        entrenos = entrenos.prefetch_related(Prefetch(
+            'ejercicios_liftin_detallados',
+            queryset=EjercicioLiftinDetallado.objects.order_by('orden_ejercicio', 'id'),
+        ))
+    return entrenos.iterator(chunk_size=bloque)
+
+
+def _texto(valor):
+    """Número sin ceros sobrantes ("80" y no "80.00")."""
+    if valor is None:
+        return None
+    return f'{float(valor):g}'
+
+
+def _ejercicio(ej):
+    repeticiones = ej.repeticiones_formateado
+    if not repeticiones and ej.repeticiones_min:
+        repeticiones = f'{ej.series_realizadas}x{ej.repeticiones_min}'
+        if ej.repeticiones_max and ej.repeticiones_max != ej.repeticiones_min:
+            repeticiones += f'-{ej.repeticiones_max}'
+    return {
+        'nombre': ej.nombre_ejercicio,
+        'peso_formateado': ej.peso_formateado or _texto(ej.peso_kg),
+        'repeticiones_formateado': repeticiones,
+        'estado': ej.estado_liftin,
+        'orden': ej.orden_ejercicio,
+    }
+
+
+def registro(entreno, con_ejercicios=False):
+    """Entreno → dict exportable (claves de la exportación JSON original)."""
+    datos = {
+        'id': entreno.id,
+        'fecha': entreno.fecha.isoformat(),
+        'cliente_id': entreno.cliente_id,
+        'cliente': entreno.cliente.nombre,
+        'rutina': entreno.nombre_rutina_liftin or entreno.rutina.nombre,
+        'fuente_datos': entreno.fuente_datos,
+        'hora_inicio': entreno.hora_inicio.isoformat() if entreno.hora_inicio else None,
+        'hora_fin': entreno.hora_fin.isoformat() if entreno.hora_fin else None,
+        'duracion_minutos': entreno.duracion_minutos,
+        'numero_ejercicios': entreno.numero_ejercicios,
+        'volumen_total_kg': float(entreno.volumen_total_kg) if entreno.volumen_total_kg else None,
+        # No es columna del modelo: el formulario lo rellenaba con el mismo volumen
+        'volumen_total_formateado': _texto(entreno.volumen_total_kg),
+        'calorias_quemadas': entreno.calorias_quemadas,
+        'frecuencia_cardiaca_promedio': entreno.frecuencia_cardiaca_promedio,
+        'frecuencia_cardiaca_maxima': entreno.frecuencia_cardiaca_maxima,
+        'liftin_workout_id': entreno.liftin_workout_id,
+        'notas_liftin': entreno.notas_liftin,
+    }
+    if con_ejercicios:
+        datos['ejercicios'] = [_ejercicio(ej) for ej in entreno.ejercicios_liftin_detallados.all()]
+    return datos
+
+
+class _Eco:
+    """Pseudo-fichero para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def exportar_csv(entrenos, con_ejercicios=False, bloque=TAMANO_BLOQUE):
+    writer = csv.writer(_Eco())
+    cabecera = CABECERA_CSV + (['Ejercicios Detallados'] if con_ejercicios else [])
+    yield writer.writerow(cabecera)
+    for entreno in _recorrer(entrenos, con_ejercicios, bloque):
+        fila = [
+            entreno.fecha,
+            entreno.cliente.nombre,
+            entreno.nombre_rutina_liftin or entreno.rutina.nombre,
+            entreno.get_fuente_datos_display(),
+            entreno.hora_inicio or '',
+            entreno.hora_fin or '',
+            entreno.duracion_minutos or '',
+            entreno.numero_ejercicios or '',
+            entreno.volumen_total_kg or '',
+            entreno.calorias_quemadas or '',
+            entreno.frecuencia_cardiaca_promedio or '',
+            entreno.frecuencia_cardiaca_maxima or '',
+            entreno.notas_liftin or '',
+        ]
+        if con_ejercicios:
+            fila.append(' | '.join(
+                f"{e['nombre']}: {e['peso_formateado'] or ''}, {e['repeticiones_formateado'] or ''}"
+                for e in map(_ejercicio, entreno.ejercicios_liftin_detallados.all())
+            ))
+        yield writer.writerow(fila)
+
+
+def exportar_json(entrenos, con_ejercicios=False, bloque=TAMANO_BLOQUE):
+    """Array JSON escrito elemento a elemento."""
+    separador = '[\n'
+    for entreno in _recorrer(entrenos, con_ejercicios, bloque):
+        yield separador + json.dumps(registro(entreno, con_ejercicios), ensure_ascii=False)
+        separador = ',\n'
+    yield '[]\n' if separador == '[\n' else '\n]\n'
+
+
+def exportar_jsonl(entrenos, con_ejercicios=False, bloque=TAMANO_BLOQUE):
+    for entreno in _recorrer(entrenos, con_ejercicios, bloque):
+        yield json.dumps(registro(entreno, con_ejercicios), ensure_ascii=False) + '\n'
+
+
+def exportar_columnar(entrenos, con_ejercicios=False, bloque=TAMANO_BLOQUE):
+    """
+    Cabecera {"columnas": [...]} y después una línea por bloque
+    {"n": filas, "valores": [[columna 0], [columna 1], ...]}. Sin ejercicios:
+    el formato es para análisis tabular.
+    """
+    yield json.dumps({'formato': 'columnar', 'version': 1, 'columnas': COLUMNAS}) + '\n'
+    valores = [[] for _ in COLUMNAS]
+    n = 0
+    for entreno in _recorrer(entrenos, False, bloque):
+        datos = registro(entreno)
+        for columna, destino in zip(COLUMNAS, valores):
+            destino.append(datos[columna])
+        n += 1
+        if n == bloque:
+            yield json.dumps({'n': n, 'valores': valores}, ensure_ascii=False) + '\n'
+            valores = [[] for _ in COLUMNAS]
+            n = 0
+    if n:
+        yield json.dumps({'n': n, 'valores': valores}, ensure_ascii=False) + '\n'
+
+
+GENERADORES = {
+    'csv': exportar_csv,
+    'json': exportar_json,
+    'jsonl': exportar_jsonl,
+    'columnar': exportar_columnar,
+}
+
+
+def exportar(formato, entrenos, con_ejercicios=False, bloque=TAMANO_BLOQUE):
+    """Generador de trozos de texto del formato pedido."""
+    return GENERADORES[formato](entrenos, con_ejercicios=con_ejercicios, bloque=bloque)
@@ -21,6 +21,8 @@ import logging
 from django.core.cache import cache
 from django.utils import timezone
 
+from core.services import cache_cliente
+
 logger = logging.getLogger(__name__)
 
 # ── Sincronización de RM ──────────────────────────────────────────────────────
@@ -47,7 +49,7 @@ def sync_rm_to_hyrox(objetivo, campo: str, nuevo_valor: float) -> bool:
 
     # Invalidar caché — ambos signals deben dejar el sistema en estado consistente
     cache.delete(f'hyrox_readiness_{objetivo.pk}')
-    cache.delete(f'dashboard_acwr_unificado_{objetivo.cliente_id}')
+    cache_cliente.invalidar_cliente(objetivo.cliente_id)
 
     logger.info(
         '[hyrox_bridge] RM actualizado: cliente=%s campo=%s anterior=%.1f nuevo=%.1f',
@@ -0,0 +1,645 @@
+"""
+Importación masiva de entrenos Liftin (backfill histórico).
+
+`importar_liftin_completo` crea un entreno por POST: `create` del entreno,
+un `create` por ejercicio y un `save` final, y cada escritura dispara la
+cadena completa de post_save (notas parseadas, ejercicios detallados, hub
+ActividadRealizada, libro de carga, índice de marcas, pipeline, logros).
+Para cargar el histórico de un cliente eso son miles de señales.
+
+Este servicio importa un fichero entero:
+
+1. Validación en streaming: se recorre el fichero sin cargarlo en memoria
+   (JSONL, o el array JSON de `exportar_json_liftin`) y se acumulan los
+   errores con su posición. Si hay alguno no se escribe nada.
+2. Escritura por lotes: cada lote de `lote` registros va en una transacción
+   con `bulk_create` de EntrenoRealizado, EjercicioRealizado,
+   SerieNotaLiftin, EjercicioLiftinDetallado y ActividadRealizada.
+   `bulk_create` no emite post_save, así que no hay señales por fila.
+3. Recálculo por cliente afectado, una vez: libro de carga desde la fecha
+   más antigua importada, índice de mejores marcas, métricas de analytics,
+   logros de Liftin y caché del dashboard.
+
+Formato de cada registro (las claves de `exportar_json_liftin`):
+
+    {"cliente_id": 3 | "cliente": "Nombre", "fecha": "2025-01-31",
+     "rutina": "Torso A", "hora_inicio": "18:30", "duracion_minutos": 62,
+     "calorias_quemadas": 410, "volumen_total_kg": 5230.5,
+     "liftin_workout_id": "...", "notas_liftin": "...",
+     "ejercicios": [{"nombre": "Press Banca", "peso": "80",
+                     "repeticiones": "3x8", "estado": "completado"}]}
+
+Con `cliente` fijado (comando `--cliente`) se ignora el del registro. Se
+omiten los entrenos ya importados (mismo `liftin_workout_id`, o misma
+fecha y hora de inicio).
+"""
+import json
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from entrenos.models import (
+    ActividadRealizada,
+    EjercicioLiftinDetallado,
+    EjercicioRealizado,
+    EntrenoRealizado,
+    SerieNotaLiftin,
+)
+from entrenos.services import carga_diaria_service, mejores_marcas_service, notas_liftin_service
+from entrenos.utils.utils import parse_reps_and_series
+
+logger = logging.getLogger(__name__)
+
+SIMBOLO_ESTADO = {'completado': '✓', 'fallado': '✗', 'nuevo': 'N'}
+MAX_ERRORES = 50
+_BLOQUE_LECTURA = 64 * 1024
+
+
+class RegistroLiftinInvalido(ValueError):
+    pass
+
+
+@dataclass
+class ResumenImportacion:
+    registros: int = 0
+    entrenos: int = 0
+    ejercicios: int = 0
+    series_notas: int = 0
+    detallados: int = 0
+    actividades: int = 0
+    duplicados: int = 0
+    clientes: int = 0
+    segundos: float = 0.0
+    errores: list = field(default_factory=list)
+
+    @property
+    def filas(self):
+        return (self.entrenos + self.ejercicios + self.series_notas
+                + self.detallados + self.actividades)
+
+    @property
+    def filas_por_segundo(self):
+        return round(self.filas / self.segundos, 1) if self.segundos else 0.0
+
+
+# ── Lectura en streaming ──────────────────────────────────────────────────
+
+def _objetos_de_array(fichero):
+    """Objetos de un array JSON leído por bloques (sin json.load del fichero)."""
+    decoder = json.JSONDecoder()
+    buffer, agotado = '', False
+    while True:
+        buffer = buffer.lstrip(' \t\r\n,')
+        if buffer.startswith(']'):
+            return
+        if buffer:
+            try:
+                objeto, fin = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if agotado:
+                    raise
+            else:
+                yield objeto
+                buffer = buffer[fin:]
+                continue
+        if agotado:
+            raise json.JSONDecodeError('Array JSON sin cerrar', buffer, 0)
+        leido = fichero.read(_BLOQUE_LECTURA)
+        agotado = not leido
+        buffer += leido
+
+
+def leer_registros(ruta):
+    """
+    Genera (posición, registro) del fichero. La posición es la línea en
+    JSONL y el índice (desde 1) en un array JSON. Una línea que no es JSON
+    produce (posición, RegistroLiftinInvalido) en lugar de cortar la lectura.
+    """
+    with open(ruta, encoding='utf-8-sig') as fichero:
+        primero = ''
+        while not primero:
+            caracter = fichero.read(1)
+            if not caracter:
+                return
+            primero = caracter.strip()
+
+        if primero == '[':
+            try:
+                for posicion, objeto in enumerate(_objetos_de_array(fichero), start=1):
+                    yield posicion, objeto
+            except json.JSONDecodeError as e:
+                yield 0, RegistroLiftinInvalido(f'JSON inválido: {e.msg}')
+            return
+
+        for numero, linea in enumerate(_lineas(primero, fichero), start=1):
+            if not linea.strip():
+                continue
+            try:
+                yield numero, json.loads(linea)
+            except json.JSONDecodeError as e:
+                yield numero, RegistroLiftinInvalido(f'JSON inválido: {e.msg}')
+
+
+def _lineas(primero, fichero):
+    yield primero + fichero.readline()
+    yield from fichero
+
+
+# ── Validación ────────────────────────────────────────────────────────────
+
+def _entero(registro, clave):
+    valor = registro.get(clave)
+    if valor in (None, ''):
+        return None
+    try:
+        valor = int(float(valor))
+    except (TypeError, ValueError):
+        raise RegistroLiftinInvalido(f'{clave} no es numérico: {valor!r}')
+    if valor < 0:
+        raise RegistroLiftinInvalido(f'{clave} negativo: {valor}')
+    return valor
+
+
+def _peso_kg(texto):
+    """Primer número del peso ("80", "80,5 kg", "PC") o 0."""
+    try:
+        return float(str(texto).replace(',', '.').split()[0])
+    except (IndexError, ValueError):
+        return 0.0
+
+
+def _ejercicios(registro):
+    ejercicios = []
+    for orden, ej in enumerate(registro.get('ejercicios') or [], start=1):
+        if not isinstance(ej, dict) or not str(ej.get('nombre') or '').strip():
+            raise RegistroLiftinInvalido(f'ejercicio {orden} sin nombre')
+        estado = ej.get('estado') or 'completado'
+        if estado not in SIMBOLO_ESTADO and estado != 'parcial':
+            raise RegistroLiftinInvalido(f'ejercicio {orden}: estado desconocido {estado!r}')
+        peso = str(ej.get('peso', ej.get('peso_formateado')) or '').strip()
+        repeticiones = str(ej.get('repeticiones', ej.get('repeticiones_formateado')) or '').strip()
+        rpe = _entero(ej, 'rpe')
+        if rpe is not None and not 1 <= rpe <= 10:
+            raise RegistroLiftinInvalido(f'ejercicio {orden}: rpe fuera de rango ({rpe})')
+        ejercicios.append({
+            'nombre': str(ej['nombre']).strip(),
+            'peso': peso,
+            'repeticiones': repeticiones,
+            'estado': estado,
+            'orden': _entero(ej, 'orden') or orden,
+            'rpe': rpe,
+        })
+    return ejercicios
+
+
+def _notas(ejercicios):
+    """Mismo texto que arma importar_liftin_completo ("✓ nombre: peso, reps")."""
+    lineas = ['Ejercicios Detallados:']
+    for ej in ejercicios:
+        linea = f"{SIMBOLO_ESTADO.get(ej['estado'], '')} {ej['nombre']}".strip()
+        if ej['peso']:
+            linea += f": {ej['peso']}"
+        if ej['repeticiones']:
+            linea += f", {ej['repeticiones']}"
+        lineas.append(linea)
+    return '\n'.join(lineas)
+
+
+class _ResolutorClientes:
+    """id o nombre de cliente → id, con una sola query por tipo."""
+
+    def __init__(self, cliente_fijo=None):
+        self.cliente_fijo = cliente_fijo
+        self._ids = None
+        self._por_nombre = None
+
+    def _cargar(self):
+        from clientes.models import Cliente
+
+        self._ids, self._por_nombre = set(), {}
+        for pk, nombre in Cliente.objects.values_list('pk', 'nombre'):
+            self._ids.add(pk)
+            self._por_nombre.setdefault(nombre.strip().lower(), []).append(pk)
+
+    def resolver(self, registro):
+        if self.cliente_fijo is not None:
+            return self.cliente_fijo
+        if self._ids is None:
+            self._cargar()
+        if registro.get('cliente_id') not in (None, ''):
+            try:
+                cliente_id = int(registro['cliente_id'])
+            except (TypeError, ValueError):
+                raise RegistroLiftinInvalido(f"cliente_id inválido: {registro['cliente_id']!r}")
+            if cliente_id not in self._ids:
+                raise RegistroLiftinInvalido(f'cliente {cliente_id} no existe')
+            return cliente_id
+        nombre = str(registro.get('cliente') or '').strip()
+        if not nombre:
+            raise RegistroLiftinInvalido('falta cliente_id o cliente')
+        candidatos = self._por_nombre.get(nombre.lower(), [])
+        if len(candidatos) != 1:
+            motivo = 'no existe' if not candidatos else 'es ambiguo'
+            raise RegistroLiftinInvalido(f'cliente {nombre!r} {motivo}; usa cliente_id')
+        return candidatos[0]
+
+
+def validar(registro, clientes):
+    """Registro del fichero → dict normalizado. Lanza RegistroLiftinInvalido."""
+    if isinstance(registro, RegistroLiftinInvalido):
+        raise registro
+    if not isinstance(registro, dict):
+        raise RegistroLiftinInvalido('el registro no es un objeto JSON')
+    try:
+        fecha = date.fromisoformat(str(registro.get('fecha'))[:10])
+    except ValueError:
+        raise RegistroLiftinInvalido(f"fecha inválida: {registro.get('fecha')!r}")
+    hora_inicio = None
+    if registro.get('hora_inicio'):
+        try:
+            hora_inicio = datetime.strptime(str(registro['hora_inicio'])[:5], '%H:%M').time()
+        except ValueError:
+            raise RegistroLiftinInvalido(f"hora_inicio inválida: {registro['hora_inicio']!r}")
+    try:
+        volumen = float(registro['volumen_total_kg']) if registro.get('volumen_total_kg') else None
+    except (TypeError, ValueError):
+        raise RegistroLiftinInvalido(f"volumen_total_kg inválido: {registro['volumen_total_kg']!r}")
+
+    ejercicios = _ejercicios(registro)
+    notas = str(registro.get('notas_liftin') or '').strip()
+    if not ejercicios and not notas:
+        raise RegistroLiftinInvalido('sin ejercicios ni notas_liftin')
+
+    return {
+        'cliente_id': clientes.resolver(registro),
+        'fecha': fecha,
+        'hora_inicio': hora_inicio,
+        'rutina': str(registro.get('rutina') or '').strip()[:200],
+        'duracion_minutos': _entero(registro, 'duracion_minutos'),
+        'calorias_quemadas': _entero(registro, 'calorias_quemadas'),
+        'frecuencia_cardiaca_promedio': _entero(registro, 'frecuencia_cardiaca_promedio'),
+        'frecuencia_cardiaca_maxima': _entero(registro, 'frecuencia_cardiaca_maxima'),
+        'volumen_total_kg': volumen,
+        'liftin_workout_id': str(registro.get('liftin_workout_id') or '').strip()[:100] or None,
+        'notas_liftin': notas or _notas(ejercicios),
+        'ejercicios': ejercicios,
+    }
+
+
+def _clave_duplicado(cliente_id, workout_id, fecha, hora_inicio):
+    if workout_id:
+        return (cliente_id, 'id', workout_id)
+    if hora_inicio:
+        return (cliente_id, fecha, hora_inicio.replace(second=0, microsecond=0))
+    return None
+
+
+def _ya_importados(clientes_fechas):
+    """Claves de duplicado de los entrenos Liftin existentes en el rango importado."""
+    claves = set()
+    for cliente_id, (desde, hasta) in clientes_fechas.items():
+        existentes = EntrenoRealizado.objects.filter(
+            cliente_id=cliente_id, fuente_datos='liftin', fecha__range=(desde, hasta),
+        ).values_list('liftin_workout_id', 'fecha', 'hora_inicio')
+        for workout_id, fecha, hora_inicio in existentes:
+            for clave in (
+                _clave_duplicado(cliente_id, workout_id, fecha, None),
+                _clave_duplicado(cliente_id, None, fecha, hora_inicio),
+            ):
+                if clave:
+                    claves.add(clave)
+    return claves
+
+
+# ── Construcción de filas ─────────────────────────────────────────────────
+
+class _Rutinas:
+    """Rutina por nombre (creada si falta); sin nombre, la primera como en la vista."""
+
+    def __init__(self):
+        self._por_nombre = {}
+
+    def id_de(self, nombre):
+        from rutinas.models import Rutina
+
+        if nombre not in self._por_nombre:
+            rutinas = Rutina.objects.order_by('pk')
+            rutina = rutinas.filter(nombre=nombre).first() if nombre else rutinas.first()
+            if rutina is None:
+                rutina = Rutina.objects.create(nombre=(nombre or 'Liftin')[:100])
+            self._por_nombre[nombre] = rutina.pk
+        return self._por_nombre[nombre]
+
+
+def _ejercicio_realizado(entreno, ej):
+    series, repeticiones = parse_reps_and_series(ej['repeticiones'])
+    return EjercicioRealizado(
+        entreno_id=entreno.pk,
+        nombre_ejercicio=ej['nombre'][:100],
+        peso_kg=_peso_kg(ej['peso']),
+        series=series,
+        repeticiones=repeticiones or 1,
+        rpe=ej['rpe'],
+        completado=ej['estado'] == 'completado',
+        orden=ej['orden'],
+        fuente_datos='liftin',
+    )
+
+
+def _detallado(fila):
+    """Mismos campos que el receptor crear_ejercicios_detallados."""
+    return EjercicioLiftinDetallado(
+        entreno_id=fila.entreno_id,
+        nombre_ejercicio=fila.nombre_normalizado,
+        peso_kg=fila.peso_kg,
+        repeticiones_min=fila.repeticiones,
+        repeticiones_max=fila.repeticiones,
+        series_realizadas=fila.series,
+        orden_ejercicio=fila.orden,
+        completado=True,
+    )
+
+
+def carga_ua_gym(duracion, rpe_medio=None, hr_media=None, objetivo=None):
+    """
+    sRPE × minutos (regla de sincronizar_hub_actividad). Sin RPE se estima
+    desde la FC media con el objetivo Hyrox; sin FC, RPE 6.5.
+    """
+    if not duracion or duracion <= 0:
+        return None
+    rpe = rpe_medio
+    if not rpe and hr_media:
+        try:
+            from hyrox.training_engine import HyroxLoadManager
+            rpe = HyroxLoadManager.estimar_rpe_desde_fc(hr_media, objetivo)
+        except Exception:
+            rpe = None
+    return round(float(rpe or 6.5) * duracion, 1)
+
+
+class _ObjetivosHyrox:
+    def __init__(self):
+        self._por_cliente = {}
+
+    def de(self, cliente_id):
+        if cliente_id not in self._por_cliente:
+            from hyrox.models import HyroxObjective
+
+            self._por_cliente[cliente_id] = HyroxObjective.objects.filter(
+                cliente_id=cliente_id, estado='activo',
+            ).first()
+        return self._por_cliente[cliente_id]
+
+
+def _actividad(entreno, ejercicios, titulo, objetivos, hoy):
+    rpes = [ej.rpe for ej in ejercicios if ej.rpe is not None]
+    rpe_medio = round(sum(rpes) / len(rpes), 1) if rpes else None
+    hr_media = entreno.frecuencia_cardiaca_promedio
+    objetivo = objetivos.de(entreno.cliente_id) if hr_media and not rpe_medio else None
+    return ActividadRealizada(
+        cliente_id=entreno.cliente_id,
+        tipo='gym',
+        titulo=titulo,
+        fecha=entreno.fecha,
+        fecha_realizado=hoy,
+        hora_inicio=entreno.hora_inicio,
+        duracion_minutos=entreno.duracion_minutos,
+        volumen_kg=entreno.volumen_total_kg,
+        calorias=entreno.calorias_quemadas,
+        rpe_medio=rpe_medio,
+        carga_ua=carga_ua_gym(entreno.duracion_minutos, rpe_medio, hr_media, objetivo),
+        hr_media=hr_media,
+        hr_maxima=entreno.frecuencia_cardiaca_maxima,
+        fuente='liftin',
+        entreno_gym=entreno,
+    )
+
+
+def _volumen(ejercicios):
+    return sum(ej.peso_kg * ej.series * ej.repeticiones for ej in ejercicios if ej.completado)
+
+
+def _asignar_pks(entrenos, ahora):
+    """
+    bulk_create solo rellena los pk en backends que devuelven las filas del
+    INSERT (PostgreSQL, SQLite, MariaDB). En MySQL se releen las filas del
+    lote, marcadas por su fecha_importacion, en orden de inserción; un
+    save() por fila dispararía las señales que la importación evita.
+    """
+    if not entrenos or entrenos[0].pk is not None:
+        return
+    filas = list(
+        EntrenoRealizado.objects.filter(
+            fuente_datos='liftin',
+            fecha_importacion=ahora,
+            cliente_id__in={e.cliente_id for e in entrenos},
+        ).order_by('pk').values_list('pk', 'cliente_id', 'fecha', 'liftin_workout_id')
+    )
+    if len(filas) != len(entrenos):
+        raise RuntimeError(f'importacion_liftin: {len(filas)} filas para un lote de {len(entrenos)} entrenos')
+    for entreno, (pk, cliente_id, fecha, workout_id) in zip(entrenos, filas):
+        if (cliente_id, fecha, workout_id) != (entreno.cliente_id, entreno.fecha, entreno.liftin_workout_id):
+            raise RuntimeError(f'importacion_liftin: la fila {pk} no corresponde al entreno del lote')
+        entreno.pk = pk
+
+
+def _escribir_lote(registros, rutinas, objetivos, resumen):
+    """Un lote en una transacción. Devuelve los entrenos creados."""
+    ahora = timezone.now()
+    hoy = timezone.localdate()
+    entrenos = []
+    for r in registros:
+        hora_fin = None
+        if r['hora_inicio'] and r['duracion_minutos']:
+            hora_fin = (datetime.combine(r['fecha'], r['hora_inicio'])
+                        + timedelta(minutes=r['duracion_minutos'])).time()
+        entrenos.append(EntrenoRealizado(
+            cliente_id=r['cliente_id'],
+            rutina_id=rutinas.id_de(r['rutina']),
+            fecha=r['fecha'],
+            fecha_ejecucion=r['fecha'],
+            fuente_datos='liftin',
+            liftin_workout_id=r['liftin_workout_id'],
+            nombre_rutina_liftin=r['rutina'] or None,
+            hora_inicio=r['hora_inicio'],
+            hora_fin=hora_fin,
+            duracion_minutos=r['duracion_minutos'],
+            calorias_quemadas=r['calorias_quemadas'],
+            frecuencia_cardiaca_promedio=r['frecuencia_cardiaca_promedio'],
+            frecuencia_cardiaca_maxima=r['frecuencia_cardiaca_maxima'],
+            notas_liftin=r['notas_liftin'],
+            fecha_importacion=ahora,
+            procesado_gamificacion=False,
+        ))
+
+    with transaction.atomic():
+        EntrenoRealizado.objects.bulk_create(entrenos)
+        _asignar_pks(entrenos, ahora)
+
+        ejercicios_por_entreno = {
+            entreno.pk: [_ejercicio_realizado(entreno, ej) for ej in r['ejercicios']]
+            for entreno, r in zip(entrenos, registros)
+        }
+        ejercicios = [ej for lista in ejercicios_por_entreno.values() for ej in lista]
+        EjercicioRealizado.objects.bulk_create(ejercicios)
+
+        series = [fila for entreno in entrenos for fila in notas_liftin_service.filas_de_notas(entreno)]
+        SerieNotaLiftin.objects.bulk_create(series)
+        detallados = [_detallado(fila) for fila in series]
+        filas_por_entreno = Counter(fila.entreno_id for fila in series)
+        EjercicioLiftinDetallado.objects.bulk_create(detallados)
+
+        actualizados = []
+        for entreno, r in zip(entrenos, registros):
+            lista = ejercicios_por_entreno[entreno.pk]
+            numero = len(lista) or filas_por_entreno[entreno.pk]
+            volumen = r['volumen_total_kg'] if r['volumen_total_kg'] is not None else _volumen(lista)
+            entreno.numero_ejercicios = numero
+            entreno.volumen_total_kg = round(volumen, 2)
+            actualizados.append(entreno)
+        EntrenoRealizado.objects.bulk_update(actualizados, ['numero_ejercicios', 'volumen_total_kg'])
+
+        actividades = [
+            _actividad(entreno, ejercicios_por_entreno[entreno.pk], r['rutina'], objetivos, hoy)
+            for entreno, r in zip(entrenos, registros)
+        ]
+        ActividadRealizada.objects.bulk_create(actividades)
+
+    resumen.entrenos += len(entrenos)
+    resumen.ejercicios += len(ejercicios)
+    resumen.series_notas += len(series)
+    resumen.detallados += len(detallados)
+    resumen.actividades += len(actividades)
+    return entrenos
+
+
+# ── Recálculo posterior ───────────────────────────────────────────────────
+
+def recalcular_cliente(cliente_id, desde, entrenos_logros=()):
+    """
+    Lo que las señales por fila habrían hecho, una vez para todo lo
+    importado del cliente.
+    """
+    from analytics.planificador_helms import persistencia as plan_helms
+    from analytics.signals import recalcular_todas_las_metricas
+    from clientes.models import Cliente
+    from core.services import cache_cliente
+    from entrenos.models import activar_logros_liftin
+    from logros import contadores, rankings
+    from logros.models import PerfilGamificacion
+
+    carga_diaria_service.actualizar_seguro(cliente_id, desde)
+    mejores_marcas_service.recalcular(cliente_id)
+    rankings.actualizar_seguro(cliente_id, timezone.now().date())
+    perfil = PerfilGamificacion.objects.filter(cliente_id=cliente_id).first()
+    if perfil is not None:
+        try:
+            contadores.reconstruir(perfil)
+        except Exception as e:
+            logger.warning('importacion_liftin: contadores cliente=%s: %s', cliente_id, e)
+    plan_helms.invalidar(cliente_id)
+    try:
+        recalcular_todas_las_metricas(Cliente.objects.get(pk=cliente_id))
+    except Exception as e:
+        logger.warning('importacion_liftin: métricas cliente=%s: %s', cliente_id, e)
+    # Los logros de Liftin son umbrales (primera importación, >60 min,
+    # >300 kcal): basta con evaluarlos sobre los entrenos que los maximizan.
+    for entreno in EntrenoRealizado.objects.filter(pk__in=set(entrenos_logros)):
+        try:
+            activar_logros_liftin(entreno)
+        except Exception as e:
+            logger.warning('importacion_liftin: logros entreno=%s: %s', entreno.pk, e)
+    cache_cliente.invalidar_cliente(cliente_id)
+
+
+class _Afectados:
+    """Por cliente: fecha más antigua importada y entrenos candidatos a logro."""
+
+    def __init__(self):
+        self.desde = {}
+        self.mas_largo = {}
+        self.mas_calorias = {}
+
+    def anotar(self, entreno):
+        cliente_id = entreno.cliente_id
+        if cliente_id not in self.desde or entreno.fecha < self.desde[cliente_id]:
+            self.desde[cliente_id] = entreno.fecha
+        for mejores, valor in ((self.mas_largo, entreno.duracion_minutos),
+                               (self.mas_calorias, entreno.calorias_quemadas)):
+            if valor and valor > mejores.get(cliente_id, (0, None))[0]:
+                mejores[cliente_id] = (valor, entreno.pk)
+
+    def logros(self, cliente_id):
+        ids = [self.mas_largo.get(cliente_id, (0, None))[1],
+               self.mas_calorias.get(cliente_id, (0, None))[1]]
+        return [pk for pk in ids if pk is not None]
+
+
+# ── Entrada ───────────────────────────────────────────────────────────────
+
+def importar(ruta, cliente_id=None, lote=500, dry_run=False):
+    """
+    Valida e importa el fichero. Devuelve un ResumenImportacion; si hay
+    errores de validación (o `dry_run`) no escribe nada.
+    """
+    inicio = time.perf_counter()
+    resumen = ResumenImportacion()
+    clientes = _ResolutorClientes(cliente_id)
+
+    # 1. Validación en streaming: solo se retienen rangos de fechas
+    rangos = {}
+    for posicion, registro in leer_registros(ruta):
+        resumen.registros += 1
+        try:
+            r = validar(registro, clientes)
+        except RegistroLiftinInvalido as e:
+            if len(resumen.errores) < MAX_ERRORES:
+                resumen.errores.append((posicion, str(e)))
+            else:
+                break
+            continue
+        desde, hasta = rangos.get(r['cliente_id'], (r['fecha'], r['fecha']))
+        rangos[r['cliente_id']] = (min(desde, r['fecha']), max(hasta, r['fecha']))
+
+    if resumen.errores or dry_run:
+        resumen.clientes = len(rangos)
+        resumen.segundos = time.perf_counter() - inicio
+        return resumen
+
+    # 2. Escritura por lotes
+    vistos = _ya_importados(rangos)
+    rutinas, objetivos, afectados = _Rutinas(), _ObjetivosHyrox(), _Afectados()
+    pendientes = []
+
+    def volcar():
+        for entreno in _escribir_lote(pendientes, rutinas, objetivos, resumen):
+            afectados.anotar(entreno)
+        pendientes.clear()
+
+    for _, registro in leer_registros(ruta):
+        r = validar(registro, clientes)
+        clave = _clave_duplicado(r['cliente_id'], r['liftin_workout_id'], r['fecha'], r['hora_inicio'])
+        if clave in vistos:
+            resumen.duplicados += 1
+            continue
+        if clave:
+            vistos.add(clave)
+        pendientes.append(r)
+        if len(pendientes) >= lote:
+            volcar()
+    if pendientes:
+        volcar()
+
+    # 3. Un recálculo por cliente afectado
+    for cliente, desde in afectados.desde.items():
+        recalcular_cliente(cliente, desde, afectados.logros(cliente))
+    resumen.clientes = len(afectados.desde)
+    resumen.segundos = time.perf_counter() - inicio
+    logger.info('importacion_liftin: %s entrenos, %s filas en %.1f s (%s filas/s)',
+                resumen.entrenos, resumen.filas, resumen.segundos, resumen.filas_por_segundo)
+    return resumen
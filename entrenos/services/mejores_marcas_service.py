@@ -0,0 +1,282 @@
+"""
+Índice de mejores marcas por cliente y ejercicio (`MejorMarcaEjercicio`).
+
+Antes cada lector recorría todo el histórico: la calculadora de analytics
+traía todas las filas de `EjercicioRealizado` del cliente y aplicaba Epley
+en un bucle con un mapeo de nombres propio, el dashboard escaneaba
+`RecordPersonal` y el sync de RM de Hyrox solo miraba el objetivo. Aquí:
+
+- `registrar_ejercicio` / `registrar_serie_realizada` (señales en
+  entrenos/signals.py) actualizan una fila por (cliente, ejercicio) con un
+  UPDATE condicional: solo escribe si la nueva serie supera el 1RM guardado
+  o es más reciente que `ultima_fecha`.
+- `recalcular_ejercicio` rehace una fila desde las fuentes cuando se edita o
+  borra la serie (o el entreno) que tenía la marca.
+- `recalcular` reconstruye el índice completo (comando
+  `recalcular_mejores_marcas`).
+- Lectores: `maximos_por_movimiento`, `top_levantamientos`,
+  `mejor_rm_para_campo`. Si un cliente con historial aún no tiene filas
+  (anterior al índice), el primer lector lo reconstruye.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from entrenos.models import EjercicioRealizado, MejorMarcaEjercicio, SerieRealizada
+
+logger = logging.getLogger(__name__)
+
+# Ejercicio específico -> movimiento principal. Fuente de verdad del
+# agrupado de 1RM (antes en CalculadoraEjerciciosTabla).
+MOVIMIENTO_PRINCIPAL = {
+    # Remo (tracción horizontal)
+    'remo con barra (pendlay)': 'Remo',
+    'remo con mancuerna a una mano': 'Remo',
+    'remo en polea baja (gironda)': 'Remo',
+
+    # Press banca (empuje horizontal)
+    'press banca con barra': 'Press Banca',
+    'press banca con mancuernas': 'Press Banca',
+    'press inclinado con barra': 'Press Banca',
+    'press inclinado con mancuernas': 'Press Banca',
+    'press cerrado en banca': 'Press Banca',
+    'fondos en paralelas (con lastre)': 'Press Banca',
+
+    # Press militar (empuje vertical)
+    'press militar con barra (de pie)': 'Press Militar',
+    'press militar con mancuernas (sentado)': 'Press Militar',
+    'push press': 'Press Militar',
+    'press arnold': 'Press Militar',
+
+    # Peso muerto (bisagra de cadera). Buenos días e hip thrust fuera:
+    # accesorios, no equivalen al peso muerto.
+    'peso muerto': 'Peso Muerto',
+    'peso muerto rumano': 'Peso Muerto',
+    'peso muerto sumo': 'Peso Muerto',
+
+    # Sentadilla (flexión de rodilla). Prensa y zancadas fuera: sobrestiman
+    # el 1RM o son accesorios unilaterales.
+    'sentadilla trasera con barra': 'Sentadilla',
+    'sentadilla frontal con barra': 'Sentadilla',
+    'sentadilla búlgara': 'Sentadilla',
+}
+
+
+def normalizar(nombre):
+    return (nombre or '').strip().lower()[:100]
+
+
+def movimiento_principal(nombre):
+    return MOVIMIENTO_PRINCIPAL.get(normalizar(nombre), '')
+
+
+def rm_epley(peso, reps):
+    """1RM estimado (Epley: peso × (1 + reps/30)); 0 si la serie no es válida."""
+    try:
+        peso = float(peso or 0)
+        reps = int(reps or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    if peso <= 0 or reps <= 0:
+        return 0.0
+    return peso * (1 + reps / 30)
+
+
+def registrar_serie(cliente_id, nombre, peso, reps, fecha, entreno_id=None):
+    """
+    Incorpora una serie al índice. Devuelve True si mejora el 1RM guardado.
+    """
+    ejercicio = normalizar(nombre)
+    if not ejercicio:
+        return False
+    fila, creada = MejorMarcaEjercicio.objects.get_or_create(
+        cliente_id=cliente_id,
+        ejercicio=ejercicio,
+        defaults={
+            'nombre': (nombre or '').strip()[:100],
+            'movimiento_principal': MOVIMIENTO_PRINCIPAL.get(ejercicio, ''),
+            'ultima_fecha': fecha,
+        },
+    )
+    if not creada and fecha is not None:
+        MejorMarcaEjercicio.objects.filter(pk=fila.pk).filter(
+            Q(ultima_fecha__isnull=True) | Q(ultima_fecha__lt=fecha)
+        ).update(ultima_fecha=fecha)
+
+    rm = rm_epley(peso, reps)
+    if rm <= 0:
+        return False
+    # UPDATE condicional: dos guardados concurrentes no se pisan la marca
+    return bool(
+        MejorMarcaEjercicio.objects.filter(pk=fila.pk, rm_estimado__lt=rm).update(
+            rm_estimado=rm,
+            mejor_peso_kg=float(peso),
+            mejor_repeticiones=min(int(reps), 32767),
+            fecha_mejor=fecha,
+            entreno_mejor_id=entreno_id,
+        )
+    )
+
+
+def _es_marca_de(entreno_id, cliente_id, nombre):
+    return MejorMarcaEjercicio.objects.filter(
+        cliente_id=cliente_id, ejercicio=normalizar(nombre), entreno_mejor_id=entreno_id,
+    ).exists()
+
+
+def registrar_ejercicio(ejercicio, creado=True):
+    """post_save de EjercicioRealizado."""
+    entreno = ejercicio.entreno
+    if not creado and _es_marca_de(entreno.pk, entreno.cliente_id, ejercicio.nombre_ejercicio):
+        # Editar la serie que tenía la marca puede bajarla: rehacer la fila
+        return recalcular_ejercicio(entreno.cliente_id, ejercicio.nombre_ejercicio)
+    return registrar_serie(
+        entreno.cliente_id, ejercicio.nombre_ejercicio,
+        ejercicio.peso_kg, ejercicio.repeticiones, entreno.fecha, entreno.pk,
+    )
+
+
+def registrar_serie_realizada(serie, creado=True):
+    """post_save de SerieRealizada."""
+    entreno = serie.entreno
+    nombre = serie.ejercicio.nombre
+    if not creado and _es_marca_de(entreno.pk, entreno.cliente_id, nombre):
+        return recalcular_ejercicio(entreno.cliente_id, nombre)
+    return registrar_serie(
+        entreno.cliente_id, nombre, serie.peso_kg, serie.repeticiones, entreno.fecha, entreno.pk,
+    )
+
+
+def retirar(nombre, entreno_id):
+    """post_delete de una serie: si tenía la marca, la fila se rehace desde las fuentes."""
+    afectados = MejorMarcaEjercicio.objects.filter(
+        ejercicio=normalizar(nombre), entreno_mejor_id=entreno_id,
+    ).values_list('cliente_id', 'ejercicio')
+    for cliente_id, ejercicio in list(afectados):
+        recalcular_ejercicio(cliente_id, ejercicio)
+
+
+def marcas_del_entreno(entreno_id):
+    """(cliente_id, ejercicio) cuya marca viene de este entreno (pre_delete del entreno)."""
+    return list(
+        MejorMarcaEjercicio.objects.filter(entreno_mejor_id=entreno_id)
+        .values_list('cliente_id', 'ejercicio')
+    )
+
+
+def _series_de_fuentes(cliente_id=None):
+    """(cliente_id, nombre, peso, reps, fecha, entreno_id) de EjercicioRealizado y SerieRealizada."""
+    ejercicios = EjercicioRealizado.objects.all()
+    series = SerieRealizada.objects.all()
+    if cliente_id is not None:
+        ejercicios = ejercicios.filter(entreno__cliente_id=cliente_id)
+        series = series.filter(entreno__cliente_id=cliente_id)
+    yield from ejercicios.values_list(
+        'entreno__cliente_id', 'nombre_ejercicio', 'peso_kg', 'repeticiones', 'entreno__fecha', 'entreno_id',
+    ).iterator(chunk_size=2000)
+    yield from series.values_list(
+        'entreno__cliente_id', 'ejercicio__nombre', 'peso_kg', 'repeticiones', 'entreno__fecha', 'entreno_id',
+    ).iterator(chunk_size=2000)
+
+
+def _filas_desde(series, solo_ejercicio=None):
+    """Reduce series a una fila MejorMarcaEjercicio (sin guardar) por (cliente, ejercicio)."""
+    filas = {}
+    for cliente_id, nombre, peso, reps, fecha, entreno_id in series:
+        ejercicio = normalizar(nombre)
+        if not ejercicio or (solo_ejercicio is not None and ejercicio != solo_ejercicio):
+            continue
+        fila = filas.get((cliente_id, ejercicio))
+        if fila is None:
+            fila = filas[(cliente_id, ejercicio)] = MejorMarcaEjercicio(
+                cliente_id=cliente_id,
+                ejercicio=ejercicio,
+                nombre=(nombre or '').strip()[:100],
+                movimiento_principal=MOVIMIENTO_PRINCIPAL.get(ejercicio, ''),
+                ultima_fecha=fecha,
+            )
+        elif fecha and (fila.ultima_fecha is None or fecha > fila.ultima_fecha):
+            fila.ultima_fecha = fecha
+        rm = rm_epley(peso, reps)
+        if rm > fila.rm_estimado:
+            fila.rm_estimado = rm
+            fila.mejor_peso_kg = float(peso)
+            fila.mejor_repeticiones = min(int(reps), 32767)
+            fila.fecha_mejor = fecha
+            fila.entreno_mejor_id = entreno_id
+    return list(filas.values())
+
+
+def recalcular_ejercicio(cliente_id, nombre):
+    """Rehace la fila de un ejercicio desde las fuentes. Devuelve True si queda con marca."""
+    ejercicio = normalizar(nombre)
+    # Normalización en Python (la de SQL no baja mayúsculas no ASCII)
+    filas = _filas_desde(_series_de_fuentes(cliente_id), solo_ejercicio=ejercicio)
+    with transaction.atomic():
+        MejorMarcaEjercicio.objects.filter(cliente_id=cliente_id, ejercicio=ejercicio).delete()
+        MejorMarcaEjercicio.objects.bulk_create(filas)
+    return any(f.rm_estimado > 0 for f in filas)
+
+
+def recalcular(cliente_id=None, lote=1000):
+    """Reconstruye el índice (de un cliente o de todos). Devuelve filas escritas."""
+    filas = _filas_desde(_series_de_fuentes(cliente_id))
+    existentes = MejorMarcaEjercicio.objects.all()
+    if cliente_id is not None:
+        existentes = existentes.filter(cliente_id=cliente_id)
+    with transaction.atomic():
+        existentes.delete()
+        MejorMarcaEjercicio.objects.bulk_create(filas, batch_size=lote)
+    return len(filas)
+
+
+# ── Lectores ──────────────────────────────────────────────────────────────
+
+def _indice(cliente_id):
+    """Filas del cliente; reconstruye su índice si tiene historial sin indexar."""
+    filas = MejorMarcaEjercicio.objects.filter(cliente_id=cliente_id)
+    if not filas.exists() and (
+        EjercicioRealizado.objects.filter(entreno__cliente_id=cliente_id).exists()
+        or SerieRealizada.objects.filter(entreno__cliente_id=cliente_id).exists()
+    ):
+        recalcular(cliente_id)
+    return filas
+
+
+def maximos_por_movimiento(cliente):
+    """{movimiento principal: 1RM máximo redondeado a 2 decimales}."""
+    maximos = {}
+    filas = (
+        _indice(cliente.pk)
+        .filter(rm_estimado__gt=0)
+        .exclude(movimiento_principal='')
+        .values_list('movimiento_principal', 'rm_estimado')
+    )
+    for movimiento, rm in filas:
+        if rm > maximos.get(movimiento, 0):
+            maximos[movimiento] = rm
+    return {movimiento: round(rm, 2) for movimiento, rm in maximos.items()}
+
+
+def top_levantamientos(cliente, limite=4):
+    """Los `limite` ejercicios con mayor 1RM estimado (lookup por índice)."""
+    return list(
+        _indice(cliente.pk)
+        .filter(rm_estimado__gt=0)
+        .order_by('-rm_estimado', F('fecha_mejor').desc(nulls_last=True))[:limite]
+    )
+
+
+def mejor_rm_para_campo(cliente_id, campo):
+    """
+    Mayor 1RM del índice entre los ejercicios que el puente Gym→Hyrox
+    asigna a `campo` ('rm_sentadilla' / 'rm_peso_muerto'); 0 si no hay.
+    """
+    from entrenos.services.hyrox_bridge import campo_rm_para_ejercicio
+
+    filas = _indice(cliente_id).filter(rm_estimado__gt=0).values_list('ejercicio', 'rm_estimado')
+    return max(
+        (rm for ejercicio, rm in filas if campo_rm_para_ejercicio(ejercicio) == campo),
+        default=0.0,
+    )
@@ -0,0 +1,152 @@
+"""
+Notas Liftin parseadas una sola vez.
+
+`EntrenoRealizado.notas_liftin` es texto libre ("✓ Press Banca: 80, 3x8").
+Analytics lo volvía a parsear para cada entreno del cliente en cada
+recálculo. Este servicio lo convierte al guardar en filas `SerieNotaLiftin`
+(ejercicio, nombre normalizado, series, reps, peso) indexadas por
+(cliente, nombre_normalizado, fecha), y ofrece a los lectores:
+
+- `ejercicios_de(entreno)`: la misma lista de dicts que
+  `parsear_ejercicios_de_notas`, leída de las filas (usa prefetch
+  `series_liftin` si el queryset lo trae).
+- `series_de_ejercicio(cliente, nombre)`: búsqueda indexada por ejercicio.
+
+`VERSION_PARSER` se incrementa cuando cambia el parser; `reparsear()`
+(comando `reparsear_notas_liftin`) regenera en bloque las filas obsoletas.
+"""
+import logging
+
+from django.db import transaction
+
+from entrenos.models import EntrenoRealizado, SerieNotaLiftin
+from entrenos.utils.utils import parse_reps_and_series, parsear_ejercicios_de_notas
+
+logger = logging.getLogger(__name__)
+
+VERSION_PARSER = 1
+PESO_CORPORAL = 'PC'
+
+
+def _peso_kg(peso_texto):
+    if not peso_texto or peso_texto.upper() == PESO_CORPORAL:
+        return 0.0
+    try:
+        return float(peso_texto.replace(',', '.'))
+    except ValueError:
+        return 0.0
+
+
+def filas_de_notas(entreno):
+    """Filas SerieNotaLiftin (sin guardar) para las notas del entreno."""
+    filas = []
+    for orden, ej in enumerate(parsear_ejercicios_de_notas(entreno.notas_liftin)):
+        series, repeticiones = parse_reps_and_series(ej['repeticiones'])
+        filas.append(SerieNotaLiftin(
+            entreno_id=entreno.pk,
+            cliente_id=entreno.cliente_id,
+            fecha=entreno.fecha,
+            orden=orden,
+            ejercicio=ej['nombre_original'][:200],
+            nombre_normalizado=(ej['nombre'] or '')[:200],
+            peso_texto=ej['peso'][:50],
+            peso_kg=_peso_kg(ej['peso']),
+            repeticiones_texto=ej['repeticiones'][:100],
+            series=min(series, 32767),
+            repeticiones=min(repeticiones, 32767),
+            completado=ej['completado'],
+            version=VERSION_PARSER,
+        ))
+    return filas
+
+
+def _clave(fila):
+    return (
+        fila.orden, fila.ejercicio, fila.nombre_normalizado, fila.peso_texto,
+        fila.repeticiones_texto, fila.completado, fila.fecha, fila.version,
+    )
+
+
+def sincronizar_entreno(entreno):
+    """
+    Deja las filas del entreno alineadas con sus notas actuales. No escribe
+    si ya coinciden (mismo contenido y versión). Devuelve las filas escritas.
+    """
+    nuevas = filas_de_notas(entreno) if entreno.notas_liftin else []
+    actuales = list(SerieNotaLiftin.objects.filter(entreno_id=entreno.pk))
+    if sorted(map(_clave, actuales)) == sorted(map(_clave, nuevas)):
+        return 0
+    with transaction.atomic():
+        SerieNotaLiftin.objects.filter(entreno_id=entreno.pk).delete()
+        SerieNotaLiftin.objects.bulk_create(nuevas)
+    return len(nuevas)
+
+
+def pendientes(cliente_id=None, forzar=False):
+    """
+    Entrenos con notas cuyas filas faltan o vienen de un parser anterior.
+    Con `forzar` devuelve todos los entrenos con notas.
+    """
+    entrenos = EntrenoRealizado.objects.exclude(notas_liftin__isnull=True).exclude(notas_liftin='')
+    if cliente_id is not None:
+        entrenos = entrenos.filter(cliente_id=cliente_id)
+    if forzar:
+        return entrenos
+    al_dia = SerieNotaLiftin.objects.filter(version=VERSION_PARSER).values('entreno_id')
+    obsoletos = SerieNotaLiftin.objects.exclude(version=VERSION_PARSER).values('entreno_id')
+    return entrenos.exclude(pk__in=al_dia) | entrenos.filter(pk__in=obsoletos)
+
+
+def reparsear(cliente_id=None, forzar=False, lote=500):
+    """
+    Regenera en bloque las filas de los entrenos pendientes (ver
+    `pendientes`). Devuelve (entrenos procesados, filas escritas).
+    """
+    ids = list(pendientes(cliente_id, forzar).order_by('pk').values_list('pk', flat=True).distinct())
+    filas_escritas = 0
+    for inicio in range(0, len(ids), lote):
+        bloque = ids[inicio:inicio + lote]
+        entrenos = EntrenoRealizado.objects.filter(pk__in=bloque).only(
+            'pk', 'cliente_id', 'fecha', 'notas_liftin',
+        )
+        nuevas = [fila for entreno in entrenos for fila in filas_de_notas(entreno)]
+        with transaction.atomic():
+            SerieNotaLiftin.objects.filter(entreno_id__in=bloque).delete()
+            SerieNotaLiftin.objects.bulk_create(nuevas, batch_size=lote)
+        filas_escritas += len(nuevas)
+    return len(ids), filas_escritas
+
+
+def como_dict(fila):
+    """Fila → dict con las claves de `parsear_ejercicios_de_notas`."""
+    return {
+        'nombre': fila.nombre_normalizado,
+        'nombre_original': fila.ejercicio,
+        'peso': fila.peso_texto,
+        'repeticiones': fila.repeticiones_texto,
+        'completado': fila.completado,
+    }
+
+
+def ejercicios_de(entreno):
+    """
+    Ejercicios de las notas del entreno leídos de las filas parseadas.
+    Si el entreno aún no tiene filas (histórico sin backfill) se parsea el
+    texto como antes.
+    """
+    if not entreno.notas_liftin:
+        return []
+    filas = sorted(entreno.series_liftin.all(), key=lambda f: f.orden)
+    if not filas:
+        return parsear_ejercicios_de_notas(entreno.notas_liftin)
+    return [como_dict(f) for f in filas]
+
+
+def series_de_ejercicio(cliente, nombre_normalizado, desde=None, hasta=None):
+    """Filas de un ejercicio del cliente ordenadas por fecha (lookup indexado)."""
+    filas = SerieNotaLiftin.objects.filter(cliente=cliente, nombre_normalizado=nombre_normalizado)
+    if desde is not None:
+        filas = filas.filter(fecha__gte=desde)
+    if hasta is not None:
+        filas = filas.filter(fecha__lte=hasta)
+    return filas.order_by('fecha', 'entreno_id', 'orden')
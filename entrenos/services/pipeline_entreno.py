@@ -0,0 +1,205 @@
+"""
+Pipeline post-guardado de EntrenoRealizado.
+
+Guardar un entreno disparaba en el mismo request todos los post_save
+derivados (estancamiento, decision log, calibración RPE, métricas de
+analytics, impacto Hyrox, invalidación JOI). Ahora esos receptores se
+registran aquí con `@handler` y una única señal (`entreno_guardado` en
+entrenos/signals.py) decide cómo ejecutarlos según
+`settings.ENTRENO_PIPELINE_MODO`:
+
+- 'inline': dentro del save, en el orden de registro (tests y entornos sin
+  worker; mismo comportamiento que los post_save originales).
+- 'diferido' (por defecto fuera de los tests): tras el commit se registra un EventoEntrenoGuardado y se
+  encola `entrenos.tasks.procesar_eventos_entreno` con una ventana de
+  `ENTRENO_PIPELINE_VENTANA_S` segundos. Los guardados del mismo cliente
+  dentro de la ventana se fusionan en los eventos pendientes y los procesa
+  una sola tarea. Sin broker alcanzable se procesan en línea tras el commit.
+
+Cada handler se cronometra y se registra en el log ('pipeline_entreno').
+La sincronización con el hub (ActividadRealizada), la gamificación y la
+creación de ejercicios detallados siguen siendo síncronas: forman parte de
+la escritura que la vista devuelve.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.services.broker import broker_alcanzable
+
+logger = logging.getLogger(__name__)
+
+MODO_INLINE = 'inline'
+MODO_DIFERIDO = 'diferido'
+
+# Un evento pendiente más antiguo que esto se considera huérfano (tarea
+# perdida) y el siguiente guardado vuelve a encolar al cliente.
+CADUCIDAD_PENDIENTE = timedelta(minutes=10)
+RETENCION_PROCESADOS = timedelta(days=7)
+
+_HANDLERS = []
+
+
+def handler(funcion):
+    """Registra un receptor post_save de EntrenoRealizado en el pipeline."""
+    _HANDLERS.append(funcion)
+    return funcion
+
+
+def handlers():
+    return list(_HANDLERS)
+
+
+def modo():
+    return getattr(settings, 'ENTRENO_PIPELINE_MODO', MODO_INLINE)
+
+
+def ventana_segundos():
+    return getattr(settings, 'ENTRENO_PIPELINE_VENTANA_S', 30)
+
+
+def _marcas(instance):
+    return sorted(k for k, v in vars(instance).items() if k.startswith('_defer_') and v)
+
+
+def _fusionar_campos(actuales, nuevos):
+    """None (save completo) absorbe cualquier lista de update_fields."""
+    if actuales is None or nuevos is None:
+        return None
+    return sorted(set(actuales) | set(nuevos))
+
+
+def ejecutar_handlers(entreno, created, update_fields=None):
+    """
+    Ejecuta todos los handlers sobre `entreno` y devuelve {nombre: ms}.
+    Un handler que falla se registra y no impide los siguientes.
+    """
+    tiempos = {}
+    sender = type(entreno)
+    for funcion in _HANDLERS:
+        inicio = time.perf_counter()
+        try:
+            funcion(sender=sender, instance=entreno, created=created,
+                    raw=False, update_fields=update_fields)
+        except Exception:
+            logger.exception('pipeline_entreno: %s falló (entreno %s)', funcion.__name__, entreno.pk)
+        ms = (time.perf_counter() - inicio) * 1000
+        tiempos[funcion.__name__] = ms
+        logger.debug('pipeline_entreno handler=%s entreno=%s %.1f ms',
+                     funcion.__name__, entreno.pk, ms)
+    return tiempos
+
+
+def entreno_guardado(instance, created, update_fields=None):
+    """Punto de entrada desde la señal post_save de EntrenoRealizado."""
+    if modo() != MODO_DIFERIDO:
+        ejecutar_handlers(instance, created, update_fields)
+        return
+
+    campos = sorted(update_fields) if update_fields is not None else None
+    marcas = _marcas(instance)
+    cliente_id, entreno_id = instance.cliente_id, instance.pk
+    transaction.on_commit(
+        lambda: registrar_evento(cliente_id, entreno_id, created, campos, marcas)
+    )
+
+
+def registrar_evento(cliente_id, entreno_id, created, campos=None, marcas=()):
+    """
+    Registra (o fusiona) el evento pendiente del entreno y encola al cliente
+    si no tenía ya una tarea en curso. Devuelve True si encoló.
+    """
+    from entrenos.models import EventoEntrenoGuardado
+
+    ahora = timezone.now()
+    with transaction.atomic():
+        pendientes = EventoEntrenoGuardado.objects.select_for_update().filter(
+            cliente_id=cliente_id, procesado_en__isnull=True,
+        )
+        en_curso = pendientes.filter(registrado_en__gte=ahora - CADUCIDAD_PENDIENTE).exists()
+        evento = pendientes.filter(entreno_id=entreno_id).first()
+        if evento is None:
+            EventoEntrenoGuardado.objects.create(
+                cliente_id=cliente_id, entreno_id=entreno_id, creado=created,
+                campos=campos, marcas=list(marcas),
+            )
+        else:
+            evento.creado = evento.creado or created
+            evento.campos = _fusionar_campos(evento.campos, campos)
+            evento.marcas = sorted(set(evento.marcas) | set(marcas))
+            evento.guardados += 1
+            evento.save(update_fields=['creado', 'campos', 'marcas', 'guardados'])
+
+    if en_curso:
+        logger.debug('pipeline_entreno: entreno %s fusionado en la cola del cliente %s',
+                     entreno_id, cliente_id)
+        return False
+    _encolar(cliente_id)
+    return True
+
+
+def _encolar(cliente_id):
+    try:
+        if broker_alcanzable():
+            from entrenos.tasks import procesar_eventos_entreno
+            procesar_eventos_entreno.apply_async(
+                args=[cliente_id], countdown=ventana_segundos(), retry=False,
+            )
+            return
+    except Exception as e:
+        logger.warning('pipeline_entreno: no se pudo encolar cliente=%s: %s', cliente_id, e)
+    logger.warning('pipeline_entreno: broker no disponible, procesando cliente=%s en línea', cliente_id)
+    procesar_pendientes(cliente_id)
+
+
+def procesar_pendientes(cliente_id):
+    """
+    Reclama y procesa los eventos pendientes del cliente. Los guardados que
+    lleguen después del reclamo crean un evento nuevo (y su propia tarea).
+    Devuelve {'eventos': n, 'tiempos_ms': {handler: ms acumulados}}.
+
+    El reclamo bloquea las filas pendientes, igual que registrar_evento: si
+    un guardado está fusionándose en ese momento, se espera a su commit y
+    su evento entra en este lote. Si aun así queda algún pendiente al
+    terminar (fusionado contando con este reclamo), se vuelve a encolar al
+    cliente en lugar de dejarlo huérfano.
+    """
+    from entrenos.models import EventoEntrenoGuardado
+
+    ahora = timezone.now()
+    pendientes = EventoEntrenoGuardado.objects.filter(
+        cliente_id=cliente_id, procesado_en__isnull=True,
+    )
+    with transaction.atomic():
+        ids = list(pendientes.select_for_update().values_list('pk', flat=True))
+        if ids:
+            EventoEntrenoGuardado.objects.filter(pk__in=ids).update(procesado_en=ahora)
+    eventos = (
+        EventoEntrenoGuardado.objects
+        .filter(pk__in=ids)
+        .select_related('entreno', 'entreno__cliente')
+        .order_by('registrado_en')
+    )
+
+    totales = {}
+    for evento in eventos:
+        entreno = evento.entreno
+        for marca in evento.marcas:
+            setattr(entreno, marca, True)
+        campos = frozenset(evento.campos) if evento.campos is not None else None
+        for nombre, ms in ejecutar_handlers(entreno, evento.creado, campos).items():
+            totales[nombre] = totales.get(nombre, 0.0) + ms
+
+    EventoEntrenoGuardado.objects.filter(
+        cliente_id=cliente_id, procesado_en__lt=ahora - RETENCION_PROCESADOS,
+    ).delete()
+    if ids:
+        logger.info('pipeline_entreno cliente=%s eventos=%s total=%.1f ms',
+                    cliente_id, len(ids), sum(totales.values()))
+        if pendientes.exists():
+            _encolar(cliente_id)
+    return {'eventos': len(ids), 'tiempos_ms': totales}
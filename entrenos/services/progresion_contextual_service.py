@@ -258,12 +258,16 @@ def aplicar_freno_contextual(cliente, entrenamiento, permiso, modo_reducido=Fals
 
 # ── Phase 28.1 — Per-exercise injury brake ────────────────────────────────────
 
-def _obtener_info_lesion(cliente):
+def _obtener_info_lesion(cliente, contexto=None):
     """Returns [{tags, motivo, fase, zona}] for active injuries with restricted tags."""
     try:
         from hyrox.models import UserInjury
+        if contexto is not None:
+            lesiones = contexto.lesiones_activas
+        else:
+            lesiones = UserInjury.objects.filter(cliente=cliente, activa=True).exclude(fase='RECUPERADO')
         result = []
-        for lesion in UserInjury.objects.filter(cliente=cliente, activa=True).exclude(fase='RECUPERADO'):
+        for lesion in lesiones:
             tags = set(lesion.tags_restringidos or [])
             if not tags:
                 continue
@@ -277,7 +281,7 @@ def _obtener_info_lesion(cliente):
         return []
 
 
-def aplicar_freno_lesion(cliente, entrenamiento):
+def aplicar_freno_lesion(cliente, entrenamiento, contexto=None):
     """
     Phase 28.1 — Per-exercise progression brake based on active injuries.
 
@@ -290,11 +294,12 @@ def aplicar_freno_lesion(cliente, entrenamiento):
     - Sets motivo_bloqueo_lesion=True for UI to distinguish from contextual brake.
     - Preserves peso_kg_propuesto for audit.
     - If no last logged weight found, keeps the proposed weight (no increase implied).
+    - With `contexto` (ContextoCliente) the injuries come from the request.
     """
     if not entrenamiento or not entrenamiento.get('ejercicios'):
         return entrenamiento
 
-    info_lesiones = _obtener_info_lesion(cliente)
+    info_lesiones = _obtener_info_lesion(cliente, contexto)
     if not info_lesiones:
         return entrenamiento
 
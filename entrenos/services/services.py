@@ -375,56 +375,34 @@ class EstadisticasService:
         LEGACY: Calcula ACWR solo desde EntrenoRealizado (gym).
         Mantenido por compatibilidad. Usar analizar_acwr_unificado() para nuevas vistas.
         """
+        from core.services import motor_carga
         from entrenos.models import EntrenoRealizado
-        try:
-            import pandas as pd
-        except ImportError:
-            return {'dataframe': [], 'acwr_actual': 0, 'zona_riesgo': 'desconocida'}
 
         fecha_fin = timezone.now().date()
         fecha_inicio = fecha_fin - timedelta(days=periodo_dias)
 
-        entrenamientos = EntrenoRealizado.objects.filter(
+        entrenamientos = list(EntrenoRealizado.objects.filter(
             cliente=cliente,
             fecha__gte=fecha_inicio,
             fecha__lte=fecha_fin
-        ).order_by('fecha').values('fecha', 'volumen_total_kg')
+        ).values_list('fecha', 'volumen_total_kg'))
 
         if not entrenamientos:
             return {'dataframe': [], 'acwr_actual': 0, 'zona_riesgo': 'baja_carga'}
 
-        df = pd.DataFrame(list(entrenamientos))
-        df['fecha'] = pd.to_datetime(df['fecha'])
-        df['volumen_total_kg'] = df['volumen_total_kg'].astype(float)
-
-        df = df.groupby('fecha')['volumen_total_kg'].sum().reset_index()
-        df['carga_diaria'] = df['volumen_total_kg'] / 1000
-
-        idx = pd.date_range(start=fecha_inicio, end=fecha_fin)
-        df = df.set_index('fecha').reindex(idx, fill_value=0)
-
-        df['carga_aguda'] = df['carga_diaria'].rolling(window=7, min_periods=1).mean()
-        df['carga_cronica'] = df['carga_diaria'].rolling(window=28, min_periods=1).mean()
-        df['acwr'] = (df['carga_aguda'] / df['carga_cronica']).fillna(0).replace([np.inf, -np.inf], 0)
-
-        acwr_actual = round(df['acwr'].iloc[-1], 2) if not df.empty else 0
-
-        if 0.8 <= acwr_actual <= 1.3:
-            zona_riesgo = 'optima'
-        elif 1.3 < acwr_actual < 1.5:
-            zona_riesgo = 'cuidado'
-        elif acwr_actual >= 1.5:
-            zona_riesgo = 'riesgo_alto'
-        else:
-            zona_riesgo = 'baja_carga'
-
-        df_json = df.reset_index().rename(columns={'index': 'fecha'})
-        df_json['fecha'] = df_json['fecha'].dt.strftime('%Y-%m-%d')
+        volumen = motor_carga.serie_diaria(entrenamientos, fecha_inicio, fecha_fin)
+        carga_diaria = volumen / 1000
+        carga_aguda, carga_cronica, acwr = motor_carga.acwr_rolling(carga_diaria, 7, 28)
+        acwr_actual = round(float(acwr[-1]), 2)
 
         return {
-            'dataframe': df_json.to_dict('records'),
+            'dataframe': motor_carga.registros(
+                motor_carga.rango_fechas(fecha_inicio, fecha_fin),
+                volumen_total_kg=volumen, carga_diaria=carga_diaria,
+                carga_aguda=carga_aguda, carga_cronica=carga_cronica, acwr=acwr,
+            ),
             'acwr_actual': acwr_actual,
-            'zona_riesgo': zona_riesgo
+            'zona_riesgo': motor_carga.zona_riesgo(acwr_actual)
         }
 
     @staticmethod
@@ -441,30 +419,71 @@ class EstadisticasService:
         con caches independientes desincronizados. Solo se cachea el caso por
         defecto (periodo_dias=90, el usado por todo lo anterior); llamadas con
         un periodo distinto (p. ej. rangos custom de analytics) se calculan
-        siempre en fresco. La clave 'dashboard_acwr_unificado_{id}' es la
-        misma que ya invalidan las señales existentes en entrenos/signals.py,
-        entrenos/services/hyrox_bridge.py y entrenos/views.py al guardar
-        actividad nueva — no cambiar sin actualizar esos 4 sitios también.
+        siempre en fresco. La familia 'dashboard_acwr_unificado' va
+        versionada por cliente (core.services.cache_cliente): la invalidan
+        las señales de entrenos/signals.py, entrenos/services/hyrox_bridge.py
+        y entrenos/views.py al guardar actividad nueva.
         """
-        from django.core.cache import cache
+        from core.services import cache_cliente
 
         if periodo_dias != 90:
             return EstadisticasService._analizar_acwr_unificado_calc(cliente, periodo_dias)
 
-        cache_key = f'dashboard_acwr_unificado_{cliente.id}'
-        resultado = cache.get(cache_key)
+        resultado = cache_cliente.obtener('dashboard_acwr_unificado', cliente.id)
         if resultado is None:
             resultado = EstadisticasService._analizar_acwr_unificado_calc(cliente, periodo_dias)
-            cache.set(cache_key, resultado, 3600)
+            cache_cliente.guardar('dashboard_acwr_unificado', cliente.id, resultado, 3600)
         return resultado
 
     @staticmethod
     def _analizar_acwr_unificado_calc(cliente, periodo_dias=90):
-        """Cálculo real del ACWR unificado — sin caché. Ver analizar_acwr_unificado."""
+        """
+        Cálculo real del ACWR unificado — sin caché. Ver analizar_acwr_unificado.
+
+        CTL/ATL salen del libro diario CargaDiariaCliente, leyendo solo los 57
+        días del gráfico; el historial completo solo se recorre mientras el
+        libro del cliente no esté construido.
+        """
+        from core.services import motor_carga
         from entrenos.models import ActividadRealizada
-        import math
+        from entrenos.services import carga_diaria_service
 
         fecha_fin = timezone.now().date()
+        primera_fecha = carga_diaria_service.primera_fecha(cliente.id)
+        if primera_fecha is None or primera_fecha > fecha_fin:
+            return EstadisticasService._acwr_unificado_desde_historial(
+                cliente, periodo_dias, fecha_fin
+            )
+
+        dias_historial = (fecha_fin - primera_fecha).days
+        if dias_historial < 28:
+            return EstadisticasService._acwr_unificado_insuficiente(dias_historial)
+
+        # El libro guarda sRPE / ESCALA_CARGA_UA; el ACWR no depende de la
+        # escala, pero carga aguda/crónica se muestran en UA como antes.
+        desde = max(primera_fecha, fecha_fin - timedelta(days=56))
+        ctl, atl = carga_diaria_service.serie_en(cliente.id, desde, fecha_fin)
+        escala = carga_diaria_service.ESCALA_CARGA_UA
+
+        recientes = ActividadRealizada.objects.filter(
+            cliente=cliente,
+            fecha__gte=fecha_fin - timedelta(days=7),
+            fecha__lte=fecha_fin,
+            carga_ua__isnull=False,
+        ).order_by('fecha').values_list('tipo', 'carga_ua')
+
+        return EstadisticasService._acwr_unificado_resultado(
+            motor_carga.rango_fechas(desde, fecha_fin),
+            ctl * escala,
+            atl * escala,
+            EstadisticasService._desglose_tipos(recientes),
+        )
+
+    @staticmethod
+    def _acwr_unificado_desde_historial(cliente, periodo_dias, fecha_fin):
+        """Fallback sin libro diario: EWMA sobre todo el historial del hub."""
+        from core.services import motor_carga
+        from entrenos.models import ActividadRealizada
 
         # Sin límite inferior: el EWMA necesita toda la historia para que CTL
         # converja al mismo valor que HyroxLoadManager (que tampoco acota por abajo).
@@ -483,63 +502,66 @@ class EstadisticasService:
         primera_fecha = actividades[0]['fecha']
         dias_historial = (fecha_fin - primera_fecha).days
         if dias_historial < 28:
-            return {
-                'dataframe': [],
-                'acwr_actual': 0,
-                'zona_riesgo': 'insuficiente_historial',
-                'carga_aguda': 0,
-                'carga_cronica': 0,
-                'desglose_tipos': {},
-                'dias_descanso': None,
-                'fuente': 'unificado_ewma',
-                'dias_historial': dias_historial,
-            }
-
-        # Mapa fecha → carga diaria total.
-        # Usar 'fecha' (no fecha_realizado) para coincidir exactamente con
-        # HyroxLoadManager y producir el mismo ACWR en ambos sitios.
-        carga_por_dia = {}
-        desglose_tipos_7d = {}
+            return EstadisticasService._acwr_unificado_insuficiente(dias_historial)
+
+        # Carga diaria total por 'fecha' (no fecha_realizado) para coincidir
+        # exactamente con HyroxLoadManager y producir el mismo ACWR en ambos sitios.
         corte_7d = fecha_fin - timedelta(days=7)
-        for a in actividades:
-            d = a['fecha']
-            carga_por_dia[d] = carga_por_dia.get(d, 0) + float(a['carga_ua'])
-            if d >= corte_7d:
-                t = a['tipo']
-                desglose_tipos_7d[t] = round(desglose_tipos_7d.get(t, 0) + float(a['carga_ua']), 1)
-
-        # EWMA — idéntico a HyroxLoadManager.calcular_ctl_atl_tsb
-        desde = min(carga_por_dia.keys())
-        n_dias = (fecha_fin - desde).days + 1
-        ctl = atl = 0.0
-        k_ctl = 1 / 42.0
-        k_atl = 1 / 7.0
-        cursor = desde
-        corte_serie = fecha_fin - timedelta(days=56)
-        serie_diaria = []
-        for _ in range(n_dias):
-            t = carga_por_dia.get(cursor, 0)
-            ctl = ctl + (t - ctl) * k_ctl
-            atl = atl + (t - atl) * k_atl
-            if cursor >= corte_serie:
-                acwr_dia = round(atl / ctl, 2) if ctl > 0 else 0
-                serie_diaria.append({'fecha': cursor.isoformat(), 'acwr': acwr_dia})
-            cursor += timedelta(days=1)
-
-        acwr_actual = round(atl / ctl, 2) if ctl > 0 else 0
-        carga_aguda_actual   = round(atl, 1)
-        carga_cronica_actual = round(ctl, 1)
-
-        if 0.8 <= acwr_actual <= 1.3:
-            zona_riesgo = 'optima'
-        elif 1.3 < acwr_actual < 1.5:
-            zona_riesgo = 'cuidado'
-        elif acwr_actual >= 1.5:
-            zona_riesgo = 'riesgo_alto'
-        elif acwr_actual > 0:
-            zona_riesgo = 'baja_carga'
-        else:
-            zona_riesgo = 'desconocida'
+        desglose_tipos_7d = EstadisticasService._desglose_tipos(
+            (a['tipo'], a['carga_ua']) for a in actividades if a['fecha'] >= corte_7d
+        )
+
+        cargas = motor_carga.serie_diaria(
+            ((a['fecha'], a['carga_ua']) for a in actividades), primera_fecha, fecha_fin
+        )
+        ctl, atl, _tsb = motor_carga.ctl_atl_tsb(cargas)
+
+        # Serie de los últimos 57 días (desde fecha_fin - 56) para el gráfico
+        fechas = motor_carga.rango_fechas(primera_fecha, fecha_fin)
+        inicio_serie = max(0, len(fechas) - 57)
+        return EstadisticasService._acwr_unificado_resultado(
+            fechas[inicio_serie:], ctl[inicio_serie:], atl[inicio_serie:], desglose_tipos_7d
+        )
+
+    @staticmethod
+    def _desglose_tipos(filas):
+        """Carga UA acumulada por tipo de actividad a partir de (tipo, carga_ua)."""
+        desglose = {}
+        for tipo, carga_ua in filas:
+            desglose[tipo] = round(desglose.get(tipo, 0) + float(carga_ua), 1)
+        return desglose
+
+    @staticmethod
+    def _acwr_unificado_insuficiente(dias_historial):
+        return {
+            'dataframe': [],
+            'acwr_actual': 0,
+            'zona_riesgo': 'insuficiente_historial',
+            'carga_aguda': 0,
+            'carga_cronica': 0,
+            'desglose_tipos': {},
+            'dias_descanso': None,
+            'fuente': 'unificado_ewma',
+            'dias_historial': dias_historial,
+        }
+
+    @staticmethod
+    def _acwr_unificado_resultado(fechas, ctl, atl, desglose_tipos_7d):
+        """Respuesta del ACWR unificado a partir de la ventana CTL/ATL del gráfico."""
+        from core.services import motor_carga
+        import math
+
+        acwr = motor_carga.ratio(atl, ctl)
+        serie_diaria = [
+            {'fecha': fecha.isoformat(), 'acwr': round(float(valor), 2)}
+            for fecha, valor in zip(fechas, acwr)
+        ]
+
+        acwr_actual = round(float(acwr[-1]), 2)
+        carga_aguda_actual   = round(float(atl[-1]), 1)
+        carga_cronica_actual = round(float(ctl[-1]), 1)
+
+        zona_riesgo = motor_carga.zona_riesgo(acwr_actual) if acwr_actual > 0 else 'desconocida'
 
         dias_descanso = None
         if carga_cronica_actual > 0:
@@ -571,11 +571,12 @@ def _obtener_contexto_fisico(cliente, fecha_hoy, physical_snapshot=None):
     return ctx
 
 
-def _aplicar_contexto(decision_base, contexto, fecha_hoy):
+def _aplicar_contexto(decision_base, contexto, fecha_hoy, contexto_cliente=None):
     """
     Phase 3B/3C: Enriches the base decision with physical context.
     Returns the decision dict with updated estado, causa_principal,
     mensaje, and modo_reducido flag.
+    contexto_cliente: optional ContextoCliente with the request's injuries.
     """
     decision = dict(decision_base)
 
@@ -600,7 +601,7 @@ def _aplicar_contexto(decision_base, contexto, fecha_hoy):
         try:
             cliente = contexto.get('_cliente')  # passed by caller when available
             if cliente:
-                aviso = _detectar_riesgo_lesion(cliente, entrenamiento)
+                aviso = _detectar_riesgo_lesion(cliente, entrenamiento, contexto_cliente)
                 lesion_conflicto = aviso is not None
             else:
                 lesion_conflicto = True  # safe default: block when no client context
@@ -862,9 +863,10 @@ _FASE_LABELS = {
 }
 
 
-def _detectar_riesgo_lesion(cliente, entrenamiento):
+def _detectar_riesgo_lesion(cliente, entrenamiento, contexto=None):
     """
     Phase 28A — Cross-references active injuries with session exercises.
+    With `contexto` (ContextoCliente) the injuries come from the request.
 
     Returns a lesion_aviso dict or None.
 
@@ -886,9 +888,12 @@ def _detectar_riesgo_lesion(cliente, entrenamiento):
         if not ejercicios:
             return None
 
-        lesiones = list(UserInjury.objects.filter(
-            cliente=cliente, activa=True,
-        ).exclude(fase='RECUPERADO'))
+        if contexto is not None:
+            lesiones = contexto.lesiones_activas
+        else:
+            lesiones = list(UserInjury.objects.filter(
+                cliente=cliente, activa=True,
+            ).exclude(fase='RECUPERADO'))
         if not lesiones:
             return None
 
@@ -952,12 +957,12 @@ def _detectar_riesgo_lesion(cliente, entrenamiento):
     return None
 
 
-def _aplicar_aviso_lesion(cliente, decision, fecha_hoy):
+def _aplicar_aviso_lesion(cliente, decision, fecha_hoy, contexto=None):
     """
     Phase 28B — Adds lesion_aviso to the decision without changing its outcome.
     """
     entrenamiento = decision.get('entrenamiento') or {}
-    aviso = _detectar_riesgo_lesion(cliente, entrenamiento)
+    aviso = _detectar_riesgo_lesion(cliente, entrenamiento, contexto)
     if aviso:
         decision['lesion_aviso'] = aviso
     return decision
@@ -1203,7 +1208,7 @@ def _devolver_con_traza(cliente, decision, fecha):
     return decision
 
 
-def obtener_sesion_recomendada_hoy(cliente, fecha_hoy=None, physical_snapshot=None):
+def obtener_sesion_recomendada_hoy(cliente, fecha_hoy=None, physical_snapshot=None, contexto_cliente=None):
     """
     Returns the recommended session for today as a dict:
         tipo:              'pendiente' | 'programada_hoy' | 'descanso'
@@ -1215,6 +1220,7 @@ def obtener_sesion_recomendada_hoy(cliente, fecha_hoy=None, physical_snapshot=No
     Priority: pending sessions (oldest first after reconciliation) → today's plan → rest.
     The live DB query for the pending session is NOT cached, so actions (completing
     a session, pressing "skip") are reflected immediately.
+    contexto_cliente: optional ContextoCliente; injury checks reuse its injuries.
     """
     fecha_hoy = fecha_hoy or timezone.localdate()
 
@@ -1248,7 +1254,9 @@ def obtener_sesion_recomendada_hoy(cliente, fecha_hoy=None, physical_snapshot=No
                     cliente, entrenamiento, permiso,
                     modo_reducido=getattr(pendiente, 'modo_reducido_origen', False),
                 )
-                entrenamiento = aplicar_freno_lesion(cliente, entrenamiento)  # Phase 28.1
+                entrenamiento = aplicar_freno_lesion(  # Phase 28.1
+                    cliente, entrenamiento, contexto=contexto_cliente,
+                )
                 # Phase Gym 1.1: adjust motivo_peso to reflect actual decision after frenos
                 if entrenamiento and entrenamiento.get('ejercicios'):
                     entrenamiento['ejercicios'] = [
@@ -1285,10 +1293,10 @@ def obtener_sesion_recomendada_hoy(cliente, fecha_hoy=None, physical_snapshot=No
             physical_snapshot=physical_snapshot,
         )
         contexto['_cliente'] = cliente  # for injury-session conflict check in _aplicar_contexto
-        decision = _aplicar_contexto(decision_base, contexto, fecha_hoy)
+        decision = _aplicar_contexto(decision_base, contexto, fecha_hoy, contexto_cliente)
         decision = _aplicar_efecto_distribucion(cliente, decision, fecha_hoy)
         decision = _aplicar_preferencia_activa(cliente, decision, fecha_hoy)
-        decision = _aplicar_aviso_lesion(cliente, decision, fecha_hoy)
+        decision = _aplicar_aviso_lesion(cliente, decision, fecha_hoy, contexto_cliente)
         return _devolver_con_traza(cliente, decision, fecha_hoy)
 
     # Phase 52 — Si el usuario pospuso explícitamente hoy, no generar nueva sesión
@@ -1325,7 +1333,9 @@ def obtener_sesion_recomendada_hoy(cliente, fecha_hoy=None, physical_snapshot=No
             )
             permiso = evaluar_permiso_progresion(cliente, fecha_hoy)
             entrenamiento_hoy = aplicar_freno_contextual(cliente, entrenamiento_hoy, permiso)
-            entrenamiento_hoy = aplicar_freno_lesion(cliente, entrenamiento_hoy)  # Phase 28.1
+            entrenamiento_hoy = aplicar_freno_lesion(  # Phase 28.1
+                cliente, entrenamiento_hoy, contexto=contexto_cliente,
+            )
             # Phase Gym 1.1: adjust motivo_peso to reflect actual decision after frenos
             if entrenamiento_hoy and entrenamiento_hoy.get('ejercicios'):
                 entrenamiento_hoy['ejercicios'] = [
@@ -1366,8 +1376,8 @@ def obtener_sesion_recomendada_hoy(cliente, fecha_hoy=None, physical_snapshot=No
         physical_snapshot=physical_snapshot,
     )
     contexto['_cliente'] = cliente  # for injury-session conflict check
-    decision = _aplicar_contexto(decision_base, contexto, fecha_hoy)
+    decision = _aplicar_contexto(decision_base, contexto, fecha_hoy, contexto_cliente)
     decision = _aplicar_efecto_distribucion(cliente, decision, fecha_hoy)
     decision = _aplicar_preferencia_activa(cliente, decision, fecha_hoy)
-    decision = _aplicar_aviso_lesion(cliente, decision, fecha_hoy)
+    decision = _aplicar_aviso_lesion(cliente, decision, fecha_hoy, contexto_cliente)
     return _devolver_con_traza(cliente, decision, fecha_hoy)
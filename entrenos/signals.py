@@ -3,6 +3,7 @@ import logging
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from entrenos.models import EntrenoRealizado, EjercicioRealizado, EjercicioLiftinDetallado, ActividadRealizada
+from entrenos.services import pipeline_entreno
 from entrenos.utils.utils import parse_reps_and_series
 from django.utils.timezone import make_aware
 from datetime import datetime
@@ -24,35 +25,40 @@ _SENTADILLA_KW = ('sentadilla', 'squat', 'goblet', 'hack squat', 'front squat')
 _PESO_MUERTO_KW = ('peso muerto', 'deadlift', 'rdl', 'romanian', 'sumo dead')
 
 
+@receiver(post_save, sender=EntrenoRealizado)
+def parsear_notas_liftin(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Parsea notas_liftin una vez a SerieNotaLiftin (lectura indexada en analytics)."""
+    if raw:
+        return
+    if update_fields is not None and 'notas_liftin' not in update_fields:
+        return
+    if created and not instance.notas_liftin:
+        return
+    try:
+        from entrenos.services.notas_liftin_service import sincronizar_entreno
+        sincronizar_entreno(instance)
+    except Exception as e:
+        logger.warning('parsear_notas_liftin: entreno %s: %s', instance.pk, e)
+
+
 @receiver(post_save, sender=EntrenoRealizado)
 def crear_ejercicios_detallados(sender, instance, created, raw=False, **kwargs):
     if raw or not instance.notas_liftin:
         return
 
-    ejercicios = parsear_ejercicios(instance.notas_liftin)
-    for orden, ej in enumerate(ejercicios):
+    # Filas ya parseadas por parsear_notas_liftin (receptor anterior)
+    for fila in instance.series_liftin.order_by('orden'):
         try:
-            nombre = ej.get('nombre', '').strip()
-            peso = ej.get('peso', 0)
-            if peso == 'PC':
-                peso = 0
-            peso = float(str(peso).replace(',', '.'))
-
-            rep_str = str(ej.get('repeticiones', '1x1')).lower().replace('×', 'x').replace(' ', '')
-            partes = rep_str.split('x')
-            rep_min = int(partes[1]) if len(partes) > 1 else 1
-            series = int(partes[0]) if len(partes) > 0 else 1
-
             EjercicioLiftinDetallado.objects.get_or_create(
                 entreno=instance,
-                nombre_ejercicio=nombre,
+                nombre_ejercicio=fila.nombre_normalizado,
                 defaults={
-                    'peso_kg': peso,
-                    'repeticiones_min': rep_min,
-                    'repeticiones_max': rep_min,
-                    'series_realizadas': series,
+                    'peso_kg': fila.peso_kg,
+                    'repeticiones_min': fila.repeticiones,
+                    'repeticiones_max': fila.repeticiones,
+                    'series_realizadas': fila.series,
                     'fecha_creacion': make_aware(datetime.now()),
-                    'orden_ejercicio': orden,
+                    'orden_ejercicio': fila.orden,
                     'completado': True
                 }
             )
@@ -178,12 +184,10 @@ def sincronizar_hub_actividad(sender, instance, created, raw=False, **kwargs):
             obj.fecha_realizado = hoy
             obj.save(update_fields=['fecha_realizado'])
 
-        # Invalidar caché ACWR para que el dashboard refleje el nuevo entreno
-        from django.core.cache import cache as _cache
-        _cache.delete(f'dashboard_acwr_unificado_{instance.cliente_id}')
-        _cache.delete(f'dashboard_gamif_{instance.cliente_id}')
-        _cache.delete(f'dashboard_stats_{instance.cliente_id}')
-        _cache.delete(f'dashboard_carga_total_{instance.cliente_id}')
+        # Invalidar los bloques cacheados del cliente (ACWR, gamificación,
+        # stats, carga total...) para que el dashboard refleje el nuevo entreno
+        from core.services import cache_cliente
+        cache_cliente.invalidar_cliente(instance.cliente_id)
     except Exception as e:
         print(f"❌ Hub ActividadRealizada error (entreno {instance.id}): {e}")
 
@@ -191,6 +195,14 @@ def sincronizar_hub_actividad(sender, instance, created, raw=False, **kwargs):
     # poder incluir rpe_final, que se calcula DESPUÉS de crear los ejercicios.
 
 
+@receiver(post_save, sender=EntrenoRealizado)
+def entreno_guardado(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Delega los efectos derivados del guardado al pipeline (inline o diferido)."""
+    if raw:
+        return
+    pipeline_entreno.entreno_guardado(instance, created, update_fields)
+
+
 @receiver(post_save, sender=EntrenoRealizado)
 def detectar_molestia_recurrente(sender, instance, created, raw=False, **kwargs):
     """Delega la molestia leve recurrente al ciclo acotado especializado."""
@@ -200,7 +212,7 @@ def detectar_molestia_recurrente(sender, instance, created, raw=False, **kwargs)
     procesar_molestias_recurrentes(instance)
 
 
-@receiver(post_save, sender=EntrenoRealizado)
+@pipeline_entreno.handler
 def detectar_estancamiento(sender, instance, created, raw=False, **kwargs):
     """
     Para cada ejercicio de la sesión, comprueba si las últimas 3 apariciones
@@ -270,7 +282,7 @@ def detectar_estancamiento(sender, instance, created, raw=False, **kwargs):
         print(f"⚠️ Estancamiento check error (entreno {instance.id}): {e}")
 
 
-@receiver(post_save, sender=EntrenoRealizado)
+@pipeline_entreno.handler
 def actualizar_decision_log(sender, instance, created, raw=False, **kwargs):
     """Evalúa decisiones previas y genera nuevas al guardar un EntrenoRealizado."""
     if raw or getattr(instance, '_defer_cierre_aprendizaje_gym', False):
@@ -497,7 +509,7 @@ def joi_preferencia_aprendida(sender, instance, created, **kwargs):
 # ── Calibración RPE personal ──────────────────────────────────────────────────
 from django.db.models import Avg as _Avg
 
-@receiver(post_save, sender=EntrenoRealizado)
+@pipeline_entreno.handler
 def calibrar_rpe_personal(sender, instance, created, raw=False, update_fields=None, **kwargs):
     """
     Detecta discordancia persistente entre RPE reportado y zona FC real.
@@ -597,3 +609,95 @@ def calibrar_rpe_personal(sender, instance, created, raw=False, update_fields=No
     except Exception as e:
         import logging
         logging.getLogger(__name__).error(f"[RPE calibracion] {e}")
+
+
+# ── Libro diario de carga (CTL/ATL/TSB incremental) ───────────────────────────
+from django.db.models.signals import pre_save as _pre_save, post_delete as _post_delete
+
+
+@receiver(_pre_save, sender=ActividadRealizada)
+def recordar_fecha_carga_previa(sender, instance, raw=False, **kwargs):
+    """Guarda (cliente, fecha) anteriores para reescribir el libro si cambian."""
+    instance._carga_previa = None
+    if raw or instance.pk is None:
+        return
+    instance._carga_previa = (
+        ActividadRealizada.objects
+        .filter(pk=instance.pk)
+        .values_list('cliente_id', 'fecha')
+        .first()
+    )
+
+
+@receiver(post_save, sender=ActividadRealizada)
+def actualizar_carga_diaria(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    from entrenos.services.carga_diaria_service import actualizar_seguro
+
+    previa = getattr(instance, '_carga_previa', None)
+    if previa and previa[0] != instance.cliente_id:
+        actualizar_seguro(previa[0], previa[1])
+        previa = None
+    desde = min(instance.fecha, previa[1]) if previa else instance.fecha
+    actualizar_seguro(instance.cliente_id, desde)
+
+
+@receiver(_post_delete, sender=ActividadRealizada)
+def revertir_carga_diaria(sender, instance, **kwargs):
+    from entrenos.services.carga_diaria_service import actualizar_seguro
+    actualizar_seguro(instance.cliente_id, instance.fecha)
+
+
+# ── Índice de mejores marcas (1RM por ejercicio) ──────────────────────────────
+from django.db.models.signals import pre_delete as _pre_delete
+from entrenos.models import SerieRealizada
+
+
+@receiver(post_save, sender=EjercicioRealizado)
+def indexar_marca_ejercicio(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    from entrenos.services import mejores_marcas_service
+    try:
+        mejores_marcas_service.registrar_ejercicio(instance, creado=created)
+    except Exception as e:
+        logger.warning('indexar_marca_ejercicio: ejercicio %s: %s', instance.pk, e)
+
+
+@receiver(post_save, sender=SerieRealizada)
+def indexar_marca_serie(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    from entrenos.services import mejores_marcas_service
+    try:
+        mejores_marcas_service.registrar_serie_realizada(instance, creado=created)
+    except Exception as e:
+        logger.warning('indexar_marca_serie: serie %s: %s', instance.pk, e)
+
+
+@receiver(_post_delete, sender=EjercicioRealizado)
+def retirar_marca_ejercicio(sender, instance, **kwargs):
+    from entrenos.services import mejores_marcas_service
+    mejores_marcas_service.retirar(instance.nombre_ejercicio, instance.entreno_id)
+
+
+@receiver(_post_delete, sender=SerieRealizada)
+def retirar_marca_serie(sender, instance, **kwargs):
+    from entrenos.services import mejores_marcas_service
+    mejores_marcas_service.retirar(instance.ejercicio.nombre, instance.entreno_id)
+
+
+@receiver(_pre_delete, sender=EntrenoRealizado)
+def recordar_marcas_del_entreno(sender, instance, **kwargs):
+    # El borrado en cascada pone entreno_mejor a NULL antes de avisar a las
+    # series: hay que anotar aquí qué marcas dependían de este entreno.
+    from entrenos.services import mejores_marcas_service
+    instance._marcas_afectadas = mejores_marcas_service.marcas_del_entreno(instance.pk)
+
+
+@receiver(_post_delete, sender=EntrenoRealizado)
+def recalcular_marcas_del_entreno(sender, instance, **kwargs):
+    from entrenos.services import mejores_marcas_service
+    for cliente_id, ejercicio in getattr(instance, '_marcas_afectadas', ()):
+        mejores_marcas_service.recalcular_ejercicio(cliente_id, ejercicio)
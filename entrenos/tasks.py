@@ -26,3 +26,10 @@ def evaluar_intervenciones_esenciales_diarias():
         generar_resultado_intervencion_joi.delay(iv.pk)
         reencoladas += 1
     return {'evaluadas': evaluadas, 'joi_reencoladas': reencoladas}
+
+
+@shared_task
+def procesar_eventos_entreno(cliente_id):
+    """Handlers diferidos del pipeline post-guardado (ver pipeline_entreno)."""
+    from entrenos.services.pipeline_entreno import procesar_pendientes
+    return procesar_pendientes(cliente_id)
@@ -11,6 +11,7 @@ from django.core.cache import cache
 from django.test import TestCase
 
 from clientes.models import Cliente
+from core.services import cache_cliente
 from entrenos.services.services import EstadisticasService
 
 
@@ -41,14 +42,14 @@ class AcwrSelfCachingTests(TestCase):
 
     def test_usa_la_misma_clave_que_las_señales_de_invalidacion(self):
         """Las señales en entrenos/signals.py, hyrox_bridge.py y views.py invalidan
-        'dashboard_acwr_unificado_{id}' directamente — si esta clave cambia sin
-        actualizar esos 4 sitios, el caché queda huérfano y nunca se invalida."""
+        la familia versionada 'dashboard_acwr_unificado' del cliente — si la
+        clave sale de cache_cliente, el caché queda huérfano y nunca se invalida."""
         with patch.object(
             EstadisticasService, '_analizar_acwr_unificado_calc',
             return_value={'acwr_actual': 1.0, 'dataframe': []},
         ):
             EstadisticasService.analizar_acwr_unificado(self.cliente)
-        self.assertIsNotNone(cache.get(f'dashboard_acwr_unificado_{self.cliente.id}'))
+        self.assertIsNotNone(cache_cliente.obtener('dashboard_acwr_unificado', self.cliente.id))
 
     def test_invalidar_la_clave_fuerza_recalculo(self):
         with patch.object(
@@ -56,6 +57,6 @@ class AcwrSelfCachingTests(TestCase):
             return_value={'acwr_actual': 1.0, 'dataframe': []},
         ) as mock_calc:
             EstadisticasService.analizar_acwr_unificado(self.cliente)
-            cache.delete(f'dashboard_acwr_unificado_{self.cliente.id}')
+            cache_cliente.invalidar_cliente(self.cliente.id)
             EstadisticasService.analizar_acwr_unificado(self.cliente)
             self.assertEqual(mock_calc.call_count, 2)
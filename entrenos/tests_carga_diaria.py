@@ -0,0 +1,95 @@
+"""
+Libro diario CargaDiariaCliente: el estado incremental debe coincidir con el
+EWMA completo que calculaba HyroxLoadManager sobre todo el historial.
+"""
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from clientes.models import Cliente
+from entrenos.models import ActividadRealizada, CargaDiariaCliente
+from entrenos.services import carga_diaria_service
+
+
+class CargaDiariaLibroTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('carga_diaria_user')
+        self.cliente = Cliente.objects.get(user=user)
+        self.hoy = date(2026, 9, 30)
+
+    def _actividad(self, dias_atras, carga_ua, **extra):
+        return ActividadRealizada.objects.create(
+            cliente=self.cliente,
+            fecha=self.hoy - timedelta(days=dias_atras),
+            tipo='gym',
+            carga_ua=carga_ua,
+            **extra,
+        )
+
+    def _assert_consistente(self, hasta=None):
+        resultado = carga_diaria_service.verificar(self.cliente.id, hasta or self.hoy)
+        self.assertTrue(resultado['consistente'], resultado)
+        return resultado
+
+    def test_guardar_actividades_mantiene_libro_denso_y_consistente(self):
+        self._actividad(40, 400)
+        self._actividad(20, 350)
+        self._actividad(3, 600)
+
+        filas = CargaDiariaCliente.objects.filter(cliente=self.cliente)
+        self.assertEqual(filas.count(), 38)
+        resultado = self._assert_consistente()
+        self.assertEqual(resultado['libro'], resultado['referencia'])
+
+    def test_actividad_retroactiva_y_borrado_reescriben_desde_la_fecha(self):
+        self._actividad(30, 400)
+        tardia = self._actividad(10, 500)
+        self._actividad(50, 300)  # anterior al inicio del libro
+        self._assert_consistente()
+
+        tardia.delete()
+        self._assert_consistente()
+        self.assertEqual(
+            CargaDiariaCliente.objects.filter(cliente=self.cliente).order_by('-fecha').first().fecha,
+            self.hoy - timedelta(days=30),
+        )
+
+    def test_cambio_de_fecha_reescribe_ambos_dias(self):
+        act = self._actividad(15, 450)
+        self._actividad(25, 200)
+        act.fecha = self.hoy - timedelta(days=5)
+        act.save()
+        self._assert_consistente()
+        self._assert_consistente(self.hoy - timedelta(days=12))
+
+    def test_hyrox_load_manager_lee_el_libro_en_una_consulta(self):
+        from hyrox.models import HyroxObjective
+        from hyrox.training_engine import HyroxLoadManager
+
+        for d in range(0, 300, 2):
+            self._actividad(d, 300 + d)
+        objetivo = HyroxObjective.objects.create(
+            cliente=self.cliente, fecha_evento=self.hoy + timedelta(days=60),
+        )
+
+        referencia = carga_diaria_service.calcular_desde_cero(self.cliente.id, self.hoy)
+        with self.assertNumQueries(1):
+            carga = HyroxLoadManager.calcular_ctl_atl_tsb(objetivo, hasta_fecha=self.hoy)
+        self.assertEqual(carga, referencia)
+
+    def test_comando_reconstruye_y_verifica(self):
+        self._actividad(12, 400)
+        self._actividad(2, 250)
+        CargaDiariaCliente.objects.all().delete()
+
+        out = StringIO()
+        call_command('reconstruir_carga_diaria', '--verificar', stdout=out)
+        self.assertIn('Inconsistentes: 1', out.getvalue())
+
+        out = StringIO()
+        call_command('reconstruir_carga_diaria', stdout=out)
+        self.assertIn('Filas escritas: 11', out.getvalue())
+        self.assertIn('Inconsistentes: 0', out.getvalue())
@@ -0,0 +1,145 @@
+"""
+Exportación Liftin en streaming: queries por bloque (no por fila), filtros
+por cliente y fechas, y formatos CSV, JSON, JSON Lines y columnar.
+"""
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clientes.models import Cliente
+from entrenos.models import EjercicioLiftinDetallado, EntrenoRealizado
+from entrenos.services import exportacion_liftin_service, importacion_liftin_service
+from rutinas.models import Rutina
+
+
+class ExportacionLiftinTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('exporta_liftin', password='x')
+        self.cliente = Cliente.objects.get(user=self.user)
+        self.otro = Cliente.objects.get(user=User.objects.create_user('exporta_otro'))
+        self.rutina = Rutina.objects.create(nombre='Pierna')
+
+    def _entreno(self, cliente, fecha, notas='Ejercicios Detallados:\n✓ Sentadilla: 100, 3x5'):
+        return EntrenoRealizado.objects.create(
+            cliente=cliente, rutina=self.rutina, fecha=fecha, fuente_datos='liftin',
+            duracion_minutos=50, notas_liftin=notas,
+        )
+
+    def _contenido(self, chunks):
+        return ''.join(chunks)
+
+    def test_queries_por_bloque_no_por_fila(self):
+        def queries(n):
+            EntrenoRealizado.objects.all().delete()
+            for i in range(n):
+                self._entreno(self.cliente, datetime.date(2026, 1, 1) + datetime.timedelta(days=i))
+            entrenos = exportacion_liftin_service.entrenos_a_exportar()
+            with CaptureQueriesContext(connection) as capturadas:
+                self._contenido(exportacion_liftin_service.exportar(
+                    'json', entrenos, con_ejercicios=True, bloque=2,
+                ))
+            return len(capturadas)
+
+        # Una query de entrenos y una de ejercicios por bloque de 2; nada por fila
+        self.assertEqual(queries(2), 2)
+        self.assertEqual(queries(6), 4)
+
+    def test_vista_filtra_por_cliente_y_fechas_en_streaming(self):
+        self._entreno(self.cliente, datetime.date(2026, 2, 1))
+        self._entreno(self.cliente, datetime.date(2026, 2, 10))
+        self._entreno(self.cliente, datetime.date(2026, 3, 1))
+        self._entreno(self.otro, datetime.date(2026, 2, 5))
+        self.client.force_login(self.user)
+
+        respuesta = self.client.post(reverse('entrenos:exportar_datos_liftin'), {
+            'formato': 'csv', 'cliente': self.cliente.pk,
+            'fecha_desde': '2026-02-01', 'fecha_hasta': '2026-02-28',
+        })
+
+        self.assertIsInstance(respuesta, StreamingHttpResponse)
+        self.assertIn('.csv', respuesta['Content-Disposition'])
+        filas = list(csv.reader(io.StringIO(b''.join(respuesta.streaming_content).decode())))
+        self.assertEqual(filas[0][0], 'Fecha')
+        self.assertEqual([f[0] for f in filas[1:]], ['2026-02-10', '2026-02-01'])
+
+    def test_vista_limita_a_su_cliente_salvo_staff(self):
+        self._entreno(self.cliente, datetime.date(2026, 2, 1))
+        self._entreno(self.otro, datetime.date(2026, 2, 5))
+        url = reverse('entrenos:exportar_datos_liftin')
+        self.client.force_login(self.user)
+
+        respuesta = self.client.post(url, {'formato': 'csv', 'cliente': self.otro.pk})
+        self.assertEqual(respuesta.status_code, 403)
+
+        respuesta = self.client.post(url, {'formato': 'csv'})
+        filas = list(csv.reader(io.StringIO(b''.join(respuesta.streaming_content).decode())))
+        self.assertEqual([f[0] for f in filas[1:]], ['2026-02-01'])
+        self.assertEqual(list(self.client.get(url).context['clientes']), [self.cliente])
+
+        self.user.is_staff = True
+        self.user.save()
+        respuesta = self.client.post(url, {'formato': 'csv', 'cliente': self.otro.pk})
+        filas = list(csv.reader(io.StringIO(b''.join(respuesta.streaming_content).decode())))
+        self.assertEqual([f[0] for f in filas[1:]], ['2026-02-05'])
+
+    def test_json_mantiene_las_claves_de_la_exportacion(self):
+        entreno = self._entreno(self.cliente, datetime.date(2026, 4, 1))
+
+        datos = json.loads(self._contenido(exportacion_liftin_service.exportar(
+            'json', exportacion_liftin_service.entrenos_a_exportar(), con_ejercicios=True,
+        )))
+
+        self.assertEqual(len(datos), 1)
+        self.assertEqual(datos[0]['id'], entreno.pk)
+        self.assertEqual(datos[0]['cliente'], self.cliente.nombre)
+        self.assertIn('volumen_total_formateado', datos[0])
+        self.assertEqual(datos[0]['ejercicios'], [{
+            'nombre': 'sentadilla', 'peso_formateado': '100', 'repeticiones_formateado': '3x5',
+            'estado': 'completado', 'orden': 0,
+        }])
+        self.assertEqual(self._contenido(exportacion_liftin_service.exportar(
+            'json', EntrenoRealizado.objects.none(),
+        )), '[]\n')
+
+    def test_columnar_por_bloques(self):
+        for dia in range(1, 4):
+            self._entreno(self.cliente, datetime.date(2026, 5, dia))
+
+        lineas = self._contenido(exportacion_liftin_service.exportar(
+            'columnar', exportacion_liftin_service.entrenos_a_exportar(), bloque=2,
+        )).splitlines()
+
+        cabecera, *bloques = map(json.loads, lineas)
+        self.assertEqual(cabecera['columnas'], list(exportacion_liftin_service.COLUMNAS))
+        self.assertEqual([b['n'] for b in bloques], [2, 1])
+        fechas = cabecera['columnas'].index('fecha')
+        self.assertEqual(bloques[0]['valores'][fechas], ['2026-05-03', '2026-05-02'])
+
+    def test_jsonl_se_reimporta(self):
+        self._entreno(self.cliente, datetime.date(2026, 6, 1))
+        self._entreno(self.cliente, datetime.date(2026, 6, 3))
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        ruta = os.path.join(tmp.name, 'export.jsonl')
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.writelines(exportacion_liftin_service.exportar(
+                'jsonl', exportacion_liftin_service.entrenos_a_exportar(cliente_id=self.cliente.pk),
+                con_ejercicios=True,
+            ))
+
+        resumen = importacion_liftin_service.importar(ruta, cliente_id=self.otro.pk)
+
+        self.assertEqual((resumen.errores, resumen.entrenos), ([], 2))
+        self.assertEqual(
+            EjercicioLiftinDetallado.objects.filter(entreno__cliente=self.otro).count(), 2,
+        )
@@ -75,13 +75,14 @@ class TestSyncRm(TestCase):
 
     def test_invalida_cache_tras_actualizacion(self):
         from django.core.cache import cache
+        from core.services import cache_cliente
         cache.set(f'hyrox_readiness_{self.objetivo.pk}', 'cached_value', 60)
-        cache.set(f'dashboard_acwr_unificado_{self.cliente.id}', 'cached_acwr', 60)
+        cache_cliente.guardar('dashboard_acwr_unificado', self.cliente.id, 'cached_acwr', 60)
 
         sync_rm_to_hyrox(self.objetivo, 'rm_sentadilla', 95.0)
 
         self.assertIsNone(cache.get(f'hyrox_readiness_{self.objetivo.pk}'))
-        self.assertIsNone(cache.get(f'dashboard_acwr_unificado_{self.cliente.id}'))
+        self.assertIsNone(cache_cliente.obtener('dashboard_acwr_unificado', self.cliente.id))
 
     def test_no_invalida_cache_si_no_actualiza(self):
         from django.core.cache import cache
@@ -0,0 +1,187 @@
+"""
+Importación masiva de Liftin: bulk_create por lotes sin señales por fila y
+un único recálculo por cliente al final.
+"""
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase
+
+from clientes.models import Cliente
+from entrenos.models import (
+    ActividadRealizada,
+    CargaDiariaCliente,
+    EjercicioLiftinDetallado,
+    EjercicioRealizado,
+    EntrenoRealizado,
+    MejorMarcaEjercicio,
+    SerieNotaLiftin,
+)
+from entrenos.services import importacion_liftin_service
+from logros import contadores
+from logros.models import PerfilGamificacion
+
+
+def _registro(fecha, hora='18:00', **extra):
+    registro = {
+        'fecha': fecha,
+        'rutina': 'Torso A',
+        'hora_inicio': hora,
+        'duracion_minutos': 60,
+        'ejercicios': [
+            {'nombre': 'Press Banca con Barra', 'peso': '80', 'repeticiones': '3x8', 'rpe': 8},
+            {'nombre': 'Remo con Barra (Pendlay)', 'peso': '70', 'repeticiones': '3x10',
+             'estado': 'fallado'},
+        ],
+    }
+    registro.update(extra)
+    return registro
+
+
+class ImportacionLiftinTests(TestCase):
+    def setUp(self):
+        self.cliente = Cliente.objects.get(user=User.objects.create_user('importa_liftin'))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _fichero(self, registros, nombre='liftin.jsonl', array=False):
+        ruta = os.path.join(self.tmp.name, nombre)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            if array:
+                json.dump(registros, f, ensure_ascii=False, indent=2)
+            else:
+                f.write('\n'.join(json.dumps(r, ensure_ascii=False) for r in registros))
+        return ruta
+
+    def test_importa_lotes_y_recalcula_derivados(self):
+        ruta = self._fichero([
+            _registro('2026-01-05', cliente_id=self.cliente.pk),
+            _registro('2026-01-07', cliente_id=self.cliente.pk, liftin_workout_id='w-2'),
+            _registro('2026-01-09', cliente_id=self.cliente.pk),
+        ])
+
+        resumen = importacion_liftin_service.importar(ruta, lote=2)
+
+        self.assertEqual(resumen.errores, [])
+        self.assertEqual(resumen.entrenos, 3)
+        self.assertEqual(EntrenoRealizado.objects.filter(cliente=self.cliente, fuente_datos='liftin').count(), 3)
+        self.assertEqual(EjercicioRealizado.objects.filter(entreno__cliente=self.cliente).count(), 6)
+        self.assertEqual(SerieNotaLiftin.objects.filter(cliente=self.cliente).count(), 6)
+        self.assertEqual(EjercicioLiftinDetallado.objects.filter(entreno__cliente=self.cliente).count(), 6)
+
+        entreno = EntrenoRealizado.objects.get(cliente=self.cliente, fecha=datetime.date(2026, 1, 5))
+        self.assertEqual(entreno.numero_ejercicios, 2)
+        self.assertEqual(float(entreno.volumen_total_kg), 80 * 3 * 8)
+        self.assertEqual(entreno.hora_fin, datetime.time(19, 0))
+        self.assertTrue(entreno.notas_liftin.startswith('Ejercicios Detallados:\n✓ Press Banca con Barra: 80, 3x8'))
+
+        actividad = ActividadRealizada.objects.get(entreno_gym=entreno)
+        self.assertEqual((actividad.fuente, actividad.rpe_medio, actividad.carga_ua), ('liftin', 8.0, 480.0))
+        self.assertTrue(CargaDiariaCliente.objects.filter(cliente=self.cliente).exists())
+        self.assertTrue(MejorMarcaEjercicio.objects.filter(
+            cliente=self.cliente, ejercicio='press banca con barra',
+        ).exists())
+        self.assertGreater(resumen.filas_por_segundo, 0)
+
+    def test_sin_pks_devueltos_por_el_insert_relee_el_lote(self):
+        # MySQL: bulk_create no rellena los pk de los entrenos.
+        ruta = self._fichero([
+            _registro('2026-03-02', cliente_id=self.cliente.pk),
+            _registro('2026-03-04', cliente_id=self.cliente.pk, liftin_workout_id='w-9'),
+        ])
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            resumen = importacion_liftin_service.importar(ruta)
+
+        self.assertEqual(resumen.errores, [])
+        for entreno in EntrenoRealizado.objects.filter(cliente=self.cliente, fuente_datos='liftin'):
+            self.assertEqual(entreno.ejercicios_realizados.count(), 2)
+            self.assertEqual(entreno.numero_ejercicios, 2)
+            self.assertTrue(ActividadRealizada.objects.filter(entreno_gym=entreno).exists())
+
+    def test_reconstruye_contadores_de_pruebas(self):
+        perfil, _ = PerfilGamificacion.objects.get_or_create(cliente=self.cliente)
+        contadores.obtener(perfil)  # existentes antes de importar, sin volumen
+
+        importacion_liftin_service.importar(
+            self._fichero([_registro('2026-02-01'), _registro('2026-02-03')]),
+            cliente_id=self.cliente.pk,
+        )
+
+        perfil.contadores.refresh_from_db()
+        self.assertEqual(perfil.contadores.volumen_total_kg, 2 * 80 * 3 * 8)
+        self.assertEqual(perfil.contadores.entrenos_perfectos, 2)
+
+    def test_no_dispara_señales_por_fila(self):
+        recibidas = []
+
+        def contar(sender, **kwargs):
+            recibidas.append(sender)
+
+        post_save.connect(contar, sender=EntrenoRealizado, weak=False)
+        post_save.connect(contar, sender=EjercicioRealizado, weak=False)
+        self.addCleanup(post_save.disconnect, contar, sender=EntrenoRealizado)
+        self.addCleanup(post_save.disconnect, contar, sender=EjercicioRealizado)
+
+        importacion_liftin_service.importar(
+            self._fichero([_registro('2026-02-01'), _registro('2026-02-03')]),
+            cliente_id=self.cliente.pk,
+        )
+
+        self.assertEqual(recibidas, [])
+
+    def test_registro_invalido_no_escribe_nada(self):
+        ruta = self._fichero([
+            _registro('2026-01-05', cliente_id=self.cliente.pk),
+            _registro('no-es-fecha', cliente_id=self.cliente.pk),
+            {'fecha': '2026-01-06', 'cliente_id': self.cliente.pk},
+        ])
+
+        resumen = importacion_liftin_service.importar(ruta)
+
+        self.assertEqual([posicion for posicion, _ in resumen.errores], [2, 3])
+        self.assertFalse(EntrenoRealizado.objects.filter(cliente=self.cliente).exists())
+
+    def test_array_de_exportacion_y_reimportacion_omite_duplicados(self):
+        registros = [
+            {**_registro('2026-03-01'), 'cliente': self.cliente.nombre, 'ejercicios': [],
+             'notas_liftin': 'Ejercicios Detallados:\n✓ Peso Muerto: 150, 3x5'},
+            {**_registro('2026-03-02', hora='07:30'), 'cliente': self.cliente.nombre},
+        ]
+        ruta = self._fichero(registros, nombre='export.json', array=True)
+
+        primera = importacion_liftin_service.importar(ruta)
+        segunda = importacion_liftin_service.importar(ruta)
+
+        self.assertEqual((primera.entrenos, primera.duplicados), (2, 0))
+        self.assertEqual((segunda.entrenos, segunda.duplicados), (0, 2))
+        solo_notas = EntrenoRealizado.objects.get(cliente=self.cliente, fecha=datetime.date(2026, 3, 1))
+        self.assertEqual(solo_notas.numero_ejercicios, 1)
+        self.assertEqual(
+            list(solo_notas.ejercicios_liftin_detallados.values_list('nombre_ejercicio', 'series_realizadas')),
+            [('peso muerto', 3)],
+        )
+
+    def test_comando_informa_filas_por_segundo(self):
+        ruta = self._fichero([_registro('2026-04-01'), _registro('2026-04-02')])
+        salida = StringIO()
+
+        call_command('importar_liftin', ruta, '--dry-run', '--cliente', str(self.cliente.pk), stdout=salida)
+        self.assertIn('Registros válidos: 2', salida.getvalue())
+        self.assertFalse(EntrenoRealizado.objects.filter(cliente=self.cliente).exists())
+
+        call_command('importar_liftin', ruta, '--cliente', str(self.cliente.pk), stdout=salida)
+        self.assertIn('Importados: 2', salida.getvalue())
+        self.assertIn('filas/s', salida.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('importar_liftin', self._fichero([{'fecha': 'x'}], nombre='malo.jsonl'),
+                         stdout=StringIO(), stderr=StringIO())
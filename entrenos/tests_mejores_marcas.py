@@ -0,0 +1,120 @@
+"""
+Índice materializado de mejores marcas (MejorMarcaEjercicio): se mantiene
+al escribir series y da los mismos 1RM que la calculadora de analytics.
+"""
+import datetime
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from analytics.views import CalculadoraEjerciciosTabla
+from clientes.models import Cliente
+from clientes.views import calcular_top_1rm
+from entrenos.models import EjercicioRealizado, EntrenoRealizado, MejorMarcaEjercicio, SerieRealizada
+from entrenos.services import mejores_marcas_service
+from rutinas.models import EjercicioBase, Rutina
+
+
+class MejoresMarcasTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('mejores_marcas_user')
+        self.cliente = Cliente.objects.get(user=user)
+        self.rutina = Rutina.objects.create(nombre='Marcas')
+
+    def _ejercicio(self, nombre, peso, reps, fecha=datetime.date(2026, 3, 1)):
+        entreno = EntrenoRealizado.objects.create(cliente=self.cliente, rutina=self.rutina, fecha=fecha)
+        return EjercicioRealizado.objects.create(
+            entreno=entreno, nombre_ejercicio=nombre, peso_kg=peso, series=3, repeticiones=reps,
+        )
+
+    def _fila(self, ejercicio):
+        return MejorMarcaEjercicio.objects.get(cliente=self.cliente, ejercicio=ejercicio)
+
+    def test_guardar_series_mantiene_mejor_marca_y_ultima_fecha(self):
+        self._ejercicio('Press Banca con Barra', 80, 5, datetime.date(2026, 3, 1))
+        self._ejercicio('press banca con barra ', 70, 5, datetime.date(2026, 3, 8))
+
+        fila = self._fila('press banca con barra')
+        self.assertAlmostEqual(fila.rm_estimado, 80 * (1 + 5 / 30))
+        self.assertEqual(fila.mejor_peso_kg, 80)
+        self.assertEqual(fila.fecha_mejor, datetime.date(2026, 3, 1))
+        self.assertEqual(fila.ultima_fecha, datetime.date(2026, 3, 8))
+        self.assertEqual(fila.movimiento_principal, 'Press Banca')
+
+    def test_mismos_maximos_que_la_calculadora(self):
+        self._ejercicio('Press Banca con Barra', 80, 5)
+        self._ejercicio('Press Inclinado con Mancuernas', 40, 10)
+        self._ejercicio('Sentadilla Trasera con Barra', 120, 3)
+        self._ejercicio('Curl de Bíceps', 20, 12)
+
+        self.assertEqual(
+            mejores_marcas_service.maximos_por_movimiento(self.cliente),
+            CalculadoraEjerciciosTabla(self.cliente).calcular_1rm_estimado_por_ejercicio(),
+        )
+
+    def test_editar_o_borrar_la_serie_de_la_marca_recalcula(self):
+        mejor = self._ejercicio('Peso Muerto', 180, 2, datetime.date(2026, 3, 1))
+        self._ejercicio('Peso Muerto', 150, 3, datetime.date(2026, 3, 5))
+
+        mejor.peso_kg = 100
+        mejor.save()
+        self.assertAlmostEqual(self._fila('peso muerto').rm_estimado, 150 * (1 + 3 / 30))
+
+        self._ejercicio('Peso Muerto', 200, 1, datetime.date(2026, 3, 9)).entreno.delete()
+        fila = self._fila('peso muerto')
+        self.assertAlmostEqual(fila.rm_estimado, 150 * (1 + 3 / 30))
+        self.assertEqual(fila.fecha_mejor, datetime.date(2026, 3, 5))
+
+    def test_series_realizadas_tambien_indexan(self):
+        base = EjercicioBase.objects.create(nombre='Sentadilla Frontal con Barra', grupo_muscular='Piernas')
+        entreno = EntrenoRealizado.objects.create(
+            cliente=self.cliente, rutina=self.rutina, fecha=datetime.date(2026, 3, 2),
+        )
+        SerieRealizada.objects.create(
+            entreno=entreno, ejercicio=base, serie_numero=1, repeticiones=5, peso_kg=90, completado=True,
+        )
+
+        self.assertEqual(
+            mejores_marcas_service.maximos_por_movimiento(self.cliente),
+            {'Sentadilla': round(90 * (1 + 5 / 30), 2)},
+        )
+
+    def test_comando_reconstruye_igual_que_el_incremental(self):
+        self._ejercicio('Press Banca con Barra', 80, 5, datetime.date(2026, 3, 1))
+        self._ejercicio('Press Militar con Barra (de pie)', 50, 6, datetime.date(2026, 3, 4))
+        incremental = sorted(
+            MejorMarcaEjercicio.objects.values_list('ejercicio', 'rm_estimado', 'ultima_fecha', 'entreno_mejor_id')
+        )
+
+        salida = StringIO()
+        call_command('recalcular_mejores_marcas', stdout=salida)
+
+        self.assertIn('Filas escritas: 2', salida.getvalue())
+        self.assertEqual(
+            sorted(MejorMarcaEjercicio.objects.values_list(
+                'ejercicio', 'rm_estimado', 'ultima_fecha', 'entreno_mejor_id',
+            )),
+            incremental,
+        )
+
+    def test_historial_sin_indexar_se_reconstruye_al_leer(self):
+        self._ejercicio('Press Banca con Barra', 80, 5)
+        MejorMarcaEjercicio.objects.all().delete()
+
+        self.assertIn('Press Banca', mejores_marcas_service.maximos_por_movimiento(self.cliente))
+        self.assertTrue(MejorMarcaEjercicio.objects.filter(cliente=self.cliente).exists())
+
+    def test_top_del_dashboard_sale_del_indice(self):
+        self._ejercicio('Curl de Bíceps', 20, 12)
+        self._ejercicio('Sentadilla Trasera con Barra', 120, 3)
+        self._ejercicio('Press Banca con Barra', 80, 5)
+
+        with self.assertNumQueries(2):
+            top = calcular_top_1rm(self.cliente)
+
+        self.assertEqual(
+            [f.ejercicio for f in top],
+            ['sentadilla trasera con barra', 'press banca con barra', 'curl de bíceps'],
+        )
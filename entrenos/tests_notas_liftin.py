@@ -0,0 +1,129 @@
+"""
+Notas Liftin parseadas una sola vez a SerieNotaLiftin y lectores de
+analytics sobre las filas estructuradas.
+"""
+from datetime import date
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from analytics.models import AnalisisEjercicio, MetricaRendimiento
+from analytics.signals import actualizar_analisis_ejercicio_especifico, calcular_metricas_dia
+from clientes.models import Cliente
+from entrenos.models import EntrenoRealizado, SerieNotaLiftin
+from entrenos.services import notas_liftin_service
+from entrenos.utils.utils import parsear_ejercicios_de_notas
+from rutinas.models import Rutina
+
+NOTAS = (
+    "Ejercicios Detallados:\n"
+    "✓ Press Banca: 80, 3x8\n"
+    "✗ Sentadilla: 100,5, 4x5-7\n"
+    "N Dominadas: PC, 3x10\n"
+)
+
+
+class NotasLiftinTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('notas_liftin_user')
+        self.cliente = Cliente.objects.get(user=user)
+        self.rutina = Rutina.objects.create(nombre='Liftin')
+
+    def _entreno(self, fecha, notas=NOTAS):
+        return EntrenoRealizado.objects.create(
+            cliente=self.cliente, rutina=self.rutina, fecha=fecha, notas_liftin=notas,
+        )
+
+    def test_guardar_parsea_una_vez_a_filas_estructuradas(self):
+        entreno = self._entreno(date(2026, 9, 1))
+
+        filas = list(SerieNotaLiftin.objects.filter(entreno=entreno).order_by('orden'))
+        self.assertEqual(
+            [(f.nombre_normalizado, f.peso_kg, f.series, f.repeticiones, f.completado) for f in filas],
+            [
+                ('press banca', 80.0, 3, 8, True),
+                ('sentadilla', 100.5, 4, 6, False),
+                ('dominadas', 0.0, 3, 10, False),
+            ],
+        )
+        self.assertTrue(all(f.cliente_id == self.cliente.id and f.fecha == entreno.fecha for f in filas))
+        self.assertEqual(filas[0].ejercicio, 'Press Banca')
+        self.assertEqual(notas_liftin_service.ejercicios_de(entreno), parsear_ejercicios_de_notas(NOTAS))
+
+    def test_resave_sin_cambios_no_reescribe_y_cambio_de_notas_si(self):
+        entreno = self._entreno(date(2026, 9, 1))
+        ids = set(SerieNotaLiftin.objects.values_list('pk', flat=True))
+
+        entreno.save()
+        entreno.duracion_minutos = 45
+        entreno.save(update_fields=['duracion_minutos'])
+        self.assertEqual(set(SerieNotaLiftin.objects.values_list('pk', flat=True)), ids)
+
+        entreno.notas_liftin = "✓ Press Banca: 85, 3x8"
+        entreno.save(update_fields=['notas_liftin'])
+        self.assertEqual(
+            list(SerieNotaLiftin.objects.filter(entreno=entreno).values_list('peso_kg', flat=True)),
+            [85.0],
+        )
+
+        entreno.notas_liftin = ''
+        entreno.save()
+        self.assertFalse(SerieNotaLiftin.objects.filter(entreno=entreno).exists())
+
+    def test_lectores_de_analytics_usan_las_filas(self):
+        self._entreno(date(2026, 9, 1))
+        self._entreno(date(2026, 9, 8), "✓ Press Banca: 90, 3x8")
+
+        calcular_metricas_dia(self.cliente, date(2026, 9, 1))
+        metrica = MetricaRendimiento.objects.get(cliente=self.cliente, fecha=date(2026, 9, 1))
+        self.assertAlmostEqual(metrica.volumen_total, 80 * 3 * 8 + 100.5 * 4 * 6)
+
+        with patch('entrenos.utils.utils.parsear_ejercicios_de_notas') as parser:
+            actualizar_analisis_ejercicio_especifico(self.cliente, 'press banca', date(2026, 9, 8))
+        parser.assert_not_called()
+        analisis = AnalisisEjercicio.objects.get(
+            cliente=self.cliente, nombre_ejercicio='press banca', fecha=date(2026, 9, 8),
+        )
+        self.assertEqual(float(analisis.progresion_peso), 12.5)
+        self.assertEqual(float(analisis.peso_maximo), 90)
+        self.assertEqual(float(analisis.volumen_ejercicio), 90 * 3 * 8)
+
+    def test_intensidad_avanzada_precarga_las_filas_liftin(self):
+        from analytics.analisis_intensidad import AnalisisIntensidadAvanzado
+
+        for dia in range(1, 6):
+            self._entreno(date(2026, 9, dia))
+        analisis = AnalisisIntensidadAvanzado(self.cliente)
+
+        # entrenos + ejercicios_realizados + series_liftin, sin una por entreno
+        with self.assertNumQueries(3):
+            entrenos = list(analisis._entrenos_desde(date(2026, 9, 1)))
+            zonas = [analisis._estimar_zona_entrenamiento(e) for e in entrenos]
+            cargas = [analisis._calcular_carga_dia(e) for e in entrenos]
+        self.assertEqual(len(zonas), 5)
+        self.assertTrue(all(carga >= 10 for carga in cargas))
+
+    def test_entreno_sin_filas_se_parsea_al_vuelo(self):
+        entreno = self._entreno(date(2026, 9, 1))
+        SerieNotaLiftin.objects.all().delete()
+        entreno = EntrenoRealizado.objects.prefetch_related('series_liftin').get(pk=entreno.pk)
+        self.assertEqual(notas_liftin_service.ejercicios_de(entreno), parsear_ejercicios_de_notas(NOTAS))
+
+    def test_comando_reparsea_solo_pendientes_y_versiones_antiguas(self):
+        self._entreno(date(2026, 9, 1))
+        sin_filas = self._entreno(date(2026, 9, 2))
+        SerieNotaLiftin.objects.filter(entreno=sin_filas).delete()
+
+        out = StringIO()
+        call_command('reparsear_notas_liftin', stdout=out)
+        self.assertIn('Entrenos: 1 | Filas escritas: 3', out.getvalue())
+
+        with patch.object(notas_liftin_service, 'VERSION_PARSER', 2):
+            out = StringIO()
+            call_command('reparsear_notas_liftin', '--dry-run', stdout=out)
+            self.assertIn('Entrenos pendientes: 2', out.getvalue())
+            call_command('reparsear_notas_liftin', stdout=StringIO())
+        self.assertEqual(set(SerieNotaLiftin.objects.values_list('version', flat=True)), {2})
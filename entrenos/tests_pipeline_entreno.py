@@ -0,0 +1,125 @@
+"""
+Pipeline post-guardado de EntrenoRealizado: modo inline (comportamiento
+original de los post_save) y modo diferido (evento tras commit, fusión de
+guardados por cliente y una sola tarea Celery).
+"""
+from datetime import date
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from clientes.models import Cliente
+from entrenos.models import EntrenoRealizado, EventoEntrenoGuardado
+from entrenos.services import pipeline_entreno
+from rutinas.models import Rutina
+
+
+class _Espia:
+    def __init__(self):
+        self.llamadas = []
+        self.__name__ = 'espia'
+
+    def __call__(self, sender, instance, created, raw=False, update_fields=None, **kwargs):
+        self.llamadas.append((instance.pk, created, update_fields, getattr(instance, '_defer_prueba', False)))
+
+
+class RegistroPipelineTests(SimpleTestCase):
+    def test_receptores_derivados_registrados_en_el_pipeline(self):
+        nombres = {f.__name__ for f in pipeline_entreno.handlers()}
+        self.assertTrue({
+            'detectar_estancamiento', 'actualizar_decision_log', 'calibrar_rpe_personal',
+            'actualizar_metricas_entreno', 'sync_gym_impact_to_hyrox',
+            'invalidar_joi_por_sesion_alta_rpe',
+        } <= nombres)
+
+    def test_fusion_de_update_fields(self):
+        self.assertEqual(pipeline_entreno._fusionar_campos(['a'], ['b', 'a']), ['a', 'b'])
+        self.assertIsNone(pipeline_entreno._fusionar_campos(['a'], None))
+        self.assertIsNone(pipeline_entreno._fusionar_campos(None, ['b']))
+
+
+class PipelineEntrenoTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('pipeline_entreno_user')
+        self.cliente = Cliente.objects.get(user=user)
+        self.rutina = Rutina.objects.create(nombre='Pipeline')
+        self.espia = _Espia()
+        parche = patch.object(pipeline_entreno, '_HANDLERS', [self.espia])
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def _entreno(self, **extra):
+        return EntrenoRealizado.objects.create(
+            cliente=self.cliente, rutina=self.rutina, fecha=date(2026, 10, 1), **extra,
+        )
+
+    def test_inline_ejecuta_en_el_save_y_registra_tiempos(self):
+        with self.assertLogs('entrenos.services.pipeline_entreno', 'DEBUG') as logs:
+            entreno = self._entreno()
+        # Otros receptores síncronos re-guardan el entreno (update_fields)
+        self.assertEqual(self.espia.llamadas[0], (entreno.pk, True, None, False))
+        self.assertTrue(any('handler=espia' in linea for linea in logs.output))
+        self.assertFalse(EventoEntrenoGuardado.objects.exists())
+
+    @override_settings(ENTRENO_PIPELINE_MODO='diferido', ENTRENO_PIPELINE_VENTANA_S=15)
+    def test_diferido_fusiona_guardados_y_encola_una_tarea(self):
+        with patch('entrenos.services.pipeline_entreno.broker_alcanzable', return_value=True), \
+             patch('entrenos.tasks.procesar_eventos_entreno.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                entreno = self._entreno()
+                entreno._defer_prueba = True
+                entreno.save(update_fields=['notas_liftin'])
+            with self.captureOnCommitCallbacks(execute=True):
+                entreno.duracion_minutos = 50
+                entreno.save(update_fields=['duracion_minutos'])
+            with self.captureOnCommitCallbacks(execute=True):
+                otro = self._entreno()
+
+        self.assertEqual(self.espia.llamadas, [])
+        apply_async.assert_called_once_with(args=[self.cliente.id], countdown=15, retry=False)
+
+        evento = EventoEntrenoGuardado.objects.get(entreno=entreno)
+        self.assertTrue(evento.creado)
+        self.assertIsNone(evento.campos)  # el create fue un save completo
+        self.assertGreaterEqual(evento.guardados, 3)
+        self.assertEqual(evento.marcas, ['_defer_prueba'])
+
+        resultado = pipeline_entreno.procesar_pendientes(self.cliente.id)
+        self.assertEqual(resultado['eventos'], 2)
+        self.assertEqual(self.espia.llamadas, [
+            (entreno.pk, True, None, True),
+            (otro.pk, True, None, False),
+        ])
+        self.assertFalse(EventoEntrenoGuardado.objects.filter(procesado_en__isnull=True).exists())
+        self.assertEqual(pipeline_entreno.procesar_pendientes(self.cliente.id)['eventos'], 0)
+
+    @override_settings(ENTRENO_PIPELINE_MODO='diferido')
+    def test_diferido_sin_broker_procesa_tras_el_commit(self):
+        with patch('entrenos.services.pipeline_entreno.broker_alcanzable', return_value=False):
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                entreno = self._entreno()
+            self.assertEqual(self.espia.llamadas, [])
+            for callback in callbacks:
+                callback()
+
+        self.assertEqual(self.espia.llamadas[0], (entreno.pk, True, None, False))
+        self.assertFalse(EventoEntrenoGuardado.objects.filter(procesado_en__isnull=True).exists())
+
+    @override_settings(ENTRENO_PIPELINE_MODO='diferido')
+    def test_evento_fusionado_tras_el_reclamo_se_vuelve_a_encolar(self):
+        entreno, tardio = self._entreno(), self._entreno()
+        EventoEntrenoGuardado.objects.create(cliente=self.cliente, entreno=entreno, creado=True)
+
+        def fusion_tardia(**kwargs):
+            # registrar_evento vio el pendiente anterior al reclamo y no encoló
+            if not EventoEntrenoGuardado.objects.filter(entreno=tardio).exists():
+                EventoEntrenoGuardado.objects.create(cliente=self.cliente, entreno=tardio, creado=True)
+
+        with patch.object(pipeline_entreno, '_HANDLERS', [fusion_tardia]), \
+             patch.object(pipeline_entreno, '_encolar') as encolar:
+            self.assertEqual(pipeline_entreno.procesar_pendientes(self.cliente.id)['eventos'], 1)
+        encolar.assert_called_once_with(self.cliente.id)
+
+        self.assertEqual(pipeline_entreno.procesar_pendientes(self.cliente.id)['eventos'], 1)
+        self.assertFalse(EventoEntrenoGuardado.objects.filter(procesado_en__isnull=True).exists())
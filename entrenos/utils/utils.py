@@ -137,6 +137,7 @@ def parsear_ejercicios_de_notas(notas):
 
             ejercicios.append({
                 'nombre': normalizar_nombre_ejercicio(nombre),
+                'nombre_original': nombre.strip(),
                 'peso': peso.strip(),
                 'repeticiones': repeticiones_str.strip(),
                 'completado': completado_raw == '✓',
@@ -3243,86 +3243,18 @@ def exportar_datos_liftin(request):
 
 def exportar_csv_liftin(entrenamientos):
     """
-    Exportar entrenamientos a formato CSV
+    Exportar entrenamientos a formato CSV (streaming)
     """
-    response = HttpResponse(content_type='text/csv')
-    response[
-        'Content-Disposition'] = f'attachment; filename="entrenamientos_liftin_{timezone.now().strftime("%Y%m%d")}.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow([
-        'Fecha', 'Cliente', 'Rutina', 'Fuente', 'Hora Inicio', 'Hora Fin',
-        'Duración (min)', 'Ejercicios', 'Volumen (kg)', 'Calorías',
-        'FC Promedio', 'FC Máxima', 'Notas'
-    ])
-
-    for entreno in entrenamientos:
-        writer.writerow([
-            entreno.fecha,
-            entreno.cliente.nombre,
-            entreno.nombre_rutina_liftin or entreno.rutina.nombre,
-            entreno.get_fuente_datos_display(),
-            entreno.hora_inicio or '',
-            entreno.hora_fin or '',
-            entreno.duracion_minutos or '',
-            entreno.numero_ejercicios or '',
-            entreno.volumen_total_kg or '',
-            entreno.calorias_quemadas or '',
-            entreno.frecuencia_cardiaca_promedio or '',
-            entreno.frecuencia_cardiaca_maxima or '',
-            entreno.notas_liftin or ''
-        ])
-
-    return response
+    from entrenos.views_liftin import respuesta_exportacion_liftin
+    return respuesta_exportacion_liftin('csv', entrenamientos)
 
 
 def exportar_json_liftin(entrenamientos):
     """
-    Exportar entrenamientos a formato JSON
+    Exportar entrenamientos a formato JSON (streaming)
     """
-    data = []
-
-    for entreno in entrenamientos:
-        ejercicios = []
-        if hasattr(entreno, 'ejercicios_liftin'):
-            ejercicios = [
-                {
-                    'nombre': ej.nombre_ejercicio,
-                    'peso_formateado': ej.peso_formateado,
-                    'repeticiones_formateado': ej.repeticiones_formateado,
-                    'estado': ej.estado_liftin,
-                    'orden': ej.orden_ejercicio,
-                }
-                for ej in entreno.ejercicios_liftin.all()
-            ]
-
-        data.append({
-            'id': entreno.id,
-            'fecha': entreno.fecha.isoformat(),
-            'cliente': entreno.cliente.nombre,
-            'rutina': entreno.nombre_rutina_liftin or entreno.rutina.nombre,
-            'fuente_datos': entreno.fuente_datos,
-            'hora_inicio': entreno.hora_inicio.isoformat() if entreno.hora_inicio else None,
-            'hora_fin': entreno.hora_fin.isoformat() if entreno.hora_fin else None,
-            'duracion_minutos': entreno.duracion_minutos,
-            'numero_ejercicios': entreno.numero_ejercicios,
-            'volumen_total_kg': float(entreno.volumen_total_kg) if entreno.volumen_total_kg else None,
-            'volumen_total_formateado': entreno.volumen_total_formateado,
-            'calorias_quemadas': entreno.calorias_quemadas,
-            'frecuencia_cardiaca_promedio': entreno.frecuencia_cardiaca_promedio,
-            'frecuencia_cardiaca_maxima': entreno.frecuencia_cardiaca_maxima,
-            'notas_liftin': entreno.notas_liftin,
-            'ejercicios': ejercicios,
-        })
-
-    response = HttpResponse(
-        json.dumps(data, indent=2, ensure_ascii=False),
-        content_type='application/json'
-    )
-    response[
-        'Content-Disposition'] = f'attachment; filename="entrenamientos_liftin_{timezone.now().strftime("%Y%m%d")}.json"'
-
-    return response
+    from entrenos.views_liftin import respuesta_exportacion_liftin
+    return respuesta_exportacion_liftin('json', entrenamientos, con_ejercicios=True)
 
 
 def comparar_liftin_manual(request):
@@ -4710,7 +4642,7 @@ def guardar_entrenamiento_activo(request, cliente_id):
                 # Actualizar ActividadRealizada con la duración real y recalcular carga_ua
                 try:
                     from entrenos.models import ActividadRealizada as _AR
-                    from django.core.cache import cache as _cache
+                    from core.services import cache_cliente
                     from datetime import date as _date
                     _hoy = _date.today()
                     _act_qs = _AR.objects.filter(entreno_gym=entreno)
@@ -4735,8 +4667,7 @@ def guardar_entrenamiento_activo(request, cliente_id):
                                 _update_fields.append('carga_ua')
                             _act.save(update_fields=_update_fields)
                     # Invalidar caché ACWR y carga total inmediatamente tras guardar
-                    _cache.delete(f'dashboard_acwr_unificado_{cliente.id}')
-                    _cache.delete(f'dashboard_carga_total_{cliente.id}')
+                    cache_cliente.invalidar_cliente(cliente.id)
                 except Exception as _e:
                     logger.warning("Error actualizando ActividadRealizada tras sesion: %s", _e)
 
@@ -8643,7 +8574,7 @@ def api_apple_health(request):
     """
     import json as _json
     from datetime import date as _date, datetime as _dt
-    from django.core.cache import cache as _cache
+    from core.services import cache_cliente
 
     if request.method != 'POST':
         return JsonResponse({'error': 'Solo POST'}, status=405)
@@ -8766,7 +8697,7 @@ def api_apple_health(request):
         accion = 'created'
 
     # Invalidar caché ACWR
-    _cache.delete(f'dashboard_acwr_unificado_{cliente.id}')
+    cache_cliente.invalidar_cliente(cliente.id)
 
     return JsonResponse({
         'ok': True,
@@ -3,10 +3,11 @@ from rutinas.models import Rutina, Programa
 from .forms import ImportarLiftinCompletoForm
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q, Count, Sum, Avg
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.core.paginator import Paginator
 from django.db.models import Q, Count, Sum, Avg, Max
 import json
@@ -29,6 +30,7 @@ from .forms import (
 )
 from clientes.models import Cliente
 from entrenos.models import EjercicioRealizado
+from entrenos.services import exportacion_liftin_service
 
 # ============================================================================
 # VISTAS PRINCIPALES DE IMPORTACIÓN
@@ -518,82 +520,51 @@ def detalle_ejercicios_liftin(request, entrenamiento_id):
 @login_required
 def exportar_datos_liftin(request):
     """
-    Vista para exportar datos específicos de Liftin
+    Vista para exportar datos específicos de Liftin (CSV, JSON, JSON Lines o
+    columnar), filtrando por cliente y rango de fechas. La respuesta se
+    genera en streaming. El staff exporta cualquier cliente; el resto de
+    usuarios, solo el suyo.
     """
+    clientes = Cliente.objects.order_by('nombre').only('id', 'nombre')
+    if not request.user.is_staff:
+        clientes = clientes.filter(user=request.user)
+
     if request.method == 'POST':
-        # Lógica de exportación (simplificada)
         formato = request.POST.get('formato', 'csv')
-
-        if formato == 'csv':
-            return exportar_csv_liftin_simple()
-        elif formato == 'json':
-            return exportar_json_liftin_simple()
+        if formato in exportacion_liftin_service.FORMATOS:
+            cliente_id = request.POST.get('cliente') or None
+            if not request.user.is_staff:
+                propio = clientes.first()
+                if propio is None or (cliente_id and cliente_id != str(propio.pk)):
+                    return HttpResponseForbidden("Solo puedes exportar tus propios entrenamientos.")
+                cliente_id = propio.pk
+            entrenamientos = exportacion_liftin_service.entrenos_a_exportar(
+                cliente_id=cliente_id,
+                desde=parse_date(request.POST.get('fecha_desde') or ''),
+                hasta=parse_date(request.POST.get('fecha_hasta') or ''),
+            )
+            return respuesta_exportacion_liftin(
+                formato, entrenamientos,
+                con_ejercicios=bool(request.POST.get('incluir_ejercicios')),
+            )
 
     # Si es GET, mostrar formulario de exportación
     context = {
         'title': 'Exportar Datos de Liftin',
+        'clientes': clientes,
     }
     return render(request, 'entrenos/exportar_datos_liftin.html', context)
 
 
-def exportar_csv_liftin_simple():
-    """
-    Exportación simple a CSV
-    """
-    import csv
-    from django.http import HttpResponse
-
-    response = HttpResponse(content_type='text/csv')
-    response[
-        'Content-Disposition'] = f'attachment; filename="entrenamientos_liftin_{timezone.now().strftime("%Y%m%d")}.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(['Fecha', 'Cliente', 'Rutina', 'Fuente', 'Duración', 'Calorías', 'Volumen'])
-
-    entrenamientos = EntrenoRealizado.objects.filter(fuente_datos='liftin').order_by('-fecha')
-
-    for entreno in entrenamientos:
-        writer.writerow([
-            entreno.fecha,
-            entreno.cliente.nombre,
-            entreno.rutina.nombre,
-            'Liftin',
-            entreno.duracion_minutos or '',
-            entreno.calorias_quemadas or '',
-            entreno.volumen_total_kg or ''
-        ])
-
-    return response
-
-
-def exportar_json_liftin_simple():
-    """
-    Exportación simple a JSON
-    """
-    import json
-    from django.http import HttpResponse
-
-    entrenamientos = EntrenoRealizado.objects.filter(fuente_datos='liftin').order_by('-fecha')
-
-    data = []
-    for entreno in entrenamientos:
-        data.append({
-            'fecha': entreno.fecha.isoformat(),
-            'cliente': entreno.cliente.nombre,
-            'rutina': entreno.rutina.nombre,
-            'fuente': 'Liftin',
-            'duracion_minutos': entreno.duracion_minutos,
-            'calorias_quemadas': entreno.calorias_quemadas,
-            'volumen_total_kg': float(entreno.volumen_total_kg) if entreno.volumen_total_kg else None,
-        })
-
-    response = HttpResponse(
-        json.dumps(data, indent=2, ensure_ascii=False),
-        content_type='application/json'
+def respuesta_exportacion_liftin(formato, entrenamientos, con_ejercicios=False):
+    """StreamingHttpResponse del formato pedido (ver exportacion_liftin_service)."""
+    content_type, extension = exportacion_liftin_service.FORMATOS[formato]
+    response = StreamingHttpResponse(
+        exportacion_liftin_service.exportar(formato, entrenamientos, con_ejercicios=con_ejercicios),
+        content_type=content_type,
     )
     response[
-        'Content-Disposition'] = f'attachment; filename="entrenamientos_liftin_{timezone.now().strftime("%Y%m%d")}.json"'
-
+        'Content-Disposition'] = f'attachment; filename="entrenamientos_liftin_{timezone.now().strftime("%Y%m%d")}.{extension}"'
     return response
 
 
@@ -601,84 +572,14 @@ def exportar_csv_liftin(entrenamientos):
     """
     Exportar entrenamientos a formato CSV
     """
-    response = HttpResponse(content_type='text/csv')
-    response[
-        'Content-Disposition'] = f'attachment; filename="entrenamientos_liftin_{timezone.now().strftime("%Y%m%d")}.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow([
-        'Fecha', 'Cliente', 'Rutina', 'Fuente', 'Hora Inicio', 'Hora Fin',
-        'Duración (min)', 'Ejercicios', 'Volumen (kg)', 'Calorías',
-        'FC Promedio', 'FC Máxima', 'Notas'
-    ])
-
-    for entreno in entrenamientos:
-        writer.writerow([
-            entreno.fecha,
-            entreno.cliente.nombre,
-            entreno.nombre_rutina_liftin or entreno.rutina.nombre,
-            entreno.get_fuente_datos_display(),
-            entreno.hora_inicio or '',
-            entreno.hora_fin or '',
-            entreno.duracion_minutos or '',
-            entreno.numero_ejercicios or '',
-            entreno.volumen_total_kg or '',
-            entreno.calorias_quemadas or '',
-            entreno.frecuencia_cardiaca_promedio or '',
-            entreno.frecuencia_cardiaca_maxima or '',
-            entreno.notas_liftin or ''
-        ])
-
-    return response
+    return respuesta_exportacion_liftin('csv', entrenamientos)
 
 
 def exportar_json_liftin(entrenamientos):
     """
     Exportar entrenamientos a formato JSON
     """
-    data = []
-
-    for entreno in entrenamientos:
-        ejercicios = []
-        if hasattr(entreno, 'ejercicios_liftin'):
-            ejercicios = [
-                {
-                    'nombre': ej.nombre_ejercicio,
-                    'peso_formateado': ej.peso_formateado,
-                    'repeticiones_formateado': ej.repeticiones_formateado,
-                    'estado': ej.estado_liftin,
-                    'orden': ej.orden_ejercicio,
-                }
-                for ej in entreno.ejercicios_liftin.all()
-            ]
-
-        data.append({
-            'id': entreno.id,
-            'fecha': entreno.fecha.isoformat(),
-            'cliente': entreno.cliente.nombre,
-            'rutina': entreno.nombre_rutina_liftin or entreno.rutina.nombre,
-            'fuente_datos': entreno.fuente_datos,
-            'hora_inicio': entreno.hora_inicio.isoformat() if entreno.hora_inicio else None,
-            'hora_fin': entreno.hora_fin.isoformat() if entreno.hora_fin else None,
-            'duracion_minutos': entreno.duracion_minutos,
-            'numero_ejercicios': entreno.numero_ejercicios,
-            'volumen_total_kg': float(entreno.volumen_total_kg) if entreno.volumen_total_kg else None,
-            'volumen_total_formateado': entreno.volumen_total_formateado,
-            'calorias_quemadas': entreno.calorias_quemadas,
-            'frecuencia_cardiaca_promedio': entreno.frecuencia_cardiaca_promedio,
-            'frecuencia_cardiaca_maxima': entreno.frecuencia_cardiaca_maxima,
-            'notas_liftin': entreno.notas_liftin,
-            'ejercicios': ejercicios,
-        })
-
-    response = HttpResponse(
-        json.dumps(data, indent=2, ensure_ascii=False),
-        content_type='application/json'
-    )
-    response[
-        'Content-Disposition'] = f'attachment; filename="entrenamientos_liftin_{timezone.now().strftime("%Y%m%d")}.json"'
-
-    return response
+    return respuesta_exportacion_liftin('json', entrenamientos, con_ejercicios=True)
 
 
 @login_required
@@ -1681,40 +1582,28 @@ def generar_insights_automaticos(cliente_seleccionado, entrenamientos_base, esta
 
 
 def generar_rankings(periodo):
-    """Generar rankings de clientes"""
-
-    fechas = calcular_fechas_periodo(periodo)
-
-    # Ranking por entrenamientos de Liftin
-    ranking_entrenamientos = Cliente.objects.filter(
-        entrenorealizado__fuente_datos='liftin',
-        entrenorealizado__fecha__gte=fechas['inicio'],
-        entrenorealizado__fecha__lte=fechas['fin']
-    ).annotate(
-        total_entrenamientos=Count('entrenorealizado')
-    ).order_by('-total_entrenamientos')[:5]
-
-    # Ranking por calorías
-    ranking_calorias = Cliente.objects.filter(
-        entrenorealizado__fecha__gte=fechas['inicio'],
-        entrenorealizado__fecha__lte=fechas['fin']
-    ).annotate(
-        total_calorias=Sum('entrenorealizado__calorias_quemadas')
-    ).order_by('-total_calorias')[:5]
-
-    # Ranking por volumen
-    ranking_volumen = Cliente.objects.filter(
-        entrenorealizado__fecha__gte=fechas['inicio'],
-        entrenorealizado__fecha__lte=fechas['fin']
-    ).annotate(
-        total_volumen=Sum('entrenorealizado__volumen_total_kg')
-    ).order_by('-total_volumen')[:5]
+    """
+    Generar rankings de clientes (top 5 por métrica).
 
-    return {
-        'entrenamientos': ranking_entrenamientos,
-        'calorias': ranking_calorias,
-        'volumen': ranking_volumen
-    }
+    Lee los valores precalculados de logros.rankings en vez de agregar todo
+    EntrenoRealizado en cada render; devuelve los mismos Cliente con
+    total_entrenamientos / total_calorias / total_volumen.
+    """
+    from logros import rankings
+
+    if periodo not in rankings.PERIODOS:
+        periodo = 'week'
+
+    resultado = {}
+    for metrica, atributo in (('entrenamientos', 'total_entrenamientos'),
+                              ('calorias', 'total_calorias'),
+                              ('volumen', 'total_volumen')):
+        clientes = []
+        for fila in rankings.top(periodo, metrica):
+            setattr(fila.cliente, atributo, fila.valor)
+            clientes.append(fila.cliente)
+        resultado[metrica] = clientes
+    return resultado
 
 
 def obtener_logros_recientes(cliente_seleccionado, limite=5):
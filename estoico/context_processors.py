@@ -1,14 +1,10 @@
 from .models import LogroUsuario, ReflexionDiaria, EstadisticaUsuario
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django.core.cache import cache
 
 
-def estoico_context(request):
-    """Context processor para datos estoicos globales."""
-    if not request.user.is_authenticated:
-        return {}
-
-    user = request.user
+def _datos_estoicos(user):
     cache_key = f'estoico_ctx_{user.id}'
     cached = cache.get(cache_key)
     if cached is not None:
@@ -43,3 +39,19 @@ def estoico_context(request):
 
     except Exception:
         return {}
+
+
+def estoico_context(request):
+    """
+    Context processor para datos estoicos globales. Valores perezosos: solo
+    se consultan si la plantilla los lee.
+    """
+    if not request.user.is_authenticated:
+        return {}
+
+    user = request.user
+    datos = SimpleLazyObject(lambda: _datos_estoicos(user))
+    return {
+        clave: SimpleLazyObject(lambda clave=clave: datos.get(clave))
+        for clave in ('logros_nuevos', 'reflexion_hoy', 'racha_actual')
+    }
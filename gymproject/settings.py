@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -83,6 +84,16 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Europe/Madrid'  # Alineado con TIME_ZONE — antes desalineado (America/Mexico_City)
 
+# Pipeline post-guardado de EntrenoRealizado (entrenos/services/pipeline_entreno.py).
+# 'diferido' (por defecto) encola los handlers derivados en Celery tras el commit,
+# agrupando los guardados de un cliente durante ENTRENO_PIPELINE_VENTANA_S segundos;
+# sin broker alcanzable los procesa en línea tras el commit. 'inline' los ejecuta
+# dentro del save: es el modo de `manage.py test`, o ENTRENO_PIPELINE_MODO=inline.
+ENTRENO_PIPELINE_MODO = os.environ.get(
+    'ENTRENO_PIPELINE_MODO', 'inline' if 'test' in sys.argv else 'diferido'
+)
+ENTRENO_PIPELINE_VENTANA_S = int(os.environ.get('ENTRENO_PIPELINE_VENTANA_S', '30'))
+
 from celery.schedules import crontab
 CELERY_BEAT_SCHEDULE = {
     'evaluar-intervenciones-esenciales': {
@@ -113,6 +124,14 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'joi.tasks.generar_poda_mensual',
         'schedule': crontab(hour=9, minute=0, day_of_month=1),  # día 1 de cada mes
     },
+    'logros-recalcular-rankings': {
+        'task': 'logros.tasks.recalcular_rankings',
+        'schedule': crontab(hour='*/6', minute=15),  # cada 6 horas
+    },
+    'hyrox-procesar-eventos-strava': {
+        'task': 'hyrox.tasks.procesar_eventos_strava',
+        'schedule': 60.0,  # cola del webhook de Strava, cada minuto
+    },
 }
 # Configuración de notificaciones push
 PUSH_NOTIFICATION_URL = 'https://fcm.googleapis.com/fcm/send'
@@ -243,15 +262,31 @@ ANALYTICS_CONFIG = {
     ]
 }
 # Configuración de cache para IA (opcional pero recomendado)
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'TIMEOUT': 900,
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000,
+# CACHE_BACKEND=redis comparte la caché entre workers (mismo Redis que Celery,
+# otra base de datos): las invalidaciones por cliente de
+# core/services/cache_cliente.py llegan a todos. Por defecto, LocMemCache por proceso.
+if os.environ.get('CACHE_BACKEND', 'locmem') == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/1'),
+            'TIMEOUT': 900,
+            'KEY_PREFIX': 'gym',
         }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'TIMEOUT': 900,
+            'OPTIONS': {
+                'MAX_ENTRIES': 1000,
+            }
+        }
+    }
+# Contadores hit/miss por familia de clave (comando estadisticas_cache).
+# Desactivados por defecto: suman un incr() a cada lectura de la caché.
+CACHE_CLIENTE_CONTADORES = os.environ.get('CACHE_CLIENTE_CONTADORES', '0') == '1'
 LOGS_DIR = os.path.join(BASE_DIR, 'logs')
 os.makedirs(LOGS_DIR, exist_ok=True)
 
@@ -350,6 +385,14 @@ GAMIFICACION_CONFIG = {
 # --- IA INTEGRATION ---
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
 ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY', '')
+# JOI: backend LLM ('anthropic' | 'falso' para medir sin red) y ciclo de síntesis
+JOI_LLM_BACKEND = os.environ.get('JOI_LLM_BACKEND', 'anthropic')
+JOI_SINTESIS_CONCURRENCIA = int(os.environ.get('JOI_SINTESIS_CONCURRENCIA', '4'))
+JOI_SINTESIS_TIMEOUT = float(os.environ.get('JOI_SINTESIS_TIMEOUT', '30'))
+# JOI: memo de bloques de prompt por usuario y caché opcional de respuestas por prompt
+JOI_MEMO_BLOQUES_TTL = 900
+JOI_LLM_CACHE_RESPUESTAS = os.environ.get('JOI_LLM_CACHE_RESPUESTAS', '') == '1'
+JOI_LLM_CACHE_TTL = 6 * 3600
 
 # Sobreescribe con secretos locales del servidor si existen (no en git)
 try:
@@ -361,3 +404,5 @@ except ImportError:
 STRAVA_CLIENT_ID     = os.environ.get('STRAVA_CLIENT_ID', '')
 STRAVA_CLIENT_SECRET = os.environ.get('STRAVA_CLIENT_SECRET', '')
 STRAVA_VERIFY_TOKEN  = os.environ.get('STRAVA_VERIFY_TOKEN', 'hyrox_strava_verify')
+STRAVA_API_URL       = os.environ.get('STRAVA_API_URL', 'https://www.strava.com/api/v3')
+STRAVA_OAUTH_URL     = os.environ.get('STRAVA_OAUTH_URL', 'https://www.strava.com/oauth/token')
@@ -9,22 +9,10 @@ Combina tres capas:
 Regla de oro: el usuario aporta contexto, el sistema decide.
 """
 
+from . import splits
 from .station_intelligence import HyroxStationIntelligence as _SI
 
 
-# ── Palabras clave para localizar actividades por estación ────────────────────
-_STATION_KEYWORDS = {
-    'skierg':         ['skierg', 'ski erg'],
-    'sled_push':      ['sled push'],
-    'sled_pull':      ['sled pull'],
-    'burpees':        ['burpee'],
-    'rowing':         ['rowing', 'remo'],
-    'farmers_carry':  ['farmer', 'carry'],
-    'sandbag_lunges': ['sandbag', 'lunge'],
-    'wall_balls':     ['wall ball'],
-}
-
-
 def _station_display(key):
     return _SI.STATIONS.get(key, {}).get('display_name', (key or '').replace('_', ' ').title())
 
@@ -59,11 +47,12 @@ class HyroxDiagnosticEngine:
             return None
 
         station_diags = []
+        tiempos = splits.tiempos_sesion(sesion)
         for fb in sesion.station_feedback:
             key = fb.get('estacion', '')
             if not key:
                 continue
-            obj  = cls._build_objective(sesion, key, fb)
+            obj  = cls._build_objective(sesion, key, fb, tiempos)
             subj = cls._build_subjective(fb)
             diag = cls._evaluate_station(obj, subj, key)
             station_diags.append({'estacion': key, 'display_name': _station_display(key), 'diagnosis': diag})
@@ -78,9 +67,10 @@ class HyroxDiagnosticEngine:
     # ── Construcción de datos ─────────────────────────────────────────────────
 
     @classmethod
-    def _build_objective(cls, sesion, station_key, fb):
-        act        = cls._find_activity(sesion, station_key)
-        tiempo_r   = (act.data_metricas or {}).get('tiempo_s') if act else None
+    def _build_objective(cls, sesion, station_key, fb, tiempos=None):
+        if tiempos is None:
+            tiempos = splits.tiempos_sesion(sesion)
+        tiempo_r   = tiempos.get(station_key)
         hist       = cls._historical_times(sesion, station_key)
         tiempo_a   = hist[0] if hist else None
         pausas_str = fb.get('pausas', '0')
@@ -320,37 +310,7 @@ class HyroxDiagnosticEngine:
             'icon':   meta['icon'],
         }
 
-    @classmethod
-    def _find_activity(cls, sesion, station_key):
-        keywords = _STATION_KEYWORDS.get(station_key, [])
-        for act in sesion.activities.all():
-            name = act.nombre_ejercicio.lower()
-            for kw in keywords:
-                if kw in name:
-                    return act
-        return None
-
     @classmethod
     def _historical_times(cls, sesion, station_key, limit=5):
-        from .models import HyroxSession
-        keywords = _STATION_KEYWORDS.get(station_key, [])
-        times = []
-        previas = (
-            HyroxSession.objects
-            .filter(objective=sesion.objective, estado='completado', fecha__lt=sesion.fecha)
-            .order_by('-fecha')
-            .prefetch_related('activities')[:limit]
-        )
-        for prev in previas:
-            for act in prev.activities.all():
-                name = act.nombre_ejercicio.lower()
-                for kw in keywords:
-                    if kw in name:
-                        t = (act.data_metricas or {}).get('tiempo_s')
-                        if t and t > 0:
-                            times.append(t)
-                        break
-                else:
-                    continue
-                break
-        return times
+        """Últimos tiempos de la estación en sesiones completadas previas (HyroxStationSplit, una consulta indexada)."""
+        return splits.tiempos_previos(sesion, station_key, limit)
@@ -0,0 +1,53 @@
+# Importa como pendientes todas las actividades de Strava de un atleta en un
+# rango de fechas (hyrox/strava_service.backfill). Espera lo necesario por
+# el rate limit de 15 minutos; si se agota el cupo diario se detiene y se
+# puede repetir más tarde con --desde en la última fecha importada.
+#
+# Uso:
+#   python3 manage.py backfill_strava --usuario david --desde 2019-01-01
+#   python3 manage.py backfill_strava --todos --desde 2024-01-01 --hasta 2024-12-31
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Backfill paginado de actividades de Strava para un rango de fechas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', type=str, help='Username del cliente')
+        parser.add_argument('--todos', action='store_true', help='Todos los clientes con Strava conectado')
+        parser.add_argument('--desde', type=date.fromisoformat, required=True, help='YYYY-MM-DD')
+        parser.add_argument('--hasta', type=date.fromisoformat, default=None, help='YYYY-MM-DD (por defecto hoy)')
+
+    def handle(self, *args, **options):
+        from hyrox.models import StravaToken
+        from hyrox.strava_service import backfill, sesion_http
+
+        tokens = StravaToken.objects.select_related('cliente__user')
+        if options['usuario']:
+            tokens = tokens.filter(cliente__user__username=options['usuario'])
+        elif not options['todos']:
+            raise CommandError('Indica --usuario o --todos.')
+        if not tokens.exists():
+            raise CommandError('Ningún cliente con Strava conectado coincide.')
+
+        hasta = options['hasta'] or date.today()
+        http = sesion_http()
+        total = 0
+        for token in tokens:
+            resumen = backfill(token, options['desde'], hasta, http=http)
+            total += resumen['nuevas']
+            linea = (
+                f"  {token.cliente.user.username}: {resumen['paginas']} páginas | "
+                f"{resumen['recibidas']} recibidas | {resumen['nuevas']} nuevas | "
+                f"{resumen['existentes']} ya importadas"
+            )
+            if resumen['interrumpido']:
+                linea += f" | interrumpido ({resumen['interrumpido']}, última fecha {resumen['ultima_fecha']})"
+                self.stdout.write(self.style.WARNING(linea))
+            else:
+                self.stdout.write(linea)
+
+        self.stdout.write(self.style.SUCCESS(f'\nBackfill Strava: {total} actividades nuevas pendientes de revisión'))
@@ -0,0 +1,76 @@
+# Script de benchmark — no es un test formal.
+# Mide el throughput de escenarios de HyroxMonteCarloSimulator: el mismo
+# modelo sorteado carrera a carrera en Python puro frente a la versión
+# vectorizada con NumPy (sortear + percentiles + sensibilidad). Usa los
+# tiempos de referencia de la categoría y no toca la BD.
+#
+# Uso:
+#   python3 manage.py hyrox_benchmark_montecarlo
+#   python3 manage.py hyrox_benchmark_montecarlo --escenarios 1000 5000 20000 --categoria open_women
+
+import math
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from hyrox.race_montecarlo import HyroxMonteCarloSimulator as MC
+from hyrox.services import HyroxRaceSimulator
+
+
+def _total_python(rng, medianas, sigmas, ritmos, prob_fatiga, transiciones):
+    """Una carrera del mismo modelo que MC.sortear, escalar."""
+    forma = 1 + MC.SD_FORMA_DIA * rng.gauss(0, 1)
+    penalizacion = rng.uniform(*MC.PENALIZACION_FATIGA) if rng.random() < prob_fatiga else 0.0
+    estaciones = sum(m * math.exp(rng.gauss(0, 1) * s) for m, s in zip(medianas, sigmas))
+    carrera = sum(r * (1 + MC.CV_RITMO_KM * rng.gauss(0, 1)) for r in ritmos)
+    return estaciones * forma * (1 + penalizacion) + carrera * forma * (1 + penalizacion / 2) + transiciones
+
+
+class Command(BaseCommand):
+    help = 'Benchmark offline del simulador Monte Carlo HYROX: bucle Python vs NumPy vectorizado.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escenarios', type=int, nargs='+', default=[1000, 5000, 20000],
+                            help='Tamaños de simulación a medir')
+        parser.add_argument('--categoria', default='open_men')
+        parser.add_argument('--ritmo-km', type=int, default=330, help='Segundos por km de carrera')
+        parser.add_argument('--prob-fatiga', type=float, default=0.25)
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def handle(self, *args, **options):
+        tiempos = HyroxRaceSimulator.get_tiempos_categoria(options['categoria'])
+        nombres = list(tiempos)
+        medianas = [tiempos[n] for n in nombres]
+        ritmos = [options['ritmo_km']] * 8
+        cvs = [MC.CV_ESTACION_DEFECTO] * len(nombres)
+        sigmas = [math.sqrt(math.log1p(cv ** 2)) for cv in cvs]
+        prob_fatiga = options['prob_fatiga']
+        repeticiones = options['repeticiones']
+
+        self.stdout.write(
+            f"{options['categoria']} | {len(nombres)} estaciones + 8 km a {options['ritmo_km']} s/km | "
+            f"p(fatiga)={prob_fatiga} | mejor de {repeticiones}"
+        )
+        for n in options['escenarios']:
+            rng = random.Random(0)
+            t_python = float('inf')
+            for _ in range(repeticiones):
+                t0 = time.perf_counter()
+                totales = [_total_python(rng, medianas, sigmas, ritmos, prob_fatiga, 120) for _ in range(n)]
+                cuantiles = statistics.quantiles(totales, n=10)
+                t_python = min(t_python, time.perf_counter() - t0)
+
+            t_numpy = float('inf')
+            for i in range(repeticiones):
+                t0 = time.perf_counter()
+                resultado = MC.simular(nombres, medianas, ritmos, cvs=cvs, prob_fatiga=prob_fatiga,
+                                       transiciones_seg=120, n=n, seed=i)
+                t_numpy = min(t_numpy, time.perf_counter() - t0)
+
+            self.stdout.write(
+                f"  {n:6d} escenarios | python: {t_python * 1000:8.1f} ms ({n / t_python:10,.0f}/s) | "
+                f"numpy: {t_numpy * 1000:6.1f} ms ({n / t_numpy:12,.0f}/s) | x{t_python / max(t_numpy, 1e-9):.0f} | "
+                f"p50 {resultado['p50_seg']} s (python {round(cuantiles[4])} s)"
+            )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Procesa la cola de eventos del webhook de Strava (para entornos sin Celery beat).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limite', type=int, default=200,
+                            help='Máximo de eventos por ejecución')
+
+    def handle(self, *args, **options):
+        from hyrox.strava_service import procesar_eventos
+
+        resumen = procesar_eventos(limite=options['limite'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Eventos Strava: {resumen['importadas']} importadas | {resumen['duplicadas']} duplicadas | "
+            f"{resumen['descartadas']} descartadas | {resumen['reintentos']} reintentos | "
+            f"{resumen['errores']} errores"
+        ))
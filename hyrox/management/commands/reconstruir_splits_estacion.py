@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from hyrox import splits
+from hyrox.models import HyroxObjective
+
+
+class Command(BaseCommand):
+    help = 'Recalcula desde las actividades los splits por estación (hyrox.splits / HyroxStationSplit).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--objetivo', type=int, help='Solo este HyroxObjective (id)')
+
+    def handle(self, *args, **options):
+        objetivos = HyroxObjective.objects.all()
+        if options['objetivo']:
+            objetivos = objetivos.filter(pk=options['objetivo'])
+
+        total = splits.reconstruir(objetivos.iterator())
+
+        self.stdout.write(self.style.SUCCESS(f'Splits por estación reconstruidos: {total}'))
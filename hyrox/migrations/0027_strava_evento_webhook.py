@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 15:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hyrox', '0026_contratocampanahyrox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StravaEventoWebhook',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('strava_id', models.BigIntegerField(unique=True)),
+                ('athlete_id', models.BigIntegerField()),
+                ('fecha_evento', models.DateTimeField(blank=True, null=True)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesado', 'Procesado'), ('descartado', 'Descartado (atleta sin token)'), ('error', 'Error tras agotar reintentos')], default='pendiente', max_length=10)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ultimo_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Evento webhook Strava',
+                'verbose_name_plural': 'Eventos webhook Strava',
+                'ordering': ['proximo_intento'],
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='strava_evento_cola_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 17:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hyrox', '0027_strava_evento_webhook'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HyroxStationSplit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estacion', models.CharField(help_text='Clave de HyroxStationIntelligence.STATIONS', max_length=20)),
+                ('tipo_actividad', models.CharField(max_length=25)),
+                ('fecha', models.DateField(help_text='Copia de sesion.fecha')),
+                ('tiempo_s', models.PositiveIntegerField(blank=True, null=True)),
+                ('peso_kg', models.FloatField(blank=True, help_text='Peso máximo de las series', null=True)),
+                ('reps', models.PositiveIntegerField(blank=True, help_text='Repeticiones totales', null=True)),
+                ('distancia_m', models.FloatField(blank=True, null=True)),
+                ('actividad', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='station_split', to='hyrox.hyroxactivity')),
+                ('objective', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='station_splits', to='hyrox.hyroxobjective')),
+                ('sesion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='station_splits', to='hyrox.hyroxsession')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['objective', 'estacion', 'fecha'], name='hyrox_split_estacion_idx')],
+            },
+        ),
+    ]
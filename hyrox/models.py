@@ -124,11 +124,25 @@ class HyroxObjective(models.Model):
         """
         self.__dict__.pop('_perf_cache', None)
 
+    def _contexto(self):
+        """ContextoCliente que cargó esta instancia (core.context.contexto_cliente), o None."""
+        return self.__dict__.get('_contexto_cliente')
+
+    def _como_objetivo_activo(self):
+        """self si el contexto lo identifica como el objetivo 'activo' del cliente;
+        así los servicios que lo buscan por user_id no repiten la query."""
+        contexto = self._contexto()
+        if contexto is not None and contexto.objetivo_hyrox('activo') is self:
+            return self
+        return None
+
     def _running_inactivity_info(self):
         cache = self._perf_cache_dict()
         if 'running_inactivity' not in cache:
             from hyrox.services import HyroxMacrocycleEngine
-            cache['running_inactivity'] = HyroxMacrocycleEngine.detect_running_inactivity(self.cliente.user_id)
+            cache['running_inactivity'] = HyroxMacrocycleEngine.detect_running_inactivity(
+                self.cliente.user_id, objetivo=self._como_objetivo_activo(),
+            )
         return cache['running_inactivity']
 
     def _gym_external_load(self, dias):
@@ -145,7 +159,11 @@ class HyroxObjective(models.Model):
         cache = self._perf_cache_dict()
         if 'lesiones_activas' not in cache:
             from hyrox.models import UserInjury
-            cache['lesiones_activas'] = list(UserInjury.objects.filter(cliente=self.cliente, activa=True))
+            contexto = self._contexto()
+            if contexto is not None:
+                cache['lesiones_activas'] = [l for l in contexto.lesiones if l.activa]
+            else:
+                cache['lesiones_activas'] = list(UserInjury.objects.filter(cliente=self.cliente, activa=True))
         return cache['lesiones_activas']
 
     def _lesion_activa_primera(self):
@@ -163,7 +181,9 @@ class HyroxObjective(models.Model):
         cache = self._perf_cache_dict()
         if 'standards_progress' not in cache:
             from hyrox.services import CompetitionStandardsService
-            cache['standards_progress'] = CompetitionStandardsService.get_user_standards_progress(self.cliente.user_id)
+            cache['standards_progress'] = CompetitionStandardsService.get_user_standards_progress(
+                self.cliente.user_id, objetivo=self._como_objetivo_activo(),
+            )
         return cache['standards_progress']
 
     def get_race_readiness_score(self):
@@ -546,11 +566,14 @@ class HyroxSession(models.Model):
     fatiga_updated_at = models.DateTimeField(null=True, blank=True, help_text="Cuándo se inyectó la fatiga por última vez (para Fatigue Decay)")
     station_feedback = models.JSONField(null=True, blank=True, help_text="Feedback por estación al final del entreno: [{estacion, pausas, fallos, sensacion}]")
 
-    def save(self, *args, **kwargs):
+    def ajustar_titulo_por_energia(self):
         # Lógica de cambio de título según energía pre-entreno (Fase 14)
         if self.nivel_energia_pre is not None and self.nivel_energia_pre < 4:
             if not self.titulo or 'Recuperación Activa' not in self.titulo:
                 self.titulo = 'Recuperación Activa / Movilidad'
+
+    def save(self, *args, **kwargs):
+        self.ajustar_titulo_por_energia()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -606,6 +629,30 @@ class HyroxActivity(models.Model):
     def __str__(self):
         return f"Bloque {self.get_tipo_actividad_display()} - {self.nombre_ejercicio} ({self.sesion})"
 
+class HyroxStationSplit(models.Model):
+    """
+    Split canónico por estación: una fila por HyroxActivity que corresponde a
+    una estación Hyrox, con las métricas ya extraídas de data_metricas.
+    Se mantiene desde hyrox/splits.py (señales y caminos en bloque) y se
+    reconstruye con `python manage.py reconstruir_splits_estacion`.
+    """
+    objective = models.ForeignKey(HyroxObjective, on_delete=models.CASCADE, related_name='station_splits')
+    sesion = models.ForeignKey(HyroxSession, on_delete=models.CASCADE, related_name='station_splits')
+    actividad = models.OneToOneField(HyroxActivity, on_delete=models.CASCADE, related_name='station_split')
+    estacion = models.CharField(max_length=20, help_text="Clave de HyroxStationIntelligence.STATIONS")
+    tipo_actividad = models.CharField(max_length=25)
+    fecha = models.DateField(help_text="Copia de sesion.fecha")
+    tiempo_s = models.PositiveIntegerField(null=True, blank=True)
+    peso_kg = models.FloatField(null=True, blank=True, help_text="Peso máximo de las series")
+    reps = models.PositiveIntegerField(null=True, blank=True, help_text="Repeticiones totales")
+    distancia_m = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['objective', 'estacion', 'fecha'], name='hyrox_split_estacion_idx')]
+
+    def __str__(self):
+        return f"{self.estacion} {self.fecha} ({self.tiempo_s or '-'} s)"
+
 # Phase 6: Analytics Visuales - Histórico de Race Readiness
 class HyroxReadinessLog(models.Model):
     objective = models.ForeignKey(HyroxObjective, on_delete=models.CASCADE, related_name='readiness_logs')
@@ -859,3 +906,34 @@ class StravaActivityRaw(models.Model):
     def __str__(self):
         return f"Strava #{self.strava_id} — {self.tipo_strava} {self.fecha_actividad}"
 
+
+class StravaEventoWebhook(models.Model):
+    """
+    Evento 'create' de actividad recibido por el webhook de Strava, pendiente
+    de descargar. El webhook solo inserta esta fila; strava_service la procesa
+    en segundo plano (tarea procesar_eventos_strava).
+    """
+    ESTADO_CHOICES = [
+        ('pendiente',  'Pendiente'),
+        ('procesado',  'Procesado'),
+        ('descartado', 'Descartado (atleta sin token)'),
+        ('error',      'Error tras agotar reintentos'),
+    ]
+
+    strava_id = models.BigIntegerField(unique=True)
+    athlete_id = models.BigIntegerField()
+    fecha_evento = models.DateTimeField(null=True, blank=True)
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='pendiente')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['proximo_intento']
+        indexes = [models.Index(fields=['estado', 'proximo_intento'], name='strava_evento_cola_idx')]
+        verbose_name = "Evento webhook Strava"
+        verbose_name_plural = "Eventos webhook Strava"
+
+    def __str__(self):
+        return f"Evento Strava #{self.strava_id} ({self.estado})"
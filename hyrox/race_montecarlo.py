@@ -0,0 +1,177 @@
+"""
+Simulación Monte Carlo del tiempo de carrera HYROX.
+
+HyroxRaceSimulator y RaceCardService dan una única estimación determinista
+(tiempo medio por estación + ritmo por km). Aquí se sortean miles de
+carreras a la vez con NumPy a partir de esas mismas medias:
+
+- Estaciones: log-normal con mediana en el tiempo estimado y dispersión
+  (CV) sacada de los splits reales del atleta (HyroxStationSplit); sin
+  historial suficiente se usa CV_ESTACION_DEFECTO.
+- Carrera: cada km normal alrededor de su ritmo (CV_RITMO_KM).
+- Forma del día: un factor común por escenario que mueve toda la carrera.
+- Fatiga: con probabilidad = proporción de sesiones recientes con fatiga
+  muscular alta, el escenario penaliza estaciones y, a la mitad, la carrera.
+
+El resultado son percentiles del tiempo final y la sensibilidad por
+estación: qué parte de la varianza explica y cuánto bajaría la mediana si
+esa estación saliera siempre como su percentil 10.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+
+
+class HyroxMonteCarloSimulator:
+
+    N_ESCENARIOS = 5000
+    PERCENTILES = (10, 50, 90)
+
+    CV_ESTACION_DEFECTO = 0.10
+    CV_ESTACION_MIN = 0.04
+    CV_ESTACION_MAX = 0.30
+    MUESTRAS_MIN = 3       # splits con tiempo necesarios para usar el CV real
+    MUESTRAS_MAX = 8       # solo los más recientes: el atleta cambia
+    CV_RITMO_KM = 0.03
+    SD_FORMA_DIA = 0.025
+    PENALIZACION_FATIGA = (0.03, 0.08)  # rango uniforme sobre las estaciones
+
+    # ------------------------------------------------------------------
+    # Datos del atleta
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def cv_estaciones(cls, objetivo):
+        """{clave_estacion: cv} con los últimos tiempos de cada estación en sesiones completadas. Una consulta."""
+        from .models import HyroxStationSplit
+
+        tiempos = {}
+        for estacion, tiempo in (
+            HyroxStationSplit.objects.filter(
+                objective=objetivo, sesion__estado='completado', tiempo_s__isnull=False,
+            ).order_by('-fecha', '-actividad_id').values_list('estacion', 'tiempo_s')
+        ):
+            muestras = tiempos.setdefault(estacion, [])
+            if len(muestras) < cls.MUESTRAS_MAX:
+                muestras.append(tiempo)
+
+        cvs = {}
+        for estacion, muestras in tiempos.items():
+            if len(muestras) < cls.MUESTRAS_MIN:
+                continue
+            valores = np.asarray(muestras, dtype=float)
+            cv = valores.std(ddof=1) / valores.mean()
+            cvs[estacion] = float(np.clip(cv, cls.CV_ESTACION_MIN, cls.CV_ESTACION_MAX))
+        return cvs
+
+    @classmethod
+    def prob_fatiga(cls, objetivo, semanas=4, sesiones=8):
+        """Proporción de las últimas sesiones completadas con fatiga muscular 'Alta'."""
+        from .models import HyroxSession
+
+        fatigas = list(HyroxSession.objects.filter(
+            objective=objetivo,
+            fecha__gte=timezone.now().date() - timedelta(weeks=semanas),
+            estado='completado',
+        ).order_by('-fecha').values_list('muscle_fatigue_index', flat=True)[:sesiones])
+        return (sum(1 for f in fatigas if f == 'Alta') / len(fatigas)) if fatigas else 0.0
+
+    # ------------------------------------------------------------------
+    # Simulación
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def sortear(cls, tiempos_estacion, ritmos_km, cvs=None, prob_fatiga=0.0, n=None, seed=None):
+        """
+        Matrices (n, estaciones) y (n, kms) de segundos simulados.
+
+        tiempos_estacion: mediana de cada estación en segundos.
+        ritmos_km: segundos de cada km de carrera.
+        cvs: coeficiente de variación de cada estación (CV_ESTACION_DEFECTO si falta).
+        """
+        n = n or cls.N_ESCENARIOS
+        rng = np.random.default_rng(seed)
+        medianas = np.asarray(tiempos_estacion, dtype=float)
+        ritmos = np.asarray(ritmos_km, dtype=float)
+        cvs = np.full(medianas.shape, cls.CV_ESTACION_DEFECTO) if cvs is None else np.asarray(cvs, dtype=float)
+
+        sigma = np.sqrt(np.log1p(cvs ** 2))
+        estaciones = medianas * np.exp(rng.standard_normal((n, medianas.size)) * sigma)
+        carrera = ritmos * (1 + cls.CV_RITMO_KM * rng.standard_normal((n, ritmos.size)))
+
+        forma = 1 + cls.SD_FORMA_DIA * rng.standard_normal((n, 1))
+        fatigado = rng.random((n, 1)) < prob_fatiga
+        penalizacion = np.where(fatigado, rng.uniform(*cls.PENALIZACION_FATIGA, size=(n, 1)), 0.0)
+
+        estaciones *= forma * (1 + penalizacion)
+        carrera *= forma * (1 + penalizacion / 2)
+        return estaciones, carrera
+
+    @classmethod
+    def simular(cls, nombres, tiempos_estacion, ritmos_km, cvs=None, prob_fatiga=0.0,
+                transiciones_seg=0, n=None, seed=None):
+        """
+        Percentiles del tiempo final y sensibilidad por estación.
+
+        Devuelve:
+          - p10_seg / p50_seg / p90_seg: tiempo final (incluye transiciones)
+          - carrera_p50_seg: tiempo corriendo, mediana
+          - sensibilidad: por estación, de más a menos influyente, con
+            p50_seg / p90_seg propios, contribucion_pct (covarianza con el
+            total sobre su varianza) y mejora_p50_seg (cuánto baja la
+            mediana si la estación rinde siempre como su percentil 10)
+        """
+        estaciones, carrera = cls.sortear(tiempos_estacion, ritmos_km, cvs, prob_fatiga, n, seed)
+        carrera_total = carrera.sum(axis=1)
+        total = estaciones.sum(axis=1) + carrera_total + transiciones_seg
+
+        p10, p50, p90 = np.percentile(total, cls.PERCENTILES)
+        est_p10, est_p50, est_p90 = np.percentile(estaciones, cls.PERCENTILES, axis=0)
+
+        varianza = total.var(ddof=1)
+        covarianzas = (estaciones - estaciones.mean(axis=0)).T @ (total - total.mean()) / (total.size - 1)
+        contribucion = covarianzas / varianza if varianza > 0 else np.zeros_like(covarianzas)
+        mejora = p50 - np.median(total[:, None] - estaciones + est_p10, axis=0)
+
+        sensibilidad = [
+            {
+                'nombre': nombre,
+                'p50_seg': int(round(est_p50[i])),
+                'p90_seg': int(round(est_p90[i])),
+                'contribucion_pct': round(float(contribucion[i]) * 100, 1),
+                'mejora_p50_seg': int(round(mejora[i])),
+            }
+            for i, nombre in enumerate(nombres)
+        ]
+        sensibilidad.sort(key=lambda s: s['contribucion_pct'], reverse=True)
+
+        return {
+            'n_escenarios': int(total.size),
+            'p10_seg': int(round(p10)),
+            'p50_seg': int(round(p50)),
+            'p90_seg': int(round(p90)),
+            'carrera_p50_seg': int(round(np.median(carrera_total))),
+            'sensibilidad': sensibilidad,
+        }
+
+    @classmethod
+    def para_objetivo(cls, objetivo, nombres, tiempos_estacion, ritmos_km, transiciones_seg=0,
+                      prob_fatiga=None, n=None):
+        """
+        simular() con la dispersión real del objetivo. La semilla es el pk del
+        objetivo: el mismo estado da los mismos percentiles en cada recarga.
+        """
+        from .station_intelligence import HyroxStationIntelligence
+
+        cv_reales = cls.cv_estaciones(objetivo)
+        cvs = [
+            cv_reales.get(HyroxStationIntelligence.station_key(nombre), cls.CV_ESTACION_DEFECTO)
+            for nombre in nombres
+        ]
+        if prob_fatiga is None:
+            prob_fatiga = cls.prob_fatiga(objetivo)
+        return cls.simular(
+            nombres, tiempos_estacion, ritmos_km, cvs=cvs, prob_fatiga=prob_fatiga,
+            transiciones_seg=transiciones_seg, n=n, seed=objetivo.pk,
+        )
@@ -37,8 +37,10 @@ def sync_hyrox_activity_rm_to_canonico(activity) -> bool:
     - la sesión no es de recuperación/deload ([DELOAD] o 'Recuperación Activa' en título)
     - sin lesión activa con tags incompatibles con ese ejercicio
     - el Brzycki de la mejor serie supera estrictamente el RM ya almacenado
-      (sync_rm_to_hyrox ya aplica "solo si mayor", pero lo comprobamos antes
-      para no marcar como procesada una actividad que no mejoró nada)
+      y el mejor 1RM del índice de marcas Gym para ese campo
+      (MejorMarcaEjercicio; sync_rm_to_hyrox ya aplica "solo si mayor", pero
+      lo comprobamos antes para no marcar como procesada una actividad que
+      no mejoró nada)
     - idempotente: una actividad ya procesada no se reprocesa
 
     Devuelve True si actualizó el RM canónico.
@@ -96,7 +98,11 @@ def sync_hyrox_activity_rm_to_canonico(activity) -> bool:
         if any(tag in _TAGS_SUSTITUCION_FUERZA_PRINCIPAL for tag in (lesion.tags_restringidos or [])):
             return False
 
-    rm_actual = float(getattr(objetivo, campo, None) or 0)
+    from entrenos.services.mejores_marcas_service import mejor_rm_para_campo
+    rm_actual = max(
+        float(getattr(objetivo, campo, None) or 0),
+        mejor_rm_para_campo(objetivo.cliente_id, campo),
+    )
     if rm_estimado_max <= rm_actual:
         # Marcamos como procesada igualmente: no fue una mejora real, pero ya
         # se evaluó esta actividad y no debe reabrirse en cada reproceso.
@@ -1080,12 +1086,23 @@ class CompetitionStandardsService:
         'Burpees Broad Jump':  {'target': 'Burpee Broad Jumps', 'factor': 1.0, 'mode': 'dist'},
     }
 
+    # Las actividades directas solo cuentan con tipo de estación, para no
+    # capturar ejercicios de gym con nombre similar (ej. "Remo con Mancuerna").
+    TIPOS_ESTACION = [
+        'hyrox_station', 'cardio_sustituto', 'ergometro',
+        'skierg', 'remo', 'hiit',
+    ]
+
     @classmethod
-    def get_user_standards_progress(cls, user_id):
+    def get_user_standards_progress(cls, user_id, objetivo=None):
+        """`objetivo`: el objetivo activo del usuario si el llamador ya lo tiene cargado."""
         from .models import HyroxObjective, HyroxActivity
-        from django.db.models import Max
+        from .station_intelligence import HyroxStationIntelligence
+        from . import splits
+        from django.db.models import Q
 
-        objetivo = HyroxObjective.objects.filter(cliente__user_id=user_id, estado='activo').first()
+        if objetivo is None:
+            objetivo = HyroxObjective.objects.filter(cliente__user_id=user_id, estado='activo').first()
         if not objetivo:
             return {'progreso': [], 'logros': []}
 
@@ -1096,6 +1113,17 @@ class CompetitionStandardsService:
 
         EJERCICIOS_DISTANCIA_PURA = ('SkiErg', 'Rowing', 'Burpee')
 
+        # Mejores marcas por estación (HyroxStationSplit) y actividades de gym
+        # con equivalencia: dos consultas para todos los estándares.
+        directas = splits.mejores_por_estacion(objetivo, cls.TIPOS_ESTACION)
+        q_equivalencias = Q()
+        for equiv_nombre in cls.EQUIVALENCIAS:
+            q_equivalencias |= Q(nombre_ejercicio__icontains=equiv_nombre)
+        actividades_equivalentes = list(
+            HyroxActivity.objects.filter(q_equivalencias, sesion__objective=objetivo)
+            .values_list('nombre_ejercicio', 'data_metricas')
+        )
+
         for estandar_nombre, objetivo_std in estandares.items():
 
             # ── Determinar si es métrica simple o dual ──────────────────────
@@ -1110,94 +1138,25 @@ class CompetitionStandardsService:
                 vol_objetivo = float(objetivo_std)
                 vol_unit = 'm'
 
-            kg_registrado = 0.0
-            vol_registrado = 0.0
-
-            # ── 1. Buscar actividades directas ──────────────────────────────
-            # Aliases bilingües: el plan genera nombres en español/combinados
-            # (ej. "SkiErg / Remo Z2") que no coinciden con los estándares en inglés.
-            # IMPORTANTE: filtrar también por tipo_actividad para no capturar
-            # ejercicios de gym con nombre similar (ej. "Remo con Mancuerna").
-            _ALIAS_NOMBRES = {
-                'Rowing':            ['rowing', 'remo z', '/ remo', 'remo /'],
-                'SkiErg':            ['skierg', 'ski erg', 'ski-erg'],
-                'Sled Push':         ['sled push', 'empuje de trineo', 'empuje trineo'],
-                'Sled Pull':         ['sled pull', 'jalón de trineo', 'jalon trineo'],
-                'Burpee Broad Jump': ['burpee broad jump', 'burpee salto', 'burpee con salto'],
-                'Kettlebell Lunges': ['kettlebell lunges', 'zancadas con kettlebell'],
-                'Farmers Carry':     ['farmers carry', 'caminata de granjero'],
-                'Wall Balls':        ['wall balls', 'wall ball', 'balón al muro'],
-                'Sandbag Lunges':    ['sandbag lunges', 'zancadas con saco'],
-            }
-            _TIPOS_ESTACION = [
-                'hyrox_station', 'cardio_sustituto', 'ergometro',
-                'skierg', 'remo', 'hiit',
-            ]
-            from django.db.models import Q as _Q
-            _terminos = [estandar_nombre] + _ALIAS_NOMBRES.get(estandar_nombre, [])
-            _q = _Q()
-            for _t in _terminos:
-                _q |= _Q(nombre_ejercicio__icontains=_t)
-            actividades_directas = HyroxActivity.objects.filter(
-                _q,
-                sesion__objective=objetivo,
-                tipo_actividad__in=_TIPOS_ESTACION,
-            ).values('data_metricas')
-
-            for act in actividades_directas:
-                metricas = act.get('data_metricas', {}) or {}
-                series = metricas.get('series', [])
-
-                # Distancia raíz (actividad completa sin series)
-                distancia_raiz = float(metricas.get('distancia', 0) or 0)
-                if not distancia_raiz:
-                    distancia_raiz = float(metricas.get('distancia_m', 0) or 0)
-                if not distancia_raiz:
-                    distancia_raiz = float(metricas.get('distancia_km', 0) or 0) * 1000
-
-                total_reps = 0
-                distancia_series = 0.0  # suma de distancias dentro de las series
-
-                if isinstance(series, list):
-                    for serie in series:
-                        peso_serie = float(serie.get('peso_kg', serie.get('peso', 0)) or 0)
-                        reps_serie = float(serie.get('reps', 0) or 0)
-                        dist_serie = float(serie.get('distancia_m', serie.get('distancia', 0)) or 0)
-                        kg_registrado = max(kg_registrado, peso_serie)
-                        total_reps += reps_serie
-                        distancia_series += dist_serie
-                elif isinstance(series, dict):
-                    peso_serie = float(series.get('peso_kg', series.get('peso', 0)) or 0)
-                    reps_serie = float(series.get('reps', 0) or 0)
-                    dist_serie = float(series.get('distancia_m', series.get('distancia', 0)) or 0)
-                    kg_registrado = max(kg_registrado, peso_serie)
-                    total_reps = reps_serie
-                    distancia_series = dist_serie
-
-                # Fallback: peso_kg en nivel raíz (ej. Sandbag Lunges planificadas)
-                if not kg_registrado:
-                    kg_registrado = max(kg_registrado, float(metricas.get('peso_kg', 0) or 0))
-
-                # Distancia efectiva: raíz si existe, si no suma de series
-                distancia_efectiva = distancia_raiz if distancia_raiz > 0 else distancia_series
-
-                # Mejor sesión completa (max entre sesiones, sum dentro de cada sesión)
-                if vol_unit == 'reps':
-                    vol_registrado = max(vol_registrado, total_reps)
-                else:
-                    vol_registrado = max(vol_registrado, distancia_efectiva)
+            # ── 1. Actividades directas ─────────────────────────────────────
+            # Mejor sesión completa por métrica (peso máximo de serie, reps
+            # totales o distancia efectiva), ya extraída en el split.
+            mejor = directas.get(HyroxStationIntelligence.station_key(estandar_nombre)) or {}
+            kg_registrado = float(mejor.get('peso_kg') or 0)
+            if vol_unit == 'reps':
+                vol_registrado = float(mejor.get('reps') or 0)
+            else:
+                vol_registrado = float(mejor.get('distancia_m') or 0)
 
             # ── 2. Equivalencias ────────────────────────────────────────────
             for equiv_nombre, equiv_data in cls.EQUIVALENCIAS.items():
                 if equiv_data['target'] == estandar_nombre:
                     mode = equiv_data.get('mode', 'kg')
-                    act_equiv = HyroxActivity.objects.filter(
-                        sesion__objective=objetivo,
-                        nombre_ejercicio__icontains=equiv_nombre
-                    ).values('data_metricas')
 
-                    for act in act_equiv:
-                        metricas = act.get('data_metricas', {}) or {}
+                    for nombre_act, metricas in actividades_equivalentes:
+                        if equiv_nombre.lower() not in nombre_act.lower():
+                            continue
+                        metricas = metricas or {}
                         series = metricas.get('series', [])
 
                         if mode == 'dist':
@@ -1449,8 +1408,13 @@ class HyroxRaceSimulator:
           - desglose: lista de (nombre_estacion, segundos, penalizacion_pct)
           - carrera_segundos: tiempo total corriendo
           - mensaje_coach: string narrativo para el coach
+          - escenarios: percentiles Monte Carlo alrededor de esta estimación
+            y sensibilidad por estación (HyroxMonteCarloSimulator.simular),
+            o None si la simulación falla
         """
         from .models import HyroxObjective, HyroxActivity, HyroxSession
+        from .race_montecarlo import HyroxMonteCarloSimulator
+        from django.db.models import Q
         from django.utils import timezone
         from datetime import timedelta
 
@@ -1476,39 +1440,45 @@ class HyroxRaceSimulator:
         ritmo_1km_seg = t5k_seg / 5.0  # segundos por km
 
         # --- Obtener actividades de últimas 4 semanas ---
+        # Solo las que aportan volumen de pierna o brazos: el filtro por nombre
+        # se hace en BD y no se cargan el resto de actividades del periodo.
         hace_4_semanas = timezone.now().date() - timedelta(weeks=4)
+        claves_pierna = ('sentadilla', 'prensa', 'lunges', 'zancada')
+        claves_brazos = ('press', 'remo', 'jalón', 'pull')
+        q_nombres = Q()
+        for clave in claves_pierna + claves_brazos:
+            q_nombres |= Q(nombre_ejercicio__icontains=clave)
         actividades_recientes = HyroxActivity.objects.filter(
+            q_nombres,
             sesion__objective=objetivo,
             sesion__fecha__gte=hace_4_semanas,
-        )
+        ).values_list('nombre_ejercicio', 'data_metricas')
 
         # Volumen total de fuerza piernas (Sentadilla, Prensa, Lunges...) en kg·reps
         volumen_pierna = 0
         volumen_brazos = 0
-        fatiga_registros = []
 
-        for act in actividades_recientes:
-            dm = act.data_metricas or {}
-            series = dm.get('series', [])
+        for nombre_act, dm in actividades_recientes:
+            series = (dm or {}).get('series', [])
             if isinstance(series, list):
+                nombre_ej = nombre_act.lower()
                 for s in series:
                     peso = float(s.get('peso_kg', s.get('peso', 0)) or 0)
                     reps = float(s.get('reps', 0) or 0)
-                    nombre_ej = act.nombre_ejercicio.lower()
-                    if any(k in nombre_ej for k in ('sentadilla', 'prensa', 'lunges', 'zancada')):
+                    if any(k in nombre_ej for k in claves_pierna):
                         volumen_pierna += peso * reps
-                    elif any(k in nombre_ej for k in ('press', 'remo', 'jalón', 'pull')):
+                    elif any(k in nombre_ej for k in claves_brazos):
                         volumen_brazos += peso * reps
 
         # Fatiga media de las últimas sesiones
-        sesiones_recientes = HyroxSession.objects.filter(
+        fatigas_recientes = list(HyroxSession.objects.filter(
             objective=objetivo,
             fecha__gte=hace_4_semanas,
             estado='completado'
-        ).order_by('-fecha')[:8]
+        ).order_by('-fecha').values_list('muscle_fatigue_index', flat=True)[:8])
 
-        fatiga_alta = sum(1 for s in sesiones_recientes if s.muscle_fatigue_index == 'Alta')
-        total_sesiones = sesiones_recientes.count()
+        fatiga_alta = sum(1 for f in fatigas_recientes if f == 'Alta')
+        total_sesiones = len(fatigas_recientes)
         pct_fatiga_alta = (fatiga_alta / total_sesiones) if total_sesiones > 0 else 0
 
         # Con fatiga alta frecuente -> mejor resistencia láctica -> mejora ritmo 5%
@@ -1571,6 +1541,21 @@ class HyroxRaceSimulator:
         total_segundos = sum(d['segundos'] for d in desglose) + carrera_segundos + transiciones_seg
         tiempo_total_str = cls._segundos_a_tiempo_str(int(total_segundos))
 
+        # --- Escenarios: dispersión real del atleta alrededor de esta estimación ---
+        escenarios = None
+        try:
+            escenarios = HyroxMonteCarloSimulator.para_objetivo(
+                objetivo,
+                [d['nombre'] for d in desglose],
+                [d['segundos'] for d in desglose],
+                [carrera_segundos / 8] * 8,
+                transiciones_seg=transiciones_seg,
+                prob_fatiga=pct_fatiga_alta,
+            )
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).warning("[RaceSimulator] Monte Carlo falló: %s", e)
+
         # --- Calculos narrativos para el coach ---
         pilar_mas_debil = max(desglose, key=lambda x: x['penalizacion_pct'])
         carrera_str = cls._segundos_a_tiempo_str(int(carrera_segundos))
@@ -1594,6 +1579,7 @@ class HyroxRaceSimulator:
             'carrera_segundos': int(carrera_segundos),
             'carrera_str': carrera_str,
             'mensaje_coach': mensaje_coach,
+            'escenarios': escenarios,
         }
 
     @staticmethod
@@ -1752,15 +1738,17 @@ class HyroxMacrocycleEngine:
         return 1.0 # Mantenimiento
 
     @classmethod
-    def detect_running_inactivity(cls, user_id):
+    def detect_running_inactivity(cls, user_id, objetivo=None):
         """
         Chequea si han pasado más de 7 días sin registrar 'carrera'.
         Retorna (inactivo_bool, dias_sin_correr, tiene_credito_futbol, preguntar_bool).
+        `objetivo`: el objetivo activo del usuario si el llamador ya lo tiene cargado.
         """
         from .models import HyroxActivity, HyroxObjective
         from django.utils import timezone
 
-        objetivo = HyroxObjective.objects.filter(cliente__user_id=user_id, estado='activo').first()
+        if objetivo is None:
+            objetivo = HyroxObjective.objects.filter(cliente__user_id=user_id, estado='activo').first()
         if not objetivo:
             return False, 0, False, False
 
@@ -2268,6 +2256,23 @@ class RaceCardService:
         dias_evento = (objetivo.fecha_evento - timezone.localdate()).days if objetivo.fecha_evento else 999
         es_race_week = 0 <= dias_evento <= 7
 
+        # ── Escenarios Monte Carlo alrededor de la tarjeta ───────────────────
+        from .race_montecarlo import HyroxMonteCarloSimulator
+        escenarios = None
+        try:
+            escenarios = HyroxMonteCarloSimulator.para_objetivo(
+                objetivo,
+                [f['station'] for f in filas],
+                [f['station_secs'] for f in filas],
+                [f['run_pace_secs'] for f in filas],
+            )
+            for p in ('p10', 'p50', 'p90'):
+                escenarios[f'{p}_str'] = cls._fmt_race(escenarios[f'{p}_seg'])
+            escenarios['estacion_clave'] = escenarios['sensibilidad'][0]
+        except Exception:
+            import logging
+            logging.getLogger(__name__).exception("[RaceCard] Error en la simulación Monte Carlo")
+
         return {
             'filas':              filas,
             'total_str':          cls._fmt_race(total_secs),
@@ -2278,6 +2283,7 @@ class RaceCardService:
             'confianza':          confianza,
             'es_race_week':       es_race_week,
             'dias_evento':        dias_evento,
+            'escenarios':         escenarios,
         }
 
 
@@ -2936,6 +2942,16 @@ class HyroxRaceIntelligence:
         ajuste = cls._calcular_ajuste_fatiga(readiness, carga, acwr)
         tiempo_ajustado = (tiempo_base_secs + ajuste) if tiempo_base_secs else None
 
+        # ── Rango: percentiles 10-90 de los escenarios Monte Carlo ──────────
+        # Preferencia por los de la Race Card (el total que ve el dashboard);
+        # sin escenarios, el margen fijo de siempre (-90 s / +150 s).
+        escenarios = (race_card or {}).get('escenarios') or (simulacion or {}).get('escenarios')
+        if escenarios:
+            margen_min = escenarios['p50_seg'] - escenarios['p10_seg']
+            margen_max = escenarios['p90_seg'] - escenarios['p50_seg']
+        else:
+            margen_min, margen_max = 90, 150
+
         # ── Interferencia principal ─────────────────────────────────────────
         if interferencia_index is None:
             interferencia_index = InterferenceIndexService.compute_for_objective(objective)
@@ -2985,8 +3001,9 @@ class HyroxRaceIntelligence:
             'tiempo_estimado':        cls._fmt_time(tiempo_ajustado),
             'tiempo_estimado_seg':    tiempo_ajustado,
             'tiempo_base':            cls._fmt_time(tiempo_base_secs),
-            'tiempo_rango_min':       cls._fmt_time(tiempo_ajustado - 90)  if tiempo_ajustado else None,
-            'tiempo_rango_max':       cls._fmt_time(tiempo_ajustado + 150) if tiempo_ajustado else None,
+            'tiempo_rango_min':       cls._fmt_time(tiempo_ajustado - margen_min) if tiempo_ajustado else None,
+            'tiempo_rango_max':       cls._fmt_time(tiempo_ajustado + margen_max) if tiempo_ajustado else None,
+            'estacion_sensible':      escenarios['sensibilidad'][0] if escenarios else None,
             'ajuste_seg':             ajuste,
             'tiempo_objetivo':        cls._fmt_time(objetivo_secs),
             'diferencia_secs':        diferencia_secs,
@@ -3241,6 +3258,9 @@ def _corregir_fecha_sesion_en_servicio(sesion):
     sesion.fecha = hoy
     try:
         ActividadRealizada.objects.filter(sesion_hyrox=sesion).update(fecha=hoy)
+        # update() no dispara señales: el libro de carga se reescribe desde hoy
+        from entrenos.services.carga_diaria_service import actualizar_seguro
+        actualizar_seguro(sesion.objective.cliente_id, hoy)
     except Exception:
         pass
 
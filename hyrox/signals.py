@@ -377,9 +377,10 @@ def autorregular_plan_futuro(sender, instance, created, update_fields=None, **kw
 # SSoT (Single Source of Truth) - Integración con Gym/Liftin
 # ==============================================================================
 from entrenos.models import EntrenoRealizado, EjercicioRealizado
+from entrenos.services import pipeline_entreno
 from hyrox.models import HyroxObjective
 
-@receiver(post_save, sender=EntrenoRealizado)
+@pipeline_entreno.handler
 def sync_gym_impact_to_hyrox(sender, instance, created, raw=False, **kwargs):
     """
     Signal transversal: Gym → Hyrox.
@@ -632,3 +633,29 @@ def detectar_5k_desde_actividad_libre(sender, instance, created, raw=False, **kw
                 print(f"✅ tiempo_5k_base actualizado → {objetivo.tiempo_5k_base} (ActividadLibre {instance.id})")
     except Exception as e:
         print(f"❌ detectar_5k_desde_actividad_libre: {e}")
+
+
+# ── Splits por estación (hyrox/splits.py) ─────────────────────────────────────
+
+from . import splits as _splits
+from .models import HyroxActivity, HyroxStationSplit
+
+@receiver(post_save, sender=HyroxActivity)
+def sincronizar_split_estacion(sender, instance, created, raw=False, **kwargs):
+    """Mantiene el HyroxStationSplit de la actividad (creado, actualizado o borrado si ya no es estación)."""
+    if raw:
+        return
+    try:
+        _splits.sincronizar([instance], limpiar=not created)
+    except Exception as e:
+        logger.error('sincronizar_split_estacion error: %s', e)
+
+
+@receiver(post_save, sender=HyroxSession)
+def sincronizar_fecha_splits(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Una sesión reprogramada arrastra la fecha de sus splits."""
+    if raw or created:
+        return
+    if update_fields is not None and 'fecha' not in update_fields:
+        return
+    HyroxStationSplit.objects.filter(sesion=instance).exclude(fecha=instance.fecha).update(fecha=instance.fecha)
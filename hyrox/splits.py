@@ -0,0 +1,181 @@
+"""
+Splits por estación (`HyroxStationSplit`).
+
+El diagnóstico post-entreno y los estándares de competición localizaban
+cada estación buscando palabras clave en HyroxActivity.nombre_ejercicio y
+recorrían data_metricas de todo el historial en Python. Aquí cada actividad
+que corresponde a una estación (HyroxStationIntelligence.station_key) tiene
+una fila con la clave canónica y sus métricas ya extraídas, indexada por
+(objective, estacion, fecha):
+
+- `sincronizar(actividades)`: reescribe (borra y crea) los splits de esas
+  actividades. Lo llaman la señal post_save de HyroxActivity y los caminos
+  en bloque de training_engine (bulk_create/bulk_update no emiten señales).
+  El borrado de actividades o sesiones arrastra el split por CASCADE.
+- `sincronizar_fechas(sesion_ids)`: copia HyroxSession.fecha a sus splits
+  cuando una sesión se reprograma.
+- `reconstruir(objetivos)`: recálculo completo (comando
+  `reconstruir_splits_estacion`, necesario para el histórico previo y tras
+  update() en bloque).
+- `tiempos_previos` / `mejores_por_estacion`: lecturas de diagnóstico y
+  estándares, una consulta cada una.
+"""
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery
+
+from .models import HyroxActivity, HyroxSession, HyroxStationSplit
+from .station_intelligence import HyroxStationIntelligence
+
+
+def _numero(valor):
+    try:
+        return float(valor or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def metricas(data_metricas):
+    """
+    tiempo_s, peso_kg (máximo de las series, o el de la raíz), reps totales y
+    distancia_m (la de la raíz si existe, si no la suma de las series) del
+    JSON de una actividad. None donde no hay dato.
+    """
+    data = data_metricas or {}
+    series = data.get('series', [])
+    if isinstance(series, dict):
+        series = [series]
+    elif not isinstance(series, list):
+        series = []
+
+    peso = reps = distancia_series = 0.0
+    for serie in series:
+        if not isinstance(serie, dict):
+            continue
+        peso = max(peso, _numero(serie.get('peso_kg', serie.get('peso', 0))))
+        reps += _numero(serie.get('reps', 0))
+        distancia_series += _numero(serie.get('distancia_m', serie.get('distancia', 0)))
+    if not peso:
+        peso = _numero(data.get('peso_kg', 0))
+
+    distancia = (
+        _numero(data.get('distancia', 0))
+        or _numero(data.get('distancia_m', 0))
+        or _numero(data.get('distancia_km', 0)) * 1000
+        or distancia_series
+    )
+    tiempo = _numero(data.get('tiempo_s', 0))
+
+    return {
+        'tiempo_s': int(tiempo) if tiempo > 0 else None,
+        'peso_kg': peso or None,
+        'reps': int(reps) if reps > 0 else None,
+        'distancia_m': distancia or None,
+    }
+
+
+def construir(actividad):
+    """Split (sin guardar) de la actividad, o None si no es una estación."""
+    estacion = HyroxStationIntelligence.station_key(actividad.nombre_ejercicio)
+    if not estacion:
+        return None
+    sesion = actividad.sesion
+    return HyroxStationSplit(
+        objective_id=sesion.objective_id,
+        sesion_id=sesion.pk,
+        actividad_id=actividad.pk,
+        estacion=estacion,
+        tipo_actividad=actividad.tipo_actividad,
+        fecha=sesion.fecha,
+        **metricas(actividad.data_metricas),
+    )
+
+
+def sincronizar(actividades, limpiar=True):
+    """
+    Deja los splits de `actividades` como corresponde a su estado actual.
+    `limpiar=False` omite el borrado de las que no son estación, cuando
+    ninguna puede tener un split previo (recién creadas, o solo cambió
+    data_metricas).
+
+    Los de las estaciones se borran y se vuelven a crear: bulk_create con
+    update_conflicts y unique_fields no está soportado en MySQL. Las
+    actividades tienen que estar guardadas (con pk).
+    """
+    splits, sin_estacion = [], []
+    for actividad in actividades:
+        split = construir(actividad)
+        if split is None:
+            sin_estacion.append(actividad.pk)
+        else:
+            splits.append(split)
+
+    borrar = [split.actividad_id for split in splits]
+    if limpiar:
+        borrar += sin_estacion
+    with transaction.atomic():
+        if borrar:
+            HyroxStationSplit.objects.filter(actividad_id__in=borrar).delete()
+        if splits:
+            HyroxStationSplit.objects.bulk_create(splits)
+
+
+def sincronizar_fechas(sesion_ids):
+    sesion_ids = list(sesion_ids)
+    if not sesion_ids:
+        return
+    HyroxStationSplit.objects.filter(sesion_id__in=sesion_ids).update(
+        fecha=Subquery(HyroxSession.objects.filter(pk=OuterRef('sesion_id')).values('fecha')[:1]),
+    )
+
+
+def reconstruir(objetivos):
+    """Recalcula los splits de los objetivos desde sus actividades. Devuelve cuántos quedan."""
+    total = 0
+    for objetivo in objetivos:
+        actividades = HyroxActivity.objects.filter(sesion__objective=objetivo).select_related('sesion')
+        splits = [s for s in map(construir, actividades.iterator(chunk_size=500)) if s is not None]
+        with transaction.atomic():
+            HyroxStationSplit.objects.filter(objective=objetivo).delete()
+            HyroxStationSplit.objects.bulk_create(splits, batch_size=500)
+        total += len(splits)
+    return total
+
+
+# --------------------------------------------------------------------------
+# Lecturas
+# --------------------------------------------------------------------------
+
+def tiempos_previos(sesion, estacion, limite=5):
+    """Últimos `limite` tiempos de la estación en sesiones completadas anteriores a `sesion`, del más reciente al más antiguo."""
+    return list(
+        HyroxStationSplit.objects.filter(
+            objective_id=sesion.objective_id,
+            estacion=estacion,
+            fecha__lt=sesion.fecha,
+            sesion__estado='completado',
+            tiempo_s__isnull=False,
+        )
+        .order_by('-fecha', '-actividad_id')
+        .values_list('tiempo_s', flat=True)[:limite]
+    )
+
+
+def tiempos_sesion(sesion):
+    """{estacion: tiempo_s} de la sesión (la primera actividad de cada estación)."""
+    tiempos = {}
+    for estacion, tiempo in (
+        HyroxStationSplit.objects.filter(sesion=sesion).order_by('actividad_id').values_list('estacion', 'tiempo_s')
+    ):
+        tiempos.setdefault(estacion, tiempo)
+    return tiempos
+
+
+def mejores_por_estacion(objetivo, tipos_actividad=None):
+    """{estacion: {'peso_kg', 'reps', 'distancia_m'}} con el máximo de cada métrica en el objetivo."""
+    splits = HyroxStationSplit.objects.filter(objective=objetivo)
+    if tipos_actividad is not None:
+        splits = splits.filter(tipo_actividad__in=tipos_actividad)
+    filas = splits.values('estacion').annotate(
+        peso_kg=Max('peso_kg'), reps=Max('reps'), distancia_m=Max('distancia_m'),
+    )
+    return {fila.pop('estacion'): fila for fila in filas}
@@ -547,16 +547,24 @@ class HyroxStationIntelligence:
     _NAME_MAP = [
         ("skierg", "skierg"),
         ("ski erg", "skierg"),
+        ("ski-erg", "skierg"),
         ("sled push", "sled_push"),
+        ("empuje de trineo", "sled_push"),
+        ("empuje trineo", "sled_push"),
         ("sled pull", "sled_pull"),
+        ("jalón de trineo", "sled_pull"),
+        ("jalon trineo", "sled_pull"),
         ("burpee", "burpees"),
         ("rowing", "rowing"),
         ("remo", "rowing"),
         ("farmer", "farmers_carry"),
         ("carry", "farmers_carry"),
+        ("caminata de granjero", "farmers_carry"),
         ("sandbag", "sandbag_lunges"),
         ("lunge", "sandbag_lunges"),
+        ("zancadas con saco", "sandbag_lunges"),
         ("wall ball", "wall_balls"),
+        ("balón al muro", "wall_balls"),
     ]
 
     @classmethod
@@ -571,6 +579,11 @@ class HyroxStationIntelligence:
 
     # ── API PÚBLICA ───────────────────────────────────────────────────────────
 
+    @classmethod
+    def station_key(cls, name):
+        """Clave canónica de estación ('sled_push', …) para un nombre de ejercicio, o None."""
+        return cls._resolve(name)
+
     @classmethod
     def get_station_tip(cls, station_name):
         """Devuelve foco técnico y estrategia para mostrar antes de ejecutar."""
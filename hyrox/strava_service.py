@@ -0,0 +1,321 @@
+"""
+Cliente de la API de Strava y cola de eventos del webhook.
+
+El webhook descargaba la actividad completa de la API (timeout de 10 s y
+posible renovación de token) dentro del propio POST. Con la API lenta,
+Strava reintentaba el evento y los reintentos se acumulaban. Ahora:
+
+- `encolar_evento(body)`: el webhook solo inserta un StravaEventoWebhook
+  (idempotente por strava_id) y responde.
+- `procesar_eventos()`: lo ejecuta la tarea procesar_eventos_strava (o el
+  comando del mismo nombre). Descarta en una consulta los strava_id ya
+  importados y agrupa los eventos por atleta: una renovación de token y un
+  listado de actividades por atleta en lugar de una descarga por evento.
+  Los fallos se reintentan con backoff exponencial hasta MAX_INTENTOS.
+- `backfill(token, desde, hasta)`: importación de un rango arbitrario de
+  fechas, paginada (200 por página), con una consulta IN por página para
+  descartar los strava_id ya importados, bulk_create(ignore_conflicts) y una
+  sesión HTTP por ejecución. Respeta las cabeceras X-RateLimit de Strava:
+  espera a la siguiente ventana de 15 minutos (o se interrumpe si la espera
+  supera `espera_maxima`) y se detiene al agotar el cupo diario. Es
+  reanudable: repetirla no duplica nada.
+
+La URL base de la API es configurable (`settings.STRAVA_API_URL`,
+`settings.STRAVA_OAUTH_URL`) para poder probar contra un stub HTTP local.
+"""
+
+import datetime
+import logging
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+
+from .models import StravaActivityRaw, StravaEventoWebhook, StravaToken
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = 10
+MAX_INTENTOS = 6
+RETRASO_BASE = timedelta(minutes=1)
+RETRASO_MAXIMO = timedelta(hours=6)
+# Margen para listar por fecha de inicio: la actividad empieza antes de subirse
+MARGEN_LISTADO = timedelta(days=2)
+POR_PAGINA = 200
+# Peticiones de reserva antes de agotar el cupo de 15 min / diario
+MARGEN_RATE_LIMIT = 5
+VENTANA_RATE_LIMIT = 15 * 60
+
+
+def _api_url():
+    return getattr(settings, 'STRAVA_API_URL', 'https://www.strava.com/api/v3')
+
+
+def sesion_http() -> requests.Session:
+    """Sesión con pool de conexiones, reutilizada durante toda una ejecución."""
+    return requests.Session()
+
+
+def refrescar_token(token: StravaToken, http=None) -> StravaToken:
+    """Exchange a stale token for a fresh one via Strava API."""
+    resp = (http or requests).post(
+        getattr(settings, 'STRAVA_OAUTH_URL', 'https://www.strava.com/oauth/token'),
+        data={
+            'client_id':     settings.STRAVA_CLIENT_ID,
+            'client_secret': settings.STRAVA_CLIENT_SECRET,
+            'grant_type':    'refresh_token',
+            'refresh_token': token.refresh_token,
+        },
+        timeout=TIMEOUT,
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    token.access_token = data['access_token']
+    token.refresh_token = data['refresh_token']
+    token.expires_at = datetime.datetime.fromtimestamp(data['expires_at'], tz=datetime.timezone.utc)
+    token.save()
+    return token
+
+
+def token_vigente(token: StravaToken, http=None) -> StravaToken:
+    return refrescar_token(token, http) if token.is_expired() else token
+
+
+def _get(token, ruta, http=None, **params):
+    resp = (http or requests).get(
+        f'{_api_url()}{ruta}',
+        headers={'Authorization': f'Bearer {token.access_token}'},
+        params=params or None,
+        timeout=TIMEOUT,
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def obtener_actividad(token: StravaToken, activity_id: int, http=None) -> dict:
+    """Fetch full activity from Strava API (el token debe estar vigente)."""
+    return _get(token, f'/activities/{activity_id}', http)
+
+
+def listar_actividades(token: StravaToken, after: int, http=None, per_page: int = 200) -> list:
+    """Una página de actividades del atleta con inicio posterior a `after` (epoch)."""
+    return _get(token, '/athlete/activities', http, after=after, per_page=per_page)
+
+
+def _epoch(dia: date) -> int:
+    return int(datetime.datetime.combine(dia, datetime.time.min).timestamp())
+
+
+def espera_rate_limit(resp, ahora=None):
+    """
+    Segundos a esperar antes de la siguiente petición según la respuesta:
+    0 si hay cupo, hasta la siguiente ventana de 15 min si se agota, None si
+    se agotó el cupo diario.
+    """
+    ahora = time.time() if ahora is None else ahora
+    hasta_ventana = int(VENTANA_RATE_LIMIT - ahora % VENTANA_RATE_LIMIT) + 1
+    try:
+        limite_15, limite_dia = (int(v) for v in resp.headers['X-RateLimit-Limit'].split(','))
+        uso_15, uso_dia = (int(v) for v in resp.headers['X-RateLimit-Usage'].split(','))
+    except (KeyError, ValueError):
+        limite_15 = limite_dia = uso_15 = uso_dia = None
+    if limite_dia is not None and uso_dia >= limite_dia - MARGEN_RATE_LIMIT:
+        return None
+    if resp.status_code == 429:
+        return int(resp.headers.get('Retry-After') or hasta_ventana)
+    if limite_15 is not None and uso_15 >= limite_15 - MARGEN_RATE_LIMIT:
+        return hasta_ventana
+    return 0
+
+
+def guardar_pagina(cliente, actividades) -> tuple:
+    """Inserta las actividades nuevas de una página: (nuevas, existentes). Una consulta IN + un INSERT."""
+    ids = [a['id'] for a in actividades if a.get('id')]
+    existentes = set(
+        StravaActivityRaw.objects.filter(strava_id__in=ids).values_list('strava_id', flat=True)
+    )
+    filas = [
+        fila for fila in (
+            fila_actividad(cliente, a) for a in actividades
+            if a.get('id') and a['id'] not in existentes
+        )
+        if fila is not None
+    ]
+    StravaActivityRaw.objects.bulk_create(filas, ignore_conflicts=True)
+    return len(filas), len(existentes)
+
+
+def backfill(token: StravaToken, desde: date, hasta: date, http=None, por_pagina: int = POR_PAGINA,
+             espera_maxima=None, dormir=time.sleep) -> dict:
+    """
+    Importa como pendientes todas las actividades del atleta con inicio entre
+    `desde` y `hasta` (incluidos). `espera_maxima` (segundos) limita cuánto se
+    espera por el rate limit de 15 min; None espera lo necesario.
+    """
+    http = http or sesion_http()
+    token = token_vigente(token, http)
+    resumen = {'paginas': 0, 'recibidas': 0, 'nuevas': 0, 'existentes': 0,
+               'ultima_fecha': None, 'interrumpido': ''}
+    pagina = 1
+    while True:
+        resp = http.get(
+            f'{_api_url()}/athlete/activities',
+            headers={'Authorization': f'Bearer {token.access_token}'},
+            params={'after': _epoch(desde), 'before': _epoch(hasta + timedelta(days=1)),
+                    'page': pagina, 'per_page': por_pagina},
+            timeout=TIMEOUT,
+        )
+        espera = espera_rate_limit(resp)
+        if resp.status_code != 429:
+            resp.raise_for_status()
+            actividades = resp.json()
+            resumen['paginas'] += 1
+            resumen['recibidas'] += len(actividades)
+            nuevas, existentes = guardar_pagina(token.cliente, actividades)
+            resumen['nuevas'] += nuevas
+            resumen['existentes'] += existentes
+            fechas = [f for f in ((a.get('start_date_local') or '')[:10] for a in actividades) if f]
+            if fechas:
+                resumen['ultima_fecha'] = max(fechas + [resumen['ultima_fecha'] or ''])
+            if len(actividades) < por_pagina:
+                break
+            pagina += 1
+        if espera is None:
+            resumen['interrumpido'] = 'Cupo diario de Strava agotado'
+            break
+        if espera:
+            if espera_maxima is not None and espera > espera_maxima:
+                resumen['interrumpido'] = f'Rate limit de Strava: reintentar en {espera} s'
+                break
+            logger.info("strava backfill: rate limit, esperando %s s", espera)
+            dormir(espera)
+    return resumen
+
+
+def fila_actividad(cliente, raw: dict, fecha_por_defecto=None) -> "StravaActivityRaw | None":
+    """StravaActivityRaw sin guardar; None si la actividad no trae fecha válida ni hay por defecto."""
+    try:
+        fecha = date.fromisoformat((raw.get('start_date_local') or '')[:10])
+    except ValueError:
+        fecha = fecha_por_defecto
+    if fecha is None:
+        return None
+    return StravaActivityRaw(
+        cliente           = cliente,
+        strava_id         = raw['id'],
+        fecha_actividad   = fecha,
+        tipo_strava       = raw.get('type', ''),
+        nombre_strava     = raw.get('name', ''),
+        duracion_segundos = raw.get('moving_time', 0),
+        hr_media          = raw.get('average_heartrate') or None,
+        hr_maxima         = raw.get('max_heartrate') or None,
+        distancia_metros  = raw.get('distance') or None,
+        raw_json          = raw,
+    )
+
+
+# ── Cola del webhook ─────────────────────────────────────────────────────────
+
+def encolar_evento(body: dict) -> bool:
+    """Guarda un evento 'create' de actividad. Sin llamadas a la API."""
+    if body.get('aspect_type') != 'create' or body.get('object_type') != 'activity':
+        return False
+    event_time = body.get('event_time')
+    StravaEventoWebhook.objects.bulk_create([
+        StravaEventoWebhook(
+            strava_id=int(body['object_id']),
+            athlete_id=int(body['owner_id']),
+            fecha_evento=(
+                datetime.datetime.fromtimestamp(event_time, tz=datetime.timezone.utc) if event_time else None
+            ),
+        )
+    ], ignore_conflicts=True)
+    return True
+
+
+def _descargar(token, eventos, http):
+    """{strava_id: actividad} de los eventos de un atleta: listado si hay varios, detalle para el resto."""
+    pendientes = {e.strava_id for e in eventos}
+    actividades = {}
+    if len(pendientes) > 1:
+        desde = min((e.fecha_evento or e.created_at) for e in eventos) - MARGEN_LISTADO
+        for raw in listar_actividades(token, int(desde.timestamp()), http):
+            if raw.get('id') in pendientes:
+                actividades[raw['id']] = raw
+    fallos = {}
+    for strava_id in pendientes - actividades.keys():
+        try:
+            actividades[strava_id] = obtener_actividad(token, strava_id, http)
+        except Exception as e:
+            fallos[strava_id] = e
+    return actividades, fallos
+
+
+def _reintentar(evento, error, ahora):
+    evento.intentos += 1
+    evento.ultimo_error = str(error)[:500]
+    if evento.intentos >= MAX_INTENTOS:
+        evento.estado = 'error'
+    else:
+        evento.proximo_intento = ahora + min(RETRASO_BASE * 2 ** (evento.intentos - 1), RETRASO_MAXIMO)
+    evento.save(update_fields=['intentos', 'ultimo_error', 'estado', 'proximo_intento'])
+
+
+def procesar_eventos(limite: int = 200, http=None) -> dict:
+    """Drena los eventos pendientes vencidos. Devuelve el recuento por resultado."""
+    ahora = timezone.now()
+    resumen = {'importadas': 0, 'duplicadas': 0, 'descartadas': 0, 'reintentos': 0, 'errores': 0}
+    eventos = list(
+        StravaEventoWebhook.objects.filter(estado='pendiente', proximo_intento__lte=ahora)
+        .order_by('proximo_intento')[:limite]
+    )
+    if not eventos:
+        return resumen
+
+    ya_importadas = set(
+        StravaActivityRaw.objects.filter(strava_id__in=[e.strava_id for e in eventos])
+        .values_list('strava_id', flat=True)
+    )
+    tokens = {
+        t.athlete_id: t
+        for t in StravaToken.objects.select_related('cliente')
+        .filter(athlete_id__in={e.athlete_id for e in eventos})
+    }
+    procesados, descartados, por_atleta = [], [], defaultdict(list)
+    for evento in eventos:
+        if evento.strava_id in ya_importadas:
+            procesados.append(evento.pk)
+            resumen['duplicadas'] += 1
+        elif evento.athlete_id not in tokens:
+            logger.warning("strava: evento para athlete_id no registrado: %s", evento.athlete_id)
+            descartados.append(evento.pk)
+            resumen['descartadas'] += 1
+        else:
+            por_atleta[evento.athlete_id].append(evento)
+
+    http = http or sesion_http()
+    filas = []
+    for athlete_id, eventos_atleta in por_atleta.items():
+        token = tokens[athlete_id]
+        try:
+            token = token_vigente(token, http)
+            actividades, fallos = _descargar(token, eventos_atleta, http)
+        except Exception as e:
+            logger.warning("strava: descarga fallida para athlete_id %s: %s", athlete_id, e)
+            actividades, fallos = {}, {ev.strava_id: e for ev in eventos_atleta}
+        for evento in eventos_atleta:
+            if evento.strava_id in actividades:
+                filas.append(fila_actividad(token.cliente, actividades[evento.strava_id], date.today()))
+                procesados.append(evento.pk)
+                resumen['importadas'] += 1
+            else:
+                _reintentar(evento, fallos.get(evento.strava_id, 'no devuelta por la API'), ahora)
+                resumen['errores' if evento.estado == 'error' else 'reintentos'] += 1
+
+    StravaActivityRaw.objects.bulk_create(filas, ignore_conflicts=True)
+    StravaEventoWebhook.objects.filter(pk__in=procesados).update(estado='procesado')
+    StravaEventoWebhook.objects.filter(pk__in=descartados).update(estado='descartado')
+    return resumen
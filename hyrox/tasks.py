@@ -0,0 +1,20 @@
+from celery import shared_task
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def procesar_eventos_strava():
+    """
+    Drena la cola de eventos del webhook de Strava (StravaEventoWebhook):
+    descarga las actividades nuevas agrupadas por atleta y reprograma con
+    backoff las que fallan. Ver hyrox/strava_service.py.
+    """
+    from .strava_service import procesar_eventos
+
+    resumen = procesar_eventos()
+    if any(resumen.values()):
+        logger.info('procesar_eventos_strava: %s', resumen)
+    return resumen
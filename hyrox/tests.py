@@ -1298,6 +1298,25 @@ class SyncHyroxActivityRmTests(TestCase):
         resultado = sync_hyrox_activity_rm_to_canonico(actividad)
         self.assertFalse(resultado)
 
+    def test_marca_por_debajo_del_indice_gym_no_actualiza(self):
+        from entrenos.models import MejorMarcaEjercicio
+        from hyrox.services import sync_hyrox_activity_rm_to_canonico
+
+        # El índice de marcas Gym ya documenta 125 kg estimados en sentadilla
+        MejorMarcaEjercicio.objects.create(
+            cliente=self.cliente, ejercicio='sentadilla trasera con barra',
+            nombre='Sentadilla Trasera con Barra', movimiento_principal='Sentadilla',
+            rm_estimado=125.0, mejor_peso_kg=115.0, mejor_repeticiones=3,
+        )
+        sesion = self._sesion()
+        actividad = self._actividad_fuerza(sesion, peso=110.0, reps=3, rpe=8)  # 121.0
+
+        resultado = sync_hyrox_activity_rm_to_canonico(actividad)
+
+        self.assertFalse(resultado)
+        self.objetivo.refresh_from_db()
+        self.assertEqual(float(self.objetivo.rm_sentadilla), 100.0)
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Item 5 — Auditoría: cobertura de las 8 estaciones oficiales en el macrociclo
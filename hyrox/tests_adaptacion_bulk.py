@@ -0,0 +1,95 @@
+"""
+Adaptación continua (HyroxTrainingEngine.apply_continuous_adaptation): los
+cambios de todos los disparadores se acumulan sobre las mismas instancias y
+se escriben al final con bulk_update, descartando sesiones que ya no están
+planificadas.
+"""
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from hyrox.models import HyroxActivity, HyroxObjective, HyroxSession
+from hyrox.tests import _activar_campana_test
+from hyrox.training_engine import HyroxTrainingEngine, _CambiosAdaptacion
+
+
+class AdaptacionEnBloqueTests(TestCase):
+    def setUp(self):
+        user, _ = User.objects.get_or_create(username='adaptacion_bulk')
+        self.hoy = datetime.date.today()
+        self.objetivo = HyroxObjective.objects.create(
+            cliente=user.cliente_perfil,
+            fecha_evento=self.hoy + datetime.timedelta(days=60),
+            categoria='open_men',
+        )
+        _activar_campana_test(self.objetivo)
+        self.proxima = self._sesion(1, 'Fuerza + Carrera')
+        self.fuerza = self._actividad(self.proxima, 'fuerza', {'series': [{'reps': 5, 'peso_kg': 100}]})
+        self.carrera = self._actividad(self.proxima, 'carrera', {'distancia_km': 5.0})
+
+    def _sesion(self, dias, titulo):
+        return HyroxSession.objects.create(
+            objective=self.objetivo, fecha=self.hoy + datetime.timedelta(days=dias), titulo=titulo,
+        )
+
+    def _actividad(self, sesion, tipo, metricas):
+        return HyroxActivity.objects.create(
+            sesion=sesion, tipo_actividad=tipo, nombre_ejercicio=tipo, data_metricas=metricas,
+        )
+
+    def _completada(self, dias, **campos):
+        # update(): sin post_save, que volvería a lanzar la adaptación
+        sesion = self._sesion(-dias, 'Fuerza')
+        self._actividad(sesion, 'fuerza', {'series': [{'reps': 5, 'peso_kg': 80}]})
+        HyroxSession.objects.filter(pk=sesion.pk).update(estado='completado', **campos)
+        return HyroxSession.objects.get(pk=sesion.pk)
+
+    def test_disparadores_acumulan_sobre_la_misma_sesion(self):
+        self._completada(2, rpe_global=5, cumplimiento_ratio=0.95)
+        completada = self._completada(1, rpe_global=5, cumplimiento_ratio=0.95)
+
+        with CaptureQueriesContext(connection) as capturadas:
+            mensajes = HyroxTrainingEngine.apply_continuous_adaptation(completada)
+
+        self.assertEqual(len(mensajes), 2)  # estancamiento +10 % y progresión +7 %
+        self.fuerza.refresh_from_db()
+        self.carrera.refresh_from_db()
+        self.assertEqual(self.fuerza.data_metricas['series'][0]['peso_kg'], round(110 * 1.07, 1))
+        self.assertIn('Ajuste Estancamiento', self.fuerza.data_metricas['notas'])
+        self.assertIn('Progresión +7%', self.fuerza.data_metricas['notas'])
+        self.assertEqual(self.carrera.data_metricas['distancia_km'], round(5.0 * 1.07, 2))
+
+        escrituras = [q['sql'] for q in capturadas.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(escrituras), 1)
+
+    def test_energia_baja_vacia_la_proxima_sesion(self):
+        self._completada(2, rpe_global=8, nivel_energia_pre=2)
+        completada = self._completada(1, rpe_global=8, nivel_energia_pre=2)
+
+        mensajes = HyroxTrainingEngine.apply_continuous_adaptation(completada)
+
+        self.assertTrue(any('baja energía' in m for m in mensajes))
+        self.proxima.refresh_from_db()
+        self.assertEqual(self.proxima.titulo, 'Día de Descanso / Salud (Autorregulado)')
+        self.assertFalse(self.proxima.activities.exists())
+
+    def test_descarta_sesiones_que_ya_no_estan_planificadas(self):
+        self._completada(2, rpe_global=8, nivel_energia_pre=2)
+        completada = self._completada(1, rpe_global=8, nivel_energia_pre=2)
+        guardar = _CambiosAdaptacion.guardar
+
+        def completar_y_guardar(cambios):
+            # El atleta registra la próxima sesión mientras se calcula la adaptación
+            HyroxSession.objects.filter(pk=self.proxima.pk).update(estado='completado', titulo='Hecha')
+            guardar(cambios)
+
+        with patch.object(_CambiosAdaptacion, 'guardar', completar_y_guardar):
+            HyroxTrainingEngine.apply_continuous_adaptation(completada)
+
+        self.proxima.refresh_from_db()
+        self.assertEqual(self.proxima.titulo, 'Hecha')
+        self.assertEqual(self.proxima.activities.count(), 2)
@@ -0,0 +1,70 @@
+"""
+Generación del plan Hyrox (HyroxTrainingEngine.generate_training_plan): las
+sesiones se construyen en memoria y se insertan en bloque, con un número de
+consultas que no crece con las semanas planificadas.
+"""
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from hyrox.models import HyroxActivity, HyroxObjective, HyroxSession
+from hyrox.tests import _activar_campana_test
+from hyrox.training_engine import HyroxTrainingEngine
+
+
+class PlanEnBloqueTests(TestCase):
+    def _objetivo(self, username, semanas):
+        user, _ = User.objects.get_or_create(username=username)
+        objetivo = HyroxObjective.objects.create(
+            cliente=user.cliente_perfil,
+            fecha_evento=datetime.date.today() + datetime.timedelta(weeks=semanas),
+            categoria='open_men',
+            rm_sentadilla=100.0,
+            rm_peso_muerto=120.0,
+        )
+        _activar_campana_test(objetivo)
+        return objetivo
+
+    def _consultas(self, objetivo):
+        with CaptureQueriesContext(connection) as capturadas:
+            HyroxTrainingEngine.generate_training_plan(objetivo)
+        return len(capturadas)
+
+    def test_consultas_no_crecen_con_las_semanas(self):
+        corto = self._objetivo('plan_bulk_corto', semanas=4)
+        largo = self._objetivo('plan_bulk_largo', semanas=12)
+
+        pocas = self._consultas(corto)
+        muchas = self._consultas(largo)
+        sesiones = HyroxSession.objects.filter(objective=largo)
+        # SQLite parte el bulk_create según su límite de parámetros: algún lote más, no una consulta por sesión
+        self.assertLessEqual(muchas, pocas + 2)
+        self.assertLess(muchas, sesiones.count())
+
+        self.assertGreater(sesiones.count(), HyroxSession.objects.filter(objective=corto).count())
+        self.assertTrue(HyroxActivity.objects.filter(sesion__objective=largo, tipo_actividad='fuerza').exists())
+
+    def test_regenerar_no_duplica_fechas(self):
+        objetivo = self._objetivo('plan_bulk_regenerar', semanas=6)
+        HyroxTrainingEngine.generate_training_plan(objetivo)
+        fechas = list(HyroxSession.objects.filter(objective=objetivo).values_list('fecha', flat=True))
+
+        HyroxTrainingEngine.generate_training_plan(objetivo)
+        self.assertEqual(
+            sorted(HyroxSession.objects.filter(objective=objetivo).values_list('fecha', flat=True)), sorted(fechas),
+        )
+        self.assertEqual(len(fechas), len(set(fechas)))
+
+    def test_sin_pks_devueltos_por_el_insert_relee_las_sesiones(self):
+        # MySQL: bulk_create no rellena los pk de las sesiones.
+        objetivo = self._objetivo('plan_bulk_sin_pks', semanas=4)
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            HyroxTrainingEngine.generate_training_plan(objetivo)
+
+        sesiones = HyroxSession.objects.filter(objective=objetivo)
+        self.assertTrue(sesiones.exists())
+        self.assertTrue(HyroxActivity.objects.filter(sesion__objective=objetivo, tipo_actividad='fuerza').exists())
@@ -0,0 +1,106 @@
+"""
+Simulación Monte Carlo de carrera (hyrox.race_montecarlo): percentiles y
+sensibilidad vectorizados, dispersión leída de los splits reales y su uso
+en HyroxRaceSimulator.simular, la Race Card y el rango del race briefing.
+"""
+import datetime
+import time
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from hyrox.models import HyroxActivity, HyroxObjective, HyroxSession
+from hyrox.race_montecarlo import HyroxMonteCarloSimulator as MC
+from hyrox.services import HyroxRaceIntelligence, HyroxRaceSimulator, RaceCardService
+
+NOMBRES = RaceCardService.STATION_ORDER
+MEDIANAS = [240, 180, 180, 240, 240, 120, 360, 240]
+RITMOS = [330] * 8
+
+
+class SimulacionVectorizadaTests(TestCase):
+    def test_percentiles_reproducibles_alrededor_de_la_estimacion(self):
+        resultado = MC.simular(NOMBRES, MEDIANAS, RITMOS, transiciones_seg=120, seed=7)
+        determinista = sum(MEDIANAS) + sum(RITMOS) + 120
+
+        self.assertEqual(resultado, MC.simular(NOMBRES, MEDIANAS, RITMOS, transiciones_seg=120, seed=7))
+        self.assertEqual(resultado['n_escenarios'], MC.N_ESCENARIOS)
+        self.assertLess(resultado['p10_seg'], resultado['p50_seg'])
+        self.assertLess(resultado['p50_seg'], resultado['p90_seg'])
+        self.assertLess(abs(resultado['p50_seg'] - determinista), determinista * 0.01)
+
+        con_fatiga = MC.simular(NOMBRES, MEDIANAS, RITMOS, transiciones_seg=120, prob_fatiga=1.0, seed=7)
+        self.assertGreater(con_fatiga['p50_seg'], resultado['p50_seg'])
+
+    def test_sensibilidad_senala_la_estacion_irregular(self):
+        cvs = [MC.CV_ESTACION_MIN] * 8
+        cvs[NOMBRES.index('Wall Balls')] = MC.CV_ESTACION_MAX
+        resultado = MC.simular(NOMBRES, MEDIANAS, RITMOS, cvs=cvs, seed=1)
+
+        primera = resultado['sensibilidad'][0]
+        self.assertEqual(primera['nombre'], 'Wall Balls')
+        self.assertGreater(primera['mejora_p50_seg'], 0)
+        self.assertEqual(
+            {s['nombre'] for s in resultado['sensibilidad']}, set(NOMBRES),
+        )
+        # Estaciones + carrera + forma del día: las estaciones no explican más del 100 %
+        self.assertLess(sum(s['contribucion_pct'] for s in resultado['sensibilidad']), 100)
+
+    def test_miles_de_escenarios_en_menos_de_100_ms(self):
+        MC.simular(NOMBRES, MEDIANAS, RITMOS, seed=0)
+        t0 = time.perf_counter()
+        MC.simular(NOMBRES, MEDIANAS, RITMOS, seed=0)
+        self.assertLess(time.perf_counter() - t0, 0.1)
+
+
+class SimulacionObjetivoTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('montecarlo')
+        self.hoy = datetime.date.today()
+        self.objetivo = HyroxObjective.objects.create(
+            cliente=self.user.cliente_perfil,
+            fecha_evento=self.hoy + datetime.timedelta(days=60),
+            categoria='open_men',
+            tiempo_5k_base='25:00',
+        )
+        for dias, tiempo, fatiga in ((9, 180, 'Alta'), (6, 320, 'Baja'), (3, 240, 'Alta'), (1, 260, 'Baja')):
+            sesion = HyroxSession.objects.create(
+                objective=self.objetivo, fecha=self.hoy - datetime.timedelta(days=dias), titulo='Estaciones',
+            )
+            HyroxSession.objects.filter(pk=sesion.pk).update(estado='completado', muscle_fatigue_index=fatiga)
+            HyroxActivity.objects.create(
+                sesion=sesion, tipo_actividad='hyrox_station', nombre_ejercicio='Wall Balls',
+                data_metricas={'tiempo_s': tiempo},
+            )
+
+    def test_dispersion_y_fatiga_desde_el_historial(self):
+        with self.assertNumQueries(1):
+            cvs = MC.cv_estaciones(self.objetivo)
+        self.assertEqual(set(cvs), {'wall_balls'})
+        self.assertAlmostEqual(cvs['wall_balls'], 0.2309, places=3)
+        self.assertEqual(MC.prob_fatiga(self.objetivo), 0.5)
+
+    def test_alimenta_simulador_race_card_y_briefing(self):
+        simulacion = HyroxRaceSimulator.simular(self.user.id)
+        escenarios = simulacion['escenarios']
+        self.assertLessEqual(escenarios['p10_seg'], simulacion['total_segundos'])
+        self.assertGreaterEqual(escenarios['p90_seg'], simulacion['total_segundos'])
+
+        race_card = RaceCardService.generate(self.objetivo, [], [])
+        escenarios = race_card['escenarios']
+        self.assertEqual(escenarios['estacion_clave']['nombre'], 'Wall Balls')
+        self.assertEqual(escenarios['p50_str'], RaceCardService._fmt_race(escenarios['p50_seg']))
+        # Misma semilla por objetivo: la tarjeta no cambia entre recargas
+        self.assertEqual(RaceCardService.generate(self.objetivo, [], [])['escenarios'], escenarios)
+
+        briefing = HyroxRaceIntelligence.get_race_briefing(self.objetivo, interferencia_index=[], race_card=race_card)
+        ajustado = briefing['tiempo_estimado_seg']
+        self.assertEqual(
+            briefing['tiempo_rango_min'],
+            HyroxRaceIntelligence._fmt_time(ajustado - (escenarios['p50_seg'] - escenarios['p10_seg'])),
+        )
+        self.assertEqual(
+            briefing['tiempo_rango_max'],
+            HyroxRaceIntelligence._fmt_time(ajustado + (escenarios['p90_seg'] - escenarios['p50_seg'])),
+        )
+        self.assertEqual(briefing['estacion_sensible']['nombre'], 'Wall Balls')
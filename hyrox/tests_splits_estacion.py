@@ -0,0 +1,118 @@
+"""
+Splits por estación (hyrox.splits / HyroxStationSplit): se mantienen al
+guardar actividades y sesiones, coinciden con la reconstrucción completa y
+el diagnóstico y los estándares los leen sin recorrer el historial.
+"""
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from hyrox.diagnostic_engine import HyroxDiagnosticEngine
+from hyrox.models import HyroxActivity, HyroxObjective, HyroxSession, HyroxStationSplit
+from hyrox.services import CompetitionStandardsService
+
+CAMPOS = ('actividad_id', 'estacion', 'tipo_actividad', 'fecha', 'tiempo_s', 'peso_kg', 'reps', 'distancia_m')
+
+
+class SplitsEstacionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('splits_estacion')
+        self.hoy = datetime.date.today()
+        self.objetivo = HyroxObjective.objects.create(
+            cliente=self.user.cliente_perfil,
+            fecha_evento=self.hoy + datetime.timedelta(days=60),
+            categoria='open_men',
+        )
+
+    def _sesion(self, dias, estado='completado'):
+        sesion = HyroxSession.objects.create(
+            objective=self.objetivo, fecha=self.hoy - datetime.timedelta(days=dias), titulo='Estaciones',
+        )
+        # update(): sin los motores post-sesión, ajenos a los splits
+        HyroxSession.objects.filter(pk=sesion.pk).update(estado=estado)
+        sesion.estado = estado
+        return sesion
+
+    def _actividad(self, sesion, nombre, metricas, tipo='hyrox_station'):
+        return HyroxActivity.objects.create(
+            sesion=sesion, tipo_actividad=tipo, nombre_ejercicio=nombre, data_metricas=metricas,
+        )
+
+    def _splits(self):
+        return sorted(HyroxStationSplit.objects.values_list(*CAMPOS))
+
+    def test_se_mantienen_y_coinciden_con_la_reconstruccion(self):
+        sesion = self._sesion(3)
+        sled = self._actividad(sesion, 'Empuje de trineo 4x25m', {
+            'tiempo_s': 150, 'series': [{'peso_kg': 120, 'distancia_m': 25}, {'peso_kg': 130, 'distancia_m': 25}],
+        })
+        wall = self._actividad(sesion, 'Wall Balls', {'series': [{'reps': 30}, {'reps': 25, 'peso_kg': 6}]})
+        self._actividad(sesion, 'Sentadilla', {'series': [{'reps': 5, 'peso_kg': 100}]}, tipo='fuerza')
+
+        split = HyroxStationSplit.objects.get(actividad=sled)
+        self.assertEqual((split.estacion, split.tiempo_s, split.peso_kg, split.distancia_m), ('sled_push', 150, 130, 50))
+        self.assertEqual(HyroxStationSplit.objects.get(actividad=wall).reps, 55)
+        self.assertEqual(HyroxStationSplit.objects.count(), 2)
+
+        wall.nombre_ejercicio = 'Thruster'
+        wall.save()
+        sesion.fecha = self.hoy - datetime.timedelta(days=2)
+        sesion.save()
+        self.assertEqual(HyroxStationSplit.objects.get().fecha, sesion.fecha)
+
+        incremental = self._splits()
+        call_command('reconstruir_splits_estacion', stdout=StringIO())
+        self.assertEqual(self._splits(), incremental)
+
+        sled.delete()
+        self.assertFalse(HyroxStationSplit.objects.exists())
+
+    def test_sin_upsert_ni_pks_devueltos(self):
+        # Flags de MySQL: sin ON CONFLICT con target ni RETURNING en el insert
+        features = type(connection.features)
+        with mock.patch.object(features, 'supports_update_conflicts_with_target', False), \
+                mock.patch.object(features, 'can_return_rows_from_bulk_insert', False):
+            self.test_se_mantienen_y_coinciden_con_la_reconstruccion()
+
+    def test_diagnostico_no_depende_del_historial(self):
+        def consultas():
+            sesion = self._sesion(0)
+            sesion.station_feedback = [{'estacion': 'skierg', 'pausas': '0', 'sensacion': 'fluida'}]
+            self._actividad(sesion, 'SkiErg 1000m', {'tiempo_s': 230})
+            with CaptureQueriesContext(connection) as capturadas:
+                resultado = HyroxDiagnosticEngine.evaluate_session(sesion)
+            return len(capturadas), resultado
+
+        self._actividad(self._sesion(20), 'SkiErg 1000m', {'tiempo_s': 250})
+        self._actividad(self._sesion(30, estado='planificado'), 'SkiErg 1000m', {'tiempo_s': 200})
+        pocas, resultado = consultas()
+        self.assertEqual(resultado['stations'][0]['diagnosis']['tipo'], 'mejora_objetiva')
+
+        for dias in range(1, 15):
+            sesion = self._sesion(dias)
+            self._actividad(sesion, 'Carrera 1km', {'distancia_km': 1}, tipo='carrera')
+            self._actividad(sesion, 'Remo 500m', {'tiempo_s': 120})
+        self.assertEqual(consultas()[0], pocas)
+        # Solo sesiones completadas de fechas anteriores: ni la de hoy ni la planificada
+        self.assertEqual(HyroxDiagnosticEngine._historical_times(HyroxSession.objects.latest('pk'), 'skierg'), [250])
+
+    def test_estandares_desde_los_splits(self):
+        sesion = self._sesion(1)
+        self._actividad(sesion, 'Sled Push', {'peso_kg': 150, 'distancia': 50})
+        self._actividad(sesion, 'Remo con mancuerna', {'series': [{'reps': 10, 'peso_kg': 30}]}, tipo='fuerza')
+        self._actividad(sesion, 'Remo Z2', {'distancia_km': 2}, tipo='remo')
+        self._actividad(sesion, 'Prensa de piernas', {'series': [{'reps': 10, 'peso_kg': 200}]}, tipo='fuerza')
+
+        with self.assertNumQueries(3):
+            progreso = {p['nombre']: p for p in CompetitionStandardsService.get_user_standards_progress(self.user.id)['progreso']}
+
+        self.assertEqual((progreso['Sled Push']['kg_actual'], progreso['Sled Push']['vol_actual']), (150.0, 50.0))
+        self.assertEqual(progreso['Rowing']['vol_actual'], 2000.0)
+        self.assertEqual(progreso['Rowing']['kg_actual'], 30.0)  # equivalencia 'Remo' (modo kg)
+        self.assertEqual(progreso['Wall Balls']['kg_actual'], 0.0)
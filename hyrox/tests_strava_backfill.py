@@ -0,0 +1,88 @@
+"""
+Backfill paginado de Strava (strava_service.backfill) contra el stub HTTP
+de tests_strava_webhook_cola.
+"""
+
+import datetime
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from hyrox import strava_service
+from hyrox.models import StravaActivityRaw, StravaToken
+from hyrox.tests_strava_webhook_cola import StubStrava
+
+
+class BackfillStravaTests(TestCase):
+
+    def setUp(self):
+        self.stub = StubStrava()
+        self.addCleanup(self.stub.cerrar)
+        ajustes = override_settings(STRAVA_API_URL=self.stub.url)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.user = User.objects.create_user('strava-backfill')
+        self.cliente = self.user.cliente_perfil
+        self.token = StravaToken.objects.create(
+            cliente=self.cliente, athlete_id=43, access_token='a', refresh_token='r',
+            expires_at=timezone.now() + datetime.timedelta(hours=6),
+        )
+        inicio = datetime.date(2022, 1, 1)
+        for i in range(450):
+            self.stub.actividad(1000 + i, fecha=(inicio + datetime.timedelta(days=i)).isoformat())
+        for strava_id in (1000, 1300):
+            StravaActivityRaw.objects.create(
+                cliente=self.cliente, strava_id=strava_id, fecha_actividad=inicio, raw_json={},
+            )
+
+    def test_pagina_todo_el_rango_con_una_consulta_in_por_pagina(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resumen = strava_service.backfill(self.token, datetime.date(2022, 1, 1), datetime.date(2023, 12, 31))
+
+        self.assertEqual(
+            (resumen['paginas'], resumen['recibidas'], resumen['nuevas'], resumen['existentes']), (3, 450, 448, 2),
+        )
+        self.assertEqual(resumen['ultima_fecha'], '2023-03-26')
+        self.assertEqual(StravaActivityRaw.objects.filter(cliente=self.cliente).count(), 450)
+        existentes = [q for q in consultas.captured_queries
+                      if q['sql'].startswith('SELECT') and 'hyrox_stravaactivityraw' in q['sql']]
+        self.assertEqual(len(existentes), 3)
+
+    def test_espera_a_la_siguiente_ventana_del_rate_limit(self):
+        self.stub.limite = (7, 1000)
+        esperas = []
+
+        resumen = strava_service.backfill(
+            self.token, datetime.date(2022, 1, 1), datetime.date(2023, 12, 31), dormir=esperas.append,
+        )
+
+        self.assertEqual(resumen['nuevas'], 448)
+        self.assertEqual(len(esperas), 1)
+        self.assertTrue(0 < esperas[0] <= strava_service.VENTANA_RATE_LIMIT + 1)
+
+    def test_vista_se_interrumpe_sin_esperar_y_se_reanuda(self):
+        self.stub.limite = (7, 1000)
+        self.client.force_login(self.user)
+        url = reverse('hyrox:strava_importar_recientes')
+
+        primera = self.client.post(url, {'desde': '2022-01-01', 'hasta': '2023-12-31'}).json()
+        self.assertTrue(primera['ok'])
+        self.assertIn('Rate limit', primera['msg'])
+        # Cupo de 15 min (7 - margen 5) agotado tras la segunda página
+        self.assertEqual(StravaActivityRaw.objects.filter(cliente=self.cliente).count(), 400)
+
+        self.assertTrue(primera['interrumpido'])
+
+        self.stub.uso = [0, self.stub.uso[1]]
+        segunda = self.client.post(url, {'desde': primera['ultima_fecha'], 'hasta': '2023-12-31'}).json()
+        self.assertFalse(segunda["interrumpido"], segunda)
+        self.assertEqual(StravaActivityRaw.objects.filter(cliente=self.cliente).count(), 450)
+
+        self.stub.uso = [0, 996]
+        agotado = self.client.post(url, {'desde': '2022-01-01', 'hasta': '2023-12-31'}).json()
+        self.assertIn('Cupo diario', agotado['msg'])
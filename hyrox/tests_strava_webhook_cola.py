@@ -0,0 +1,158 @@
+"""
+Cola del webhook de Strava (hyrox/strava_service.py).
+
+El webhook solo encola; procesar_eventos descarga contra un stub HTTP local
+que imita la API de Strava.
+"""
+
+import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from hyrox import strava_service
+from hyrox.models import StravaActivityRaw, StravaEventoWebhook, StravaToken
+
+
+class StubStrava:
+    """
+    API de Strava mínima: /athlete/activities (paginado si se pide `page`) y
+    /activities/<id>, con cabeceras X-RateLimit (`limite`, `uso`).
+    """
+
+    def __init__(self):
+        self.actividades = {}
+        self.fallan = set()
+        self.peticiones = []
+        self.limite = (600, 30000)
+        self.uso = [0, 0]
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                partes = urlsplit(self.path)
+                ruta, query = partes.path, parse_qs(partes.query)
+                stub.peticiones.append(ruta)
+                stub.uso = [stub.uso[0] + 1, stub.uso[1] + 1]
+                if ruta == '/athlete/activities':
+                    lista = sorted(stub.actividades.values(), key=lambda a: (a['start_date_local'], a['id']))
+                    inicio = lambda a: datetime.datetime.fromisoformat(a['start_date_local'][:19]).timestamp()
+                    if 'after' in query:
+                        lista = [a for a in lista if inicio(a) > int(query['after'][0])]
+                    if 'before' in query:
+                        lista = [a for a in lista if inicio(a) < int(query['before'][0])]
+                    if 'page' in query:
+                        por_pagina, pagina = int(query['per_page'][0]), int(query['page'][0])
+                        lista = lista[(pagina - 1) * por_pagina:pagina * por_pagina]
+                    return self._json(200, lista)
+                strava_id = int(ruta.rsplit('/', 1)[-1])
+                if strava_id in stub.fallan or strava_id not in stub.actividades:
+                    return self._json(500, {'message': 'error'})
+                return self._json(200, stub.actividades[strava_id])
+
+            def _json(self, estado, datos):
+                cuerpo = json.dumps(datos).encode()
+                self.send_response(estado)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('X-RateLimit-Limit', '%d,%d' % stub.limite)
+                self.send_header('X-RateLimit-Usage', '%d,%d' % tuple(stub.uso))
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.servidor.server_port}'
+
+    def actividad(self, strava_id, fecha='2026-10-10'):
+        self.actividades[strava_id] = {
+            'id': strava_id, 'type': 'Run', 'name': f'Carrera {strava_id}',
+            'start_date_local': f'{fecha}T07:00:00Z', 'moving_time': 1800, 'distance': 5000.0,
+        }
+
+    def cerrar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+class ColaWebhookStravaTests(TestCase):
+
+    def setUp(self):
+        self.stub = StubStrava()
+        self.addCleanup(self.stub.cerrar)
+        ajustes = override_settings(STRAVA_API_URL=self.stub.url)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.cliente = User.objects.create_user('strava-cola').cliente_perfil
+        StravaToken.objects.create(
+            cliente=self.cliente, athlete_id=42, access_token='a', refresh_token='r',
+            expires_at=timezone.now() + datetime.timedelta(hours=6),
+        )
+
+    def _evento(self, strava_id, athlete_id=42):
+        return self.client.post(
+            reverse('hyrox:strava_webhook'),
+            data=json.dumps({'aspect_type': 'create', 'object_type': 'activity',
+                             'object_id': strava_id, 'owner_id': athlete_id, 'event_time': 1760000000}),
+            content_type='application/json',
+        )
+
+    def test_webhook_solo_encola_sin_llamar_a_la_api(self):
+        self.stub.actividad(1)
+        self.assertEqual(self._evento(1).status_code, 200)
+        self.assertEqual(self._evento(1).status_code, 200)
+
+        self.assertEqual(StravaEventoWebhook.objects.filter(strava_id=1, estado='pendiente').count(), 1)
+        self.assertFalse(StravaActivityRaw.objects.exists())
+        self.assertEqual(self.stub.peticiones, [])
+
+    def test_eventos_del_mismo_atleta_se_descargan_en_un_listado(self):
+        for strava_id in (1, 2, 3):
+            self.stub.actividad(strava_id)
+            self._evento(strava_id)
+        StravaActivityRaw.objects.create(
+            cliente=self.cliente, strava_id=3, fecha_actividad=datetime.date(2026, 10, 10), raw_json={},
+        )
+        self._evento(99, athlete_id=7)
+
+        resumen = strava_service.procesar_eventos()
+
+        self.assertEqual(resumen, {'importadas': 2, 'duplicadas': 1, 'descartadas': 1, 'reintentos': 0, 'errores': 0})
+        self.assertEqual(self.stub.peticiones, ['/athlete/activities'])
+        self.assertEqual(
+            set(StravaActivityRaw.objects.filter(cliente=self.cliente).values_list('strava_id', flat=True)), {1, 2, 3},
+        )
+        self.assertEqual(StravaEventoWebhook.objects.get(strava_id=99).estado, 'descartado')
+        self.assertFalse(StravaEventoWebhook.objects.filter(estado='pendiente').exists())
+
+    def test_fallo_se_reintenta_con_backoff_hasta_agotar(self):
+        self._evento(5)
+        self.stub.actividad(5)
+        self.stub.fallan.add(5)
+
+        self.assertEqual(strava_service.procesar_eventos()['reintentos'], 1)
+        evento = StravaEventoWebhook.objects.get(strava_id=5)
+        self.assertEqual((evento.estado, evento.intentos), ('pendiente', 1))
+        self.assertGreater(evento.proximo_intento, timezone.now())
+        # No vencido: la siguiente pasada no lo toca
+        self.assertEqual(strava_service.procesar_eventos()['reintentos'], 0)
+
+        StravaEventoWebhook.objects.filter(pk=evento.pk).update(
+            intentos=strava_service.MAX_INTENTOS - 1, proximo_intento=timezone.now(),
+        )
+        self.assertEqual(strava_service.procesar_eventos()['errores'], 1)
+        self.assertEqual(StravaEventoWebhook.objects.get(pk=evento.pk).estado, 'error')
+
+        self.stub.fallan.clear()
+        StravaEventoWebhook.objects.filter(pk=evento.pk).update(estado='pendiente', proximo_intento=timezone.now())
+        self.assertEqual(strava_service.procesar_eventos()['importadas'], 1)
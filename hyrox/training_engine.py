@@ -2,7 +2,9 @@ import logging
 import math
 import datetime
 from datetime import timedelta
+from django.db import transaction
 from django.utils import timezone
+from . import splits
 from .models import HyroxObjective, HyroxSession, HyroxActivity
 
 logger = logging.getLogger(__name__)
@@ -137,12 +139,21 @@ class HyroxLoadManager:
 
         Constantes EWMA: CTL=42 días, ATL=7 días.
         TSB = CTL − ATL.
+
+        Lee primero el libro diario CargaDiariaCliente (una fila); solo si el
+        libro no cubre la fecha recorre el historial completo.
         """
+        from core.services import motor_carga
         from entrenos.models import ActividadRealizada
+        from entrenos.services import carga_diaria_service
 
         if hasta_fecha is None:
             hasta_fecha = timezone.now().date()
 
+        estado = carga_diaria_service.estado_en(objetivo.cliente_id, hasta_fecha)
+        if estado is not None:
+            return estado
+
         # ── Fuente primaria: hub unificado ──────────────────────────────────
         actividades = list(
             ActividadRealizada.objects.filter(
@@ -153,41 +164,24 @@ class HyroxLoadManager:
         )
 
         if actividades:
-            carga_por_dia = {}
-            for a in actividades:
-                d = a['fecha']
-                # sRPE /10 → escala comparable a TRIMP (mantiene thresholds TSB intactos)
-                carga_por_dia[d] = carga_por_dia.get(d, 0) + float(a['carga_ua']) / 10
-            desde = actividades[0]['fecha']
+            # sRPE /10 → escala comparable a TRIMP (mantiene thresholds TSB intactos)
+            filas = [(a['fecha'], float(a['carga_ua']) / 10) for a in actividades]
         else:
             # ── Fallback: sesiones Hyrox con TRIMP (histórico pre-hub) ──────
-            sesiones = list(
+            filas = list(
                 HyroxSession.objects.filter(
                     objective=objetivo,
                     estado='completado',
                     trimp__isnull=False,
                     fecha__lte=hasta_fecha,
-                ).order_by('fecha').values('fecha', 'trimp')
+                ).order_by('fecha').values_list('fecha', 'trimp')
             )
-            if not sesiones:
+            if not filas:
                 return {'ctl': None, 'atl': None, 'tsb': None}
-            carga_por_dia = {}
-            for s in sesiones:
-                d = s['fecha']
-                carga_por_dia[d] = carga_por_dia.get(d, 0) + s['trimp']
-            desde = sesiones[0]['fecha']
-
-        dias = (hasta_fecha - desde).days + 1
-        ctl = atl = 0.0
-        k_ctl = 1 / 42.0
-        k_atl = 1 / 7.0
-
-        fecha_cursor = desde
-        for _ in range(dias):
-            t = carga_por_dia.get(fecha_cursor, 0)
-            ctl = ctl + (t - ctl) * k_ctl
-            atl = atl + (t - atl) * k_atl
-            fecha_cursor += timedelta(days=1)
+
+        cargas = motor_carga.serie_diaria(filas, filas[0][0], hasta_fecha)
+        ctl, atl, _tsb = motor_carga.ctl_atl_tsb(cargas)
+        ctl, atl = float(ctl[-1]), float(atl[-1])
 
         tsb = round(ctl - atl, 1)
         return {'ctl': round(ctl, 1), 'atl': round(atl, 1), 'tsb': tsb}
@@ -234,29 +228,33 @@ class HyroxLoadManager:
         primaria; fallback a HyroxSession.trimp si el hub no tiene datos.
         """
         from entrenos.models import ActividadRealizada
+        from entrenos.services import carga_diaria_service
 
-        primera_hub = (
-            ActividadRealizada.objects
-            .filter(cliente=objetivo.cliente, carga_ua__isnull=False)
-            .order_by('fecha')
-            .values_list('fecha', flat=True)
-            .first()
-        )
-        primera_hyrox = (
-            HyroxSession.objects
-            .filter(objective=objetivo, estado='completado', trimp__isnull=False)
-            .order_by('fecha')
-            .values_list('fecha', flat=True)
-            .first()
-        )
-        candidatas = [f for f in [primera_hub, primera_hyrox] if f]
-        if not candidatas:
-            return None
-        primera = min(candidatas)
+        hoy = timezone.now().date()
+        primera_hub = carga_diaria_service.primera_fecha(objetivo.cliente_id)
+        if primera_hub is None:
+            primera_hub = (
+                ActividadRealizada.objects
+                .filter(cliente=objetivo.cliente, carga_ua__isnull=False)
+                .order_by('fecha')
+                .values_list('fecha', flat=True)
+                .first()
+            )
 
-        dias_historial = (timezone.now().date() - primera).days
-        if dias_historial < 28:
-            return None
+        # Con 28 días de hub ya no importa cuándo empezó el histórico Hyrox
+        if primera_hub is None or (hoy - primera_hub).days < 28:
+            primera_hyrox = (
+                HyroxSession.objects
+                .filter(objective=objetivo, estado='completado', trimp__isnull=False)
+                .order_by('fecha')
+                .values_list('fecha', flat=True)
+                .first()
+            )
+            candidatas = [f for f in [primera_hub, primera_hyrox] if f]
+            if not candidatas:
+                return None
+            if (hoy - min(candidatas)).days < 28:
+                return None
 
         carga = cls.calcular_ctl_atl_tsb(objetivo)
         ctl = carga.get('ctl') or 0
@@ -542,6 +540,193 @@ _TAGS_SUSTITUCION_FUERZA_PRINCIPAL = {
 }
 
 
+def _asignar_pks_actividades(actividades):
+    """
+    pk de actividades recién creadas con bulk_create cuando el backend no los
+    devuelve (MySQL): se releen las de sus sesiones, nuevas y sin otras
+    actividades, en orden de inserción. Los splits necesitan actividad_id.
+    """
+    if not actividades or actividades[0].pk is not None:
+        return
+    por_sesion = {}
+    for actividad in actividades:
+        por_sesion.setdefault(actividad.sesion_id, []).append(actividad)
+    pks = {}
+    for pk, sesion_id in (
+        HyroxActivity.objects.filter(sesion_id__in=por_sesion).order_by('pk').values_list('pk', 'sesion_id')
+    ):
+        pks.setdefault(sesion_id, []).append(pk)
+    for sesion_id, grupo in por_sesion.items():
+        if len(pks.get(sesion_id, [])) != len(grupo):
+            raise RuntimeError(f'Plan Hyrox: actividades de la sesión {sesion_id} no coinciden con las creadas')
+        for actividad, pk in zip(grupo, pks[sesion_id]):
+            actividad.pk = pk
+
+
+class _PlanEnMemoria:
+    """
+    Acumulador de generate_training_plan: sesiones y actividades se construyen
+    en memoria y se guardan al final con dos bulk_create en una transacción,
+    en lugar de un create() por sesión y por actividad.
+
+    También memoriza lo que solo depende del objetivo (fechas ya ocupadas, RM
+    calibrados, perfil atlético) para no recalcularlo en cada sesión.
+
+    bulk_create no emite post_save: los receivers de HyroxSession en
+    hyrox/signals.py solo actúan sobre sesiones 'completado', así que para
+    sesiones planificadas no hay nada que reproducir.
+
+    bulk_create solo rellena los pk en backends que devuelven las filas del
+    INSERT (PostgreSQL, SQLite, MariaDB). En MySQL los de las sesiones se
+    releen por fecha antes de crear las actividades (el plan crea como mucho
+    una sesión por fecha libre del objetivo) y los de las actividades, antes
+    de construir sus splits.
+    """
+
+    def __init__(self, objective, desde, hasta):
+        self.objective = objective
+        self.fechas_ocupadas = set(
+            HyroxSession.objects.filter(objective=objective, fecha__range=(desde, hasta))
+            .values_list('fecha', flat=True)
+        )
+        self.sesiones = []
+        self.actividades = []
+        self._memo = {}
+
+    def memo(self, clave, calcular):
+        if clave not in self._memo:
+            self._memo[clave] = calcular()
+        return self._memo[clave]
+
+    def agregar(self, sesion, actividades):
+        self.fechas_ocupadas.add(sesion.fecha)
+        self.sesiones.append(sesion)
+        self.actividades.extend(actividades)
+
+    def _asignar_pks_sesiones(self):
+        if not self.sesiones or self.sesiones[0].pk is not None:
+            return
+        pks = dict(
+            HyroxSession.objects
+            .filter(objective=self.objective, fecha__in=[s.fecha for s in self.sesiones])
+            .values_list('fecha', 'pk')
+        )
+        if len(pks) != len(self.sesiones):
+            raise RuntimeError(
+                f'Plan Hyrox: {len(pks)} sesiones en BD para {len(self.sesiones)} creadas '
+                f'(objetivo {self.objective.pk})'
+            )
+        for sesion in self.sesiones:
+            sesion.pk = pks[sesion.fecha]
+
+    def guardar(self):
+        with transaction.atomic():
+            HyroxSession.objects.bulk_create(self.sesiones)
+            self._asignar_pks_sesiones()
+            HyroxActivity.objects.bulk_create(self.actividades)
+            _asignar_pks_actividades(self.actividades)
+            splits.sincronizar(self.actividades, limpiar=False)
+        return self.sesiones
+
+
+class _CambiosAdaptacion:
+    """
+    Cambios pendientes de la adaptación sobre el plan (apply_continuous_adaptation,
+    auto_adjust, scale_volume_by_energy). Se guardan juntos al final con
+    bulk_update en una transacción, no con un save() por actividad.
+
+    Cada sesión y actividad tiene una sola instancia (`sesion`, `actividades`,
+    `primera`). Así cada disparador parte de lo que dejó el anterior sin
+    releerlo de BD.
+
+    Al guardar, solo se escriben las sesiones que siguen siendo del objetivo
+    (y 'planificado' si `solo_planificadas`). Si una sesión se completó o se
+    borró entretanto, se descarta con sus actividades. bulk_update no emite
+    post_save, y los receivers de HyroxSession solo actúan sobre sesiones
+    'completado', que aquí nunca se escriben.
+    """
+
+    CAMPOS_SESION = ['fecha', 'titulo', 'estado', 'fecha_actualizacion']
+
+    def __init__(self, objective, solo_planificadas=True):
+        self.objective = objective
+        self.solo_planificadas = solo_planificadas
+        self._sesiones = {}
+        self._actividades = {}
+        self._sesiones_cambiadas = set()
+        self._actividades_cambiadas = {}
+        self._vaciadas = set()
+
+    def sesion(self, sesion):
+        if sesion is None:
+            return None
+        return self._sesiones.setdefault(sesion.pk, sesion)
+
+    def primera(self, consulta, condicion=None):
+        """Primera sesión de `consulta` (ya ordenada) que cumple `condicion` con los cambios pendientes."""
+        if condicion is None:
+            return self.sesion(consulta.first())
+        for candidata in consulta:
+            candidata = self.sesion(candidata)
+            if condicion(candidata):
+                return candidata
+        return None
+
+    def actividades(self, sesion, tipo=None):
+        sesion = self.sesion(sesion)
+        if sesion.pk not in self._actividades:
+            self._actividades[sesion.pk] = list(sesion.activities.all())
+        return [a for a in self._actividades[sesion.pk] if tipo is None or a.tipo_actividad == tipo]
+
+    def cambiar_sesion(self, sesion):
+        self._sesiones_cambiadas.add(self.sesion(sesion).pk)
+
+    def cambiar_actividad(self, actividad):
+        self._actividades_cambiadas[actividad.pk] = actividad
+
+    def vaciar(self, sesion):
+        """Borra todas las actividades de la sesión."""
+        sesion = self.sesion(sesion)
+        self._actividades[sesion.pk] = []
+        self._vaciadas.add(sesion.pk)
+
+    def _validas(self):
+        ids = set(self._sesiones_cambiadas | self._vaciadas)
+        ids.update(a.sesion_id for a in self._actividades_cambiadas.values())
+        consulta = HyroxSession.objects.select_for_update().filter(pk__in=ids, objective=self.objective)
+        if self.solo_planificadas:
+            consulta = consulta.filter(estado='planificado')
+        return set(consulta.values_list('pk', flat=True))
+
+    def guardar(self):
+        if not (self._sesiones_cambiadas or self._actividades_cambiadas or self._vaciadas):
+            return
+        with transaction.atomic():
+            validas = self._validas()
+            ahora = timezone.now()
+            sesiones = []
+            for pk in self._sesiones_cambiadas & validas:
+                sesion = self._sesiones[pk]
+                sesion.ajustar_titulo_por_energia()
+                sesion.fecha_actualizacion = ahora
+                sesiones.append(sesion)
+            actividades = [
+                a for a in self._actividades_cambiadas.values()
+                if a.sesion_id in validas and a.sesion_id not in self._vaciadas
+            ]
+            descartadas = len(self._sesiones_cambiadas - validas) + sum(
+                1 for a in self._actividades_cambiadas.values() if a.sesion_id not in validas
+            )
+            if descartadas:
+                logger.info(f"Adaptación: {descartadas} cambios descartados (sesión ya no planificada)")
+
+            HyroxActivity.objects.filter(sesion_id__in=self._vaciadas & validas).delete()
+            HyroxSession.objects.bulk_update(sesiones, self.CAMPOS_SESION)
+            HyroxActivity.objects.bulk_update(actividades, ['data_metricas'])
+            splits.sincronizar_fechas(s.pk for s in sesiones)
+            splits.sincronizar(actividades, limpiar=False)
+
+
 class HyroxTrainingEngine:
     """
     Motor inteligente para generar y adaptar planes de entrenamiento Hyrox.
@@ -959,6 +1144,7 @@ class HyroxTrainingEngine:
                 retorno_tags.update(inj.tags_restringidos)
 
         current_date = today
+        plan = _PlanEnMemoria(objective, today, today + timedelta(weeks=weeks_to_plan))
 
         for week in range(weeks_to_plan):
             # Taper solo si el EVENTO real está dentro de las próximas 2 semanas de esta
@@ -1014,6 +1200,7 @@ class HyroxTrainingEngine:
                 rpe_acumulado=rpe_acumulado,
                 tsb=tsb_actual,
                 sleep_penalty=sleep_penalty,
+                plan=plan,
             )
 
             # Día 1: Fuerza + MetCon
@@ -1064,6 +1251,8 @@ class HyroxTrainingEngine:
                     **shared
                 )
 
+        plan.guardar()
+
     # ─────────────────────────────────────────────────────────────────────────
     # AUTO-AJUSTE DE SESIONES SALTADAS
     # ─────────────────────────────────────────────────────────────────────────
@@ -1103,7 +1292,10 @@ class HyroxTrainingEngine:
             fecha__gte=start_of_week
         ).prefetch_related('activities').order_by('fecha')
 
+        cambios = _CambiosAdaptacion(objective)
+        sesiones_futuras = None
         for sesion in sesiones_pasadas:
+            sesion = cambios.sesion(sesion)
             is_critica   = False
             titulo_lower = (sesion.titulo or '').lower()
             if 'carrera' in titulo_lower or 'simulación' in titulo_lower:
@@ -1118,24 +1310,29 @@ class HyroxTrainingEngine:
                     is_critica = True
 
             if is_critica:
-                sesiones_futuras = HyroxSession.objects.filter(
-                    objective=objective,
-                    estado='planificado',
-                    fecha__gte=hoy
-                ).order_by('-fecha')
+                # Las futuras se leen una vez; cada reprogramación posterior las vuelve a empujar
+                if sesiones_futuras is None:
+                    sesiones_futuras = [cambios.sesion(sf) for sf in HyroxSession.objects.filter(
+                        objective=objective,
+                        estado='planificado',
+                        fecha__gte=hoy
+                    ).order_by('-fecha')]
 
                 for sf in sesiones_futuras:
                     sf.fecha = sf.fecha + timedelta(days=1)
-                    sf.save()
+                    cambios.cambiar_sesion(sf)
 
                 sesion.fecha = hoy
-                sesion.save()
+                cambios.cambiar_sesion(sesion)
+                sesiones_futuras.append(sesion)
                 logger.info(f"Auto-Ajuste: Sesión crítica '{sesion.titulo}' reprogramada para hoy {hoy}")
             else:
                 sesion.estado = 'saltado'
-                sesion.save()
+                cambios.cambiar_sesion(sesion)
                 logger.info(f"Auto-Ajuste: Sesión accesoria '{sesion.titulo}' marcada como saltada.")
 
+        cambios.guardar()
+
     # ─────────────────────────────────────────────────────────────────────────
     # ADAPTACIÓN CONTINUA POST-SESIÓN
     # ─────────────────────────────────────────────────────────────────────────
@@ -1169,21 +1366,22 @@ class HyroxTrainingEngine:
 
         # Aplicar calibración personal de RPE antes de evaluar triggers
         rpe_efectivo = RPECalibrator.rpe_calibrado(rpe, sesion_completada.objective)
+        cambios = _CambiosAdaptacion(sesion_completada.objective)
 
         # --- TRIGGER 1: SOBREESFUERZO (RPE calibrado >= 9 O HR_Max > 185) ---
         if rpe_efectivo >= 9 or hr_max > 185:
             target_date = sesion_completada.fecha + timedelta(days=2)
             # Ventana ±1 día: robustez ante calendarios con huecos
-            sesion_sig = HyroxSession.objects.filter(
+            sesion_sig = cambios.primera(HyroxSession.objects.filter(
                 objective=sesion_completada.objective,
                 estado='planificado',
                 fecha__gte=target_date - timedelta(days=1),
                 fecha__lte=target_date + timedelta(days=1),
-            ).order_by('fecha').first()
+            ).order_by('fecha'))
 
             if sesion_sig:
                 is_mutated = False
-                for act in sesion_sig.activities.all():
+                for act in cambios.actividades(sesion_sig):
                     mutated_act = False
                     if 'series' in act.data_metricas:
                         for serie in act.data_metricas['series']:
@@ -1201,13 +1399,13 @@ class HyroxTrainingEngine:
                         mutated_act = True
 
                     if mutated_act:
-                        act.save()
+                        cambios.cambiar_actividad(act)
                         is_mutated = True
 
                 if is_mutated:
                     titulo_base = (sesion_sig.titulo or 'Entrenamiento').replace(' (Recuperación Activa)', '')
                     sesion_sig.titulo = titulo_base + ' (Recuperación Activa)'
-                    sesion_sig.save()
+                    cambios.cambiar_sesion(sesion_sig)
                     mensajes_ui.append(
                         f"{nombre}, hoy has llegado al límite. He suavizado un 20 % la sesión del "
                         f"{sesion_sig.fecha.strftime('%d/%m')} para optimizar tu recuperación."
@@ -1250,16 +1448,16 @@ class HyroxTrainingEngine:
                         if not hay_plateau:
                             continue  # La curva muestra progresión real, no estancamiento
 
-                        next_sesion = HyroxSession.objects.filter(
+                        next_sesion = cambios.primera(HyroxSession.objects.filter(
                             objective=sesion_completada.objective,
                             estado='planificado',
                             fecha__gt=sesion_completada.fecha,
                             activities__tipo_actividad=tipo
-                        ).order_by('fecha').first()
+                        ).order_by('fecha'))
 
                         if next_sesion:
                             is_mutated = False
-                            for act in next_sesion.activities.filter(tipo_actividad=tipo):
+                            for act in cambios.actividades(next_sesion, tipo):
                                 mutated_act = False
                                 if 'series' in act.data_metricas:
                                     for serie in act.data_metricas['series']:
@@ -1269,7 +1467,7 @@ class HyroxTrainingEngine:
                                 if mutated_act:
                                     notas_actuales = act.data_metricas.get('notas', '')
                                     act.data_metricas['notas'] = notas_actuales + " | 🔄 Ajuste Estancamiento: +10 % Carga."
-                                    act.save()
+                                    cambios.cambiar_actividad(act)
                                     is_mutated = True
 
                             if is_mutated:
@@ -1287,17 +1485,15 @@ class HyroxTrainingEngine:
                 fecha__lt=sesion_completada.fecha
             ).order_by('-fecha').first()
             if prev_sesion and prev_sesion.nivel_energia_pre is not None and prev_sesion.nivel_energia_pre < 3:
-                proxima = HyroxSession.objects.filter(
+                proxima = cambios.primera(HyroxSession.objects.filter(
                     objective=sesion_completada.objective,
                     estado='planificado',
                     fecha__gt=sesion_completada.fecha
-                ).order_by('fecha').first()
+                ).order_by('fecha'))
                 if proxima:
                     proxima.titulo = "Día de Descanso / Salud (Autorregulado)"
-                    proxima.activities.all().delete()
-                    import django.utils.timezone as tz
-                    proxima.fecha_actualizacion = tz.now()
-                    proxima.save()
+                    cambios.vaciar(proxima)
+                    cambios.cambiar_sesion(proxima)
                     mensajes_ui.append(
                         f"🛑 Cuidado: Has reportado baja energía dos sesiones seguidas. "
                         f"He cancelado tu próxima sesión ({proxima.fecha.strftime('%d/%m')}) "
@@ -1314,15 +1510,19 @@ class HyroxTrainingEngine:
         ).order_by('-fecha')[:3])
         rpes_snc = [s.rpe_global for s in ultimas_3 if s.rpe_global is not None]
         if len(rpes_snc) == 3 and all(r > 8.5 for r in rpes_snc):
-            proxima_fuerza = HyroxSession.objects.filter(
-                objective=sesion_completada.objective,
-                estado='planificado',
-                fecha__gt=sesion_completada.fecha,
-                titulo__icontains='fuerza',
-            ).order_by('fecha').first()
+            # El título puede haber cambiado en el disparador 3 (aún sin guardar)
+            proxima_fuerza = cambios.primera(
+                HyroxSession.objects.filter(
+                    objective=sesion_completada.objective,
+                    estado='planificado',
+                    fecha__gt=sesion_completada.fecha,
+                    titulo__icontains='fuerza',
+                ).order_by('fecha'),
+                lambda s: 'fuerza' in (s.titulo or '').lower(),
+            )
             if proxima_fuerza:
                 snc_mutated = False
-                for act in proxima_fuerza.activities.filter(tipo_actividad='fuerza'):
+                for act in cambios.actividades(proxima_fuerza, 'fuerza'):
                     porcentaje_actual = act.data_metricas.get('porcentaje_rm', 75)
                     if porcentaje_actual > 70:
                         factor_reduccion = 70.0 / porcentaje_actual
@@ -1333,7 +1533,7 @@ class HyroxTrainingEngine:
                         act.data_metricas['porcentaje_rm'] = 70
                         notas = act.data_metricas.get('notas', '')
                         act.data_metricas['notas'] = notas + " | ⚡ Bloqueo SNC: 3 sesiones RPE>8.5. Carga capada al 70% RM para proteger el sistema nervioso."
-                        act.save()
+                        cambios.cambiar_actividad(act)
                         snc_mutated = True
                 if snc_mutated:
                     mensajes_ui.append(
@@ -1358,16 +1558,16 @@ class HyroxTrainingEngine:
             if (prev_cumplimiento is not None and prev_cumplimiento >= 0.90
                     and prev_rpe is not None and prev_rpe <= 7):
                 # Dos sesiones seguidas con cumplimiento ≥ 90% y RPE ≤ 7 → progresión
-                next_sesion = HyroxSession.objects.filter(
+                next_sesion = cambios.primera(HyroxSession.objects.filter(
                     objective=sesion_completada.objective,
                     estado='planificado',
                     fecha__gt=sesion_completada.fecha,
-                ).order_by('fecha').first()
+                ).order_by('fecha'))
 
                 if next_sesion:
                     factor = 1.07  # +7%
                     progresion_mutated = False
-                    for act in next_sesion.activities.all():
+                    for act in cambios.actividades(next_sesion):
                         m = act.data_metricas or {}
                         mutated = False
                         if 'series' in m:
@@ -1386,7 +1586,7 @@ class HyroxTrainingEngine:
                             notas = m.get('notas', '')
                             m['notas'] = (notas + f" | 📈 Progresión +7%: cumplimiento ≥90% y RPE≤7 dos sesiones seguidas.").strip(' |')
                             act.data_metricas = m
-                            act.save()
+                            cambios.cambiar_actividad(act)
                             progresion_mutated = True
 
                     if progresion_mutated:
@@ -1401,15 +1601,15 @@ class HyroxTrainingEngine:
         # Actuamos con reducción preventiva + alerta al usuario.
         acwr = HyroxLoadManager.get_acwr(sesion_completada.objective)
         if acwr is not None and acwr > 1.5:
-            proxima_acwr = HyroxSession.objects.filter(
+            proxima_acwr = cambios.primera(HyroxSession.objects.filter(
                 objective=sesion_completada.objective,
                 estado='planificado',
                 fecha__gt=sesion_completada.fecha,
-            ).order_by('fecha').first()
+            ).order_by('fecha'))
 
             if proxima_acwr:
                 acwr_mutated = False
-                for act in proxima_acwr.activities.all():
+                for act in cambios.actividades(proxima_acwr):
                     m = act.data_metricas or {}
                     mutated = False
                     if 'series' in m:
@@ -1427,7 +1627,7 @@ class HyroxTrainingEngine:
                         notas = m.get('notas', '')
                         m['notas'] = (notas + f" | ⚠️ ACWR {acwr}: carga reciente excede la crónica. Reducción preventiva -15%.").strip(' |')
                         act.data_metricas = m
-                        act.save()
+                        cambios.cambiar_actividad(act)
                         acwr_mutated = True
 
                 if acwr_mutated:
@@ -1441,14 +1641,14 @@ class HyroxTrainingEngine:
         # Si el sueño reciente es muy deficiente, reducir carga preventivamente.
         sleep_penalty = HyroxLoadManager.get_sleep_penalty(sesion_completada.objective, dias=7)
         if sleep_penalty >= 4.0:
-            proxima_sleep = HyroxSession.objects.filter(
+            proxima_sleep = cambios.primera(HyroxSession.objects.filter(
                 objective=sesion_completada.objective,
                 estado='planificado',
                 fecha__gt=sesion_completada.fecha,
-            ).order_by('fecha').first()
+            ).order_by('fecha'))
             if proxima_sleep:
                 sleep_mutated = False
-                for act in proxima_sleep.activities.all():
+                for act in cambios.actividades(proxima_sleep):
                     m = dict(act.data_metricas or {})
                     mutated = False
                     if 'series' in m:
@@ -1464,7 +1664,7 @@ class HyroxTrainingEngine:
                         if 'Ajuste sueño' not in notas:
                             m['notas'] = (notas + f" | 😴 Ajuste sueño: déficit crónico detectado (penalización {sleep_penalty}). Carga -10%.").strip(' |')
                         act.data_metricas = m
-                        act.save()
+                        cambios.cambiar_actividad(act)
                         sleep_mutated = True
                 if sleep_mutated:
                     mensajes_ui.append(
@@ -1486,13 +1686,13 @@ class HyroxTrainingEngine:
             if total_planificado_s > 0:
                 ratio_duracion = total_ejercicios_s / total_planificado_s
                 if ratio_duracion > 1.30:
-                    proxima_larga = HyroxSession.objects.filter(
+                    proxima_larga = cambios.primera(HyroxSession.objects.filter(
                         objective=sesion_completada.objective,
                         estado='planificado',
                         fecha__gt=sesion_completada.fecha,
-                    ).order_by('fecha').first()
+                    ).order_by('fecha'))
                     if proxima_larga:
-                        for act in proxima_larga.activities.all():
+                        for act in cambios.actividades(proxima_larga):
                             m = dict(act.data_metricas or {})
                             notas = m.get('notas', '')
                             if 'Ajuste duración' not in notas:
@@ -1501,12 +1701,13 @@ class HyroxTrainingEngine:
                                     f"del tiempo planificado. Acorta pausas o reduce series si el tiempo es limitante."
                                 )).strip(' |')
                                 act.data_metricas = m
-                                act.save()
+                                cambios.cambiar_actividad(act)
                     mensajes_ui.append(
                         f"⏱ {nombre}: Tus ejercicios ocuparon el {int(ratio_duracion*100)}% del tiempo total planificado. "
                         f"He añadido una nota en la próxima sesión para ajustar los tiempos de descanso."
                     )
 
+        cambios.guardar()
         return mensajes_ui
 
     # ─────────────────────────────────────────────────────────────────────────
@@ -1531,6 +1732,8 @@ class HyroxTrainingEngine:
         if not autoriza_efectos_campana(sesion.objective, accion='autoajuste'):
             return None
         energia = sesion.nivel_energia_pre
+        # La sesión es la que se está registrando: no tiene por qué seguir 'planificado'
+        cambios = _CambiosAdaptacion(sesion.objective, solo_planificadas=False)
 
         # Carga externa gym (últimos 3 días)
         gym_load = HyroxTrainingEngine._get_gym_external_load(
@@ -1551,7 +1754,7 @@ class HyroxTrainingEngine:
 
         if energia < 5:
             ajuste_notas = "📉 Ajuste por Energía Baja (70% Volumen)"
-            for act in sesion.activities.all():
+            for act in cambios.actividades(sesion):
                 mutated_act = False
                 if 'series' in act.data_metricas:
                     for serie in act.data_metricas['series']:
@@ -1568,13 +1771,13 @@ class HyroxTrainingEngine:
                     notas_actuales = act.data_metricas.get('notas', '')
                     if "Ajuste por Energía" not in notas_actuales:
                         act.data_metricas['notas'] = f"{notas_actuales} | {ajuste_notas}{gym_aviso}".strip(" |")
-                    act.save()
+                    cambios.cambiar_actividad(act)
                     is_mutated = True
 
         elif energia <= 6:
             # Nuevo tier: energía moderada-baja → 85% volumen, 90% carga
             ajuste_notas = "📉 Ajuste por Energía Moderada-Baja (85% Volumen)"
-            for act in sesion.activities.all():
+            for act in cambios.actividades(sesion):
                 mutated_act = False
                 if 'series' in act.data_metricas:
                     for serie in act.data_metricas['series']:
@@ -1591,27 +1794,28 @@ class HyroxTrainingEngine:
                     notas_actuales = act.data_metricas.get('notas', '')
                     if "Ajuste" not in notas_actuales:
                         act.data_metricas['notas'] = f"{notas_actuales} | {ajuste_notas}{gym_aviso}".strip(" |")
-                    act.save()
+                    cambios.cambiar_actividad(act)
                     is_mutated = True
 
         elif energia > 8:
             ajuste_notas = "🔥 Energía Óptima: Considera subir el ritmo o carga en la última serie."
-            for act in sesion.activities.all():
+            for act in cambios.actividades(sesion):
                 notas_actuales = act.data_metricas.get('notas', '')
                 if "Energía Óptima" not in notas_actuales:
                     act.data_metricas['notas'] = f"{notas_actuales} | {ajuste_notas}{gym_aviso}".strip(" |")
-                    act.save()
+                    cambios.cambiar_actividad(act)
                     is_mutated = True
 
         elif gym_aviso:
             # Energía normal (7-8) pero hay fatiga de gym: solo añadir aviso sin reducir volumen
-            for act in sesion.activities.all():
+            for act in cambios.actividades(sesion):
                 notas_actuales = act.data_metricas.get('notas', '')
                 if "Gym detectado" not in notas_actuales and "Gym moderado" not in notas_actuales:
                     act.data_metricas['notas'] = f"{notas_actuales}{gym_aviso}".strip(" |")
-                    act.save()
+                    cambios.cambiar_actividad(act)
                     is_mutated = True
 
+        cambios.guardar()
         return is_mutated
 
     # ─────────────────────────────────────────────────────────────────────────
@@ -1628,13 +1832,21 @@ class HyroxTrainingEngine:
         rpe_acumulado=None,
         tsb=None,
         sleep_penalty=0.0,
+        plan=None,
     ):
         """
         Crea la sesión y sus actividades planificadas basadas en el template,
         escaladas a los RM del usuario, nivel de experiencia, semana del macrociclo
         y estado de forma objetivo (TSB).
+
+        Con `plan` (_PlanEnMemoria de generate_training_plan) no escribe nada:
+        la sesión y sus actividades se acumulan en el plan, que las guarda todas
+        juntas al final.
         """
-        if HyroxSession.objects.filter(objective=objective, fecha=fecha).exists():
+        if plan is not None:
+            if fecha in plan.fechas_ocupadas:
+                return
+        elif HyroxSession.objects.filter(objective=objective, fecha=fecha).exists():
             return
 
         restricted_tags = restricted_tags or set()
@@ -1645,40 +1857,37 @@ class HyroxTrainingEngine:
 
         # Perfil atlético — calcula Power/Endurance/Hybrid y ajusta cargas de estaciones
         from hyrox.services import HyroxAthleticProfile
-        perfil_atletico = HyroxAthleticProfile.compute(objective)
+        perfil_atletico = (
+            plan.memo('perfil_atletico', lambda: HyroxAthleticProfile.compute(objective))
+            if plan is not None else HyroxAthleticProfile.compute(objective)
+        )
 
         # Prescripción de zona cardíaca para esta sesión
         prescripcion_zona = HyroxLoadManager.get_prescripcion_zona(
             template, objective, is_taper, is_deload
         )
 
-        sesion = HyroxSession.objects.create(
+        sesion = HyroxSession(
             objective=objective,
             fecha=fecha,
             titulo=titulo,
             estado='planificado'
         )
+        actividades = []
 
         rm_squat    = objective.rm_sentadilla  or 60.0
         rm_deadlift = objective.rm_peso_muerto or 80.0
 
         # Calibrar RM desde rendimiento reciente si hay datos más actualizados
         if template != 'calibracion':
-            curva_sq = HyroxLoadManager.get_progression_curve(objective, 'fuerza', 'sentadilla', semanas=6)
-            if curva_sq:
-                max_real_sq = max(p['valor'] for p in curva_sq)
-                # Si el atleta ha levantado >90% del RM registrado, estimar RM actualizado
-                if max_real_sq > rm_squat * 0.90:
-                    rm_squat = max(rm_squat, round(max_real_sq / 0.85))
-            curva_dl = HyroxLoadManager.get_progression_curve(objective, 'fuerza', 'muerto', semanas=6)
-            if curva_dl:
-                max_real_dl = max(p['valor'] for p in curva_dl)
-                if max_real_dl > rm_deadlift * 0.90:
-                    rm_deadlift = max(rm_deadlift, round(max_real_dl / 0.85))
+            rm_squat, rm_deadlift = (
+                plan.memo('rms', lambda: HyroxTrainingEngine._rms_calibrados(objective))
+                if plan is not None else HyroxTrainingEngine._rms_calibrados(objective)
+            )
 
         # ── CALIBRACIÓN ──────────────────────────────────────────────────────
         if template == 'calibracion':
-            HyroxActivity.objects.create(
+            actividades.append(HyroxActivity(
                 sesion=sesion,
                 tipo_actividad='fuerza',
                 nombre_ejercicio='Sentadilla Trasera (Back Squat) [TEST]',
@@ -1691,8 +1900,8 @@ class HyroxTrainingEngine:
                     ),
                     "series": [{"reps": 10} for _ in range(3)]
                 }
-            )
-            HyroxActivity.objects.create(
+            ))
+            actividades.append(HyroxActivity(
                 sesion=sesion,
                 tipo_actividad='fuerza',
                 nombre_ejercicio='Peso Muerto (Deadlift) [TEST]',
@@ -1704,7 +1913,7 @@ class HyroxTrainingEngine:
                     ),
                     "series": [{"reps": 8} for _ in range(3)]
                 }
-            )
+            ))
 
         # ── FUERZA + METCON ───────────────────────────────────────────────────
         elif template == 'fuerza_metcon':
@@ -1835,7 +2044,7 @@ class HyroxTrainingEngine:
             elif edad and edad <= 25:
                 coach_tip += " Máxima explosividad concéntrica aprovechando tu recuperación de SNC."
 
-            HyroxActivity.objects.create(
+            actividades.append(HyroxActivity(
                 sesion=sesion,
                 tipo_actividad='fuerza',
                 nombre_ejercicio=ejercicio,
@@ -1853,7 +2062,7 @@ class HyroxTrainingEngine:
                         for _ in range(series_obj)
                     ]
                 }
-            )
+            ))
 
         # ── CARDIO ────────────────────────────────────────────────────────────
         elif template == 'cardio':
@@ -1898,7 +2107,7 @@ class HyroxTrainingEngine:
             if ritmo_guardar:
                 metricas["ritmo_objetivo"] = ritmo_guardar
 
-            HyroxActivity.objects.create(
+            actividades.append(HyroxActivity(
                 sesion=sesion,
                 tipo_actividad='cardio_sustituto' if is_sub else 'carrera',
                 nombre_ejercicio=(
@@ -1908,7 +2117,7 @@ class HyroxTrainingEngine:
                     else 'Carrera Continua Z2'
                 ),
                 data_metricas=metricas
-            )
+            ))
 
         # ── ESTACIONES HYROX ──────────────────────────────────────────────────
         elif template == 'hyrox_stations':
@@ -2005,12 +2214,12 @@ class HyroxTrainingEngine:
                 nombre_est = est.pop('nombre')
                 tags_est   = est.pop('tags', None)
                 tipo_est   = est.pop('tipo', 'hyrox_station')
-                HyroxActivity.objects.create(
+                actividades.append(HyroxActivity(
                     sesion=sesion,
                     tipo_actividad=tipo_est,
                     nombre_ejercicio=nombre_est,
                     data_metricas={"planificado": True, **est}
-                )
+                ))
 
         # ── SIMULACIÓN ────────────────────────────────────────────────────────
         elif template == 'simulacion':
@@ -2081,15 +2290,41 @@ class HyroxTrainingEngine:
                     if restricted_tags and any(t in restricted_tags for t in tags_seg):
                         logger.info(f"Bio-Safe Simulación: Saltando {seg['nombre']}.")
                         continue
-                    HyroxActivity.objects.create(
+                    actividades.append(HyroxActivity(
                         sesion=sesion,
                         tipo_actividad=seg['tipo'],
                         nombre_ejercicio=seg['nombre'] + (' (Adaptado)' if is_sub and seg['tipo'] != 'hyrox_station' else ''),
                         data_metricas=seg['metricas']
-                    )
+                    ))
 
+        if plan is not None:
+            plan.agregar(sesion, actividades)
+        else:
+            sesion.save()
+            HyroxActivity.objects.bulk_create(actividades)
+            _asignar_pks_actividades(actividades)
+            splits.sincronizar(actividades, limpiar=False)
         return sesion
 
+    @staticmethod
+    def _rms_calibrados(objective):
+        """RM de sentadilla y peso muerto, subidos si el rendimiento reciente los supera."""
+        rm_squat    = objective.rm_sentadilla  or 60.0
+        rm_deadlift = objective.rm_peso_muerto or 80.0
+
+        curva_sq = HyroxLoadManager.get_progression_curve(objective, 'fuerza', 'sentadilla', semanas=6)
+        if curva_sq:
+            max_real_sq = max(p['valor'] for p in curva_sq)
+            # Si el atleta ha levantado >90% del RM registrado, estimar RM actualizado
+            if max_real_sq > rm_squat * 0.90:
+                rm_squat = max(rm_squat, round(max_real_sq / 0.85))
+        curva_dl = HyroxLoadManager.get_progression_curve(objective, 'fuerza', 'muerto', semanas=6)
+        if curva_dl:
+            max_real_dl = max(p['valor'] for p in curva_dl)
+            if max_real_dl > rm_deadlift * 0.90:
+                rm_deadlift = max(rm_deadlift, round(max_real_dl / 0.85))
+        return rm_squat, rm_deadlift
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # POST-MILESTONE ADAPTATION ENGINE
@@ -1475,7 +1475,7 @@ def hyrox_dashboard(request):
         from analytics.planificador_helms.database.ejercicios import EJERCICIOS_DATABASE
         from core.bio_context import BioContextProvider
 
-        # Reutiliza la caché de 10 min del context processor global (bio_ctx_{cliente.id})
+        # Reutiliza la caché de 10 min del context processor global (bio_ctx)
         # en vez de repetir la query a UserInjury en cada carga del dashboard.
         bio_data = BioContextProvider.get_current_restrictions_cached(cliente)
         restricted_tags = bio_data.get('tags', set())
@@ -1761,6 +1761,9 @@ def _corregir_fecha_sesion_completada(sesion):
     sesion.fecha = hoy
     try:
         ActividadRealizada.objects.filter(sesion_hyrox=sesion).update(fecha=hoy)
+        # update() no dispara señales: el libro de carga se reescribe desde hoy
+        from entrenos.services.carga_diaria_service import actualizar_seguro
+        actualizar_seguro(sesion.objective.cliente_id, hoy)
     except Exception:
         pass
 
@@ -2492,6 +2495,8 @@ def editar_sesion_hyrox(request, session_id):
                     duracion_minutos=session.tiempo_total_minutos,
                     carga_ua=carga_ua,
                 )
+                from entrenos.services.carga_diaria_service import actualizar_seguro
+                actualizar_seguro(session.objective.cliente_id, session.fecha)
             except Exception as e_hub:
                 _log.warning(f'[EDIT session={session.id}] No se pudo actualizar hub: {e_hub}')
 
@@ -3008,39 +3013,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.http import HttpResponse
 
 from .models import StravaToken, StravaActivityRaw
-
-
-def _strava_refresh_token(token: StravaToken) -> StravaToken:
-    """Exchange a stale token for a fresh one via Strava API."""
-    import requests as _req
-    resp = _req.post('https://www.strava.com/oauth/token', data={
-        'client_id':     django_settings.STRAVA_CLIENT_ID,
-        'client_secret': django_settings.STRAVA_CLIENT_SECRET,
-        'grant_type':    'refresh_token',
-        'refresh_token': token.refresh_token,
-    }, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
-    from django.utils import timezone as _tz
-    token.access_token  = data['access_token']
-    token.refresh_token = data['refresh_token']
-    token.expires_at    = _tz.datetime.fromtimestamp(data['expires_at'], tz=__import__('datetime').timezone.utc)
-    token.save()
-    return token
-
-
-def _strava_get_activity(token: StravaToken, activity_id: int) -> dict:
-    """Fetch full activity from Strava API, refreshing token if needed."""
-    import requests as _req
-    if token.is_expired():
-        token = _strava_refresh_token(token)
-    resp = _req.get(
-        f'https://www.strava.com/api/v3/activities/{activity_id}',
-        headers={'Authorization': f'Bearer {token.access_token}'},
-        timeout=10,
-    )
-    resp.raise_for_status()
-    return resp.json()
+from . import strava_service
 
 
 @login_required
@@ -3099,7 +3072,9 @@ def strava_callback(request):
 def strava_webhook(request):
     """
     GET  — Strava subscription verification challenge.
-    POST — Incoming activity event; stage it for user review.
+    POST — Incoming activity event; queued as StravaEventoWebhook. The activity
+           is fetched later by the procesar_eventos_strava task, so the
+           response never waits on the Strava API.
     """
     if request.method == 'GET':
         challenge    = request.GET.get('hub.challenge', '')
@@ -3111,37 +3086,8 @@ def strava_webhook(request):
     if request.method == 'POST':
         import json as _json
         try:
-            body    = _json.loads(request.body)
-            aspect  = body.get('aspect_type')       # 'create' | 'update' | 'delete'
-            obj_type = body.get('object_type')      # 'activity'
-            act_id  = body.get('object_id')
-            ath_id  = body.get('owner_id')
-
-            if aspect == 'create' and obj_type == 'activity':
-                try:
-                    token = StravaToken.objects.select_related('cliente').get(athlete_id=ath_id)
-                    # Avoid duplicate inserts
-                    if not StravaActivityRaw.objects.filter(strava_id=act_id).exists():
-                        raw = _strava_get_activity(token, act_id)
-                        from datetime import date as _date
-                        fecha_str = raw.get('start_date_local', '')[:10]
-                        fecha = _date.fromisoformat(fecha_str) if fecha_str else _date.today()
-                        StravaActivityRaw.objects.create(
-                            cliente          = token.cliente,
-                            strava_id        = act_id,
-                            fecha_actividad  = fecha,
-                            tipo_strava      = raw.get('type', ''),
-                            nombre_strava    = raw.get('name', ''),
-                            duracion_segundos = raw.get('moving_time', 0),
-                            hr_media         = raw.get('average_heartrate') or None,
-                            hr_maxima        = raw.get('max_heartrate') or None,
-                            distancia_metros = raw.get('distance') or None,
-                            raw_json         = raw,
-                        )
-                except StravaToken.DoesNotExist:
-                    logger.warning("strava_webhook: evento para athlete_id no registrado: %s", ath_id)
-                except Exception:
-                    logger.exception("strava_webhook: fallo procesando activity %s (athlete_id=%s)", act_id, ath_id)
+            # aspect_type 'create' | 'update' | 'delete'; object_type 'activity' | 'athlete'
+            strava_service.encolar_evento(_json.loads(request.body))
         except Exception:
             logger.exception("strava_webhook: payload POST inválido o error temprano")
         # Nunca dejar que el webhook falle con non-200 (Strava reintentaría indefinidamente);
@@ -3527,15 +3473,15 @@ def strava_procesar(request, actividad_id):
 @login_required
 @require_POST
 def strava_importar_recientes(request):
-    """Fetch last 14 days of activities from Strava API and stage them as pending.
+    """Fetch activities from Strava API and stage them as pending.
 
-    Bug fix: Strava returns activities ASCENDING (oldest first) when using 'after'.
-    With per_page=50 and a 30-day window, activities after day ~15 never appeared.
-    Fix: use 14-day window + per_page=200 (API max) so all recent activities fit in
-    one page, and today's session is always included.
+    Sin parámetros importa los últimos 7 días. Con `desde` (y opcionalmente
+    `hasta`, YYYY-MM-DD) importa ese rango completo, paginado
+    (strava_service.backfill). No espera por el rate limit de Strava: si se
+    agota, devuelve lo importado hasta ahí y `ultima_fecha`, desde la que se
+    puede repetir la petición.
     """
-    import requests as _req
-    from datetime import date as _date, timedelta as _td, datetime as _dt
+    from datetime import date as _date, timedelta as _td
 
     cliente = request.user.cliente_perfil
     try:
@@ -3543,54 +3489,31 @@ def strava_importar_recientes(request):
     except StravaToken.DoesNotExist:
         return JsonResponse({'ok': False, 'msg': 'No hay cuenta de Strava conectada.'}, status=400)
 
-    if token.is_expired():
-        try:
-            token = _strava_refresh_token(token)
-        except Exception as e:
-            return JsonResponse({'ok': False, 'msg': f'Error renovando token: {e}'}, status=400)
+    try:
+        hasta = _date.fromisoformat(request.POST['hasta']) if request.POST.get('hasta') else _date.today()
+        desde = _date.fromisoformat(request.POST['desde']) if request.POST.get('desde') else hasta - _td(days=7)
+    except ValueError:
+        return JsonResponse({'ok': False, 'msg': 'Fechas no válidas (YYYY-MM-DD).'}, status=400)
 
-    after_ts = int(_dt.combine(_date.today() - _td(days=7), _dt.min.time()).timestamp())
+    http = strava_service.sesion_http()
+    try:
+        token = strava_service.token_vigente(token, http)
+    except Exception as e:
+        return JsonResponse({'ok': False, 'msg': f'Error renovando token: {e}'}, status=400)
 
     try:
-        resp = _req.get(
-            'https://www.strava.com/api/v3/athlete/activities',
-            headers={'Authorization': f'Bearer {token.access_token}'},
-            params={'after': after_ts, 'per_page': 100},
-            timeout=15,
-        )
-        resp.raise_for_status()
-        activities = resp.json()
+        resumen = strava_service.backfill(token, desde, hasta, http=http, espera_maxima=0)
     except Exception as e:
         return JsonResponse({'ok': False, 'msg': f'Error conectando con Strava: {e}'}, status=400)
 
-    nuevas = 0
-    for raw in activities:
-        act_id = raw.get('id')
-        if not act_id or StravaActivityRaw.objects.filter(strava_id=act_id).exists():
-            continue
-        fecha_str = raw.get('start_date_local', '')[:10]
-        try:
-            from datetime import date as _d2
-            fecha = _d2.fromisoformat(fecha_str)
-        except Exception:
-            continue
-        StravaActivityRaw.objects.create(
-            cliente           = cliente,
-            strava_id         = act_id,
-            fecha_actividad   = fecha,
-            tipo_strava       = raw.get('type', ''),
-            nombre_strava     = raw.get('name', ''),
-            duracion_segundos = raw.get('moving_time', 0),
-            hr_media          = raw.get('average_heartrate') or None,
-            hr_maxima         = raw.get('max_heartrate') or None,
-            distancia_metros  = raw.get('distance') or None,
-            raw_json          = raw,
-        )
-        nuevas += 1
-
+    nuevas = resumen['nuevas']
+    pendiente = f" {resumen['interrumpido']}." if resumen['interrumpido'] else ''
     if nuevas:
-        return JsonResponse({'ok': True, 'msg': f'{nuevas} actividad{"es" if nuevas != 1 else ""} importada{"s" if nuevas != 1 else ""}. Revísalas abajo.'})
-    return JsonResponse({'ok': True, 'msg': 'No hay actividades nuevas en los últimos 30 días.'})
+        msg = f'{nuevas} actividad{"es" if nuevas != 1 else ""} importada{"s" if nuevas != 1 else ""}. Revísalas abajo.{pendiente}'
+    else:
+        msg = f'No hay actividades nuevas desde el {desde:%d/%m/%Y}.{pendiente}'
+    return JsonResponse({'ok': True, 'msg': msg, 'ultima_fecha': resumen['ultima_fecha'],
+                         'interrumpido': bool(resumen['interrumpido'])})
 
 
 @login_required
@@ -2,6 +2,7 @@ from .models import EstadoEmocional, RecuerdoEmocional, Entrenamiento
 
 import datetime
 from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
 
 # Triggers que solo deben aparecer en /joi/habitacion/.
 # No se inyectan en el context processor global — permanecen en la habitación.
@@ -24,46 +25,34 @@ def utility_functions(request):
 
 def _apertura_on_demand(user):
     """
-    Genera apertura_manana síncronamente si no existe ninguna para hoy.
-    Lock de caché de 10 min para no llamar a Haiku en cada request.
-    Retorna el MensajeJOI generado, o None si ya existe / falla.
+    Encola la apertura_manana de hoy (joi.tasks.generar_apertura_manana_usuario)
+    si aún no se ha pedido. Nunca llama a Haiku dentro del render: el mensaje
+    aparece después vía /joi/api/mensaje-pendiente/ (polling del FAB).
+    Lock de caché de 10 min para no encolar en cada request; la tarea
+    comprueba si ya existe la apertura del día. Retorna siempre None.
     """
     hoy = datetime.date.today()
     lock_key = f'joi_apertura_lock_{user.id}_{hoy}'
-    if cache.get(lock_key):
+    # add() es atómico: solo el primer request del intervalo encola.
+    # Si el broker no responde el lock se queda igualmente — su TTL de 600s es
+    # el cooldown, para no reintentar en cada página de la app.
+    if not cache.add(lock_key, True, 600):
         return None
-
-    from joi.models import MensajeJOI
-    ya_existe = MensajeJOI.objects.filter(
-        user=user, trigger='apertura_manana', creado_en__date=hoy
-    ).exists()
-    if ya_existe:
-        return None
-
-    # Poner el lock antes de llamar a Haiku para evitar llamadas paralelas
-    cache.set(lock_key, True, 600)
     try:
-        from clientes.models import Cliente
-        from joi.services import generar_mensaje_joi
-        cliente = Cliente.objects.filter(user=user).first()
-        if not cliente:
-            return None
-        return generar_mensaje_joi(cliente, 'apertura_manana')
+        from joi.services import _broker_alcanzable
+        if _broker_alcanzable():
+            from joi.tasks import generar_apertura_manana_usuario
+            generar_apertura_manana_usuario.apply_async(args=[user.id], retry=False)
     except Exception:
-        # Antes: cache.delete(lock_key) — liberaba el lock al instante pese a que
-        # el comentario decía "reintentar en 10 min". Si Anthropic está caído de
-        # forma sostenida, esto hacía que CADA request de CADA página de la app
-        # (joi_context es un context processor global) reintentara la llamada
-        # síncrona a Haiku. Ahora se deja el lock puesto — expira solo con su
-        # propio TTL de 600s, que es el cooldown real que el comentario pretendía.
-        return None
+        pass
+    return None
 
 
 def _get_mensaje_gym(user):
     """
     Mensaje sin leer más reciente de triggers NO-Hyrox (gym, apertura, resumen...).
     Excluye TRIGGERS_SOLO_HABITACION: esos mensajes solo se muestran en /joi/habitacion/.
-    Si no hay ninguno, intenta generar apertura_manana on-demand.
+    Si no hay ninguno, encola la apertura_manana on-demand (no la espera).
     """
     from joi.models import MensajeJOI
     # Triggers a excluir: hyrox_* y los de solo habitación sin prefijo hyrox_
@@ -105,16 +94,11 @@ def _get_mensaje_hyrox(user):
     )
 
 
-def joi_context(request):
-    if not request.user.is_authenticated:
-        return {}
-
-    user = request.user
+def _contexto_emocional(user):
+    """Estado, frase y recuerdo de JOI; cacheado 5 min (lo invalida generar_mensaje_joi)."""
     cache_key = f'joi_ctx_{user.id}'
     cached = cache.get(cache_key)
     if cached is not None:
-        cached['joi_mensaje_pendiente'] = _get_mensaje_gym(user)
-        cached['joi_mensaje_hyrox']     = _get_mensaje_hyrox(user)
         return cached
 
     estado_actual = (
@@ -138,6 +122,24 @@ def joi_context(request):
         'recuerdo':        recuerdo,
     }
     cache.set(cache_key, result, 300)
-    result['joi_mensaje_pendiente'] = _get_mensaje_gym(user)
-    result['joi_mensaje_hyrox']     = _get_mensaje_hyrox(user)
     return result
+
+
+def joi_context(request):
+    """
+    Context processor global. Todos los valores son perezosos: solo consultan
+    la BD (o la caché) si la plantilla los lee. Las páginas sin banner JOI no
+    pagan nada por este processor.
+    """
+    if not request.user.is_authenticated:
+        return {}
+
+    user = request.user
+    emocional = SimpleLazyObject(lambda: _contexto_emocional(user))
+    contexto = {
+        clave: SimpleLazyObject(lambda clave=clave: emocional[clave])
+        for clave in ('estado_joi', 'frase_forma_joi', 'frase_extra_joi', 'frase_recaida', 'recuerdo')
+    }
+    contexto['joi_mensaje_pendiente'] = SimpleLazyObject(lambda: _get_mensaje_gym(user))
+    contexto['joi_mensaje_hyrox']     = SimpleLazyObject(lambda: _get_mensaje_hyrox(user))
+    return contexto
@@ -0,0 +1,102 @@
+"""
+Cliente LLM compartido de JOI y ejecución concurrente acotada.
+
+Cada llamada creaba un `anthropic.Anthropic` nuevo (nuevo pool HTTP, nuevo
+handshake TLS) y el ciclo de síntesis llamaba al modelo cliente a cliente,
+en serie. Aquí:
+
+- `cliente()`: un único cliente por backend y API key, reutilizado por todas
+  las llamadas e hilos (el cliente de Anthropic es thread-safe).
+- `settings.JOI_LLM_BACKEND = 'falso'`: backend local sin red que imita la
+  respuesta de `messages.create` con una latencia configurable
+  (`JOI_LLM_FALSO_LATENCIA`, segundos); sirve para medir el ciclo offline
+  (comando `joi_benchmark_sintesis`).
+- `ejecutar_en_paralelo(funcion, entradas, concurrencia)`: aplica `funcion`
+  en un pool de hilos de tamaño acotado y devuelve resultados en orden; una
+  excepción (incluido un timeout) queda en su posición sin parar el resto.
+
+Las funciones que se ejecutan en el pool no deben tocar la BD: cada hilo
+abriría su propia conexión. El ciclo de síntesis reúne el contexto antes y
+guarda los mensajes después, en el hilo principal.
+"""
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from django.conf import settings
+
+_clientes = {}
+_lock = threading.Lock()
+
+
+class ClienteFalso:
+    """Imita `anthropic.Anthropic` lo justo para `messages.create`."""
+
+    def __init__(self, latencia=None, respuesta=None):
+        self._latencia = latencia
+        self.respuesta = respuesta
+        self.messages = self
+        self.llamadas = 0
+
+    @property
+    def latencia(self):
+        if self._latencia is not None:
+            return self._latencia
+        return float(getattr(settings, 'JOI_LLM_FALSO_LATENCIA', 0.0))
+
+    def create(self, *, model, max_tokens, messages, system=None, timeout=None, **kwargs):
+        with _lock:
+            self.llamadas += 1
+        latencia = self.latencia
+        if timeout is not None and latencia > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f'LLM falso: {latencia:.2f}s > timeout {timeout:.2f}s')
+        time.sleep(latencia)
+        prompt = messages[-1]['content']
+        texto = self.respuesta or (
+            f"Hoy hay algo que merece nombrarse ({hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]})."
+        )
+        return SimpleNamespace(content=[SimpleNamespace(text=texto[:max_tokens * 4])])
+
+
+def _crear(backend, api_key):
+    if backend == 'falso':
+        return ClienteFalso()
+    import anthropic
+    return anthropic.Anthropic(api_key=api_key)
+
+
+def cliente():
+    """Cliente LLM compartido para el backend y la API key configurados."""
+    clave = (getattr(settings, 'JOI_LLM_BACKEND', 'anthropic'), settings.ANTHROPIC_API_KEY)
+    actual = _clientes.get(clave)
+    if actual is None:
+        with _lock:
+            actual = _clientes.get(clave)
+            if actual is None:
+                actual = _clientes[clave] = _crear(*clave)
+    return actual
+
+
+def ejecutar_en_paralelo(funcion, entradas, concurrencia=None):
+    """
+    [funcion(e) for e in entradas] con como mucho `concurrencia` llamadas a la
+    vez. Cada posición es el resultado o la excepción que lanzó.
+    """
+    entradas = list(entradas)
+    if not entradas:
+        return []
+    concurrencia = concurrencia or getattr(settings, 'JOI_SINTESIS_CONCURRENCIA', 4)
+
+    def _seguro(entrada):
+        try:
+            return funcion(entrada)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrencia, len(entradas))),
+                            thread_name_prefix='joi-llm') as pool:
+        return list(pool.map(_seguro, entradas))
@@ -0,0 +1,65 @@
+# Script de benchmark — no es un test formal.
+# Mide la fase LLM del ciclo de síntesis JOI con el backend falso de
+# joi/llm.py (sin red, latencia fija por llamada): en serie, como antes, y en
+# el pool acotado de ciclo_sintesis_joi. Una fracción de llamadas lentas
+# comprueba que el timeout por llamada no frena el lote. No toca la BD.
+#
+# Uso:
+#   python3 manage.py joi_benchmark_sintesis
+#   python3 manage.py joi_benchmark_sintesis --clientes 40 --latencia 0.2 --concurrencia 2 4 8
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from joi.llm import ejecutar_en_paralelo
+
+
+class Command(BaseCommand):
+    help = 'Benchmark offline de la fase LLM de la síntesis JOI: serie vs pool acotado.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=24, help='Prompts por ciclo')
+        parser.add_argument('--latencia', type=float, default=0.1, help='Segundos por llamada del LLM falso')
+        parser.add_argument('--concurrencia', type=int, nargs='+', default=[1, 4, 8],
+                            help='Tamaños de pool a medir')
+        parser.add_argument('--timeout', type=float, default=None,
+                            help='Timeout por llamada (por defecto 3 x latencia)')
+
+    def handle(self, *args, **options):
+        from joi.services import _llamar_haiku_sintesis
+
+        n = options['clientes']
+        latencia = options['latencia']
+        timeout = options['timeout'] or latencia * 3
+        prompts = [f'Contexto sintético del cliente {i}.' for i in range(n)]
+
+        def llamar(prompt):
+            return _llamar_haiku_sintesis(prompt, timeout=timeout)
+
+        with override_settings(JOI_LLM_BACKEND='falso', JOI_LLM_FALSO_LATENCIA=latencia):
+            t0 = time.perf_counter()
+            serie = [llamar(p) for p in prompts]
+            t_serie = time.perf_counter() - t0
+            self.stdout.write(f"{n} síntesis, latencia {latencia * 1000:.0f} ms | serie: {t_serie:.2f} s")
+
+            for concurrencia in options['concurrencia']:
+                t0 = time.perf_counter()
+                resultados = ejecutar_en_paralelo(llamar, prompts, concurrencia=concurrencia)
+                t_pool = time.perf_counter() - t0
+                estado = 'ok' if resultados == serie else 'RESULTADOS DISTINTOS'
+                self.stdout.write(
+                    f"  pool {concurrencia:3d}: {t_pool:.2f} s | x{t_serie / max(t_pool, 1e-9):.1f} | {estado}"
+                )
+
+        # Llamadas lentas: superan el timeout y quedan aisladas como fallos
+        with override_settings(JOI_LLM_BACKEND='falso', JOI_LLM_FALSO_LATENCIA=timeout * 2):
+            t0 = time.perf_counter()
+            resultados = ejecutar_en_paralelo(llamar, prompts[:options['concurrencia'][-1]],
+                                              concurrencia=options['concurrencia'][-1])
+            fallos = sum(isinstance(r, Exception) for r in resultados)
+            self.stdout.write(
+                f"  lentas ({timeout * 2:.2f} s > timeout {timeout:.2f} s): "
+                f"{fallos}/{len(resultados)} fallidas en {time.perf_counter() - t0:.2f} s"
+            )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Contadores del memo de bloques de prompt JOI y de la caché de respuestas del LLM.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reiniciar', action='store_true',
+                            help='Pone los contadores a cero después de mostrarlos')
+
+    def handle(self, *args, **options):
+        from joi import memo_prompt
+
+        valores = memo_prompt.contadores()
+        for nombre in memo_prompt.CONTADORES:
+            self.stdout.write(f'  {nombre:<24} {valores[nombre]}')
+
+        bloques = valores['bloques_reconstruidos'] + valores['bloques_reutilizados']
+        respuestas = valores['respuestas_nuevas'] + valores['respuestas_reutilizadas']
+        self.stdout.write(self.style.SUCCESS(
+            f'\nBloques: {valores["bloques_reutilizados"]}/{bloques} reutilizados | '
+            f'Respuestas: {valores["respuestas_reutilizadas"]}/{respuestas} reutilizadas | '
+            f'{valores["tokens_ahorrados"]} tokens ahorrados'
+        ))
+
+        if options['reiniciar']:
+            memo_prompt.reiniciar_contadores()
@@ -0,0 +1,137 @@
+"""
+Memo de bloques de prompt JOI y caché de respuestas del LLM.
+
+generar_mensaje_joi reconstruía desde la BD el marco narrativo, el Manual
+de David, la NarrativaActiva y el contexto de continuidad en cada trigger,
+aunque varios triggers del mismo usuario llegan con minutos de diferencia
+(entreno guardado, PR, decision_plan). Aquí:
+
+- `por_usuario(nombre)`: decorador para bloques `f(user, ...)`. El
+  resultado se guarda en la caché de Django bajo una generación por usuario;
+  `invalidar(user_id)` la cambia (señales de ManualDavid, NarrativaActiva y
+  MensajeJOI en joi/signals.py). El guardado espera al commit: un bloque
+  leído dentro de una transacción que luego se deshace no se memoiza.
+  `settings.JOI_MEMO_BLOQUES_TTL` acota además lo que no se invalida por
+  señal (p. ej. las estaciones Hyrox que lee la continuidad).
+- `respuesta(peticion, llamar)`: caché opcional por contenido (hash de la
+  petición: modelo, max_tokens, system y prompt final) para no reenviar un
+  prompt idéntico. Activa con `settings.JOI_LLM_CACHE_RESPUESTAS`.
+- `contadores()`: reconstrucciones y aciertos de bloques, aciertos y fallos
+  de respuestas y tokens ahorrados (comando `joi_contadores_cache`).
+"""
+
+import functools
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CONTADORES = (
+    'bloques_reconstruidos',
+    'bloques_reutilizados',
+    'respuestas_reutilizadas',
+    'respuestas_nuevas',
+    'tokens_ahorrados',
+)
+
+_FALTA = object()
+
+
+def _contar(nombre, n=1):
+    clave = f'joi_memo_contador_{nombre}'
+    cache.add(clave, 0, None)
+    try:
+        cache.incr(clave, n)
+    except ValueError:
+        # Expulsada entre add e incr (LocMem con MAX_ENTRIES): se pierde la cuenta
+        pass
+
+
+def contadores() -> dict:
+    valores = cache.get_many([f'joi_memo_contador_{n}' for n in CONTADORES])
+    return {n: valores.get(f'joi_memo_contador_{n}', 0) for n in CONTADORES}
+
+
+def reiniciar_contadores() -> None:
+    cache.delete_many([f'joi_memo_contador_{n}' for n in CONTADORES])
+
+
+# ── Bloques por usuario ──────────────────────────────────────────────────────
+
+def _generacion(user_id) -> str:
+    clave = f'joi_memo_gen_{user_id}'
+    cache.add(clave, uuid.uuid4().hex, None)
+    return cache.get(clave) or ''
+
+
+def invalidar(user_id) -> None:
+    """Descarta los bloques memoizados del usuario, ahora y al hacer commit."""
+    clave = f'joi_memo_gen_{user_id}'
+    cache.delete(clave)
+    transaction.on_commit(lambda: cache.delete(clave))
+
+
+def memoizar(user_id, variante, construir):
+    """construir() memoizado para (usuario, variante); sin memo si no hay user_id entero."""
+    if not isinstance(user_id, int):
+        return construir()
+    clave = f'joi_memo_{user_id}_{_generacion(user_id)}_{variante}'
+    valor = cache.get(clave, _FALTA)
+    if valor is not _FALTA:
+        _contar('bloques_reutilizados')
+        return valor
+    valor = construir()
+    _contar('bloques_reconstruidos')
+    ttl = getattr(settings, 'JOI_MEMO_BLOQUES_TTL', 900)
+    transaction.on_commit(lambda: cache.set(clave, valor, ttl))
+    return valor
+
+
+def por_usuario(nombre):
+    """Decorador de memoizar() para bloques `f(user, *args, **kwargs)`."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(user, *args, **kwargs):
+            variante = f'{nombre}:{args!r}:{sorted(kwargs.items())!r}'
+            return memoizar(getattr(user, 'pk', None), variante, lambda: funcion(user, *args, **kwargs))
+        return envoltura
+    return decorador
+
+
+# ── Respuestas del LLM por contenido ─────────────────────────────────────────
+
+def huella_peticion(peticion) -> str:
+    contenido = '\x00'.join(str(p) for p in peticion)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def respuesta(peticion, llamar):
+    """
+    Texto de `llamar()` -> (texto, tokens), reutilizado si la misma petición
+    (modelo, max_tokens, system, prompt) ya se envió dentro del TTL y la
+    caché de respuestas está activa.
+    """
+    if not getattr(settings, 'JOI_LLM_CACHE_RESPUESTAS', False):
+        return llamar()[0]
+    clave = f'joi_llm_resp_{huella_peticion(peticion)}'
+    guardada = cache.get(clave)
+    if guardada is not None:
+        _contar('respuestas_reutilizadas')
+        _contar('tokens_ahorrados', guardada['tokens'])
+        return guardada['texto']
+    texto, tokens = llamar()
+    _contar('respuestas_nuevas')
+    if texto:
+        cache.set(clave, {'texto': texto, 'tokens': tokens},
+                  getattr(settings, 'JOI_LLM_CACHE_TTL', 6 * 3600))
+    return texto
+
+
+def tokens_usados(response, prompt: str, texto: str) -> int:
+    """Tokens de entrada + salida de la respuesta; estimación por longitud si no los trae."""
+    uso = getattr(response, 'usage', None)
+    if uso is not None:
+        return int(getattr(uso, 'input_tokens', 0) or 0) + int(getattr(uso, 'output_tokens', 0) or 0)
+    return (len(prompt) + len(texto)) // 4
@@ -6,10 +6,13 @@ import logging
 import random
 
 from clientes.utils import get_cliente_actual
+# Alias local: joi.context_processors y los tests lo usan como joi.services._broker_alcanzable
+from core.services.broker import broker_alcanzable as _broker_alcanzable
 from joi.context_builders.continuidad_context import (
     build_continuidad_context,
     _bloque_continuidad,
 )
+from joi import memo_prompt
 from joi.validador_semantico import validar_semantica_joi
 
 logger = logging.getLogger(__name__)
@@ -57,8 +60,8 @@ Frases de referencia para calibrar el tono:
 
 
 def _cliente_anthropic():
-    import anthropic
-    return anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+    from joi.llm import cliente
+    return cliente()
 
 
 _CIRILICO_LOOKALIKES = str.maketrans({
@@ -80,14 +83,21 @@ def _llamar_haiku(prompt: str, max_tokens: int = 120, _modulo: str = 'auto') ->
     import sys
     if 'test' in sys.argv or getattr(settings, 'JOI_DISABLE_API', False):
         return ''
-    client = _cliente_anthropic()
-    response = client.messages.create(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=max_tokens,
-        system=SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": prompt}],
-    )
-    texto = _limpiar_ciriilico(response.content[0].text.strip())
+
+    modelo = "claude-haiku-4-5-20251001"
+
+    def _llamar():
+        client = _cliente_anthropic()
+        response = client.messages.create(
+            model=modelo,
+            max_tokens=max_tokens,
+            system=SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        texto = _limpiar_ciriilico(response.content[0].text.strip())
+        return texto, memo_prompt.tokens_usados(response, prompt, texto)
+
+    texto = memo_prompt.respuesta((modelo, max_tokens, SYSTEM_PROMPT, prompt), _llamar)
     from joi.validador_semantico import validar_semantica_joi
     validar_semantica_joi(texto, modulo=_modulo)
     return texto
@@ -1633,7 +1643,10 @@ def generar_mensaje_joi(cliente, trigger: str, datos_extra: dict | None = None)
         ctx = construir_contexto(cliente)
         ctx_temporal = resolver_contexto_temporal(trigger)
         datos_extra = {**datos_extra, '_ctx_temporal': ctx_temporal}
-        continuidad_ctx = build_continuidad_context(cliente)
+        continuidad_ctx = memo_prompt.memoizar(
+            cliente.user_id, f'continuidad:{date.today().isoformat()}',
+            lambda: build_continuidad_context(cliente),
+        )
         bloque_cont = _bloque_continuidad(continuidad_ctx)
         bloque_fisico = ''
         if trigger in ('apertura_manana', 'decision_plan'):
@@ -1685,27 +1698,6 @@ def generar_mensaje_joi(cliente, trigger: str, datos_extra: dict | None = None)
         return None
 
 
-def _broker_alcanzable(timeout=0.3) -> bool:
-    """
-    Prueba acotada de si el broker de Celery responde antes de encolar una
-    tarea desde un request. Sin este check, .delay()/.apply_async() con Redis
-    caído reintentan varias veces con backoff propio (~6-19s observados en
-    pruebas) — bloquean el request igual que la llamada síncrona que se
-    quería evitar. Un connection-refused local es casi instantáneo; el
-    timeout de 0.3s solo cubre el caso de un host que no responde nada.
-    """
-    import socket
-    from urllib.parse import urlparse
-    from django.conf import settings
-
-    try:
-        parsed = urlparse(settings.CELERY_BROKER_URL)
-        with socket.create_connection((parsed.hostname, parsed.port or 6379), timeout=timeout):
-            return True
-    except OSError:
-        return False
-
-
 def generar_lectura_plan(cliente) -> "MensajeJOI | None":
     """
     Nunca genera de forma síncrona (evita una llamada a Haiku bloqueando un
@@ -1736,6 +1728,7 @@ def generar_lectura_plan(cliente) -> "MensajeJOI | None":
 
 # ── Manual de David ──────────────────────────────────────────────────────────
 
+@memo_prompt.por_usuario('manual')
 def _bloque_manual(user, incluir_narrativa=True) -> str:
     """
     Formatea las entradas activas del Manual de David para incluir en prompts.
@@ -1791,6 +1784,7 @@ def _bloque_manual(user, incluir_narrativa=True) -> str:
     return bloque + narrativa_bloque
 
 
+@memo_prompt.por_usuario('narrativa')
 def _bloque_narrativa(user) -> str:
     """
     Incluye la NarrativaActiva por capas en los prompts.
@@ -1829,6 +1823,7 @@ def _bloque_narrativa(user) -> str:
         return ''
 
 
+@memo_prompt.por_usuario('marco_narrativo')
 def _bloque_marco_narrativo(user) -> str:
     """
     Marco inicial del prompt: sitúa el evento dentro de la narrativa activa de JOI.
@@ -2092,7 +2087,28 @@ def _revision_antigua(ultima_revision, dias: int = 7) -> bool:
     return (ahora - ts).days >= dias
 
 
-def revisar_manual_david(cliente, *, as_of=None) -> dict:
+SISTEMA_REVISION_MANUAL = "Eres un sistema de revisión epistemológica. Responde solo en el formato indicado."
+
+
+def _llamar_haiku_formato(prompt: str, system: str, max_tokens: int,
+                          timeout: "float | None" = None) -> str:
+    """
+    Llamada con respuesta en formato estructurado (revisión del manual,
+    diálogos). No toca la BD: ciclo_sintesis_joi la ejecuta en un pool de hilos.
+    """
+    client = _cliente_anthropic()
+    extra = {'timeout': timeout} if timeout is not None else {}
+    response = client.messages.create(
+        model="claude-haiku-4-5-20251001",
+        max_tokens=max_tokens,
+        system=system,
+        messages=[{"role": "user", "content": prompt}],
+        **extra,
+    )
+    return _limpiar_ciriilico(response.content[0].text.strip())
+
+
+def revisar_manual_david(cliente, *, as_of=None, timeout=None) -> dict:
     """
     Motor de contradicción: revisa hipótesis y patrones activos del ManualDavid
     contra el contexto actual. Actualiza confianza y estado sin generar mensajes.
@@ -2103,9 +2119,28 @@ def revisar_manual_david(cliente, *, as_of=None) -> dict:
 
     Registra el motivo de cada cambio en `ManualDavid.notas_revision` para
     trazabilidad (formato LLM: ID|ACCION|MOTIVO_BREVE).
+
+    Compone preparar_revision_manual (BD), la llamada al LLM y
+    aplicar_revision_manual (BD); ciclo_sintesis_joi usa las tres fases por
+    separado para llamar al LLM en el pool de joi.llm.
     """
-    from joi.models import ManualDavid, NarrativaActiva
-    from django.utils import timezone
+    preparada = preparar_revision_manual(cliente, as_of=as_of)
+    if 'resultado' in preparada:
+        return preparada['resultado']
+    try:
+        texto = _llamar_haiku_formato(preparada['prompt'], SISTEMA_REVISION_MANUAL, 300, timeout=timeout)
+    except Exception as e:
+        texto = e
+    return aplicar_revision_manual(cliente, preparada, texto)
+
+
+def preparar_revision_manual(cliente, *, as_of=None) -> dict:
+    """
+    Fase de BD de revisar_manual_david: hipótesis con revisión vencida,
+    resumen del contexto y prompt. Si no hay nada que preguntar al LLM
+    devuelve {'resultado': ...} con el resultado final.
+    """
+    from joi.models import ManualDavid
 
     cutoff = as_of or timezone.localdate()
     if hasattr(cutoff, 'date') and not isinstance(cutoff, date):
@@ -2126,13 +2161,13 @@ def revisar_manual_david(cliente, *, as_of=None) -> dict:
         )
     )
     if not revisables:
-        return {'revisadas': 0, 'actualizadas': 0, 'cambio_significativo': False}
+        return {'resultado': {'revisadas': 0, 'actualizadas': 0, 'cambio_significativo': False}}
 
     try:
         ctx = construir_contexto(cliente)
     except Exception:
-        return {'revisadas': 0, 'actualizadas': 0, 'cambio_significativo': False,
-                'error': 'construir_contexto falló'}
+        return {'resultado': {'revisadas': 0, 'actualizadas': 0, 'cambio_significativo': False,
+                              'error': 'construir_contexto falló'}}
 
     resumen_ctx = []
     if ctx.get('acwr'):
@@ -2166,16 +2201,21 @@ def revisar_manual_david(cliente, *, as_of=None) -> dict:
         f"Solo el formato. Sin explicaciones adicionales."
     )
 
-    try:
-        client = _cliente_anthropic()
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=300,
-            system="Eres un sistema de revisión epistemológica. Responde solo en el formato indicado.",
-            messages=[{"role": "user", "content": prompt}],
-        )
-        texto = _limpiar_ciriilico(response.content[0].text.strip())
-    except Exception:
+    return {'cutoff': cutoff, 'revisables': revisables, 'resumen_ctx': resumen_ctx, 'prompt': prompt}
+
+
+def aplicar_revision_manual(cliente, preparada: dict, texto) -> dict:
+    """
+    Fase de escritura de revisar_manual_david: aplica la respuesta del LLM
+    (o la excepción con que falló) a las hipótesis preparadas.
+    """
+    from joi.models import NarrativaActiva
+    from django.utils import timezone
+
+    if 'resultado' in preparada:
+        return preparada['resultado']
+    revisables = preparada['revisables']
+    if isinstance(texto, Exception):
         return {'revisadas': len(revisables), 'actualizadas': 0, 'cambio_significativo': False,
                 'error': 'LLM falló'}
 
@@ -2196,7 +2236,7 @@ def revisar_manual_david(cliente, *, as_of=None) -> dict:
     actualizadas = 0
     confianza_antes_por_id = {e.id: e.confianza for e in revisables}
     hubo_estado_grave = False
-    hoy = cutoff
+    hoy = preparada['cutoff']
 
     for linea in texto.splitlines():
         linea = linea.strip()
@@ -2285,7 +2325,7 @@ def revisar_manual_david(cliente, *, as_of=None) -> dict:
         'delta_confianza_medio': round(delta_medio, 3),
         'max_delta_individual': round(max_delta_individual, 3),
         'cambios_detalle': cambios_detalle,
-        'evidencia_usada': resumen_ctx,
+        'evidencia_usada': preparada['resumen_ctx'],
     }
 
 
@@ -3148,14 +3188,19 @@ def _leer_diario_reciente(user, dias: int = 7) -> str:
     return '\n---\n'.join(fragmentos)
 
 
-def _llamar_haiku_sintesis(prompt: str) -> "str | None":
-    """Como _llamar_haiku pero devuelve None si el LLM elige [SILENCE]."""
+def _llamar_haiku_sintesis(prompt: str, timeout: "float | None" = None) -> "str | None":
+    """
+    Como _llamar_haiku pero devuelve None si el LLM elige [SILENCE].
+    No toca la BD: ciclo_sintesis_joi la ejecuta en un pool de hilos.
+    """
     client = _cliente_anthropic()
+    extra = {'timeout': timeout} if timeout is not None else {}
     response = client.messages.create(
         model="claude-haiku-4-5-20251001",
         max_tokens=200,
         system=SYSTEM_PROMPT,
         messages=[{"role": "user", "content": prompt}],
+        **extra,
     )
     texto = _limpiar_ciriilico(response.content[0].text.strip())
     if '[SILENCE]' in texto:
@@ -3355,52 +3400,70 @@ def _prompt_sintesis(ctx: dict, datos_extra: dict) -> str:
     return '\n'.join(lineas)
 
 
-def generar_sintesis_joi(cliente) -> "MensajeJOI | None":
+def preparar_sintesis_joi(cliente) -> dict:
     """
-    Ciclo autónomo de síntesis: JOI decide si tiene algo que decir.
-    Devuelve MensajeJOI creado, o None si JOI eligió [SILENCE].
+    Fase de contexto de la síntesis (solo BD, sin LLM).
+    Devuelve {'ctx', 'diario_texto', 'prompt'} para _llamar_haiku_sintesis
+    y guardar_sintesis_joi.
     """
+    ctx = construir_contexto(cliente)
+    vital = _sintetizador_contexto_vital(cliente.user)
+    diario_texto = _leer_diario_reciente(cliente.user)
+    datos_extra = {'diario_texto': diario_texto, 'vital': vital}
+
+    # La síntesis se genera tras la reflexión nocturna — siempre es noche.
+    ctx_temporal = resolver_contexto_temporal('sintesis_joi')
+    bloques = [
+        _bloque_marco_narrativo(cliente.user),
+        _bloque_memoria(ctx),
+        _bloque_manual(cliente.user),
+        _bloque_temporal(ctx_temporal),
+        _prompt_sintesis(ctx, datos_extra),
+    ]
+    return {
+        'ctx': ctx,
+        'diario_texto': diario_texto,
+        'prompt': "\n\n".join(b for b in bloques if b),
+    }
+
+
+def guardar_sintesis_joi(cliente, preparada: dict, texto: "str | None") -> "MensajeJOI | None":
+    """Fase de escritura: crea el MensajeJOI con la respuesta del LLM (None = [SILENCE])."""
     from joi.models import MensajeJOI
 
-    try:
-        ctx = construir_contexto(cliente)
-        vital = _sintetizador_contexto_vital(cliente.user)
-        diario_texto = _leer_diario_reciente(cliente.user)
-        datos_extra = {'diario_texto': diario_texto, 'vital': vital}
-
-        # La síntesis se genera tras la reflexión nocturna — siempre es noche.
-        ctx_temporal = resolver_contexto_temporal('sintesis_joi')
-        bloques = [
-            _bloque_marco_narrativo(cliente.user),
-            _bloque_memoria(ctx),
-            _bloque_manual(cliente.user),
-            _bloque_temporal(ctx_temporal),
-            _prompt_sintesis(ctx, datos_extra),
-        ]
-        prompt = "\n\n".join(b for b in bloques if b)
-        texto = _llamar_haiku_sintesis(prompt)
+    if texto is None:
+        logger.info(f"[JOI síntesis] {cliente.user.username} → [SILENCE]")
+        return None
 
-        if texto is None:
-            logger.info(f"[JOI síntesis] {cliente.user.username} → [SILENCE]")
-            return None
+    ctx = preparada['ctx']
+    diario_texto = preparada['diario_texto']
+    msg = MensajeJOI.objects.create(
+        user=cliente.user,
+        trigger='sintesis_joi',
+        mensaje=texto,
+        contexto={**ctx, 'diario_texto': diario_texto[:300] if diario_texto else ''},
+    )
+    from django.core.cache import cache
+    cache.delete(f'joi_ctx_{cliente.user_id}')
+    logger.info(f"[JOI síntesis] {cliente.user.username} → mensaje generado (id={msg.id})")
 
-        msg = MensajeJOI.objects.create(
-            user=cliente.user,
-            trigger='sintesis_joi',
-            mensaje=texto,
-            contexto={**ctx, 'diario_texto': diario_texto[:300] if diario_texto else ''},
-        )
-        from django.core.cache import cache
-        cache.delete(f'joi_ctx_{cliente.user_id}')
-        logger.info(f"[JOI síntesis] {cliente.user.username} → mensaje generado (id={msg.id})")
+    try:
+        generar_tema_abierto(cliente.user, msg)
+    except Exception:
+        pass
 
-        try:
-            generar_tema_abierto(cliente.user, msg)
-        except Exception:
-            pass
+    return msg
 
-        return msg
 
+def generar_sintesis_joi(cliente) -> "MensajeJOI | None":
+    """
+    Ciclo autónomo de síntesis: JOI decide si tiene algo que decir.
+    Devuelve MensajeJOI creado, o None si JOI eligió [SILENCE].
+    """
+    try:
+        preparada = preparar_sintesis_joi(cliente)
+        texto = _llamar_haiku_sintesis(preparada['prompt'])
+        return guardar_sintesis_joi(cliente, preparada, texto)
     except Exception as e:
         logger.error(f"[JOI] generar_sintesis_joi falló: {e}", exc_info=True)
         return None
@@ -3714,7 +3777,10 @@ def enriquecer_cierre(texto: str, personas_detectadas: list, *, strict=False) ->
 MIN_HORAS_RESPUESTA_DIALOGO = 4  # propiedad semántica, no solo técnica
 
 
-def procesar_dialogo_narrativa(cliente) -> dict:
+SISTEMA_DIALOGO_NARRATIVA = "Eres un sistema de procesamiento epistemológico. Responde solo en el formato indicado."
+
+
+def procesar_dialogo_narrativa(cliente, timeout=None) -> dict:
     """
     Procesa los DialogoNarrativa pendientes del usuario que tengan ≥4h de antigüedad.
 
@@ -3727,135 +3793,147 @@ def procesar_dialogo_narrativa(cliente) -> dict:
 
     La respuesta no es obligatoria. El diálogo siempre afecta interpretación;
     no siempre produce respuesta visible.
+
+    Compone preparar_dialogos_narrativa, la llamada al LLM y
+    aplicar_dialogo_narrativa; ciclo_sintesis_joi usa las fases por separado.
     """
-    from joi.models import DialogoNarrativa, NarrativaActiva, MensajeJOI
-    from joi.validador_semantico import validar_semantica_joi
-    from django.utils import timezone
+    procesados = 0
+    respuestas_generadas = 0
+    for dialogo, prompt in preparar_dialogos_narrativa(cliente):
+        try:
+            texto = _llamar_haiku_formato(prompt, SISTEMA_DIALOGO_NARRATIVA, 200, timeout=timeout)
+        except Exception as e:
+            texto = e
+        respondido = aplicar_dialogo_narrativa(cliente, dialogo, texto)
+        if respondido is not None:
+            procesados += 1
+            respuestas_generadas += int(respondido)
 
-    ahora = timezone.now()
-    umbral = ahora - timedelta(hours=MIN_HORAS_RESPUESTA_DIALOGO)
+    return {'procesados': procesados, 'respuestas_generadas': respuestas_generadas}
 
-    pendientes = list(
-        DialogoNarrativa.objects.filter(
-            user=cliente.user,
-            procesado=False,
-            creado_en__lte=umbral,
-        ).select_related('narrativa')
-    )
-    if not pendientes:
-        return {'procesados': 0, 'respuestas_generadas': 0}
 
-    procesados = 0
-    respuestas_generadas = 0
+def preparar_dialogos_narrativa(cliente) -> list:
+    """Fase de BD: [(dialogo, prompt)] de los diálogos pendientes con ≥4h."""
+    from joi.models import DialogoNarrativa
+    from django.utils import timezone
 
-    for dialogo in pendientes:
+    umbral = timezone.now() - timedelta(hours=MIN_HORAS_RESPUESTA_DIALOGO)
+    preparados = []
+    for dialogo in DialogoNarrativa.objects.filter(
+        user=cliente.user,
+        procesado=False,
+        creado_en__lte=umbral,
+    ).select_related('narrativa'):
         narrativa = dialogo.narrativa
-        try:
-            partes_narrativa = []
-            if narrativa.capa_larga:
-                partes_narrativa.append(f"Patrón profundo: {narrativa.capa_larga}")
-            if narrativa.capa_media:
-                partes_narrativa.append(f"Esta fase: {narrativa.capa_media}")
-            if narrativa.capa_corta:
-                partes_narrativa.append(f"Ahora mismo: {narrativa.capa_corta}")
-
-            narrativa_txt = '\n'.join(partes_narrativa) or "Sin narrativa activa aún."
-
-            prompt = (
-                f"El usuario respondió a una interpretación de JOI:\n"
-                f"\"{dialogo.texto_usuario}\"\n\n"
-                f"Interpretación actual de JOI:\n{narrativa_txt}\n\n"
-                f"Analiza el diálogo y responde SOLO en este formato (una clave por línea):\n"
-                f"TIPOS: [lista separada por comas de: matiz, contradiccion, actualizacion, desfase_temporal, ampliacion]\n"
-                f"CAPA: [corto|medio|largo|general]\n"
-                f"DELTA: [número entre -0.30 y +0.10, negativo si cuestiona la interpretación]\n"
-                f"RESPONDER: [SÍ|NO]\n"
-                f"RESPUESTA: [1-2 frases en voz de JOI si RESPONDER=SÍ, vacío si NO]\n\n"
-                f"Criterio para RESPONDER=SÍ: responde si el diálogo cambia algo real en tu lectura "
-                f"(corrección, desfase temporal, contradicción) o si hay una observación que valga "
-                f"la pena devolver para que el usuario sienta que fue escuchado. "
-                f"NO respondas si el diálogo solo confirma lo que ya sabías."
-            )
+        partes_narrativa = []
+        if narrativa.capa_larga:
+            partes_narrativa.append(f"Patrón profundo: {narrativa.capa_larga}")
+        if narrativa.capa_media:
+            partes_narrativa.append(f"Esta fase: {narrativa.capa_media}")
+        if narrativa.capa_corta:
+            partes_narrativa.append(f"Ahora mismo: {narrativa.capa_corta}")
 
-            client = _cliente_anthropic()
-            response = client.messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=200,
-                system="Eres un sistema de procesamiento epistemológico. Responde solo en el formato indicado.",
-                messages=[{"role": "user", "content": prompt}],
-            )
-            texto = _limpiar_ciriilico(response.content[0].text.strip())
-        except Exception as e:
-            logger.warning(f"[JOI] procesar_dialogo_narrativa LLM falló: {e}")
-            continue
+        narrativa_txt = '\n'.join(partes_narrativa) or "Sin narrativa activa aún."
 
-        # Parsear respuesta
-        tipos = []
-        capa = 'general'
-        delta = 0.0
-        responder = False
-        respuesta_txt = ''
+        prompt = (
+            f"El usuario respondió a una interpretación de JOI:\n"
+            f"\"{dialogo.texto_usuario}\"\n\n"
+            f"Interpretación actual de JOI:\n{narrativa_txt}\n\n"
+            f"Analiza el diálogo y responde SOLO en este formato (una clave por línea):\n"
+            f"TIPOS: [lista separada por comas de: matiz, contradiccion, actualizacion, desfase_temporal, ampliacion]\n"
+            f"CAPA: [corto|medio|largo|general]\n"
+            f"DELTA: [número entre -0.30 y +0.10, negativo si cuestiona la interpretación]\n"
+            f"RESPONDER: [SÍ|NO]\n"
+            f"RESPUESTA: [1-2 frases en voz de JOI si RESPONDER=SÍ, vacío si NO]\n\n"
+            f"Criterio para RESPONDER=SÍ: responde si el diálogo cambia algo real en tu lectura "
+            f"(corrección, desfase temporal, contradicción) o si hay una observación que valga "
+            f"la pena devolver para que el usuario sienta que fue escuchado. "
+            f"NO respondas si el diálogo solo confirma lo que ya sabías."
+        )
+        preparados.append((dialogo, prompt))
+    return preparados
 
-        for linea in texto.splitlines():
-            linea = linea.strip()
-            if linea.startswith('TIPOS:'):
-                raw = linea[6:].strip()
-                tipos = [t.strip() for t in raw.split(',') if t.strip()]
-            elif linea.startswith('CAPA:'):
-                capa = linea[5:].strip().lower()
-                if capa not in ('corto', 'medio', 'largo', 'general'):
-                    capa = 'general'
-            elif linea.startswith('DELTA:'):
-                try:
-                    delta = max(-0.30, min(0.10, float(linea[6:].strip())))
-                except ValueError:
-                    delta = 0.0
-            elif linea.startswith('RESPONDER:'):
-                responder = linea[10:].strip().upper() == 'SÍ'
-            elif linea.startswith('RESPUESTA:'):
-                respuesta_txt = linea[10:].strip()
-
-        # Actualizar diálogo
-        dialogo.tipos_detectados = tipos
-        dialogo.capa_afectada = capa
-        dialogo.delta_confianza_calculado = delta
-        dialogo.procesado = True
-        dialogo.procesado_en = ahora
-        dialogo.save(update_fields=[
-            'tipos_detectados', 'capa_afectada', 'delta_confianza_calculado',
-            'procesado', 'procesado_en',
-        ])
 
-        # Aplicar delta a confianza de narrativa
-        if delta != 0.0:
-            nueva_conf = max(0.1, min(0.95, narrativa.confianza + delta))
-            narrativa.confianza = nueva_conf
-            narrativa.save(update_fields=['confianza'])
+def aplicar_dialogo_narrativa(cliente, dialogo, texto) -> "bool | None":
+    """
+    Fase de escritura de un diálogo con la respuesta del LLM. Devuelve None
+    si el LLM falló (`texto` es la excepción; el diálogo sigue pendiente) y
+    si no, si se generó una respuesta visible.
+    """
+    from joi.models import MensajeJOI
+    from joi.validador_semantico import validar_semantica_joi
+    from django.utils import timezone
+
+    if isinstance(texto, Exception):
+        logger.warning(f"[JOI] procesar_dialogo_narrativa LLM falló: {texto}")
+        return None
+    narrativa = dialogo.narrativa
 
-        procesados += 1
+    # Parsear respuesta
+    tipos = []
+    capa = 'general'
+    delta = 0.0
+    responder = False
+    respuesta_txt = ''
 
-        # Generar respuesta visible si procede
-        if responder and respuesta_txt:
-            respuesta_txt = _limpiar_ciriilico(respuesta_txt)
-            validar_semantica_joi(respuesta_txt, modulo='diario')
+    for linea in texto.splitlines():
+        linea = linea.strip()
+        if linea.startswith('TIPOS:'):
+            raw = linea[6:].strip()
+            tipos = [t.strip() for t in raw.split(',') if t.strip()]
+        elif linea.startswith('CAPA:'):
+            capa = linea[5:].strip().lower()
+            if capa not in ('corto', 'medio', 'largo', 'general'):
+                capa = 'general'
+        elif linea.startswith('DELTA:'):
             try:
-                MensajeJOI.objects.create(
-                    user=cliente.user,
-                    trigger='dialogo_respondido',
-                    mensaje=respuesta_txt,
-                    contexto={
-                        'capa_afectada': capa,
-                        'tipos': tipos,
-                        'delta': delta,
-                    },
-                )
-                from django.core.cache import cache
-                cache.delete(f'joi_ctx_{cliente.user_id}')
-                respuestas_generadas += 1
-            except Exception as e:
-                logger.warning(f"[JOI] procesar_dialogo_narrativa MensajeJOI falló: {e}")
+                delta = max(-0.30, min(0.10, float(linea[6:].strip())))
+            except ValueError:
+                delta = 0.0
+        elif linea.startswith('RESPONDER:'):
+            responder = linea[10:].strip().upper() == 'SÍ'
+        elif linea.startswith('RESPUESTA:'):
+            respuesta_txt = linea[10:].strip()
+
+    # Actualizar diálogo
+    dialogo.tipos_detectados = tipos
+    dialogo.capa_afectada = capa
+    dialogo.delta_confianza_calculado = delta
+    dialogo.procesado = True
+    dialogo.procesado_en = timezone.now()
+    dialogo.save(update_fields=[
+        'tipos_detectados', 'capa_afectada', 'delta_confianza_calculado',
+        'procesado', 'procesado_en',
+    ])
+
+    # Aplicar delta a confianza de narrativa
+    if delta != 0.0:
+        nueva_conf = max(0.1, min(0.95, narrativa.confianza + delta))
+        narrativa.confianza = nueva_conf
+        narrativa.save(update_fields=['confianza'])
+
+    # Generar respuesta visible si procede
+    if responder and respuesta_txt:
+        respuesta_txt = _limpiar_ciriilico(respuesta_txt)
+        validar_semantica_joi(respuesta_txt, modulo='diario')
+        try:
+            MensajeJOI.objects.create(
+                user=cliente.user,
+                trigger='dialogo_respondido',
+                mensaje=respuesta_txt,
+                contexto={
+                    'capa_afectada': capa,
+                    'tipos': tipos,
+                    'delta': delta,
+                },
+            )
+            from django.core.cache import cache
+            cache.delete(f'joi_ctx_{cliente.user_id}')
+            return True
+        except Exception as e:
+            logger.warning(f"[JOI] procesar_dialogo_narrativa MensajeJOI falló: {e}")
 
-    return {'procesados': procesados, 'respuestas_generadas': respuestas_generadas}
+    return False
 
 
 # ── Narrativa de bloque ──────────────────────────────────────────────────────
@@ -4005,7 +4083,7 @@ def generar_narrativa_bloque(cliente, fase_cliente) -> "MensajeJOI | None":
 # Determina en qué postura está JOI según señales reales del organismo
 # ────────────────────────────────────────────────────────────────────────────
 
-def determinar_estado_habitacion_joi(usuario):
+def determinar_estado_habitacion_joi(usuario, contexto=None):
     """
     Determina el estado interno de JOI en la Habitación según señales reales.
 
@@ -4023,6 +4101,8 @@ def determinar_estado_habitacion_joi(usuario):
 
     Args:
         usuario: Django User object
+        contexto: ContextoCliente del usuario (opcional); objetivo, lesiones,
+            entreno y bitácora de hoy salen de él en vez de consultarse
 
     Returns:
         tuple: (estado, motivo)
@@ -4035,6 +4115,8 @@ def determinar_estado_habitacion_joi(usuario):
         from joi.models import MensajeJOI, NarrativaActiva
 
         today = timezone.now().date()
+        if contexto is not None and contexto.cliente.user_id != usuario.id:
+            contexto = None
 
         # ─ PRIORIDAD 1: PROTEGIENDO ─────────────────────────────────────────
         # Si el cuerpo está en protección, JOI baja el tono
@@ -4042,7 +4124,10 @@ def determinar_estado_habitacion_joi(usuario):
         # Check 1: Pulso Hyrox PROTEGIENDO (calcula readiness + señales)
         try:
             from hyrox.pulso_service import PulsoService
-            hyrox_obj = HyroxObjective.objects.filter(cliente__user=usuario).order_by('-id').first()
+            if contexto is not None:
+                hyrox_obj = contexto.ultimo_objetivo_hyrox
+            else:
+                hyrox_obj = HyroxObjective.objects.filter(cliente__user=usuario).order_by('-id').first()
             if not hyrox_obj:
                 raise HyroxObjective.DoesNotExist
 
@@ -4053,10 +4138,13 @@ def determinar_estado_habitacion_joi(usuario):
             readiness_log = hyrox_obj.readiness_logs.filter(fecha__gte=cutoff).order_by('-fecha').first()
             readiness_score = readiness_log.score if readiness_log else 50
 
-            lesion_activa = UserInjury.objects.filter(
-                cliente=hyrox_obj.cliente,
-                fase__in=['AGUDA', 'SUB_AGUDA']
-            ).first()
+            if contexto is not None:
+                lesion_activa = next(iter(contexto.lesiones_en_fase('AGUDA', 'SUB_AGUDA')), None)
+            else:
+                lesion_activa = UserInjury.objects.filter(
+                    cliente=hyrox_obj.cliente,
+                    fase__in=['AGUDA', 'SUB_AGUDA']
+                ).first()
 
             pulso_data = PulsoService.determinar_pulso(
                 objetivo=hyrox_obj,
@@ -4087,10 +4175,13 @@ def determinar_estado_habitacion_joi(usuario):
 
             # 2b. Check Gym RPE (más sensible: >= 8)
             from entrenos.models import EntrenoRealizado
-            ultima_sesion_gym = EntrenoRealizado.objects.filter(
-                cliente__user=usuario,
-                fecha=today
-            ).select_related('sesion_detalle').order_by('-id').first()
+            if contexto is not None and today == contexto.hoy:
+                ultima_sesion_gym = contexto.entreno_hoy
+            else:
+                ultima_sesion_gym = EntrenoRealizado.objects.filter(
+                    cliente__user=usuario,
+                    fecha=today
+                ).select_related('sesion_detalle').order_by('-id').first()
 
             if ultima_sesion_gym and ultima_sesion_gym.sesion_detalle:
                 rpe_gym = ultima_sesion_gym.sesion_detalle.rpe_medio
@@ -4102,10 +4193,13 @@ def determinar_estado_habitacion_joi(usuario):
 
         # Check 3: Lesión activa (AGUDA/SUB_AGUDA)
         try:
-            lesion_activa = UserInjury.objects.filter(
-                cliente__user=usuario,
-                fase__in=['AGUDA', 'SUB_AGUDA']
-            ).exists()
+            if contexto is not None:
+                lesion_activa = bool(contexto.lesiones_en_fase('AGUDA', 'SUB_AGUDA'))
+            else:
+                lesion_activa = UserInjury.objects.filter(
+                    cliente__user=usuario,
+                    fase__in=['AGUDA', 'SUB_AGUDA']
+                ).exists()
 
             if lesion_activa:
                 logger.info(f"[JOI Estado] {usuario.username}: PROTEGIENDO (Lesión activa)")
@@ -4151,10 +4245,13 @@ def determinar_estado_habitacion_joi(usuario):
 
             # Signal 1: Diario hoy sin narrativa activa ni mensaje JOI
             # (La entrada en diario significa que hay reflexión, pero sin narrativa formada)
-            diario_hoy = BitacoraDiaria.objects.filter(
-                cliente__user=usuario,
-                fecha=today
-            ).exists()
+            if contexto is not None:
+                diario_hoy = contexto.bitacora_del_dia(today) is not None
+            else:
+                diario_hoy = BitacoraDiaria.objects.filter(
+                    cliente__user=usuario,
+                    fecha=today
+                ).exists()
 
             if diario_hoy:
                 logger.info(f"[JOI Estado] {usuario.username}: OBSERVANDO (Diario hoy)")
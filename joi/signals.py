@@ -2,11 +2,14 @@
 JOI reactivity signals: invalidate JOI estado when external events occur
 (gym sessions with high RPE, lesion reports, etc.)
 """
+from django.conf import settings
 from django.db.models.signals import post_delete, post_save
 from django.db import transaction
 from django.dispatch import receiver
 from django.core.cache import cache as _cache
 
+from entrenos.services import pipeline_entreno
+
 
 @receiver(post_save, sender='diario.ReflexionLibre')
 @receiver(post_delete, sender='diario.ReflexionLibre')
@@ -16,7 +19,7 @@ def invalidar_contexto_joi_por_reflexion(sender, instance, **kwargs):
     transaction.on_commit(lambda: _cache.delete(f'joi_ctx_{usuario_id}'))
 
 
-@receiver(post_save, sender='entrenos.EntrenoRealizado')
+@pipeline_entreno.handler
 def invalidar_joi_por_sesion_alta_rpe(sender, instance, created, **kwargs):
     """
     Cuando se guarda una sesión de gym con RPE alto (>= 8),
@@ -57,3 +60,24 @@ def invalidar_joi_por_lesion(sender, instance, created, **kwargs):
             _cache.delete(cache_key)
     except Exception:
         pass
+
+
+@receiver(post_save, sender='joi.ManualDavid')
+@receiver(post_delete, sender='joi.ManualDavid')
+@receiver(post_save, sender='joi.NarrativaActiva')
+@receiver(post_delete, sender='joi.NarrativaActiva')
+@receiver(post_save, sender='joi.MensajeJOI')
+@receiver(post_delete, sender='joi.MensajeJOI')
+def invalidar_bloques_prompt_joi(sender, instance, **kwargs):
+    """Los bloques de prompt memoizados (joi/memo_prompt.py) dependen de estos modelos."""
+    from joi import memo_prompt
+    memo_prompt.invalidar(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidar_bloques_prompt_joi_usuario(sender, instance, created=False, **kwargs):
+    """Un id de usuario reutilizado no debe heredar bloques memoizados de otro."""
+    if created or kwargs.get('signal') is post_delete:
+        from joi import memo_prompt
+        memo_prompt.invalidar(instance.pk)
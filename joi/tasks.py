@@ -97,6 +97,32 @@ def generar_apertura_manana(self):
     return {'generados': generados, 'errores': errores, 'fecha': str(hoy)}
 
 
+@shared_task
+def generar_apertura_manana_usuario(user_id):
+    """
+    Apertura matutina on-demand de un usuario, encolada desde
+    joi.context_processors._apertura_on_demand cuando abre la app antes de
+    que la haya generado generar_apertura_manana. Sustituye a la llamada
+    síncrona a Haiku que se hacía dentro del render de la página.
+    """
+    from datetime import date
+    from clientes.models import Cliente
+    from joi.models import MensajeJOI
+    from joi.services import generar_mensaje_joi
+
+    ya_existe = MensajeJOI.objects.filter(
+        user_id=user_id, trigger='apertura_manana', creado_en__date=date.today(),
+    ).exists()
+    if ya_existe:
+        return None
+
+    cliente = Cliente.objects.filter(user_id=user_id).first()
+    if not cliente:
+        return None
+    mensaje = generar_mensaje_joi(cliente, 'apertura_manana')
+    return mensaje.pk if mensaje else None
+
+
 @shared_task(bind=True, max_retries=2)
 def verificar_cuenta_regresiva_hyrox(self):
     """
@@ -263,15 +289,29 @@ def ciclo_sintesis_joi(self):
     - Trigger 3: entrada de diario nueva desde el último mensaje
     - Si trigger activo: LLM recibe contexto completo y decide hablar o [SILENCE]
 
+    Diálogos, revisión y generación van cada uno en tres fases, para todos los
+    clientes: contexto y prompts (BD, en serie), llamadas al LLM en un pool
+    acotado (settings.JOI_SINTESIS_CONCURRENCIA, cliente compartido de
+    joi.llm, timeout por llamada JOI_SINTESIS_TIMEOUT) y escritura (BD, en
+    serie). Una llamada lenta o fallida no bloquea al resto: en la
+    generación cuenta como 'fallidos'; un diálogo queda pendiente y una
+    revisión sin respuesta no cambia el manual.
+
     Programar via Celery Beat cada 4 horas.
     """
+    from django.conf import settings
+
     from clientes.models import Cliente
+    from joi.llm import ejecutar_en_paralelo
     from joi.models import MensajeJOI, NarrativaActiva
-    from joi.services import (generar_sintesis_joi, revisar_manual_david,
-                               registrar_sintesis_log,
+    from joi.services import (preparar_sintesis_joi, guardar_sintesis_joi,
+                               _llamar_haiku_sintesis, _llamar_haiku_formato,
+                               preparar_revision_manual, aplicar_revision_manual,
+                               SISTEMA_REVISION_MANUAL, registrar_sintesis_log,
                                _hay_contexto_para_revision, _revision_antigua,
                                _actualizar_narrativa_activa, construir_contexto,
-                               procesar_dialogo_narrativa)
+                               preparar_dialogos_narrativa, aplicar_dialogo_narrativa,
+                               SISTEMA_DIALOGO_NARRATIVA)
     from entrenos.models import ActividadRealizada
 
     ahora = datetime.datetime.now()
@@ -280,85 +320,109 @@ def ciclo_sintesis_joi(self):
     saltados = 0
     revisiones = 0
     dialogos_procesados = 0
+    fallidos = 0
+    pendientes = []  # (cliente, síntesis preparada)
 
-    for cliente in Cliente.objects.select_related('user').all():
+    timeout = getattr(settings, 'JOI_SINTESIS_TIMEOUT', 30)
+    concurrencia = getattr(settings, 'JOI_SINTESIS_CONCURRENCIA', 4)
+    clientes = list(Cliente.objects.select_related('user').all())
+
+    def _capas(user):
         try:
-            # ── DIÁLOGOS PENDIENTES: procesar antes que revisión ─────────────
+            n = NarrativaActiva.objects.get(user=user)
+        except NarrativaActiva.DoesNotExist:
+            return {}
+        return {
+            'capa_corta': n.capa_corta or '',
+            'capa_media': n.capa_media or '',
+            'capa_larga': n.capa_larga or '',
+        }
+
+    # ── DIÁLOGOS PENDIENTES: procesar antes que revisión ─────────────────
+    dialogos = []  # (cliente, dialogo, prompt)
+    for cliente in clientes:
+        try:
+            dialogos += [(cliente, d, prompt) for d, prompt in preparar_dialogos_narrativa(cliente)]
+        except Exception:
+            pass
+    textos = ejecutar_en_paralelo(
+        lambda d: _llamar_haiku_formato(d[2], SISTEMA_DIALOGO_NARRATIVA, 200, timeout=timeout),
+        dialogos, concurrencia=concurrencia,
+    )
+    for (cliente, dialogo, _), texto in zip(dialogos, textos):
+        try:
+            if aplicar_dialogo_narrativa(cliente, dialogo, texto) is not None:
+                dialogos_procesados += 1
+        except Exception:
+            pass
+
+    # ── MODO REVISIÓN: solo si hay contexto nuevo o revisión antigua ──────
+    por_revisar = []  # (cliente, revisión preparada, narrativa_existia, capas_antes)
+    for cliente in clientes:
+        try:
+            ultima_revision = None
             try:
-                resultado_dialogos = procesar_dialogo_narrativa(cliente)
-                dialogos_procesados += resultado_dialogos.get('procesados', 0)
-            except Exception:
+                narrativa = NarrativaActiva.objects.get(user=cliente.user)
+                ultima_revision = narrativa.ultima_revision_manual
+            except NarrativaActiva.DoesNotExist:
                 pass
 
-            # ── MODO REVISIÓN: solo si hay contexto nuevo o revisión antigua ──
-            try:
-                ultima_revision = None
+            debe_revisar = (
+                _revision_antigua(ultima_revision, dias=7)
+                or _hay_contexto_para_revision(cliente, ultima_revision)
+            )
+
+            if debe_revisar:
+                narrativa_existia = NarrativaActiva.objects.filter(
+                    user=cliente.user
+                ).exists()
+                capas_antes = _capas(cliente.user)
+                por_revisar.append((
+                    cliente, preparar_revision_manual(cliente), narrativa_existia, capas_antes,
+                ))
+        except Exception:
+            pass
+    textos = ejecutar_en_paralelo(
+        lambda r: (
+            _llamar_haiku_formato(r[1]['prompt'], SISTEMA_REVISION_MANUAL, 300, timeout=timeout)
+            if 'prompt' in r[1] else None
+        ),
+        por_revisar, concurrencia=concurrencia,
+    )
+    for (cliente, preparada, narrativa_existia, capas_antes), texto in zip(por_revisar, textos):
+        try:
+            resultado_revision = aplicar_revision_manual(cliente, preparada, texto)
+            revisiones += 1
+
+            narrativa_existe = NarrativaActiva.objects.filter(
+                user=cliente.user
+            ).exists()
+            if resultado_revision.get('cambio_significativo') or not narrativa_existe:
                 try:
-                    narrativa = NarrativaActiva.objects.get(user=cliente.user)
-                    ultima_revision = narrativa.ultima_revision_manual
-                except NarrativaActiva.DoesNotExist:
+                    ctx = construir_contexto(cliente)
+                    _actualizar_narrativa_activa(
+                        cliente, ctx,
+                        cambio_significativo=True,
+                    )
+                except Exception:
                     pass
 
-                debe_revisar = (
-                    _revision_antigua(ultima_revision, dias=7)
-                    or _hay_contexto_para_revision(cliente, ultima_revision)
+            try:
+                registrar_sintesis_log(
+                    cliente=cliente,
+                    tipo='auto',
+                    resultado_revision=resultado_revision,
+                    narrativa_existia=narrativa_existia,
+                    capas_antes=capas_antes,
+                    capas_despues=_capas(cliente.user),
                 )
-
-                if debe_revisar:
-                    narrativa_existia = NarrativaActiva.objects.filter(
-                        user=cliente.user
-                    ).exists()
-                    capas_antes = {}
-                    try:
-                        n = NarrativaActiva.objects.get(user=cliente.user)
-                        capas_antes = {
-                            'capa_corta': n.capa_corta or '',
-                            'capa_media': n.capa_media or '',
-                            'capa_larga': n.capa_larga or '',
-                        }
-                    except NarrativaActiva.DoesNotExist:
-                        pass
-
-                    resultado_revision = revisar_manual_david(cliente)
-                    revisiones += 1
-
-                    narrativa_existe = NarrativaActiva.objects.filter(
-                        user=cliente.user
-                    ).exists()
-                    if resultado_revision.get('cambio_significativo') or not narrativa_existe:
-                        try:
-                            ctx = construir_contexto(cliente)
-                            _actualizar_narrativa_activa(
-                                cliente, ctx,
-                                cambio_significativo=True,
-                            )
-                        except Exception:
-                            pass
-
-                    try:
-                        n = NarrativaActiva.objects.get(user=cliente.user)
-                        capas_despues = {
-                            'capa_corta': n.capa_corta or '',
-                            'capa_media': n.capa_media or '',
-                            'capa_larga': n.capa_larga or '',
-                        }
-                    except NarrativaActiva.DoesNotExist:
-                        capas_despues = {}
-
-                    try:
-                        registrar_sintesis_log(
-                            cliente=cliente,
-                            tipo='auto',
-                            resultado_revision=resultado_revision,
-                            narrativa_existia=narrativa_existia,
-                            capas_antes=capas_antes,
-                            capas_despues=capas_despues,
-                        )
-                    except Exception:
-                        pass
             except Exception:
                 pass
+        except Exception:
+            pass
 
+    for cliente in clientes:
+        try:
             ultimo_msg = (
                 MensajeJOI.objects
                 .filter(user=cliente.user)
@@ -416,22 +480,44 @@ def ciclo_sintesis_joi(self):
                 saltados += 1
                 continue
 
-            # ── MODO GENERACIÓN: LLM decide hablar o [SILENCE] ────────────
-            resultado = generar_sintesis_joi(cliente)
-            if resultado:
-                generados += 1
-            else:
-                silenciados += 1
+            # ── MODO GENERACIÓN: contexto ahora, LLM después en lote ──────
+            try:
+                pendientes.append((cliente, preparar_sintesis_joi(cliente)))
+            except Exception as e:
+                logger.error(f"[JOI] contexto de síntesis de {cliente.user.username} falló: {e}")
+                fallidos += 1
 
         except Exception:
             pass
 
+    # ── LLM: decide hablar o [SILENCE], como mucho N llamadas a la vez ──
+    respuestas = ejecutar_en_paralelo(
+        lambda preparada: _llamar_haiku_sintesis(preparada['prompt'], timeout=timeout),
+        [preparada for _, preparada in pendientes],
+        concurrencia=concurrencia,
+    )
+
+    for (cliente, preparada), texto in zip(pendientes, respuestas):
+        if isinstance(texto, Exception):
+            logger.error(f"[JOI] síntesis de {cliente.user.username} falló: {texto}")
+            fallidos += 1
+            continue
+        try:
+            if guardar_sintesis_joi(cliente, preparada, texto):
+                generados += 1
+            else:
+                silenciados += 1
+        except Exception as e:
+            logger.error(f"[JOI] guardar síntesis de {cliente.user.username} falló: {e}")
+            fallidos += 1
+
     return {
         'generados':            generados,
         'silenciados':          silenciados,
         'saltados':             saltados,
         'revisiones':           revisiones,
         'dialogos_procesados':  dialogos_procesados,
+        'fallidos':             fallidos,
         'fecha':                str(ahora.date()),
     }
 
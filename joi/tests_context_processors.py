@@ -0,0 +1,99 @@
+"""
+Context processors globales (joi_context, estoico_context, bio_context):
+valores perezosos que solo consultan la BD si la plantilla los lee, y la
+apertura on-demand encolada fuera del render.
+"""
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clientes.models import Cliente
+from core.bio_context_processor import bio_context
+from estoico.context_processors import estoico_context
+from joi.context_processors import joi_context
+from joi.models import MensajeJOI
+
+PROCESADORES_PEREZOSOS = {
+    'joi.context_processors.joi_context',
+    'estoico.context_processors.estoico_context',
+    'core.bio_context_processor.bio_context',
+}
+
+
+def _templates_sin_procesadores():
+    templates = []
+    for config in settings.TEMPLATES:
+        config = {**config, 'OPTIONS': dict(config.get('OPTIONS', {}))}
+        config['OPTIONS']['context_processors'] = [
+            p for p in config['OPTIONS'].get('context_processors', []) if p not in PROCESADORES_PEREZOSOS
+        ]
+        templates.append(config)
+    return templates
+
+
+class ContextProcessorsPerezososTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user('ctx-perezoso', password='x')
+        self.cliente = Cliente.objects.get_or_create(user=self.user)[0]
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+        self.request.session = {}
+
+    def test_construir_el_contexto_no_consulta(self):
+        with self.assertNumQueries(0):
+            contexto = {**joi_context(self.request), **estoico_context(self.request), **bio_context(self.request)}
+
+        MensajeJOI.objects.create(user=self.user, trigger='resumen_semanal', mensaje='Hola.', leido=False)
+        self.assertEqual(contexto['joi_mensaje_pendiente'].mensaje, 'Hola.')
+        self.assertEqual(contexto['estado_joi'], 'motivada')
+        self.assertEqual(contexto['racha_actual'], 0)
+        self.assertFalse(contexto['reflexion_hoy'])
+        self.assertIn('has_restrictions', contexto['bio_banner'])
+
+    @patch('joi.services._broker_alcanzable', return_value=True)
+    @patch('joi.tasks.generar_apertura_manana_usuario.apply_async')
+    @patch('joi.services.generar_mensaje_joi')
+    def test_apertura_on_demand_se_encola_fuera_del_render(self, generar_mock, encolar_mock, _broker):
+        contexto = joi_context(self.request)
+
+        self.assertFalse(contexto['joi_mensaje_pendiente'])
+        generar_mock.assert_not_called()
+        encolar_mock.assert_called_once_with(args=[self.user.id], retry=False)
+
+        # El lock evita encolar otra vez en el siguiente request
+        self.client.force_login(self.user)
+        respuesta = self.client.get(reverse('joi:joi_mensaje_pendiente'))
+        self.assertEqual(respuesta.json(), {'mensaje_id': None})
+        self.assertEqual(encolar_mock.call_count, 1)
+
+        mensaje = MensajeJOI.objects.create(user=self.user, trigger='apertura_manana', mensaje='Buenos días.')
+        respuesta = self.client.get(reverse('joi:joi_mensaje_pendiente'))
+        self.assertEqual(respuesta.json(), {'mensaje_id': mensaje.pk})
+
+    def test_vistas_sin_widgets_no_pagan_consultas(self):
+        self.client.force_login(self.user)
+        urls = [
+            reverse('logros:lista_arquetipos'),
+            reverse('estoico:progreso'),
+            reverse('joi:joi_pulso_actual'),
+        ]
+
+        def consultas(url):
+            cache.clear()
+            with CaptureQueriesContext(connection) as capturadas:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            return len(capturadas)
+
+        for url in urls:
+            with self.subTest(url=url):
+                con_procesadores = consultas(url)
+                with override_settings(TEMPLATES=_templates_sin_procesadores()):
+                    sin_procesadores = consultas(url)
+                self.assertEqual(con_procesadores, sin_procesadores)
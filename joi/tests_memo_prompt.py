@@ -0,0 +1,95 @@
+"""
+Memo de bloques de prompt JOI y caché de respuestas (joi/memo_prompt.py).
+
+- Un bloque ya construido se reutiliza sin consultas hasta que cambia
+  ManualDavid, NarrativaActiva o MensajeJOI del usuario.
+- Lo leído dentro de una transacción sin commit no se memoiza.
+- Un prompt idéntico no se reenvía al LLM si la caché de respuestas está activa.
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from joi import memo_prompt
+from joi.models import ManualDavid, NarrativaActiva
+from joi.services import _bloque_manual, _bloque_marco_narrativo
+
+
+class MemoBloquesPromptTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('joi-memo', password='x')
+        self.narrativa = NarrativaActiva.objects.create(user=self.user, estado='activa', capa_corta='Vuelve tras la pausa.')
+
+    def tearDown(self):
+        cache.clear()
+
+    def _memoizado(self, bloque, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            return bloque(self.user, *args)
+
+    def test_bloque_reutilizado_sin_consultas_hasta_que_cambia_la_narrativa(self):
+        primero = self._memoizado(_bloque_marco_narrativo)
+        with self.assertNumQueries(0):
+            self.assertEqual(_bloque_marco_narrativo(self.user), primero)
+
+        self.narrativa.capa_corta = 'Semana de carga alta.'
+        self.narrativa.save()
+
+        self.assertIn('Semana de carga alta.', self._memoizado(_bloque_marco_narrativo))
+        self.assertEqual(memo_prompt.contadores()['bloques_reconstruidos'], 2)
+        self.assertEqual(memo_prompt.contadores()['bloques_reutilizados'], 1)
+
+    def test_sin_commit_no_se_memoiza(self):
+        _bloque_manual(self.user)
+        with self.assertNumQueries(2):
+            _bloque_manual(self.user)
+
+    def test_desactivar_entrada_del_manual_invalida(self):
+        entrada = ManualDavid.objects.create(
+            user=self.user, entrada='Entrena mejor por la mañana.', origen='patron_detectado', tipo='preferencia',
+        )
+        self.assertIn('Entrena mejor por la mañana.', self._memoizado(_bloque_manual))
+
+        self.client.force_login(self.user)
+        self.client.post(reverse('joi:joi_desactivar_entrada', args=[entrada.id]))
+
+        self.assertNotIn('Entrena mejor por la mañana.', self._memoizado(_bloque_manual))
+
+
+class CacheRespuestasLLMTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.llamadas = 0
+
+    def tearDown(self):
+        cache.clear()
+
+    def _llamar(self):
+        self.llamadas += 1
+        return f'Respuesta {self.llamadas}', 350
+
+    @override_settings(JOI_LLM_CACHE_RESPUESTAS=True)
+    def test_prompt_identico_no_se_reenvia(self):
+        peticion = ('modelo', 400, 'system', 'prompt final')
+
+        self.assertEqual(memo_prompt.respuesta(peticion, self._llamar), 'Respuesta 1')
+        self.assertEqual(memo_prompt.respuesta(peticion, self._llamar), 'Respuesta 1')
+        self.assertEqual(memo_prompt.respuesta(peticion[:3] + ('otro prompt',), self._llamar), 'Respuesta 2')
+
+        self.assertEqual(self.llamadas, 2)
+        contadores = memo_prompt.contadores()
+        self.assertEqual(contadores['respuestas_reutilizadas'], 1)
+        self.assertEqual(contadores['respuestas_nuevas'], 2)
+        self.assertEqual(contadores['tokens_ahorrados'], 350)
+
+    @override_settings(JOI_LLM_CACHE_RESPUESTAS=False)
+    def test_desactivada_siempre_llama(self):
+        peticion = ('modelo', 400, 'system', 'prompt final')
+        memo_prompt.respuesta(peticion, self._llamar)
+        memo_prompt.respuesta(peticion, self._llamar)
+        self.assertEqual(self.llamadas, 2)
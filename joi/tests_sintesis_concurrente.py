@@ -0,0 +1,165 @@
+"""
+Ciclo de síntesis JOI en fases: contexto en serie, LLM en un pool acotado
+con timeout por llamada (joi/llm.py), escritura en serie. Diálogos,
+revisión del manual y generación pasan por el mismo pool.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from clientes.utils import get_cliente_actual
+from joi.llm import ClienteFalso, ejecutar_en_paralelo
+
+
+class EjecucionParalelaTests(SimpleTestCase):
+
+    def test_respeta_el_limite_de_concurrencia_y_el_orden(self):
+        activas, maximo = [0], [0]
+        lock = threading.Lock()
+
+        def tarea(i):
+            with lock:
+                activas[0] += 1
+                maximo[0] = max(maximo[0], activas[0])
+            time.sleep(0.02)
+            with lock:
+                activas[0] -= 1
+            return i * 2
+
+        self.assertEqual(ejecutar_en_paralelo(tarea, range(12), concurrencia=3), [i * 2 for i in range(12)])
+        self.assertEqual(maximo[0], 3)
+
+    def test_una_llamada_lenta_no_frena_el_lote(self):
+        rapido, lento = ClienteFalso(latencia=0.01), ClienteFalso(latencia=5)
+
+        def llamar(cliente):
+            return cliente.messages.create(
+                model='m', max_tokens=50, messages=[{'role': 'user', 'content': 'x'}], timeout=0.1,
+            ).content[0].text
+
+        t0 = time.perf_counter()
+        resultados = ejecutar_en_paralelo(llamar, [rapido, lento, rapido, rapido], concurrencia=4)
+
+        self.assertLess(time.perf_counter() - t0, 1)
+        self.assertIsInstance(resultados[1], TimeoutError)
+        self.assertTrue(all(isinstance(r, str) for i, r in enumerate(resultados) if i != 1))
+
+    @override_settings(JOI_LLM_BACKEND='falso', ANTHROPIC_API_KEY='clave-test')
+    def test_cliente_compartido(self):
+        from joi.services import _cliente_anthropic
+
+        self.assertIs(_cliente_anthropic(), _cliente_anthropic())
+        self.assertIsInstance(_cliente_anthropic(), ClienteFalso)
+
+
+class CicloSintesisConcurrenteTests(TestCase):
+
+    def setUp(self):
+        self.clientes = [get_cliente_actual(User.objects.create_user(f'joi-ciclo-{i}')) for i in range(3)]
+
+    @override_settings(JOI_SINTESIS_CONCURRENCIA=3, JOI_SINTESIS_TIMEOUT=1)
+    @patch('joi.services.generar_tema_abierto')
+    @patch('joi.services.preparar_dialogos_narrativa', return_value=[])
+    @patch('joi.services._hay_contexto_para_revision', return_value=False)
+    @patch('joi.services._revision_antigua', return_value=False)
+    @patch('joi.services.preparar_sintesis_joi')
+    def test_fases_separadas_cuentan_cada_resultado(self, preparar, *_):
+        from joi.models import MensajeJOI
+        from joi.tasks import ciclo_sintesis_joi
+
+        preparar.side_effect = lambda c: {'ctx': {}, 'diario_texto': '', 'prompt': c.user.username}
+        respuestas = {
+            'joi-ciclo-0': 'Algo que nombrar.',
+            'joi-ciclo-1': None,
+            'joi-ciclo-2': TimeoutError('lento'),
+        }
+
+        def llamar(prompt, timeout=None):
+            self.assertEqual(timeout, 1)
+            respuesta = respuestas[prompt]
+            if isinstance(respuesta, Exception):
+                raise respuesta
+            return respuesta
+
+        with patch('joi.services._llamar_haiku_sintesis', side_effect=llamar):
+            resultado = ciclo_sintesis_joi.run()
+
+        self.assertEqual(
+            (resultado['generados'], resultado['silenciados'], resultado['fallidos']), (1, 1, 1),
+        )
+        self.assertEqual(
+            list(MensajeJOI.objects.filter(trigger='sintesis_joi').values_list('user__username', flat=True)),
+            ['joi-ciclo-0'],
+        )
+
+    @override_settings(JOI_SINTESIS_CONCURRENCIA=3, JOI_SINTESIS_TIMEOUT=1)
+    @patch('joi.services.registrar_sintesis_log')
+    @patch('joi.services._actualizar_narrativa_activa')
+    @patch('joi.services.construir_contexto', return_value={})
+    @patch('joi.services._llamar_haiku_sintesis', return_value=None)
+    @patch('joi.services.preparar_sintesis_joi', side_effect=lambda c: {'prompt': c.user.username})
+    @patch('joi.services._revision_antigua', return_value=True)
+    def test_dialogos_y_revision_en_el_pool_con_timeout(self, *_):
+        from joi.tasks import ciclo_sintesis_joi
+
+        llamadas, aplicados, revisados = [], [], []
+
+        def llamar(prompt, system, max_tokens, timeout=None):
+            llamadas.append((prompt, timeout, threading.current_thread().name.startswith('joi-llm')))
+            if prompt == 'dialogo-joi-ciclo-1':
+                raise TimeoutError('lento')
+            return 'RESPONDER: NO'
+
+        def aplicar_dialogo(cliente, dialogo, texto):
+            aplicados.append((dialogo, texto))
+            return None if isinstance(texto, Exception) else False
+
+        with patch('joi.services._llamar_haiku_formato', side_effect=llamar), \
+             patch('joi.services.preparar_dialogos_narrativa',
+                   side_effect=lambda c: [(c.user.username, f'dialogo-{c.user.username}')]), \
+             patch('joi.services.aplicar_dialogo_narrativa', side_effect=aplicar_dialogo), \
+             patch('joi.services.preparar_revision_manual',
+                   side_effect=lambda c: {'prompt': f'revision-{c.user.username}'}), \
+             patch('joi.services.aplicar_revision_manual',
+                   side_effect=lambda c, p, t: revisados.append(t) or {'cambio_significativo': False}):
+            resultado = ciclo_sintesis_joi.run()
+
+        self.assertEqual(len(llamadas), 6)
+        self.assertTrue(all(timeout == 1 and en_pool for _, timeout, en_pool in llamadas))
+        self.assertIsInstance(dict(aplicados)['joi-ciclo-1'], TimeoutError)
+        self.assertEqual((resultado['dialogos_procesados'], resultado['revisiones']), (2, 3))
+        self.assertEqual(revisados, ['RESPONDER: NO'] * 3)
+
+    @override_settings(JOI_LLM_BACKEND='falso', ANTHROPIC_API_KEY='clave-dialogo')
+    def test_procesar_dialogo_aplica_la_respuesta_y_pasa_el_timeout(self):
+        import datetime
+
+        from django.utils import timezone
+
+        from joi.llm import cliente
+        from joi.models import DialogoNarrativa, NarrativaActiva
+        from joi.services import procesar_dialogo_narrativa
+
+        user = self.clientes[0].user
+        narrativa = NarrativaActiva.objects.create(user=user, texto='Lectura', confianza=0.5)
+        dialogo = DialogoNarrativa.objects.create(user=user, narrativa=narrativa, texto_usuario='No es eso')
+        DialogoNarrativa.objects.filter(pk=dialogo.pk).update(
+            creado_en=timezone.now() - datetime.timedelta(hours=5),
+        )
+        falso = cliente()
+        falso.respuesta = 'TIPOS: matiz\nCAPA: corto\nDELTA: -0.2\nRESPONDER: NO'
+
+        with patch.object(falso, 'create', wraps=falso.create) as create:
+            resultado = procesar_dialogo_narrativa(self.clientes[0], timeout=2)
+
+        self.assertEqual(resultado, {'procesados': 1, 'respuestas_generadas': 0})
+        self.assertEqual(create.call_args.kwargs['timeout'], 2)
+        dialogo.refresh_from_db()
+        narrativa.refresh_from_db()
+        self.assertTrue(dialogo.procesado)
+        self.assertEqual((dialogo.capa_afectada, dialogo.tipos_detectados), ('corto', ['matiz']))
+        self.assertAlmostEqual(narrativa.confianza, 0.3)
@@ -24,4 +24,5 @@ urlpatterns = [
     path('narrativa/dialogo/', views.crear_dialogo_narrativa, name='joi_dialogo_narrativa'),
     path('api/feedback-estado/', views.feedback_estado_encaje, name='joi_feedback_estado_encaje'),
     path('api/pulso-actual/', views.pulso_actual_api, name='joi_pulso_actual'),
+    path('api/mensaje-pendiente/', views.mensaje_pendiente_api, name='joi_mensaje_pendiente'),
 ]
@@ -128,6 +128,10 @@ def poda_manual_joi(request):
 def desactivar_entrada_manual(request, entrada_id):
     from joi.models import ManualDavid
     updated = ManualDavid.objects.filter(id=entrada_id, user=request.user).update(activa=False)
+    if updated:
+        # update() no emite post_save: invalidar el memo de bloques a mano
+        from joi import memo_prompt
+        memo_prompt.invalidar(request.user.id)
     return JsonResponse({'ok': bool(updated)})
 
 
@@ -516,3 +520,20 @@ def pulso_actual_api(request):
         'texto_motivo': joi_texto_motivo,
         'mensaje_activo': tiene_mensaje_activo,
     })
+
+
+@login_required
+@require_http_methods(["GET"])
+def mensaje_pendiente_api(request):
+    """
+    Endpoint AJAX del FAB de JOI: mensaje sin leer que anunciaría el banner.
+    Sustituye a la apertura on-demand que antes se generaba dentro del
+    context processor; si no hay ninguno, la encola y el FAB vuelve a
+    preguntar más tarde.
+
+    Respuesta: {'mensaje_id': int | None}
+    """
+    from .context_processors import _get_mensaje_gym
+
+    mensaje = _get_mensaje_gym(request.user)
+    return JsonResponse({'mensaje_id': mensaje.pk if mensaje else None})
@@ -4,7 +4,7 @@ from django.contrib import admin
 from .models import (
     Arquetipo, PruebaLegendaria, PerfilGamificacion, PruebaUsuario,
     Quest, TipoQuest, QuestUsuario, HistorialPuntos, Notificacion, Liga, Temporada, RankingEntry, TituloEspecial,
-    PerfilTitulo
+    PerfilTitulo, RankingPeriodo, ContadoresPruebas
 )
 
 
@@ -191,6 +191,19 @@ class RankingEntryAdmin(admin.ModelAdmin):
     ordering = ['posicion']
 
 
+@admin.register(RankingPeriodo)
+class RankingPeriodoAdmin(admin.ModelAdmin):
+    list_display = ['cliente', 'periodo', 'inicio', 'metrica', 'valor', 'actualizado']
+    list_filter = ['periodo', 'metrica', 'inicio']
+    ordering = ['periodo', 'metrica', '-valor']
+
+
+@admin.register(ContadoresPruebas)
+class ContadoresPruebasAdmin(admin.ModelAdmin):
+    list_display = ['perfil', 'volumen_total_kg', 'entrenos_perfectos', 'flexiones_totales', 'actualizado']
+    readonly_fields = ['actualizado']
+
+
 @admin.register(TituloEspecial)
 class TituloEspecialAdmin(admin.ModelAdmin):
     list_display = ['nombre', 'icono', 'condicion_tipo', 'condicion_valor', 'es_temporal']
@@ -0,0 +1,237 @@
+"""
+Contadores incrementales de las Pruebas Legendarias (`ContadoresPruebas`).
+
+`CodiceService._verificar_pruebas_legendarias` agregaba el historial
+completo del cliente en cada entreno guardado (suma de volumen, conteo de
+entrenos perfectos, barrido de series para el 1RM, repeticiones de
+flexiones), una vez por prueba. Aquí esos valores se guardan por perfil:
+
+- `aplicar_entreno(previo, actual)` / `aplicar_serie(previo, actual)`: al
+  guardar o borrar un entreno o una serie se aplica solo la diferencia
+  (señales en logros.services). Sin contadores creados no se hace nada: se
+  construyen completos la primera vez que se leen.
+- `obtener(perfil)`: lectura para las pruebas, sin agregar nada.
+- `reconstruir(perfil)`: recálculo completo desde el historial (comando
+  `reconstruir_contadores_pruebas`, necesario tras bulk_create/update, que
+  no emiten señales).
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from . import rankings
+from .models import ContadoresPruebas
+
+logger = logging.getLogger('gamificacion')
+
+# Texto buscado en EjercicioBase.nombre (icontains), igual que las pruebas de 1RM
+LEVANTAMIENTOS = ('Press de Banca', 'Sentadilla', 'Peso Muerto')
+PATRON_FLEXIONES = 'flexion'
+
+
+def _como_fecha(valor):
+    """EntrenoRealizado.fecha = DateField(default=timezone.now): sin recargar
+    desde BD la instancia conserva el datetime crudo."""
+    if isinstance(valor, datetime):
+        return (timezone.localtime(valor) if timezone.is_aware(valor) else valor).date()
+    return valor
+
+
+def _clave(periodo, fecha):
+    return rankings.rango(periodo, fecha)[0].isoformat()
+
+
+def _coincide(nombre, patron):
+    return patron.lower() in (nombre or '').lower()
+
+
+def _serie_valida(peso, repeticiones):
+    return bool(peso) and peso > 0 and bool(repeticiones) and repeticiones > 0
+
+
+def _mejor_serie(cliente_id, levantamiento):
+    """[peso_kg, repeticiones, serie_id] de la serie más pesada, o None."""
+    from entrenos.models import SerieRealizada
+
+    fila = SerieRealizada.objects.filter(
+        entreno__cliente_id=cliente_id,
+        ejercicio__nombre__icontains=levantamiento,
+        peso_kg__gt=0,
+        repeticiones__gt=0,
+    ).order_by('-peso_kg', '-repeticiones').values_list('peso_kg', 'repeticiones', 'pk').first()
+    return [float(fila[0]), fila[1], fila[2]] if fila else None
+
+
+# --------------------------------------------------------------------------
+# Estado de una fila antes/después de guardar, para las señales
+# --------------------------------------------------------------------------
+
+def estado_entreno(entreno):
+    """(cliente_id, fecha, volumen_total_kg) de la instancia en memoria."""
+    return entreno.cliente_id, _como_fecha(entreno.fecha), entreno.volumen_total_kg
+
+
+def estado_entreno_guardado(pk):
+    """Lo mismo leído de BD (antes de guardar la instancia), o None."""
+    from entrenos.models import EntrenoRealizado
+
+    return EntrenoRealizado.objects.filter(pk=pk).values_list('cliente_id', 'fecha', 'volumen_total_kg').first()
+
+
+def estado_serie_guardada(pk):
+    """(cliente_id, nombre_ejercicio, peso_kg, repeticiones, serie_id) leído de BD, o None."""
+    from entrenos.models import SerieRealizada
+
+    return SerieRealizada.objects.filter(pk=pk).values_list(
+        'entreno__cliente_id', 'ejercicio__nombre', 'peso_kg', 'repeticiones', 'pk',
+    ).first()
+
+
+# --------------------------------------------------------------------------
+# Aplicación incremental
+# --------------------------------------------------------------------------
+
+def _bloquear(cliente_id):
+    return ContadoresPruebas.objects.select_for_update().filter(perfil__cliente_id=cliente_id).first()
+
+
+def _sumar_bucket(buckets, clave, delta):
+    valor = buckets.get(clave, 0) + delta
+    if abs(valor) < 1e-6:
+        buckets.pop(clave, None)
+    else:
+        buckets[clave] = valor
+
+
+def _sumar_entreno(contadores, fecha, volumen, signo):
+    volumen = float(volumen or 0)
+    contadores.volumen_total_kg += signo * volumen
+    if volumen > 0:
+        contadores.entrenos_perfectos = max(contadores.entrenos_perfectos + signo, 0)
+        if fecha:
+            _sumar_bucket(contadores.volumen_semanal, _clave('week', fecha), signo * volumen)
+            _sumar_bucket(contadores.volumen_mensual, _clave('month', fecha), signo * volumen)
+
+
+def aplicar_entreno(previo, actual):
+    """previo/actual: estado del entreno antes y después (None si no existía / ya no existe)."""
+    for cliente_id in {estado[0] for estado in (previo, actual) if estado}:
+        with transaction.atomic():
+            contadores = _bloquear(cliente_id)
+            if contadores is None:
+                continue
+            for estado, signo in ((previo, -1), (actual, 1)):
+                if estado and estado[0] == cliente_id:
+                    _sumar_entreno(contadores, _como_fecha(estado[1]), estado[2], signo)
+            contadores.save()
+
+
+def aplicar_serie(previo, actual):
+    """
+    previo/actual: estado de la serie antes y después. Flexiones por
+    diferencia; la mejor serie de un levantamiento solo se vuelve a buscar en
+    BD si la que lo era baja de valor o desaparece.
+    """
+    for cliente_id in {estado[0] for estado in (previo, actual) if estado}:
+        with transaction.atomic():
+            contadores = _bloquear(cliente_id)
+            if contadores is None:
+                continue
+
+            antes = previo if previo and previo[0] == cliente_id else None
+            despues = actual if actual and actual[0] == cliente_id else None
+
+            for estado, signo in ((antes, -1), (despues, 1)):
+                if estado and _coincide(estado[1], PATRON_FLEXIONES):
+                    contadores.flexiones_totales = max(contadores.flexiones_totales + signo * (estado[3] or 0), 0)
+
+            for levantamiento in LEVANTAMIENTOS:
+                mejor = contadores.mejores_series.get(levantamiento)
+                nueva = None
+                if despues and _coincide(despues[1], levantamiento) and _serie_valida(despues[2], despues[3]):
+                    nueva = [float(despues[2]), despues[3], despues[4]]
+                era_la_mejor = mejor is not None and antes is not None and mejor[2] == antes[4]
+
+                if nueva and (mejor is None or nueva[:2] >= mejor[:2]):
+                    contadores.mejores_series[levantamiento] = nueva
+                elif era_la_mejor:
+                    mejor = _mejor_serie(cliente_id, levantamiento)
+                    if mejor:
+                        contadores.mejores_series[levantamiento] = mejor
+                    else:
+                        contadores.mejores_series.pop(levantamiento)
+
+            contadores.save()
+
+
+def aplicar_seguro(aplicar, previo, actual):
+    """Variante para señales: nunca propaga errores al guardado."""
+    try:
+        with transaction.atomic():
+            aplicar(previo, actual)
+    except Exception as e:
+        logger.warning('contadores: no se pudo aplicar %s -> %s: %s', previo, actual, e)
+
+
+# --------------------------------------------------------------------------
+# Lectura y reconstrucción
+# --------------------------------------------------------------------------
+
+def reconstruir(perfil):
+    """Recalcula todos los contadores del perfil desde el historial."""
+    from entrenos.models import EntrenoRealizado, SerieRealizada
+
+    total = 0.0
+    perfectos = 0
+    semanal = defaultdict(float)
+    mensual = defaultdict(float)
+    entrenos = EntrenoRealizado.objects.filter(cliente_id=perfil.cliente_id).values_list('fecha', 'volumen_total_kg')
+    for fecha, volumen in entrenos:
+        volumen = float(volumen or 0)
+        total += volumen
+        if volumen > 0:
+            perfectos += 1
+            if fecha:
+                semanal[_clave('week', fecha)] += volumen
+                mensual[_clave('month', fecha)] += volumen
+
+    flexiones = SerieRealizada.objects.filter(
+        entreno__cliente_id=perfil.cliente_id, ejercicio__nombre__icontains=PATRON_FLEXIONES,
+    ).aggregate(total=Sum('repeticiones'))['total'] or 0
+
+    mejores = {}
+    for levantamiento in LEVANTAMIENTOS:
+        mejor = _mejor_serie(perfil.cliente_id, levantamiento)
+        if mejor:
+            mejores[levantamiento] = mejor
+
+    contadores, _ = ContadoresPruebas.objects.update_or_create(
+        perfil=perfil,
+        defaults={
+            'volumen_total_kg': total,
+            'volumen_semanal': dict(semanal),
+            'volumen_mensual': dict(mensual),
+            'entrenos_perfectos': perfectos,
+            'flexiones_totales': flexiones,
+            'mejores_series': mejores,
+        },
+    )
+    return contadores
+
+
+def obtener(perfil):
+    """Contadores del perfil; se construyen desde el historial si aún no existen."""
+    try:
+        return perfil.contadores
+    except ContadoresPruebas.DoesNotExist:
+        return reconstruir(perfil)
+
+
+def volumen_periodo(contadores, periodo, fecha=None):
+    """Volumen del periodo ('week' o 'month') que contiene `fecha` (hoy por defecto)."""
+    buckets = contadores.volumen_semanal if periodo == 'week' else contadores.volumen_mensual
+    return buckets.get(_clave(periodo, fecha), 0.0)
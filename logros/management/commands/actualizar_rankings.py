@@ -2,6 +2,7 @@
 
 import sys
 from django.core.management.base import BaseCommand
+from logros import rankings
 from logros.views import RankingService  # Importamos el servicio desde views.py
 
 # Aseguramos la codificación correcta para la salida en la terminal
@@ -17,6 +18,8 @@ class Command(BaseCommand):
         try:
             # Llamamos al método principal del servicio que hace todo el trabajo
             RankingService.actualizar_rankings()
+            filas = rankings.recalcular()
+            self.stdout.write(f"Rankings de periodo (semana/mes/año): {filas} filas")
 
             self.stdout.write(self.style.SUCCESS("\n✅ ¡Todos los rankings han sido actualizados correctamente!"))
             self.stdout.write("El leaderboard ahora mostrará las posiciones más recientes.")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from logros import contadores
+from logros.models import PerfilGamificacion
+
+
+class Command(BaseCommand):
+    help = 'Recalcula desde el historial los contadores de las Pruebas Legendarias (logros.contadores).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cliente', type=int, help='Solo el perfil de este cliente (id)')
+
+    def handle(self, *args, **options):
+        perfiles = PerfilGamificacion.objects.all()
+        if options['cliente']:
+            perfiles = perfiles.filter(cliente_id=options['cliente'])
+
+        total = 0
+        for perfil in perfiles.iterator():
+            contadores.reconstruir(perfil)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Contadores reconstruidos: {total} perfiles'))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 14:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0009_add_hrv_ms_to_bitacora'),
+        ('logros', '0002_liga_temporada_tituloespecial_rankingentry_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingPeriodo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periodo', models.CharField(choices=[('week', 'Semana'), ('month', 'Mes'), ('year', 'Año')], max_length=10)),
+                ('inicio', models.DateField(help_text='Primer día del periodo')),
+                ('metrica', models.CharField(choices=[('entrenamientos', 'Entrenamientos Liftin'), ('calorias', 'Calorías'), ('volumen', 'Volumen (kg)')], max_length=20)),
+                ('valor', models.FloatField(default=0)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings_periodo', to='clientes.cliente')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['periodo', 'inicio', 'metrica', '-valor'], name='ranking_periodo_valor_idx')],
+                'constraints': [models.UniqueConstraint(fields=('periodo', 'inicio', 'metrica', 'cliente'), name='ranking_periodo_cliente_uniq')],
+            },
+        ),
+    ]
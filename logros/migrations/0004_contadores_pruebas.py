@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 16:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logros', '0003_rankingperiodo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadoresPruebas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('volumen_total_kg', models.FloatField(default=0)),
+                ('volumen_semanal', models.JSONField(default=dict, help_text='{lunes ISO: kg}')),
+                ('volumen_mensual', models.JSONField(default=dict, help_text='{día 1 ISO: kg}')),
+                ('entrenos_perfectos', models.PositiveIntegerField(default=0, help_text='Entrenos con volumen > 0')),
+                ('flexiones_totales', models.PositiveIntegerField(default=0)),
+                ('mejores_series', models.JSONField(default=dict, help_text='{levantamiento: [peso_kg, repeticiones, serie_id]}')),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('perfil', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='contadores', to='logros.perfilgamificacion')),
+            ],
+            options={
+                'verbose_name': 'Contadores de Pruebas',
+                'verbose_name_plural': 'Contadores de Pruebas',
+            },
+        ),
+    ]
@@ -328,6 +328,74 @@ class RankingEntry(models.Model):
         return f"{self.perfil.cliente.nombre} - {self.get_tipo_ranking_display()} - Pos #{self.posicion}"
 
 
+class RankingPeriodo(models.Model):
+    """
+    Valor precalculado de un cliente en un ranking de periodo (semana, mes,
+    año) — entrenos Liftin, calorías y volumen. Lo mantiene
+    `logros.rankings`: al guardar un entreno se reescriben solo las filas
+    del cliente y una tarea periódica lo recalcula entero. La posición se
+    obtiene leyendo por el índice (periodo, inicio, metrica, -valor).
+    """
+    PERIODOS = [
+        ('week', 'Semana'),
+        ('month', 'Mes'),
+        ('year', 'Año'),
+    ]
+    METRICAS = [
+        ('entrenamientos', 'Entrenamientos Liftin'),
+        ('calorias', 'Calorías'),
+        ('volumen', 'Volumen (kg)'),
+    ]
+
+    periodo = models.CharField(max_length=10, choices=PERIODOS)
+    inicio = models.DateField(help_text="Primer día del periodo")
+    metrica = models.CharField(max_length=20, choices=METRICAS)
+    cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, related_name='rankings_periodo')
+    valor = models.FloatField(default=0)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['periodo', 'inicio', 'metrica', 'cliente'],
+                name='ranking_periodo_cliente_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['periodo', 'inicio', 'metrica', '-valor'], name='ranking_periodo_valor_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cliente.nombre} - {self.get_metrica_display()} ({self.periodo} {self.inicio}): {self.valor}"
+
+
+class ContadoresPruebas(models.Model):
+    """
+    Acumulados del perfil que leen las Pruebas Legendarias: volumen total,
+    volumen por semana y por mes, entrenos perfectos, repeticiones de
+    flexiones y la mejor serie de cada levantamiento. Los mantiene
+    `logros.contadores` por señal al guardar o borrar entrenos y series;
+    `reconstruir_contadores_pruebas` los recalcula desde el historial.
+    """
+    perfil = models.OneToOneField(PerfilGamificacion, on_delete=models.CASCADE, related_name='contadores')
+    volumen_total_kg = models.FloatField(default=0)
+    volumen_semanal = models.JSONField(default=dict, help_text="{lunes ISO: kg}")
+    volumen_mensual = models.JSONField(default=dict, help_text="{día 1 ISO: kg}")
+    entrenos_perfectos = models.PositiveIntegerField(default=0, help_text="Entrenos con volumen > 0")
+    flexiones_totales = models.PositiveIntegerField(default=0)
+    mejores_series = models.JSONField(
+        default=dict, help_text="{levantamiento: [peso_kg, repeticiones, serie_id]}"
+    )
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Contadores de Pruebas")
+        verbose_name_plural = _("Contadores de Pruebas")
+
+    def __str__(self):
+        return f"Contadores de {self.perfil.cliente.nombre}"
+
+
 class TituloEspecial(models.Model):
     """
     Títulos especiales que se otorgan por logros excepcionales
@@ -0,0 +1,136 @@
+"""
+Rankings de periodo precalculados (`RankingPeriodo`).
+
+`generar_rankings` (entrenos/views_liftin.py) lanzaba en cada render tres
+annotate/aggregate de `Cliente` sobre todo `EntrenoRealizado` por periodo.
+Aquí los valores se guardan por (periodo, inicio, métrica, cliente):
+
+- `actualizar_cliente(cliente_id, *fechas)`: al guardar o borrar un entreno
+  se recalculan solo las filas del cliente para los periodos que contienen
+  cada fecha (una agregación por periodo; borrado e inserción de sus filas).
+  Si el entreno cambió de fecha se pasan la anterior y la nueva.
+- `recalcular(periodo)`: recálculo completo de los periodos en curso
+  (tarea `logros.tasks.recalcular_rankings` en Celery beat).
+- `top(periodo, metrica)` / `posicion(...)`: lecturas por índice, sin
+  agregar nada; el coste no depende del número de entrenos ni de clientes.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import RankingPeriodo
+
+logger = logging.getLogger('gamificacion')
+
+PERIODOS = ('week', 'month', 'year')
+METRICAS = ('entrenamientos', 'calorias', 'volumen')
+
+# Métrica → agregado sobre EntrenoRealizado (mismas reglas que generar_rankings:
+# solo los entrenos Liftin cuentan como entrenamientos; calorías y volumen
+# suman todas las fuentes).
+_AGREGADOS = {
+    'entrenamientos': Count('pk', filter=Q(fuente_datos='liftin')),
+    'calorias': Sum('calorias_quemadas'),
+    'volumen': Sum('volumen_total_kg'),
+}
+
+
+def rango(periodo, fecha=None):
+    """(inicio, fin) del periodo que contiene `fecha` (hoy por defecto)."""
+    fecha = fecha or timezone.now().date()
+    if periodo == 'week':
+        inicio = fecha - timedelta(days=fecha.weekday())
+        return inicio, inicio + timedelta(days=6)
+    if periodo == 'month':
+        inicio = fecha.replace(day=1)
+        siguiente = (inicio + timedelta(days=32)).replace(day=1)
+        return inicio, siguiente - timedelta(days=1)
+    if periodo == 'year':
+        return fecha.replace(month=1, day=1), fecha.replace(month=12, day=31)
+    raise ValueError(f'Periodo desconocido: {periodo}')
+
+
+def _agregar(entrenos):
+    return entrenos.values('cliente_id').annotate(**_AGREGADOS).order_by()
+
+
+def _filas(periodo, inicio, agregados):
+    return [
+        RankingPeriodo(
+            periodo=periodo, inicio=inicio, metrica=metrica,
+            cliente_id=fila['cliente_id'], valor=float(fila[metrica] or 0),
+        )
+        for fila in agregados
+        for metrica in METRICAS
+    ]
+
+
+def actualizar_cliente(cliente_id, *fechas):
+    """
+    Reescribe las filas del cliente en los periodos que contienen alguna de
+    `fechas`; un periodo compartido por varias fechas se recalcula una vez.
+    """
+    from entrenos.models import EntrenoRealizado
+
+    periodos = {(periodo, *rango(periodo, fecha)) for fecha in fechas for periodo in PERIODOS}
+    # Borrar e insertar, como recalcular(): bulk_create con update_conflicts
+    # y unique_fields no está soportado en MySQL.
+    for periodo, inicio, fin in sorted(periodos):
+        agregados = list(_agregar(EntrenoRealizado.objects.filter(
+            cliente_id=cliente_id, fecha__range=(inicio, fin),
+        )))
+        with transaction.atomic():
+            RankingPeriodo.objects.filter(periodo=periodo, inicio=inicio, cliente_id=cliente_id).delete()
+            RankingPeriodo.objects.bulk_create(_filas(periodo, inicio, agregados))
+
+
+def actualizar_seguro(cliente_id, *fechas):
+    """Variante para señales: nunca propaga errores al guardado."""
+    try:
+        actualizar_cliente(cliente_id, *fechas)
+    except Exception as e:
+        logger.warning('rankings: no se pudo actualizar cliente=%s (%s): %s', cliente_id, fechas, e)
+
+
+def recalcular(periodo=None, fecha=None):
+    """
+    Recalcula por completo el periodo en curso (o todos). Devuelve las
+    filas escritas.
+    """
+    from entrenos.models import EntrenoRealizado
+
+    escritas = 0
+    for p in ([periodo] if periodo else PERIODOS):
+        inicio, fin = rango(p, fecha)
+        filas = _filas(p, inicio, _agregar(
+            EntrenoRealizado.objects.filter(fecha__range=(inicio, fin))
+        ))
+        with transaction.atomic():
+            RankingPeriodo.objects.filter(periodo=p, inicio=inicio).delete()
+            RankingPeriodo.objects.bulk_create(filas, batch_size=1000)
+        escritas += len(filas)
+    return escritas
+
+
+def top(periodo, metrica, limite=5, fecha=None):
+    """Las `limite` mejores filas (con cliente) del periodo en curso."""
+    inicio, _ = rango(periodo, fecha)
+    return list(
+        RankingPeriodo.objects
+        .filter(periodo=periodo, inicio=inicio, metrica=metrica, valor__gt=0)
+        .select_related('cliente')
+        .order_by('-valor', 'cliente_id')[:limite]
+    )
+
+
+def posicion(cliente_id, periodo, metrica, fecha=None):
+    """Posición (1..n) del cliente en el periodo en curso, o None si no puntúa."""
+    inicio, _ = rango(periodo, fecha)
+    filas = RankingPeriodo.objects.filter(periodo=periodo, inicio=inicio, metrica=metrica)
+    propia = filas.filter(cliente_id=cliente_id, valor__gt=0).values_list('valor', flat=True).first()
+    if propia is None:
+        return None
+    return filas.filter(valor__gt=propia).count() + 1
@@ -3,8 +3,7 @@
 import logging
 from datetime import datetime, timedelta
 from django.db import transaction
-from django.db.models import Sum, Count, Q
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from .models import (
@@ -12,10 +11,50 @@ from .models import (
     HistorialPuntos, Quest, QuestUsuario, Notificacion
 )
 from entrenos.models import EntrenoRealizado, SerieRealizada, SesionEntrenamiento
+from . import contadores
 
 logger = logging.getLogger('gamificacion')
 
 
+# Contadores de las Pruebas Legendarias (logros.contadores). Registrados antes
+# que procesar_gamificacion_post_entreno para que la verificación de pruebas
+# ya vea el entreno recién guardado.
+
+@receiver(pre_save, sender=EntrenoRealizado)
+def recordar_entreno_previo(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._contadores_previo = None if instance._state.adding else contadores.estado_entreno_guardado(instance.pk)
+
+
+@receiver(post_save, sender=EntrenoRealizado)
+@receiver(post_delete, sender=EntrenoRealizado)
+def actualizar_contadores_entreno(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    borrado = 'created' not in kwargs
+    previo = contadores.estado_entreno(instance) if borrado else getattr(instance, '_contadores_previo', None)
+    actual = None if borrado else contadores.estado_entreno(instance)
+    contadores.aplicar_seguro(contadores.aplicar_entreno, previo, actual)
+
+
+@receiver(pre_save, sender=SerieRealizada)
+@receiver(pre_delete, sender=SerieRealizada)
+def recordar_serie_previa(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._contadores_previo = None if instance._state.adding else contadores.estado_serie_guardada(instance.pk)
+
+
+@receiver(post_save, sender=SerieRealizada)
+@receiver(post_delete, sender=SerieRealizada)
+def actualizar_contadores_serie(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    actual = contadores.estado_serie_guardada(instance.pk) if 'created' in kwargs else None
+    contadores.aplicar_seguro(contadores.aplicar_serie, getattr(instance, '_contadores_previo', None), actual)
+
+
 @receiver(post_save, sender=EntrenoRealizado)
 def procesar_gamificacion_post_entreno(sender, instance, created, raw=False, **kwargs):
     """Signal que se ejecuta automáticamente después de crear un EntrenoRealizado"""
@@ -25,6 +64,27 @@ def procesar_gamificacion_post_entreno(sender, instance, created, raw=False, **k
     CodiceService.procesar_entreno_completo(instance)
 
 
+@receiver(post_save, sender=EntrenoRealizado)
+@receiver(post_delete, sender=EntrenoRealizado)
+def actualizar_rankings_periodo(sender, instance, raw=False, **kwargs):
+    """
+    Refresco incremental de los rankings de periodo del cliente (logros.rankings).
+    Si el guardado cambió la fecha (o el cliente) del entreno, también se
+    refrescan los periodos de origen, con el estado que recordar_entreno_previo
+    leyó en pre_save.
+    """
+    if raw:
+        return
+    from . import rankings
+    previo = getattr(instance, '_contadores_previo', None) if 'created' in kwargs else None
+    fechas_por_cliente = {}
+    for estado in (previo, contadores.estado_entreno(instance)):
+        if estado and estado[1]:
+            fechas_por_cliente.setdefault(estado[0], set()).add(estado[1])
+    for cliente_id, fechas in fechas_por_cliente.items():
+        rankings.actualizar_seguro(cliente_id, *fechas)
+
+
 class CodiceService:
     """
     Servicio principal para gestionar la lógica del "Códice de las Leyendas".
@@ -154,14 +214,8 @@ class CodiceService:
         """
         Calcula el número total de repeticiones para ejercicios que son 'flexiones'.
         """
-        # Buscamos en todas las series realizadas por el cliente que contengan "flexion" en el nombre.
-        # Esto cubre "Flexiones", "Flexiones con lastre", etc.
-        total_flexiones = SerieRealizada.objects.filter(
-            entreno__cliente=perfil.cliente,
-            ejercicio__nombre__icontains='flexion'
-        ).aggregate(total_reps=Sum('repeticiones'))['total_reps'] or 0
-
-        return total_flexiones
+        # Series cuyo ejercicio contiene "flexion": "Flexiones", "Flexiones con lastre", etc.
+        return contadores.obtener(perfil).flexiones_totales
 
     @classmethod
     def _actualizar_estadisticas_base(cls, perfil, entreno):
@@ -251,17 +305,14 @@ class CodiceService:
         )
 
         pruebas_completadas = []
+        registros = {pu.prueba_id: pu for pu in PruebaUsuario.objects.filter(perfil=perfil)}
 
         for prueba in pruebas_disponibles:
-            # Calcular el progreso actual para esta prueba
+            # Calcular el progreso actual para esta prueba (lee contadores, no el historial)
             progreso = cls._calcular_progreso_prueba(perfil, prueba, entreno)
 
             # Obtener o crear el registro de progreso del usuario
-            prueba_usuario, created = PruebaUsuario.objects.get_or_create(
-                perfil=perfil,
-                prueba=prueba,
-                defaults={'progreso_actual': progreso}
-            )
+            prueba_usuario = registros.get(prueba.pk) or PruebaUsuario(perfil=perfil, prueba=prueba)
 
             # Actualizar el progreso
             prueba_usuario.progreso_actual = progreso
@@ -359,61 +410,39 @@ class CodiceService:
     @classmethod
     def _calc_volumen_total_kg(cls, perfil, entreno, prueba):
         """Calcula el volumen total acumulado en kg"""
-        total_volumen = EntrenoRealizado.objects.filter(
-            cliente=perfil.cliente
-        ).aggregate(total=Sum('volumen_total_kg'))['total'] or 0
-        return float(total_volumen)
+        return float(contadores.obtener(perfil).volumen_total_kg)
 
     @classmethod
     def _calc_volumen_semanal(cls, perfil, entreno, prueba):
         """Calcula el volumen de la semana actual"""
-        inicio_semana = timezone.now().date() - timedelta(days=timezone.now().weekday())
-        fin_semana = inicio_semana + timedelta(days=6)
-
-        volumen_semanal = EntrenoRealizado.objects.filter(
-            cliente=perfil.cliente,
-            fecha__date__range=[inicio_semana, fin_semana]  # <-- CORREGIDO de 'fecha_realizacion__date__range'
-        ).aggregate(total=Sum('volumen_total_kg'))['total'] or 0
-
-        return float(volumen_semanal)
+        return float(contadores.volumen_periodo(contadores.obtener(perfil), 'week'))
 
     @classmethod
     def _calc_volumen_mensual(cls, perfil, entreno, prueba):
         """Calcula el volumen del mes actual"""
-        inicio_mes = timezone.now().replace(day=1).date()
-
-        volumen_mensual = EntrenoRealizado.objects.filter(
-            cliente=perfil.cliente,
-            fecha__date__gte=inicio_mes  # <-- CORREGIDO de 'fecha_realizacion__date__gte'
-        ).aggregate(total=Sum('volumen_total_kg'))['total'] or 0
-
-        return float(volumen_mensual)
+        return float(contadores.volumen_periodo(contadores.obtener(perfil), 'month'))
 
     @classmethod
     def _calc_rm_press_banca(cls, perfil, entreno, prueba):
         """Calcula el 1RM estimado en Press de Banca"""
-        return cls._calcular_1rm_ejercicio(perfil.cliente, 'Press de Banca')
+        return cls._calcular_1rm_ejercicio(perfil, 'Press de Banca')
 
     @classmethod
     def _calc_rm_sentadilla(cls, perfil, entreno, prueba):
         """Calcula el 1RM estimado en Sentadilla"""
-        return cls._calcular_1rm_ejercicio(perfil.cliente, 'Sentadilla')
+        return cls._calcular_1rm_ejercicio(perfil, 'Sentadilla')
 
     @classmethod
     def _calc_rm_peso_muerto(cls, perfil, entreno, prueba):
         """Calcula el 1RM estimado en Peso Muerto"""
-        return cls._calcular_1rm_ejercicio(perfil.cliente, 'Peso Muerto')
+        return cls._calcular_1rm_ejercicio(perfil, 'Peso Muerto')
 
     @classmethod
     def _calc_entrenos_perfectos(cls, perfil, entreno, prueba):
         """Calcula el número de entrenamientos perfectos (todas las series completadas)"""
         # Esta lógica requiere verificar que todas las series planificadas se completaron
         # Por simplicidad, asumimos que un entreno es perfecto si tiene volumen > 0
-        entrenos_perfectos = EntrenoRealizado.objects.filter(
-            cliente=perfil.cliente,
-            volumen_total_kg__gt=0
-        ).count()
-        return entrenos_perfectos
+        return contadores.obtener(perfil).entrenos_perfectos
 
     @classmethod
     def _calc_records_semanales(cls, perfil, entreno, prueba):
@@ -430,22 +459,16 @@ class CodiceService:
         return 0
 
     @classmethod
-    def _calcular_1rm_ejercicio(cls, cliente, nombre_ejercicio):
+    def _calcular_1rm_ejercicio(cls, perfil, nombre_ejercicio):
         """Calcula el 1RM estimado para un ejercicio específico usando la fórmula de Brzycki"""
         try:
-            # Buscar la serie más pesada reciente para este ejercicio
-            serie_maxima = SerieRealizada.objects.filter(
-                entreno__cliente=cliente,
-                ejercicio__nombre__icontains=nombre_ejercicio,
-                peso_kg__gt=0,
-                repeticiones__gt=0
-            ).order_by('-peso_kg', '-repeticiones').first()
+            # Serie más pesada del ejercicio (mantenida en los contadores del perfil)
+            serie_maxima = contadores.obtener(perfil).mejores_series.get(nombre_ejercicio)
 
             if not serie_maxima:
                 return 0
 
-            peso = serie_maxima.peso_kg
-            reps = serie_maxima.repeticiones
+            peso, reps = float(serie_maxima[0]), serie_maxima[1]
 
             # Fórmula de Brzycki: 1RM = peso / (1.0278 - 0.0278 * reps)
             if reps == 1:
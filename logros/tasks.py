@@ -0,0 +1,21 @@
+from celery import shared_task
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def recalcular_rankings():
+    """
+    Recálculo completo de los rankings: los de periodo (logros.rankings,
+    semana/mes/año en curso) y los RankingEntry de la temporada activa.
+    Entre ejecuciones, los de periodo se mantienen al día por señal.
+    """
+    from . import rankings
+    from .views import RankingService
+
+    filas = rankings.recalcular()
+    RankingService.actualizar_rankings()
+    logger.info('recalcular_rankings: %s filas de periodo', filas)
+    return {'filas_periodo': filas}
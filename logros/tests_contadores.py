@@ -0,0 +1,110 @@
+"""
+Contadores de las Pruebas Legendarias (logros.contadores): se mantienen por
+señal al guardar o borrar entrenos y series, coinciden con la reconstrucción
+completa y la verificación de pruebas no depende del tamaño del historial.
+"""
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from clientes.models import Cliente
+from entrenos.models import EntrenoRealizado, SerieRealizada
+from logros.models import Arquetipo, ContadoresPruebas, PerfilGamificacion, PruebaLegendaria, PruebaUsuario
+from logros.services import CodiceService
+from rutinas.models import EjercicioBase, Rutina
+
+CAMPOS = ('volumen_total_kg', 'volumen_semanal', 'volumen_mensual', 'entrenos_perfectos',
+          'flexiones_totales', 'mejores_series')
+
+
+class ContadoresPruebasTests(TestCase):
+    def setUp(self):
+        arquetipo = Arquetipo.objects.create(
+            nivel=1, nombre_personaje='Iniciado', titulo_arquetipo='Iniciado', filosofia='-', puntos_requeridos=0,
+        )
+        # Metas inalcanzables: ninguna prueba se completa durante los tests
+        for clave in ('volumen_maraton', 'entrenos_perfectos', 'rm_100kg_banca',
+                      'flexiones_totales_meta_100', 'volumen_semanal_alto'):
+            PruebaLegendaria.objects.create(
+                arquetipo=arquetipo, nombre=clave, descripcion='-', clave_calculo=clave, meta_valor=10 ** 9,
+            )
+        self.cliente = Cliente.objects.get(user=User.objects.create_user('contadores_a'))
+        self.rutina = Rutina.objects.create(nombre='Full body')
+        self.banca = EjercicioBase.objects.create(nombre='Press de Banca con Barra', grupo_muscular='Pecho')
+        self.flexiones = EjercicioBase.objects.create(nombre='Flexiones', grupo_muscular='Pecho')
+        self.hoy = timezone.now().date()
+
+    def _entreno(self, volumen=1000, fecha=None):
+        entreno = EntrenoRealizado.objects.create(cliente=self.cliente, rutina=self.rutina, fecha=fecha or self.hoy)
+        # La gamificación recalcula el volumen desde los ejercicios (vacíos aquí); se fija después
+        entreno.volumen_total_kg = volumen
+        entreno.save(update_fields=['volumen_total_kg'])
+        return entreno
+
+    def _serie(self, entreno, ejercicio, peso, reps, numero=1):
+        return SerieRealizada.objects.create(
+            entreno=entreno, ejercicio=ejercicio, serie_numero=numero, repeticiones=reps, peso_kg=Decimal(peso),
+        )
+
+    def _valores(self):
+        fila = ContadoresPruebas.objects.get(perfil__cliente=self.cliente)
+        return {campo: getattr(fila, campo) for campo in CAMPOS}
+
+    def test_incremental_coincide_con_la_reconstruccion(self):
+        primero = self._entreno(volumen=0)
+        self._entreno(volumen=2500, fecha=self.hoy - datetime.timedelta(days=40))
+        tercero = self._entreno(volumen=1500)
+        mejor = self._serie(primero, self.banca, '90', 3)
+        self._serie(primero, self.banca, '85', 5, numero=2)
+        self._serie(tercero, self.flexiones, '0', 20)
+        self._serie(tercero, self.flexiones, '0', 15, numero=2)
+
+        mejor.peso_kg = Decimal('80')
+        mejor.save()
+        tercero.volumen_total_kg = 1800
+        tercero.save()
+        SerieRealizada.objects.filter(ejercicio=self.flexiones).first().delete()
+        self._entreno(volumen=700).delete()
+
+        incremental = self._valores()
+        self.assertEqual(incremental['mejores_series']['Press de Banca'][:2], [85.0, 5])
+        self.assertEqual(incremental['entrenos_perfectos'], 2)
+
+        call_command('reconstruir_contadores_pruebas', stdout=StringIO())
+        reconstruido = self._valores()
+        self.assertAlmostEqual(incremental.pop('volumen_total_kg'), reconstruido.pop('volumen_total_kg'))
+        self.assertEqual(incremental, reconstruido)
+
+        primero.delete()
+        self.assertEqual(self._valores()['mejores_series'], {})
+
+    def test_verificar_pruebas_no_depende_del_historial(self):
+        self._entreno()
+        perfil = PerfilGamificacion.objects.get(cliente=self.cliente)
+
+        def consultas():
+            perfil_fresco = PerfilGamificacion.objects.get(pk=perfil.pk)
+            entreno = self._entreno(volumen=2000)
+            self._serie(entreno, self.banca, '100', 2)
+            with CaptureQueriesContext(connection) as capturadas:
+                CodiceService._verificar_pruebas_legendarias(perfil_fresco, entreno)
+            return len(capturadas)
+
+        pocas = consultas()
+        for _ in range(15):
+            self._entreno(volumen=500)
+        self.assertEqual(consultas(), pocas)
+
+        progreso = dict(PruebaUsuario.objects.filter(perfil=perfil).values_list(
+            'prueba__clave_calculo', 'progreso_actual'))
+        self.assertEqual(progreso['volumen_maraton'], 1000 + 2000 + 15 * 500 + 2000)
+        self.assertEqual(progreso['entrenos_perfectos'], 18)
+        self.assertAlmostEqual(progreso['rm_100kg_banca'], 100 / (1.0278 - 0.0278 * 2))
+        self.assertEqual(progreso['volumen_semanal_alto'], progreso['volumen_maraton'])
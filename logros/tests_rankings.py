@@ -0,0 +1,139 @@
+"""
+Rankings precalculados: RankingPeriodo se mantiene por señal al guardar o
+borrar entrenos, el recálculo completo coincide con el incremental y las
+lecturas no dependen del número de entrenos.
+"""
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from clientes.models import Cliente
+from entrenos.models import EntrenoRealizado
+from entrenos.views_liftin import generar_rankings
+from logros import rankings
+from logros.models import PerfilGamificacion, RankingEntry, RankingPeriodo
+from logros.views import RankingService
+from rutinas.models import Rutina
+
+
+class RankingsPeriodoTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ranking_a', password='x')
+        self.cliente = Cliente.objects.get(user=self.user)
+        self.otro = Cliente.objects.get(user=User.objects.create_user('ranking_b'))
+        self.rutina = Rutina.objects.create(nombre='Full body')
+        self.hoy = timezone.now().date()
+
+    def _entreno(self, cliente, fecha=None, calorias=300, volumen=1000, fuente='liftin'):
+        return EntrenoRealizado.objects.create(
+            cliente=cliente, rutina=self.rutina, fecha=fecha or self.hoy, fuente_datos=fuente,
+            calorias_quemadas=calorias, volumen_total_kg=volumen,
+        )
+
+    def _valores(self, periodo, metrica):
+        return [(f.cliente_id, f.valor) for f in rankings.top(periodo, metrica)]
+
+    def test_guardar_y_borrar_actualizan_el_ranking(self):
+        self._entreno(self.cliente)
+        segundo = self._entreno(self.cliente, calorias=200)
+        self._entreno(self.otro, calorias=900, fuente='manual')
+
+        self.assertEqual(self._valores('week', 'entrenamientos'), [(self.cliente.pk, 2.0)])
+        self.assertEqual(self._valores('month', 'calorias'), [(self.otro.pk, 900.0), (self.cliente.pk, 500.0)])
+        self.assertEqual(rankings.posicion(self.cliente.pk, 'year', 'calorias'), 2)
+
+        segundo.delete()
+        self.assertEqual(self._valores('week', 'calorias'), [(self.otro.pk, 900.0), (self.cliente.pk, 300.0)])
+
+        EntrenoRealizado.objects.filter(cliente=self.otro).delete()
+        self._entreno(self.cliente).delete()
+        self.assertFalse(RankingPeriodo.objects.filter(cliente=self.otro).exists())
+
+    def test_cambiar_la_fecha_refresca_el_periodo_de_origen_y_el_de_destino(self):
+        entreno = self._entreno(self.cliente, calorias=400)
+        self._entreno(self.otro, calorias=100)
+        antigua = self.hoy - datetime.timedelta(days=400)
+
+        entreno.fecha = antigua
+        entreno.save()
+
+        for periodo in rankings.PERIODOS:
+            self.assertEqual(self._valores(periodo, 'calorias'), [(self.otro.pk, 100.0)], periodo)
+            inicio, _fin = rankings.rango(periodo, antigua)
+            self.assertEqual(
+                RankingPeriodo.objects.get(
+                    periodo=periodo, inicio=inicio, metrica='calorias', cliente=self.cliente,
+                ).valor,
+                400.0,
+            )
+
+    def test_recalculo_completo_coincide_con_el_incremental(self):
+        self._entreno(self.cliente, volumen=1500)
+        self._entreno(self.otro, volumen=2500)
+        self._entreno(self.otro, fecha=self.hoy - datetime.timedelta(days=400))
+        incremental = sorted(RankingPeriodo.objects.filter(
+            inicio__in=[rankings.rango(p)[0] for p in rankings.PERIODOS],
+        ).values_list('periodo', 'metrica', 'cliente_id', 'valor'))
+
+        RankingPeriodo.objects.all().delete()
+        escritas = rankings.recalcular()
+
+        self.assertEqual(escritas, 3 * 2 * 3)
+        self.assertEqual(sorted(RankingPeriodo.objects.values_list(
+            'periodo', 'metrica', 'cliente_id', 'valor')), incremental)
+
+    def test_generar_rankings_no_depende_del_numero_de_entrenos(self):
+        def queries(n):
+            for _ in range(n):
+                self._entreno(self.cliente)
+            with CaptureQueriesContext(connection) as capturadas:
+                resultado = generar_rankings('month')
+            return len(capturadas), resultado
+
+        pocas, _ = queries(1)
+        muchas, resultado = queries(10)
+
+        self.assertEqual(pocas, muchas)
+        self.assertEqual(pocas, 3)
+        self.assertEqual(resultado['entrenamientos'][0], self.cliente)
+        self.assertEqual(resultado['entrenamientos'][0].total_entrenamientos, 11)
+        self.assertEqual(resultado['calorias'][0].total_calorias, 3300)
+
+
+class RankingEntryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ranking_c', password='x')
+        self.cliente = Cliente.objects.get(user=self.user)
+        self.perfil, _ = PerfilGamificacion.objects.get_or_create(cliente=self.cliente)
+        EntrenoRealizado.objects.create(
+            cliente=self.cliente, rutina=Rutina.objects.create(nombre='Torso'),
+            fecha=timezone.now().date(),
+        )
+
+    def test_actualizar_rankings_agrupa_y_el_leaderboard_no_recalcula(self):
+        RankingService.actualizar_rankings()
+        entrada = RankingEntry.objects.get(perfil=self.perfil, tipo_ranking='entrenamientos_mes')
+        self.assertEqual((entrada.valor, entrada.posicion), (1.0, 1))
+
+        # Segunda pasada: actualiza las entradas existentes sin duplicarlas
+        EntrenoRealizado.objects.create(
+            cliente=self.cliente, rutina=Rutina.objects.get(nombre='Torso'), fecha=timezone.now().date(),
+        )
+        entradas = RankingEntry.objects.count()
+        RankingService.actualizar_rankings()
+        entrada.refresh_from_db()
+        self.assertEqual((entrada.valor, entrada.posicion), (2.0, 1))
+        self.assertEqual(RankingEntry.objects.count(), entradas)
+
+        self.client.force_login(self.user)
+        with mock.patch.object(RankingService, 'actualizar_rankings') as actualizar:
+            respuesta = self.client.get(reverse('logros:leaderboard'))
+
+        self.assertEqual(respuesta.status_code, 200)
+        actualizar.assert_not_called()
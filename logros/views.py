@@ -518,8 +518,11 @@ def leaderboard_view(request):
         # Crear temporada si no existe
         temporada_actual = RankingService.crear_temporada_actual()
 
-    # Actualizar rankings
-    RankingService.actualizar_rankings()
+    # Los rankings los recalcula la tarea periódica (logros.tasks); aquí solo
+    # se calculan si la temporada aún no tiene ninguno.
+    if not RankingEntry.objects.filter(temporada=temporada_actual).exists():
+        RankingService.actualizar_rankings()
+        temporada_actual = Temporada.objects.filter(activa=True).first()
 
     # Obtener rankings para el tipo seleccionado
     rankings = RankingEntry.objects.filter(
@@ -555,13 +558,11 @@ def leaderboard_view(request):
     from entrenos.models import EntrenoRealizado
     total_entrenamientos = EntrenoRealizado.objects.count()
 
-    # Calcular volumen total
-    from entrenos.models import EjercicioRealizado
-    volumen_total = EjercicioRealizado.objects.filter(
-        completado=True
-    ).aggregate(
-        total=Sum(F('peso_kg') * F('series') * F('repeticiones'))
-    )['total'] or 0
+    # Volumen total: suma del ranking ya calculado, no de todo EjercicioRealizado
+    volumen_total = RankingEntry.objects.filter(
+        temporada=temporada_actual,
+        tipo_ranking='volumen_total'
+    ).aggregate(total=Sum('valor'))['total'] or 0
 
     context = {
         'rankings': rankings,
@@ -636,7 +637,7 @@ class RankingService:
         temporada = RankingService.crear_temporada_actual()
 
         # Obtener todos los perfiles activos
-        perfiles = PerfilGamificacion.objects.select_related('cliente').all()
+        perfiles = list(PerfilGamificacion.objects.select_related('cliente', 'nivel_actual'))
 
         # Actualizar cada tipo de ranking
         tipos_ranking = [
@@ -648,11 +649,39 @@ class RankingService:
             'nivel_arquetipo'
         ]
 
+        agregados = RankingService._agregados_por_tipo(temporada)
         for tipo in tipos_ranking:
-            RankingService._actualizar_ranking_especifico(temporada, tipo, perfiles)
+            RankingService._actualizar_ranking_especifico(temporada, tipo, perfiles, agregados)
 
     @staticmethod
-    def _actualizar_ranking_especifico(temporada, tipo_ranking, perfiles):
+    def _agregados_por_tipo(temporada):
+        """
+        Valores de los rankings que dependen de otras tablas, con una query
+        agrupada por tipo (antes eran una query por perfil y tipo).
+        """
+        from entrenos.models import EjercicioRealizado, EntrenoRealizado
+        from .models import PruebaUsuario
+
+        entrenos_mes = EntrenoRealizado.objects.filter(
+            fecha__range=[temporada.fecha_inicio.date(), temporada.fecha_fin.date()]
+        ).values('cliente_id').annotate(n=Count('id')).order_by()
+        volumen = EjercicioRealizado.objects.filter(
+            completado=True
+        ).values('entreno__cliente_id').annotate(
+            total=Sum(F('peso_kg') * F('series') * F('repeticiones'))
+        ).order_by()
+        pruebas = PruebaUsuario.objects.filter(
+            completada=True
+        ).values('perfil_id').annotate(n=Count('id')).order_by()
+
+        return {
+            'entrenamientos_mes': {f['cliente_id']: f['n'] for f in entrenos_mes},
+            'volumen_total': {f['entreno__cliente_id']: f['total'] or 0 for f in volumen},
+            'pruebas_completadas': {f['perfil_id']: f['n'] for f in pruebas},
+        }
+
+    @staticmethod
+    def _actualizar_ranking_especifico(temporada, tipo_ranking, perfiles, agregados=None):
         """
         Actualiza un tipo específico de ranking
         """
@@ -660,7 +689,14 @@ class RankingService:
         datos_ranking = []
 
         for perfil in perfiles:
-            valor = RankingService._calcular_valor_ranking(perfil, tipo_ranking, temporada)
+            if agregados is None:
+                valor = RankingService._calcular_valor_ranking(perfil, tipo_ranking, temporada)
+            elif tipo_ranking in ('entrenamientos_mes', 'volumen_total'):
+                valor = float(agregados[tipo_ranking].get(perfil.cliente_id, 0))
+            elif tipo_ranking == 'pruebas_completadas':
+                valor = agregados[tipo_ranking].get(perfil.id, 0)
+            else:
+                valor = RankingService._calcular_valor_ranking(perfil, tipo_ranking, temporada)
             if valor is not None:
                 datos_ranking.append({
                     'perfil': perfil,
@@ -670,17 +706,35 @@ class RankingService:
         # Ordenar por valor (descendente)
         datos_ranking.sort(key=lambda x: x['valor'], reverse=True)
 
-        # Actualizar posiciones
+        # Actualizar posiciones: bulk_update de las entradas existentes y
+        # bulk_create del resto (el upsert con unique_fields no existe en MySQL)
+        existentes = {
+            entrada.perfil_id: entrada
+            for entrada in RankingEntry.objects.filter(
+                temporada=temporada, tipo_ranking=tipo_ranking,
+            ).only('id', 'perfil_id')
+        }
+        ahora = timezone.now()
+        nuevas, actualizadas = [], []
         for posicion, datos in enumerate(datos_ranking, 1):
-            RankingEntry.objects.update_or_create(
-                perfil=datos['perfil'],
-                temporada=temporada,
-                tipo_ranking=tipo_ranking,
-                defaults={
-                    'valor': datos['valor'],
-                    'posicion': posicion
-                }
-            )
+            entrada = existentes.get(datos['perfil'].id)
+            if entrada is None:
+                nuevas.append(RankingEntry(
+                    perfil=datos['perfil'],
+                    temporada=temporada,
+                    tipo_ranking=tipo_ranking,
+                    valor=datos['valor'],
+                    posicion=posicion,
+                ))
+            else:
+                entrada.valor = datos['valor']
+                entrada.posicion = posicion
+                entrada.fecha_actualizacion = ahora
+                actualizadas.append(entrada)
+        RankingEntry.objects.bulk_update(
+            actualizadas, ['valor', 'posicion', 'fecha_actualizacion'], batch_size=500,
+        )
+        RankingEntry.objects.bulk_create(nuevas, batch_size=500)
 
     @staticmethod
     def _calcular_valor_ranking(perfil, tipo_ranking, temporada):
@@ -5,12 +5,16 @@ Funciones principales:
   - generar_target_diario()        Sprint 2
   - get_tipo_sesion_hoy()          Sprint 2
   - analisis_semanal_pas()         Sprint 5 (esqueleto)
+  - analisis_semanal_pas_cohorte() PAS de todos los clientes (tarea de los lunes)
   - _safety_lock_check()           Sprint 5
 """
 
 import math
 from datetime import date, timedelta
 
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+
 from .bloques_alimentos import (
     calcular_bloques_dia,
     distribuir_bloques_comidas,
@@ -156,29 +160,36 @@ def _aplicar_ajustes_historicos(cliente, bloques, tipo_sesion):
 # MÉTRICAS SEMANALES
 # ─────────────────────────────────────────────────────────────
 
+def _media(suma, n, decimales, minimo=1):
+    """Media redondeada a partir de una suma agregada; None con menos de `minimo` valores."""
+    if not n or n < minimo:
+        return None
+    return round(suma / n, decimales)
+
+
+def _delta_volumen_pct(vol_actual, vol_prev):
+    if not vol_prev or not vol_actual:
+        return None
+    return round((vol_actual - vol_prev) / vol_prev * 100, 1)
+
+
 def calcular_cumplimiento_semana(cliente, lunes):
     from .models import CheckNutricionalDiario
     domingo = lunes + timedelta(days=6)
-    checks = CheckNutricionalDiario.objects.filter(
+    agregado = CheckNutricionalDiario.objects.filter(
         cliente=cliente, fecha__range=(lunes, domingo)
-    )
-    if not checks.exists():
-        return 0.0
-    return round(sum(c.cumplimiento_pct for c in checks) / checks.count(), 1)
+    ).aggregate(n=Count('id'), suma=Sum('cumplimiento_pct'))
+    return _media(agregado['suma'], agregado['n'], 1) or 0.0
 
 
 def calcular_media_peso_semana(cliente, lunes):
     """Returns: (media: float | None, n_pesajes: int)"""
     from clientes.models import PesoDiario
     domingo = lunes + timedelta(days=6)
-    pesos = list(
-        PesoDiario.objects
-        .filter(cliente=cliente, fecha__range=(lunes, domingo))
-        .values_list('peso_kg', flat=True)
-    )
-    if len(pesos) < 2:
-        return None, len(pesos)
-    return round(sum(pesos) / len(pesos), 2), len(pesos)
+    agregado = PesoDiario.objects.filter(
+        cliente=cliente, fecha__range=(lunes, domingo)
+    ).aggregate(n=Count('id'), suma=Sum('peso_kg'))
+    return _media(agregado['suma'], agregado['n'], 2, minimo=2), agregado['n']
 
 
 def calcular_rendimiento_gym_delta(cliente, lunes):
@@ -189,9 +200,7 @@ def calcular_rendimiento_gym_delta(cliente, lunes):
         domingo_prev = lunes - timedelta(days=1)
         vol_actual   = _volumen_semana(cliente, lunes, domingo)
         vol_prev     = _volumen_semana(cliente, lunes_prev, domingo_prev)
-        if not vol_prev or not vol_actual:
-            return None
-        return round((vol_actual - vol_prev) / vol_prev * 100, 1)
+        return _delta_volumen_pct(vol_actual, vol_prev)
     except Exception:
         return None
 
@@ -199,7 +208,6 @@ def calcular_rendimiento_gym_delta(cliente, lunes):
 def _volumen_semana(cliente, inicio, fin):
     try:
         from entrenos.models import EntrenoRealizado
-        from django.db.models import Sum
         result = EntrenoRealizado.objects.filter(
             cliente=cliente, fecha__range=(inicio, fin)
         ).aggregate(total=Sum('volumen_total_kg'))
@@ -211,29 +219,25 @@ def _volumen_semana(cliente, inicio, fin):
 def _fatiga_media_semana(cliente, lunes):
     from .models import CheckNutricionalDiario
     domingo = lunes + timedelta(days=6)
-    valores = list(
-        CheckNutricionalDiario.objects.filter(
-            cliente=cliente,
-            fecha__range=(lunes, domingo),
-            fatiga_percibida__isnull=False,
-        ).values_list('fatiga_percibida', flat=True)
-    )
-    if not valores:
-        return None
-    return round(sum(valores) / len(valores), 1)
+    agregado = CheckNutricionalDiario.objects.filter(
+        cliente=cliente, fecha__range=(lunes, domingo),
+    ).aggregate(n=Count('fatiga_percibida'), suma=Sum('fatiga_percibida'))
+    return _media(agregado['suma'], agregado['n'], 1)
 
 
 # ─────────────────────────────────────────────────────────────
 # SAFETY LOCK
 # ─────────────────────────────────────────────────────────────
 
-def _safety_lock_check(cliente, bloques_nuevos):
+def _safety_lock_check(cliente, bloques_nuevos, peso_actual=None):
     """
+    peso_actual: si ya se conoce (PAS por cohorte), evita releerlo.
     Returns: (es_seguro: bool, motivo: str | None)
     """
     try:
         perfil = cliente.perfil_nutricional
-        peso_actual = perfil._get_peso_actual()
+        if peso_actual is None:
+            peso_actual = perfil._get_peso_actual()
 
         min_proteina_g = perfil.masa_magra_kg * perfil.safety_proteina_min_g_kg
         min_grasa_g    = peso_actual * perfil.safety_grasa_min_g_kg
@@ -265,7 +269,8 @@ UMBRAL_CUMPLIMIENTO_MINIMO = 90.0
 def analisis_semanal_pas(cliente, lunes=None):
     """
     Genera el InformeOptimizacion de la semana.
-    Llamado por Celery cada lunes a las 7:00.
+    Llamado desde la vista del informe; la tarea de los lunes usa
+    analisis_semanal_pas_cohorte().
     """
     from .models import InformeOptimizacion, TargetNutricionalDiario
 
@@ -275,52 +280,70 @@ def analisis_semanal_pas(cliente, lunes=None):
 
     lunes_anterior = lunes - timedelta(days=7)
 
-    cumplimiento   = calcular_cumplimiento_semana(cliente, lunes_anterior)
-    media_nueva,  _= calcular_media_peso_semana(cliente, lunes_anterior)
-    media_previa, _= calcular_media_peso_semana(cliente, lunes_anterior - timedelta(days=7))
-    fatiga_media   = _fatiga_media_semana(cliente, lunes_anterior)
-    delta_gym      = calcular_rendimiento_gym_delta(cliente, lunes_anterior)
+    metricas = {
+        'cumplimiento': calcular_cumplimiento_semana(cliente, lunes_anterior),
+        'media_nueva':  calcular_media_peso_semana(cliente, lunes_anterior)[0],
+        'media_previa': calcular_media_peso_semana(cliente, lunes_anterior - timedelta(days=7))[0],
+        'fatiga_media': _fatiga_media_semana(cliente, lunes_anterior),
+        'delta_gym':    calcular_rendimiento_gym_delta(cliente, lunes_anterior),
+    }
+
+    target_actual = None
+    if metricas['cumplimiento'] >= UMBRAL_CUMPLIMIENTO_MINIMO:
+        target_actual = TargetNutricionalDiario.objects.filter(
+            cliente=cliente, fecha__gte=lunes_anterior,
+        ).order_by('-fecha').first()
+
+    informe, _ = InformeOptimizacion.objects.update_or_create(
+        cliente=cliente, semana=lunes,
+        defaults=_defaults_informe_pas(cliente, metricas, target_actual),
+    )
+    return informe
+
+
+def _defaults_informe_pas(cliente, metricas, target_actual, peso_actual=None):
+    """
+    Campos del InformeOptimizacion a partir de las métricas de la semana.
+    Sin consultas salvo el safety lock cuando no se pasa peso_actual.
+    """
+    cumplimiento = metricas['cumplimiento']
+    media_nueva  = metricas['media_nueva']
+    media_previa = metricas['media_previa']
+    delta_gym    = metricas['delta_gym']
 
     # REGLA 0: cumplimiento insuficiente → no ajustar
     if cumplimiento < UMBRAL_CUMPLIMIENTO_MINIMO:
-        informe, _ = InformeOptimizacion.objects.update_or_create(
-            cliente=cliente, semana=lunes,
-            defaults={
-                'media_peso_anterior':     media_previa,
-                'media_peso_nueva':        media_nueva,
-                'cumplimiento_semana_pct': cumplimiento,
-                'fatiga_media':            fatiga_media,
-                'rendimiento_gym_delta_pct': delta_gym,
-                'escenario':    'X',
-                'justificacion': (
-                    f"Cumplimiento: {cumplimiento:.0f}% "
-                    f"(mínimo requerido: {UMBRAL_CUMPLIMIENTO_MINIMO:.0f}%). "
-                    "No puedo ajustar sin datos fiables. "
-                    "Apunta al 90%+ esta semana y decidimos juntos."
-                ),
-                'ajuste_bloques_proteina': 0,
-                'ajuste_bloques_carbos':   0,
-                'ajuste_bloques_grasas':   0,
-                'estado': 'pendiente',
-            }
-        )
-        return informe
+        return {
+            'media_peso_anterior':     media_previa,
+            'media_peso_nueva':        media_nueva,
+            'cumplimiento_semana_pct': cumplimiento,
+            'fatiga_media':            metricas['fatiga_media'],
+            'rendimiento_gym_delta_pct': delta_gym,
+            'escenario':    'X',
+            'justificacion': (
+                f"Cumplimiento: {cumplimiento:.0f}% "
+                f"(mínimo requerido: {UMBRAL_CUMPLIMIENTO_MINIMO:.0f}%). "
+                "No puedo ajustar sin datos fiables. "
+                "Apunta al 90%+ esta semana y decidimos juntos."
+            ),
+            'ajuste_bloques_proteina': 0,
+            'ajuste_bloques_carbos':   0,
+            'ajuste_bloques_grasas':   0,
+            'estado': 'pendiente',
+        }
 
     # Clasificar escenario
     escenario, ajuste, justificacion, aplica_a = _clasificar_escenario(
         cliente=cliente,
         media_nueva=media_nueva,
         media_previa=media_previa,
-        fatiga_media=fatiga_media,
+        fatiga_media=metricas['fatiga_media'],
         delta_gym=delta_gym,
     )
 
     # Safety lock
     safety_ok  = True
     diet_break = False
-    target_actual = TargetNutricionalDiario.objects.filter(
-        cliente=cliente, fecha__gte=lunes_anterior,
-    ).order_by('-fecha').first()
 
     if target_actual and ajuste:
         bloques_prop = {
@@ -328,7 +351,7 @@ def analisis_semanal_pas(cliente, lunes=None):
             "C": target_actual.bloques_carbos   + ajuste.get("C", 0),
             "G": target_actual.bloques_grasas   + ajuste.get("G", 0),
         }
-        safety_ok, safety_msg = _safety_lock_check(cliente, bloques_prop)
+        safety_ok, safety_msg = _safety_lock_check(cliente, bloques_prop, peso_actual)
         if not safety_ok:
             diet_break = True
             justificacion += (
@@ -339,27 +362,142 @@ def analisis_semanal_pas(cliente, lunes=None):
 
     alerta = _detectar_contradiccion(cumplimiento, media_nueva, media_previa, delta_gym)
 
-    informe, _ = InformeOptimizacion.objects.update_or_create(
-        cliente=cliente, semana=lunes,
-        defaults={
-            'media_peso_anterior':          media_previa,
-            'media_peso_nueva':             media_nueva,
-            'cumplimiento_semana_pct':      cumplimiento,
-            'fatiga_media':                 fatiga_media,
-            'rendimiento_gym_delta_pct':    delta_gym,
-            'escenario':                    escenario,
-            'alerta_honestidad':            alerta,
-            'ajuste_bloques_proteina':      ajuste.get("P", 0) if ajuste else 0,
-            'ajuste_bloques_carbos':        ajuste.get("C", 0) if ajuste else 0,
-            'ajuste_bloques_grasas':        ajuste.get("G", 0) if ajuste else 0,
-            'ajuste_aplica_a':              aplica_a,
-            'justificacion':                justificacion,
-            'safety_lock_activado':         not safety_ok,
-            'diet_break_sugerido':          diet_break,
-            'estado':                       'pendiente',
+    return {
+        'media_peso_anterior':          media_previa,
+        'media_peso_nueva':             media_nueva,
+        'cumplimiento_semana_pct':      cumplimiento,
+        'fatiga_media':                 metricas['fatiga_media'],
+        'rendimiento_gym_delta_pct':    delta_gym,
+        'escenario':                    escenario,
+        'alerta_honestidad':            alerta,
+        'ajuste_bloques_proteina':      ajuste.get("P", 0) if ajuste else 0,
+        'ajuste_bloques_carbos':        ajuste.get("C", 0) if ajuste else 0,
+        'ajuste_bloques_grasas':        ajuste.get("G", 0) if ajuste else 0,
+        'ajuste_aplica_a':              aplica_a,
+        'justificacion':                justificacion,
+        'safety_lock_activado':         not safety_ok,
+        'diet_break_sugerido':          diet_break,
+        'estado':                       'pendiente',
+    }
+
+
+# ─────────────────────────────────────────────────────────────
+# PAS POR COHORTE
+# ─────────────────────────────────────────────────────────────
+
+def analisis_semanal_pas_cohorte(clientes, lunes=None):
+    """
+    PAS de la semana para todos los `clientes` (queryset con perfil
+    nutricional) con un número fijo de consultas agrupadas por cliente:
+    cumplimiento y fatiga, medias de peso de dos semanas, volumen gym de dos
+    semanas, último target y último pesaje. La clasificación se hace en
+    memoria; los informes ya existentes de la semana se actualizan con un
+    bulk_update por tipo de informe y el resto se crea con un bulk_create.
+
+    Mismo resultado que analisis_semanal_pas() cliente a cliente.
+    Returns: lista de InformeOptimizacion escritos
+    """
+    from clientes.models import PesoDiario
+    from entrenos.models import EntrenoRealizado
+    from .models import CheckNutricionalDiario, InformeOptimizacion, TargetNutricionalDiario
+
+    if lunes is None:
+        hoy = date.today()
+        lunes = hoy - timedelta(days=hoy.weekday())
+
+    lunes_anterior = lunes - timedelta(days=7)
+    lunes_previo   = lunes_anterior - timedelta(days=7)
+    domingo        = lunes_anterior + timedelta(days=6)
+    semana_actual  = Q(fecha__gte=lunes_anterior)
+    semana_previa  = Q(fecha__lt=lunes_anterior)
+
+    ultimo_peso = PesoDiario.objects.filter(cliente=OuterRef('pk')).order_by('-fecha').values('peso_kg')[:1]
+    lista = list(
+        clientes.select_related('perfil_nutricional')
+        .annotate(ultimo_peso_kg=Subquery(ultimo_peso))
+    )
+    if not lista:
+        return []
+    ids = clientes.values('pk')
+
+    checks = {
+        fila['cliente_id']: fila for fila in
+        CheckNutricionalDiario.objects
+        .filter(cliente__in=ids, fecha__range=(lunes_anterior, domingo))
+        .values('cliente_id')
+        .annotate(n=Count('id'), suma=Sum('cumplimiento_pct'),
+                  n_fatiga=Count('fatiga_percibida'), suma_fatiga=Sum('fatiga_percibida'))
+    }
+    pesos = {
+        fila['cliente_id']: fila for fila in
+        PesoDiario.objects
+        .filter(cliente__in=ids, fecha__range=(lunes_previo, domingo))
+        .values('cliente_id')
+        .annotate(n=Count('id', filter=semana_actual), suma=Sum('peso_kg', filter=semana_actual),
+                  n_previa=Count('id', filter=semana_previa), suma_previa=Sum('peso_kg', filter=semana_previa))
+    }
+    volumenes = {
+        fila['cliente_id']: fila for fila in
+        EntrenoRealizado.objects
+        .filter(cliente__in=ids, fecha__range=(lunes_previo, domingo))
+        .values('cliente_id')
+        .annotate(actual=Sum('volumen_total_kg', filter=semana_actual),
+                  previo=Sum('volumen_total_kg', filter=semana_previa))
+    }
+
+    metricas_por_cliente = {}
+    for cliente in lista:
+        c = checks.get(cliente.pk, {})
+        p = pesos.get(cliente.pk, {})
+        v = volumenes.get(cliente.pk, {})
+        metricas_por_cliente[cliente.pk] = {
+            'cumplimiento': _media(c.get('suma'), c.get('n'), 1) or 0.0,
+            'media_nueva':  _media(p.get('suma'), p.get('n'), 2, minimo=2),
+            'media_previa': _media(p.get('suma_previa'), p.get('n_previa'), 2, minimo=2),
+            'fatiga_media': _media(c.get('suma_fatiga'), c.get('n_fatiga'), 1),
+            'delta_gym':    _delta_volumen_pct(v.get('actual') or 0, v.get('previo') or 0),
         }
+
+    # Último target solo de quienes superan la regla 0 (los únicos que lo usan)
+    targets = {}
+    con_ajuste = [pk for pk, m in metricas_por_cliente.items()
+                  if m['cumplimiento'] >= UMBRAL_CUMPLIMIENTO_MINIMO]
+    if con_ajuste:
+        for target in (TargetNutricionalDiario.objects
+                       .filter(cliente_id__in=con_ajuste, fecha__gte=lunes_anterior)
+                       .order_by('cliente_id', '-fecha')):
+            targets.setdefault(target.cliente_id, target)
+
+    # bulk_create con update_conflicts/unique_fields no existe en MySQL:
+    # se separan los informes que ya existen de los nuevos.
+    existentes = dict(
+        InformeOptimizacion.objects.filter(cliente__in=ids, semana=lunes).values_list('cliente_id', 'pk')
     )
-    return informe
+
+    # Los informes 'X' no tocan alerta/aplica_a/safety: un bulk_update por juego de campos
+    informes, nuevos, por_campos = [], [], {}
+    for cliente in lista:
+        peso_actual = (float(cliente.ultimo_peso_kg) if cliente.ultimo_peso_kg
+                       else float(cliente.peso_corporal or 0))
+        try:
+            defaults = _defaults_informe_pas(
+                cliente, metricas_por_cliente[cliente.pk], targets.get(cliente.pk), peso_actual,
+            )
+        except Exception:
+            continue  # un cliente con datos corruptos no bloquea al resto
+        informe = InformeOptimizacion(cliente=cliente, semana=lunes, **defaults)
+        informes.append(informe)
+        if cliente.pk in existentes:
+            informe.pk = existentes[cliente.pk]
+            por_campos.setdefault(tuple(defaults), []).append(informe)
+        else:
+            nuevos.append(informe)
+
+    with transaction.atomic():
+        for campos, grupo in por_campos.items():
+            InformeOptimizacion.objects.bulk_update(grupo, list(campos), batch_size=500)
+        InformeOptimizacion.objects.bulk_create(nuevos, batch_size=500)
+    return informes
 
 
 def _clasificar_escenario(cliente, media_nueva, media_previa,
@@ -9,19 +9,24 @@ def tarea_analisis_semanal_nutricional():
     Se ejecuta cada lunes a las 7:00.
     """
     from clientes.models import Cliente
-    from .services import analisis_semanal_pas
+    from .services import analisis_semanal_pas, analisis_semanal_pas_cohorte
 
     clientes = Cliente.objects.filter(
         perfil_nutricional__isnull=False,
         membresia_activa=True,
     )
 
-    procesados = 0
-    for cliente in clientes:
-        try:
-            analisis_semanal_pas(cliente)
-            procesados += 1
-        except Exception as e:
-            pass  # log en producción
+    try:
+        procesados = len(analisis_semanal_pas_cohorte(clientes))
+    except Exception:
+        # Si la pasada agrupada falla, cliente a cliente: uno con datos
+        # corruptos no bloquea al resto.
+        procesados = 0
+        for cliente in clientes:
+            try:
+                analisis_semanal_pas(cliente)
+                procesados += 1
+            except Exception as e:
+                pass  # log en producción
 
     return f"PAS completado: {procesados}/{clientes.count()} clientes procesados."
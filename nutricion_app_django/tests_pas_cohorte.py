@@ -0,0 +1,136 @@
+"""
+PAS por cohorte (services.analisis_semanal_pas_cohorte): mismos informes que
+analisis_semanal_pas() cliente a cliente y un número de consultas que no
+crece con el número de clientes.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from clientes.models import Cliente, PesoDiario
+from entrenos.models import EntrenoRealizado
+from rutinas.models import Rutina
+from .models import CheckNutricionalDiario, InformeOptimizacion, PerfilNutricional, TargetNutricionalDiario
+from .services import analisis_semanal_pas, analisis_semanal_pas_cohorte
+from .tasks import tarea_analisis_semanal_nutricional
+
+CAMPOS = [f.name for f in InformeOptimizacion._meta.fields if f.name not in ('id', 'creado_en')]
+
+
+class PasCohorteTests(TestCase):
+    def setUp(self):
+        hoy = timezone.localdate()
+        self.lunes = hoy - timedelta(days=hoy.weekday())
+        self.semana = self.lunes - timedelta(days=7)
+        self.rutina = Rutina.objects.create(nombre='PAS cohorte')
+        self.dia_peso = 0  # PesoDiario.fecha es única en toda la tabla
+
+        # Estancado en definición con target bajo → B con safety lock
+        estancado = self._cliente('pas_estancado', fase='definicion', peso=80)
+        self._checks(estancado, cumplidos=True)
+        self._pesos(estancado, [Decimal('80.10'), Decimal('80.30')], [Decimal('80.20'), Decimal('80.25')])
+        TargetNutricionalDiario.objects.create(
+            cliente=estancado, fecha=self.semana + timedelta(days=3),
+            bloques_proteina=12, bloques_carbos=10, bloques_grasas=6,
+        )
+        self._entreno(estancado, self.semana - timedelta(days=3), 5000)
+        self._entreno(estancado, self.semana + timedelta(days=2), 5400)
+
+        # Fatiga alta → C
+        fatigado = self._cliente('pas_fatigado', fase='volumen', peso=70)
+        self._checks(fatigado, cumplidos=True, fatiga=8)
+        self._pesos(fatigado, [Decimal('70.00'), Decimal('70.40')], [Decimal('70.50')])
+
+        # Cumplimiento bajo → X
+        self._checks(self._cliente('pas_irregular', fase='mantenimiento', peso=60), cumplidos=False, fatiga=4)
+
+        # Sin ningún dato → X
+        self._cliente('pas_vacio', fase='mantenimiento', peso=None)
+
+    def _cliente(self, username, fase, peso):
+        cliente = Cliente.objects.get_or_create(user=User.objects.create_user(username))[0]
+        cliente.peso_corporal = peso
+        cliente.save()
+        PerfilNutricional.objects.create(cliente=cliente, altura_cm=175, fase=fase)
+        return cliente
+
+    def _checks(self, cliente, cumplidos, fatiga=None):
+        for i in range(7):
+            CheckNutricionalDiario.objects.create(
+                cliente=cliente, fecha=self.semana + timedelta(days=i), fatiga_percibida=fatiga,
+                bloques_proteina_cumplidos=True, bloques_carbos_cumplidos=cumplidos,
+                bloques_grasas_cumplidos=True, verduras_cumplidas=cumplidos or i % 2 == 0,
+            )
+
+    def _pesos(self, cliente, previa, actual):
+        for inicio, pesos in ((self.semana - timedelta(days=7), previa), (self.semana, actual)):
+            for peso in pesos:
+                registro = PesoDiario.objects.create(cliente=cliente, peso_kg=peso)
+                # fecha es auto_now_add: se fija después
+                PesoDiario.objects.filter(pk=registro.pk).update(fecha=inicio + timedelta(days=self.dia_peso % 7))
+                self.dia_peso += 1
+
+    def _entreno(self, cliente, fecha, volumen):
+        entreno = EntrenoRealizado.objects.create(cliente=cliente, rutina=self.rutina, fecha=fecha)
+        EntrenoRealizado.objects.filter(pk=entreno.pk).update(volumen_total_kg=volumen)
+
+    def _clientes(self):
+        return Cliente.objects.filter(perfil_nutricional__isnull=False, membresia_activa=True)
+
+    def _informes(self):
+        return {
+            fila['cliente']: fila for fila in
+            InformeOptimizacion.objects.filter(semana=self.lunes).values(*CAMPOS)
+        }
+
+    def test_mismos_informes_que_cliente_a_cliente(self):
+        for cliente in self._clientes():
+            analisis_semanal_pas(cliente, lunes=self.lunes)
+        esperado = self._informes()
+        self.assertEqual(
+            sorted(i['escenario'] for i in esperado.values()), ['B', 'C', 'X', 'X'],
+        )
+        self.assertTrue(any(i['safety_lock_activado'] for i in esperado.values()))
+
+        InformeOptimizacion.objects.all().delete()
+        informes = analisis_semanal_pas_cohorte(self._clientes(), lunes=self.lunes)
+        self.assertEqual(len(informes), 4)
+        self.assertEqual(self._informes(), esperado)
+
+        # Segunda pasada: actualiza en lugar de duplicar
+        analisis_semanal_pas_cohorte(self._clientes(), lunes=self.lunes)
+        self.assertEqual(self._informes(), esperado)
+        self.assertEqual(InformeOptimizacion.objects.count(), 4)
+
+    def test_consultas_constantes(self):
+        def consultas():
+            with CaptureQueriesContext(connection) as capturadas:
+                analisis_semanal_pas_cohorte(self._clientes(), lunes=self.lunes)
+            return len(capturadas)
+
+        # Primera pasada crea los informes; la segunda los actualiza
+        crear = consultas()
+        actualizar = consultas()
+        for i in range(6):
+            cliente = self._cliente(f'pas_extra_{i}', fase='definicion', peso=75)
+            self._checks(cliente, cumplidos=i % 2 == 0, fatiga=i + 2)
+        InformeOptimizacion.objects.all().delete()
+        self.assertEqual(consultas(), crear)
+        self.assertEqual(consultas(), actualizar)
+        self.assertEqual(InformeOptimizacion.objects.filter(semana=self.lunes).count(), 10)
+
+    def test_tarea_sigue_cliente_a_cliente_si_falla_la_cohorte(self):
+        with mock.patch('nutricion_app_django.services.analisis_semanal_pas_cohorte',
+                        side_effect=DatabaseError('caída')), \
+             mock.patch('nutricion_app_django.services.analisis_semanal_pas',
+                        side_effect=[ValueError('datos corruptos'), None, None, None]) as por_cliente:
+            resultado = tarea_analisis_semanal_nutricional()
+
+        self.assertEqual(por_cliente.call_count, 4)
+        self.assertEqual(resultado, 'PAS completado: 3/4 clientes procesados.')